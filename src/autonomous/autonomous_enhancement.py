@@ -21,6 +21,8 @@ import tempfile
 import sys
 import importlib.util
 
+from ..core.ast_pipeline import AnalysisPass, ASTPipeline, ParseCache
+
 @dataclass
 class CodeAnalysis:
     """Code analysis result"""
@@ -319,11 +321,17 @@ class SelfAnalyzer:
             "efficiency": self._analyze_efficiency
         }
         
+        # Parsed trees and AST pass results shared by the analyzers of one run
+        self.parse_cache = ParseCache()
+        self.walked_sources = {}
+        
     def perform_comprehensive_analysis(self) -> List[CodeAnalysis]:
         """Perform comprehensive analysis of target files"""
         logging.info("Starting comprehensive code analysis")
         
         analyses = []
+        self.parse_cache = ParseCache()
+        self.walked_sources = {}
         
         for file_path in self.target_files:
             if not Path(file_path).exists():
@@ -339,26 +347,47 @@ class SelfAnalyzer:
                 except Exception as e:
                     logging.error(f"Analysis failed for {file_path} ({analysis_type}): {e}")
                     
+        logging.debug(f"Parse cache: {self.parse_cache.misses} parses, {self.parse_cache.hits} reuses")
         self.analysis_history.extend(analyses)
         self._save_analysis_results(analyses)
         
         return analyses
         
+    def _ast_pass(self, file_path: str, analysis_type: str) -> AnalysisPass:
+        """The ``analysis_type`` pass after one shared walk of ``file_path``
+        
+        All AST-based analyzers are fed by the same walk, which is redone only
+        when the file's text has changed since.
+        """
+        source = self.parse_cache.get(file_path)
+        walked = self.walked_sources.get(file_path)
+        if walked is None or walked[0] is not source:
+            passes = {
+                "performance": PerformanceAnalysisVisitor(),
+                "complexity": ComplexityAnalysisVisitor(),
+                "maintainability": FunctionLengthPass(),
+                "efficiency": EfficiencyPass()
+            }
+            pipeline = ASTPipeline(passes.values())
+            pipeline.run(source.tree)
+            walked = (source, passes, pipeline.failures)
+            self.walked_sources[file_path] = walked
+            
+        _, passes, failures = walked
+        analysis_pass = passes[analysis_type]
+        if analysis_pass in failures:
+            raise failures[analysis_pass]
+        return analysis_pass
+        
     def _analyze_performance(self, file_path: str) -> Optional[CodeAnalysis]:
         """Analyze code for performance issues"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            tree = ast.parse(content)
-            
             issues = []
             metrics = {}
             suggestions = []
             
             # Analyze AST for performance issues
-            performance_visitor = PerformanceAnalysisVisitor()
-            performance_visitor.visit(tree)
+            performance_visitor = self._ast_pass(file_path, "performance")
             
             issues.extend(performance_visitor.issues)
             metrics.update(performance_visitor.metrics)
@@ -385,17 +414,11 @@ class SelfAnalyzer:
     def _analyze_complexity(self, file_path: str) -> Optional[CodeAnalysis]:
         """Analyze code complexity"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            tree = ast.parse(content)
+            complexity_visitor = self._ast_pass(file_path, "complexity")
             
-            complexity_visitor = ComplexityAnalysisVisitor()
-            complexity_visitor.visit(tree)
-            
-            metrics = complexity_visitor.metrics
-            issues = complexity_visitor.issues
-            suggestions = complexity_visitor.suggestions
+            metrics = dict(complexity_visitor.metrics)
+            issues = list(complexity_visitor.issues)
+            suggestions = list(complexity_visitor.suggestions)
             
             return CodeAnalysis(
                 file_path=file_path,
@@ -414,9 +437,7 @@ class SelfAnalyzer:
     def _analyze_maintainability(self, file_path: str) -> Optional[CodeAnalysis]:
         """Analyze code maintainability"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
+            content = self.parse_cache.get(file_path).content
             lines = content.split('\n')
             
             issues = []
@@ -450,23 +471,19 @@ class SelfAnalyzer:
                 })
                 
             # Check function lengths
-            tree = ast.parse(content)
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    func_length = node.end_lineno - node.lineno if hasattr(node, 'end_lineno') else 0
-                    if func_length > 50:
-                        issues.append({
-                            "type": "long_function",
-                            "severity": "medium",
-                            "message": f"Function '{node.name}' is {func_length} lines long",
-                            "line": node.lineno
-                        })
-                        suggestions.append({
-                            "type": "refactor_function",
-                            "description": f"Consider breaking down function '{node.name}' into smaller functions",
-                            "priority": "medium",
-                            "target": node.name
-                        })
+            for node, func_length in self._ast_pass(file_path, "maintainability").long_functions:
+                issues.append({
+                    "type": "long_function",
+                    "severity": "medium",
+                    "message": f"Function '{node.name}' is {func_length} lines long",
+                    "line": node.lineno
+                })
+                suggestions.append({
+                    "type": "refactor_function",
+                    "description": f"Consider breaking down function '{node.name}' into smaller functions",
+                    "priority": "medium",
+                    "target": node.name
+                })
             
             metrics["maintainability_score"] = max(0, 1.0 - (len(issues) * 0.15))
             
@@ -545,40 +562,10 @@ class SelfAnalyzer:
     def _analyze_efficiency(self, file_path: str) -> Optional[CodeAnalysis]:
         """Analyze code for efficiency improvements"""
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            tree = ast.parse(content)
-            
-            issues = []
+            # Look for inefficient patterns
+            issues = list(self._ast_pass(file_path, "efficiency").issues)
             suggestions = []
             
-            # Look for inefficient patterns
-            for node in ast.walk(tree):
-                # Check for inefficient list operations
-                if isinstance(node, ast.ListComp):
-                    # Look for nested list comprehensions
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.ListComp) and child != node:
-                            issues.append({
-                                "type": "nested_list_comprehension",
-                                "severity": "low",
-                                "message": "Nested list comprehensions can be inefficient",
-                                "line": getattr(node, 'lineno', None)
-                            })
-                            
-                # Check for string concatenation in loops
-                if isinstance(node, ast.For):
-                    for child in ast.walk(node):
-                        if isinstance(child, ast.AugAssign) and isinstance(child.op, ast.Add):
-                            if isinstance(child.target, ast.Name):
-                                issues.append({
-                                    "type": "string_concat_in_loop",
-                                    "severity": "medium",
-                                    "message": "String concatenation in loop can be inefficient",
-                                    "line": getattr(child, 'lineno', None)
-                                })
-                                
             # Generate efficiency suggestions
             if any(issue["type"] == "string_concat_in_loop" for issue in issues):
                 suggestions.append({
@@ -1100,7 +1087,7 @@ class AutonomousEnhancementLoop:
                 logging.info(f"Pipeline discovered {len(pipeline_context.discovered_opportunities)} opportunities")
                 
                 # Implement high-priority enhancements from the pipeline
-                await self._implement_pipeline_enhancements(pipeline_context)
+                await self._implement_pipeline_enhancements(pipeline_context, ParseCache())
                 
             return pipeline_context
             
@@ -1108,8 +1095,12 @@ class AutonomousEnhancementLoop:
             logging.error(f"Enhanced pipeline error: {e}")
             return None
 
-    async def _implement_pipeline_enhancements(self, pipeline_context):
-        """Implement enhancements from pipeline results"""
+    async def _implement_pipeline_enhancements(self, pipeline_context, parse_cache: ParseCache):
+        """Implement enhancements from pipeline results
+        
+        Impact measurements of the run share ``parse_cache``, so a file
+        targeted by several enhancements is only re-parsed once it changes.
+        """
         
         # Get implementation plan
         implementation_plan = pipeline_context.enhancement_plan.get('implementation_plan', {})
@@ -1134,7 +1125,8 @@ class AutonomousEnhancementLoop:
                         enhancement.target_file,
                         enhancement.enhancement_type,
                         pre_enhancement_callback=None,
-                        post_enhancement_callback=None
+                        post_enhancement_callback=None,
+                        parse_cache=parse_cache
                     )
                     
                     # Apply enhancement
@@ -1515,9 +1507,9 @@ class AutonomousEnhancementLoop:
             logging.warning("Metrics tracker not available for report generation")
             return None
 
-# AST Visitor classes for analysis
-class PerformanceAnalysisVisitor(ast.NodeVisitor):
-    """AST visitor for performance analysis"""
+# AST analysis passes; SelfAnalyzer feeds all of them from one walk per file
+class PerformanceAnalysisVisitor(AnalysisPass):
+    """AST pass for performance analysis"""
     
     def __init__(self):
         self.issues = []
@@ -1525,32 +1517,28 @@ class PerformanceAnalysisVisitor(ast.NodeVisitor):
         self.suggestions = []
         self.loop_depth = 0
         
-    def visit_For(self, node):
+    def _enter_loop(self, node):
         self.loop_depth += 1
-        self.generic_visit(node)
-        self.loop_depth -= 1
         
-    def visit_While(self, node):
-        self.loop_depth += 1
-        self.generic_visit(node)
+    def _leave_loop(self, node):
         self.loop_depth -= 1
         
+    visit_For = visit_While = _enter_loop
+    leave_For = leave_While = _leave_loop
+        
     def visit_Call(self, node):
         # Check for inefficient calls in loops
-        if self.loop_depth > 0:
-            if isinstance(node.func, ast.Attribute):
-                if node.func.attr in ['append', 'extend'] and self.loop_depth > 1:
-                    self.issues.append({
-                        "type": "performance_issue",
-                        "severity": "medium",
-                        "message": "List operations in nested loops can be inefficient",
-                        "line": getattr(node, 'lineno', None)
-                    })
-                    
-        self.generic_visit(node)
+        if self.loop_depth > 1 and isinstance(node.func, ast.Attribute):
+            if node.func.attr in ['append', 'extend']:
+                self.issues.append({
+                    "type": "performance_issue",
+                    "severity": "medium",
+                    "message": "List operations in nested loops can be inefficient",
+                    "line": getattr(node, 'lineno', None)
+                })
 
-class ComplexityAnalysisVisitor(ast.NodeVisitor):
-    """AST visitor for complexity analysis"""
+class ComplexityAnalysisVisitor(AnalysisPass):
+    """AST pass for complexity analysis"""
     
     def __init__(self):
         self.metrics = {}
@@ -1560,60 +1548,48 @@ class ComplexityAnalysisVisitor(ast.NodeVisitor):
         self.class_count = 0
         self.max_nesting = 0
         self.current_nesting = 0
+        # Decision points seen so far, and where each open function started counting
+        self.decision_points = 0
+        self.open_functions = []
         
     def visit_FunctionDef(self, node):
         self.function_count += 1
+        self.open_functions.append((len(self.issues), self.decision_points))
         
-        # Calculate function complexity
-        complexity = self._calculate_cyclomatic_complexity(node)
+    def leave_FunctionDef(self, node):
+        # Cyclomatic complexity of the function's subtree, nested functions included
+        issue_index, decisions_before = self.open_functions.pop()
+        complexity = 1 + self.decision_points - decisions_before
         
         if complexity > 10:
-            self.issues.append({
+            self.issues.insert(issue_index, {
                 "type": "high_complexity",
                 "severity": "medium",
                 "message": f"Function '{node.name}' has high complexity: {complexity}",
                 "line": node.lineno
             })
-            
-        self.generic_visit(node)
         
     def visit_ClassDef(self, node):
         self.class_count += 1
-        self.generic_visit(node)
-        
-    def visit_If(self, node):
-        self.current_nesting += 1
-        self.max_nesting = max(self.max_nesting, self.current_nesting)
-        self.generic_visit(node)
-        self.current_nesting -= 1
         
-    def visit_For(self, node):
+    def _enter_block(self, node):
+        self.decision_points += 1
         self.current_nesting += 1
         self.max_nesting = max(self.max_nesting, self.current_nesting)
-        self.generic_visit(node)
-        self.current_nesting -= 1
         
-    def visit_While(self, node):
-        self.current_nesting += 1
-        self.max_nesting = max(self.max_nesting, self.current_nesting)
-        self.generic_visit(node)
+    def _leave_block(self, node):
         self.current_nesting -= 1
         
-    def _calculate_cyclomatic_complexity(self, node):
-        """Calculate cyclomatic complexity for a function"""
-        complexity = 1  # Base complexity
+    visit_If = visit_For = visit_While = _enter_block
+    leave_If = leave_For = leave_While = _leave_block
         
-        for child in ast.walk(node):
-            if isinstance(child, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(child, ast.BoolOp):
-                complexity += len(child.values) - 1
-                
-        return complexity
+    def visit_ExceptHandler(self, node):
+        self.decision_points += 1
         
-    def visit_Module(self, node):
-        self.generic_visit(node)
+    def visit_BoolOp(self, node):
+        self.decision_points += len(node.values) - 1
         
+    def leave_Module(self, node):
         self.metrics.update({
             "function_count": self.function_count,
             "class_count": self.class_count,
@@ -1629,5 +1605,55 @@ class ComplexityAnalysisVisitor(ast.NodeVisitor):
                 "line": None
             })
 
+class FunctionLengthPass(AnalysisPass):
+    """Functions longer than 50 lines, for maintainability analysis"""
+    
+    def __init__(self):
+        self.long_functions = []
+        
+    def visit_FunctionDef(self, node):
+        func_length = node.end_lineno - node.lineno if hasattr(node, 'end_lineno') else 0
+        if func_length > 50:
+            self.long_functions.append((node, func_length))
+
+class EfficiencyPass(AnalysisPass):
+    """Nested list comprehensions and += inside for loops, for efficiency analysis"""
+    
+    def __init__(self):
+        self.issues = []
+        self.open_comprehensions = []
+        self.for_depth = 0
+        
+    def visit_ListComp(self, node):
+        # One issue per enclosing comprehension, reported at the enclosing one's line
+        for outer in self.open_comprehensions:
+            self.issues.append({
+                "type": "nested_list_comprehension",
+                "severity": "low",
+                "message": "Nested list comprehensions can be inefficient",
+                "line": getattr(outer, 'lineno', None)
+            })
+        self.open_comprehensions.append(node)
+        
+    def leave_ListComp(self, node):
+        self.open_comprehensions.pop()
+        
+    def visit_For(self, node):
+        self.for_depth += 1
+        
+    def leave_For(self, node):
+        self.for_depth -= 1
+        
+    def visit_AugAssign(self, node):
+        # Reported once per enclosing for loop
+        if isinstance(node.op, ast.Add) and isinstance(node.target, ast.Name):
+            for _ in range(self.for_depth):
+                self.issues.append({
+                    "type": "string_concat_in_loop",
+                    "severity": "medium",
+                    "message": "String concatenation in loop can be inefficient",
+                    "line": getattr(node, 'lineno', None)
+                })
+
 # Alias for backward compatibility
 EnhancementEngine = AutonomousEnhancementLoop
\ No newline at end of file
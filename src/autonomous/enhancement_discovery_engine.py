@@ -3,9 +3,11 @@ Enhanced Discovery Engine for SuperMini
 Sophisticated enhancement detection with ML-powered analysis and pattern recognition
 """
 
+import os
 import ast
 import inspect
 import logging
+import itertools
 import time
 import json
 import hashlib
@@ -15,10 +17,13 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import numpy as np
 from collections import defaultdict, Counter
-import sqlite3
 from threading import Lock
+from concurrent.futures import ProcessPoolExecutor
 import re
 
+from ..core.ast_pipeline import AnalysisPass, ASTPipeline, CyclomaticComplexity
+from ..core.sqlite_db import Migration, SQLiteDatabase
+
 # ML and analysis imports
 try:
     from sklearn.feature_extraction.text import TfidfVectorizer
@@ -29,6 +34,10 @@ except ImportError:
     ML_AVAILABLE = False
     logging.warning("ML libraries not available. Using fallback analysis methods.")
 
+# Bump whenever metrics, pattern detectors or opportunity generation change,
+# so cached per-file analyses from older code are recomputed
+ANALYZER_VERSION = 2
+
 @dataclass
 class CodeMetrics:
     """Comprehensive code metrics"""
@@ -69,6 +78,16 @@ class EnhancementOpportunity:
     estimated_benefit: Dict[str, float]
     timestamp: float
 
+@dataclass
+class FileAnalysis:
+    """Outcome of analyzing one file; returned by analysis worker processes"""
+    file_path: str
+    content: Optional[str]
+    metrics: Optional[CodeMetrics]
+    opportunities: List[EnhancementOpportunity]
+    error: Optional[str] = None
+    cached: bool = False
+
 @dataclass
 class CodeContext:
     """Detailed code context for opportunities"""
@@ -89,25 +108,25 @@ class CodePatternMatcher:
             'performance_antipatterns': [
                 {
                     'name': 'nested_loop_with_append',
-                    'pattern': self._detect_nested_loop_append,
+                    'pass': NestedLoopAppendPass,
                     'severity': 'high',
                     'description': 'Nested loops with list append operations'
                 },
                 {
                     'name': 'string_concatenation_in_loop',
-                    'pattern': self._detect_string_concat_loop,
+                    'pass': StringConcatLoopPass,
                     'severity': 'medium',
                     'description': 'String concatenation inside loops'
                 },
                 {
                     'name': 'inefficient_data_structure',
-                    'pattern': self._detect_inefficient_data_structures,
+                    'pass': ListRemovePass,
                     'severity': 'medium',
                     'description': 'Use of inefficient data structures'
                 },
                 {
                     'name': 'repeated_computation',
-                    'pattern': self._detect_repeated_computation,
+                    'pass': RepeatedComputationPass,
                     'severity': 'high',
                     'description': 'Repeated expensive computations'
                 }
@@ -115,25 +134,25 @@ class CodePatternMatcher:
             'maintainability_issues': [
                 {
                     'name': 'long_parameter_list',
-                    'pattern': self._detect_long_parameter_list,
+                    'pass': LongParameterListPass,
                     'severity': 'medium',
                     'description': 'Functions with too many parameters'
                 },
                 {
                     'name': 'deep_nesting',
-                    'pattern': self._detect_deep_nesting,
+                    'pass': DeepNestingPass,
                     'severity': 'high',
                     'description': 'Deeply nested code structures'
                 },
                 {
                     'name': 'large_class',
-                    'pattern': self._detect_large_class,
+                    'pass': LargeClassPass,
                     'severity': 'medium',
                     'description': 'Classes with too many methods or lines'
                 },
                 {
                     'name': 'duplicate_code',
-                    'pattern': self._detect_duplicate_code,
+                    'pass': DuplicateCodePass,
                     'severity': 'high',
                     'description': 'Duplicate or similar code blocks'
                 }
@@ -141,13 +160,13 @@ class CodePatternMatcher:
             'security_vulnerabilities': [
                 {
                     'name': 'dangerous_eval',
-                    'pattern': self._detect_dangerous_eval,
+                    'pass': DangerousEvalPass,
                     'severity': 'critical',
                     'description': 'Use of eval() or exec() with untrusted input'
                 },
                 {
                     'name': 'sql_injection_risk',
-                    'pattern': self._detect_sql_injection_risk,
+                    'pass': SqlInjectionPass,
                     'severity': 'critical',
                     'description': 'Potential SQL injection vulnerabilities'
                 },
@@ -159,7 +178,7 @@ class CodePatternMatcher:
                 },
                 {
                     'name': 'unsafe_deserialization',
-                    'pattern': self._detect_unsafe_deserialization,
+                    'pass': UnsafeDeserializationPass,
                     'severity': 'high',
                     'description': 'Unsafe deserialization operations'
                 }
@@ -167,39 +186,55 @@ class CodePatternMatcher:
             'modern_improvements': [
                 {
                     'name': 'missing_type_hints',
-                    'pattern': self._detect_missing_type_hints,
+                    'pass': MissingTypeHintsPass,
                     'severity': 'low',
                     'description': 'Functions without type hints'
                 },
                 {
                     'name': 'old_string_formatting',
-                    'pattern': self._detect_old_string_formatting,
+                    'pass': OldStringFormattingPass,
                     'severity': 'low',
                     'description': 'Old-style string formatting'
                 },
                 {
                     'name': 'missing_async_opportunities',
-                    'pattern': self._detect_async_opportunities,
+                    'pass': AsyncOpportunityPass,
                     'severity': 'medium',
                     'description': 'I/O operations that could be async'
                 },
                 {
                     'name': 'outdated_patterns',
-                    'pattern': self._detect_outdated_patterns,
+                    'pass': OutdatedPatternPass,
                     'severity': 'low',
                     'description': 'Usage of outdated coding patterns'
                 }
             ]
         }
         
-    def analyze_patterns(self, file_path: str, ast_tree: ast.AST) -> List[Dict[str, Any]]:
-        """Analyze code for all patterns"""
+    def create_passes(self) -> List[Tuple[str, Dict[str, Any], AnalysisPass]]:
+        """Fresh (category, pattern info, pass) triples for every AST-based detector"""
+        return [(category, pattern_info, pattern_info['pass']())
+                for category, patterns in self.patterns.items()
+                for pattern_info in patterns if 'pass' in pattern_info]
+        
+    def collect_patterns(self, file_path: str, passes: List[Tuple[str, Dict[str, Any], AnalysisPass]],
+                         content: Optional[str] = None,
+                         failures: Optional[Dict[AnalysisPass, Exception]] = None) -> List[Dict[str, Any]]:
+        """Detected patterns from passes that have walked the tree, plus the source-based detectors"""
+        failures = failures or {}
+        passes_by_name = {pattern_info['name']: analysis_pass for _, pattern_info, analysis_pass in passes}
         detected_patterns = []
         
         for category, patterns in self.patterns.items():
             for pattern_info in patterns:
                 try:
-                    matches = pattern_info['pattern'](file_path, ast_tree)
+                    if 'pass' in pattern_info:
+                        analysis_pass = passes_by_name[pattern_info['name']]
+                        if analysis_pass in failures:
+                            raise failures[analysis_pass]
+                        matches = analysis_pass.matches
+                    else:
+                        matches = pattern_info['pattern'](file_path, None, content)
                     for match in matches:
                         detected_patterns.append({
                             'category': category,
@@ -215,335 +250,26 @@ class CodePatternMatcher:
                     
         return detected_patterns
         
-    def _detect_nested_loop_append(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect nested loops with append operations"""
-        matches = []
-        
-        class NestedLoopVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.loop_depth = 0
-                self.found_patterns = []
-                
-            def visit_For(self, node):
-                self.loop_depth += 1
-                self.generic_visit(node)
-                self.loop_depth -= 1
-                
-            def visit_While(self, node):
-                self.loop_depth += 1
-                self.generic_visit(node)
-                self.loop_depth -= 1
-                
-            def visit_Call(self, node):
-                if (self.loop_depth >= 2 and 
-                    isinstance(node.func, ast.Attribute) and 
-                    node.func.attr == 'append'):
-                    
-                    self.found_patterns.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'loop_depth': self.loop_depth},
-                        'suggestions': [
-                            'Consider using list comprehensions',
-                            'Pre-allocate list size if known',
-                            'Use numpy arrays for numerical data'
-                        ]
-                    })
-                    
-                self.generic_visit(node)
-                
-        visitor = NestedLoopVisitor()
-        visitor.visit(tree)
-        return visitor.found_patterns
+    def analyze_patterns(self, file_path: str, ast_tree: ast.AST, content: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Analyze code for all patterns in a single walk of ``ast_tree``
         
-    def _detect_string_concat_loop(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect string concatenation in loops"""
-        matches = []
+        Source-based detectors get ``content`` when it is given instead of
+        reading the file again.
+        """
+        passes = self.create_passes()
+        pipeline = ASTPipeline(analysis_pass for _, _, analysis_pass in passes)
+        pipeline.run(ast_tree)
+        return self.collect_patterns(file_path, passes, content, pipeline.failures)
         
-        class StringConcatVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.in_loop = False
-                self.found_patterns = []
-                
-            def visit_For(self, node):
-                old_in_loop = self.in_loop
-                self.in_loop = True
-                self.generic_visit(node)
-                self.in_loop = old_in_loop
-                
-            def visit_While(self, node):
-                old_in_loop = self.in_loop
-                self.in_loop = True
-                self.generic_visit(node)
-                self.in_loop = old_in_loop
-                
-            def visit_AugAssign(self, node):
-                if (self.in_loop and 
-                    isinstance(node.op, ast.Add) and
-                    self._is_string_operation(node)):
-                    
-                    self.found_patterns.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'operation': 'string_concatenation'},
-                        'suggestions': [
-                            'Use str.join() for better performance',
-                            'Use list.append() then join',
-                            'Consider using StringIO for complex cases'
-                        ]
-                    })
-                    
-                self.generic_visit(node)
-                
-            def _is_string_operation(self, node):
-                # Simple heuristic - could be more sophisticated
-                return True
-                
-        visitor = StringConcatVisitor()
-        visitor.visit(tree)
-        return visitor.found_patterns
-        
-    def _detect_inefficient_data_structures(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect use of inefficient data structures"""
-        matches = []
-        
-        class DataStructureVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.found_patterns = []
-                
-            def visit_Call(self, node):
-                # Check for list operations that should use sets
-                if (isinstance(node.func, ast.Attribute) and
-                    node.func.attr == 'remove' and
-                    isinstance(node.func.value, ast.Name)):
-                    
-                    self.found_patterns.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'operation': 'list_remove'},
-                        'suggestions': [
-                            'Consider using set for O(1) removal',
-                            'Use collections.deque for frequent removals',
-                            'Pre-filter data to avoid removals'
-                        ]
-                    })
-                    
-                self.generic_visit(node)
-                
-        visitor = DataStructureVisitor()
-        visitor.visit(tree)
-        return visitor.found_patterns
-        
-    def _detect_repeated_computation(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect repeated expensive computations"""
-        matches = []
-        
-        # This would require more sophisticated analysis
-        # For now, detect obvious patterns like repeated function calls
-        
-        class RepeatedComputationVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.function_calls = defaultdict(list)
-                self.found_patterns = []
-                
-            def visit_Call(self, node):
-                if isinstance(node.func, ast.Name):
-                    func_name = node.func.id
-                    self.function_calls[func_name].append(getattr(node, 'lineno', 0))
-                    
-                self.generic_visit(node)
-                
-            def analyze_patterns(self):
-                for func_name, lines in self.function_calls.items():
-                    if len(lines) > 3:  # Called more than 3 times
-                        self.found_patterns.append({
-                            'location': {'line': min(lines)},
-                            'context': {'function': func_name, 'call_count': len(lines)},
-                            'suggestions': [
-                                'Consider caching the result',
-                                'Move computation outside loop if possible',
-                                'Use memoization decorator'
-                            ]
-                        })
-                        
-        visitor = RepeatedComputationVisitor()
-        visitor.visit(tree)
-        visitor.analyze_patterns()
-        return visitor.found_patterns
-        
-    def _detect_long_parameter_list(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect functions with too many parameters"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                param_count = len(node.args.args)
-                if param_count > 5:  # Threshold for too many parameters
-                    matches.append({
-                        'location': {'line': node.lineno},
-                        'context': {'function': node.name, 'param_count': param_count},
-                        'suggestions': [
-                            'Use a configuration object or dataclass',
-                            'Group related parameters into structs',
-                            'Consider using **kwargs for optional parameters'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_deep_nesting(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect deeply nested code"""
-        matches = []
-        
-        class NestingVisitor(ast.NodeVisitor):
-            def __init__(self):
-                self.nesting_level = 0
-                self.max_nesting = 0
-                self.found_patterns = []
-                
-            def visit_If(self, node):
-                self.nesting_level += 1
-                self.max_nesting = max(self.max_nesting, self.nesting_level)
-                
-                if self.nesting_level > 4:  # Deep nesting threshold
-                    self.found_patterns.append({
-                        'location': {'line': node.lineno},
-                        'context': {'nesting_level': self.nesting_level},
-                        'suggestions': [
-                            'Extract nested logic into separate functions',
-                            'Use early returns to reduce nesting',
-                            'Consider using guard clauses'
-                        ]
-                    })
-                    
-                self.generic_visit(node)
-                self.nesting_level -= 1
-                
-            def visit_For(self, node):
-                self.nesting_level += 1
-                self.max_nesting = max(self.max_nesting, self.nesting_level)
-                self.generic_visit(node)
-                self.nesting_level -= 1
-                
-            def visit_While(self, node):
-                self.nesting_level += 1
-                self.max_nesting = max(self.max_nesting, self.nesting_level)
-                self.generic_visit(node)
-                self.nesting_level -= 1
-                
-        visitor = NestingVisitor()
-        visitor.visit(tree)
-        return visitor.found_patterns
-        
-    def _detect_large_class(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect classes that are too large"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                method_count = sum(1 for n in node.body if isinstance(n, ast.FunctionDef))
-                
-                if method_count > 15:  # Too many methods
-                    matches.append({
-                        'location': {'line': node.lineno},
-                        'context': {'class': node.name, 'method_count': method_count},
-                        'suggestions': [
-                            'Split class into smaller, focused classes',
-                            'Extract related methods into mixins',
-                            'Use composition instead of inheritance'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_duplicate_code(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect duplicate code blocks"""
-        matches = []
-        
-        # This is a simplified implementation
-        # A full implementation would use more sophisticated similarity detection
-        
-        function_bodies = []
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                # Convert function body to string for comparison
-                body_str = ast.dump(node)
-                function_bodies.append({
-                    'name': node.name,
-                    'line': node.lineno,
-                    'body': body_str
-                })
-                
-        # Look for similar function bodies
-        for i, func1 in enumerate(function_bodies):
-            for j, func2 in enumerate(function_bodies[i+1:], i+1):
-                similarity = self._calculate_similarity(func1['body'], func2['body'])
-                if similarity > 0.8:  # High similarity threshold
-                    matches.append({
-                        'location': {'line': func1['line']},
-                        'context': {
-                            'function1': func1['name'],
-                            'function2': func2['name'],
-                            'similarity': similarity
-                        },
-                        'suggestions': [
-                            'Extract common code into shared function',
-                            'Use template method pattern',
-                            'Consider parameterizing the differences'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_dangerous_eval(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect dangerous use of eval/exec"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                if node.func.id in ['eval', 'exec']:
-                    matches.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'function': node.func.id},
-                        'suggestions': [
-                            'Use ast.literal_eval for safe evaluation',
-                            'Consider using a whitelist of allowed operations',
-                            'Validate and sanitize input before evaluation'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_sql_injection_risk(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect SQL injection risks"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                # Look for string formatting in SQL-like contexts
-                if (isinstance(node.func, ast.Attribute) and
-                    node.func.attr in ['execute', 'query']):
-                    
-                    # Check if using string formatting
-                    for arg in node.args:
-                        if isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mod):
-                            matches.append({
-                                'location': {'line': getattr(node, 'lineno', 0)},
-                                'context': {'method': node.func.attr},
-                                'suggestions': [
-                                    'Use parameterized queries',
-                                    'Use ORM query builders',
-                                    'Validate and escape input parameters'
-                                ]
-                            })
-                            
-        return matches
-        
-    def _detect_hardcoded_secrets(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
+    def _detect_hardcoded_secrets(self, file_path: str, tree: ast.AST, content: Optional[str] = None) -> List[Dict[str, Any]]:
         """Detect hardcoded secrets"""
         matches = []
         
         # Read file content to check for patterns
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
                 
             # Look for common secret patterns
             secret_patterns = [
@@ -571,134 +297,6 @@ class CodePatternMatcher:
             logging.error(f"Error reading file for secret detection: {e}")
             
         return matches
-        
-    def _detect_unsafe_deserialization(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect unsafe deserialization"""
-        matches = []
-        
-        unsafe_functions = ['pickle.loads', 'pickle.load', 'yaml.load']
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Attribute):
-                    func_name = f"{node.func.value.id if isinstance(node.func.value, ast.Name) else 'unknown'}.{node.func.attr}"
-                    if func_name in unsafe_functions:
-                        matches.append({
-                            'location': {'line': getattr(node, 'lineno', 0)},
-                            'context': {'function': func_name},
-                            'suggestions': [
-                                'Use safe_load for YAML',
-                                'Validate data before deserialization',
-                                'Use JSON instead of pickle when possible'
-                            ]
-                        })
-                        
-        return matches
-        
-    def _detect_missing_type_hints(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect functions without type hints"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                has_return_annotation = node.returns is not None
-                has_arg_annotations = any(arg.annotation for arg in node.args.args)
-                
-                if not has_return_annotation or not has_arg_annotations:
-                    matches.append({
-                        'location': {'line': node.lineno},
-                        'context': {'function': node.name},
-                        'suggestions': [
-                            'Add type hints for better code clarity',
-                            'Use typing module for complex types',
-                            'Consider using mypy for type checking'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_old_string_formatting(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect old-style string formatting"""
-        matches = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.BinOp) and isinstance(node.op, ast.Mod):
-                if isinstance(node.left, ast.Str):  # Old-style % formatting
-                    matches.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'type': 'percent_formatting'},
-                        'suggestions': [
-                            'Use f-strings for better performance and readability',
-                            'Use str.format() for complex formatting',
-                            'Consider using template strings for user-facing text'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_async_opportunities(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect I/O operations that could be async"""
-        matches = []
-        
-        io_functions = ['open', 'requests.get', 'requests.post', 'urlopen', 'read', 'write']
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                func_name = None
-                if isinstance(node.func, ast.Name):
-                    func_name = node.func.id
-                elif isinstance(node.func, ast.Attribute):
-                    func_name = node.func.attr
-                    
-                if func_name in io_functions:
-                    matches.append({
-                        'location': {'line': getattr(node, 'lineno', 0)},
-                        'context': {'function': func_name},
-                        'suggestions': [
-                            'Consider using async/await for I/O operations',
-                            'Use aiohttp for HTTP requests',
-                            'Use aiofiles for file operations'
-                        ]
-                    })
-                    
-        return matches
-        
-    def _detect_outdated_patterns(self, file_path: str, tree: ast.AST) -> List[Dict[str, Any]]:
-        """Detect usage of outdated patterns"""
-        matches = []
-        
-        # This would be extended with more patterns
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call):
-                if isinstance(node.func, ast.Name) and node.func.id == 'range':
-                    # Check for range with only one argument in a for loop
-                    parent = getattr(node, 'parent', None)
-                    if (parent and isinstance(parent, ast.For) and 
-                        len(node.args) == 1):
-                        matches.append({
-                            'location': {'line': getattr(node, 'lineno', 0)},
-                            'context': {'pattern': 'range_one_arg'},
-                            'suggestions': [
-                                'Consider using enumerate() when you need both index and value',
-                                'Use direct iteration when index is not needed'
-                            ]
-                        })
-                        
-        return matches
-        
-    def _calculate_similarity(self, str1: str, str2: str) -> float:
-        """Calculate similarity between two strings"""
-        # Simple similarity calculation
-        set1 = set(str1.split())
-        set2 = set(str2.split())
-        
-        if not set1 or not set2:
-            return 0.0
-            
-        intersection = set1.intersection(set2)
-        union = set1.union(set2)
-        
-        return len(intersection) / len(union)
 
 class MLEnhancedAnalyzer:
     """Machine learning enhanced code analysis"""
@@ -849,6 +447,44 @@ class MLEnhancedAnalyzer:
             
         return sorted(opportunities, key=lambda x: x.priority_rank, reverse=True)
 
+# Schema of discovery_cache.db; append new steps, never edit applied ones
+DISCOVERY_MIGRATIONS = [
+    Migration(1, "code metrics, opportunities and file analysis cache", """
+        CREATE TABLE IF NOT EXISTS code_metrics (
+            file_path TEXT PRIMARY KEY,
+            metrics_data TEXT NOT NULL,
+            timestamp REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS enhancement_opportunities (
+            opportunity_id TEXT PRIMARY KEY,
+            opportunity_data TEXT NOT NULL,
+            priority_rank INTEGER DEFAULT 0,
+            status TEXT DEFAULT 'discovered',
+            timestamp REAL NOT NULL
+        );
+        CREATE TABLE IF NOT EXISTS file_analysis_cache (
+            file_path TEXT PRIMARY KEY,
+            content_hash TEXT NOT NULL,
+            analyzer_version INTEGER NOT NULL,
+            metrics_data TEXT,
+            opportunities_data TEXT NOT NULL,
+            error TEXT,
+            timestamp REAL NOT NULL
+        );
+    """),
+    Migration(2, "indexed file_path, opportunity_type, status and priority on opportunities", """
+        ALTER TABLE enhancement_opportunities ADD COLUMN file_path TEXT;
+        ALTER TABLE enhancement_opportunities ADD COLUMN opportunity_type TEXT;
+        UPDATE enhancement_opportunities
+            SET file_path = json_extract(opportunity_data, '$.file_path'),
+                opportunity_type = json_extract(opportunity_data, '$.opportunity_type');
+        CREATE INDEX idx_opportunities_file ON enhancement_opportunities (file_path, priority_rank);
+        CREATE INDEX idx_opportunities_type ON enhancement_opportunities (opportunity_type, priority_rank);
+        CREATE INDEX idx_opportunities_status ON enhancement_opportunities (status, priority_rank);
+        CREATE INDEX idx_opportunities_priority ON enhancement_opportunities (priority_rank);
+    """),
+]
+
 class EnhancementDiscoveryEngine:
     """Enhanced discovery engine with sophisticated analysis capabilities"""
     
@@ -865,55 +501,49 @@ class EnhancementDiscoveryEngine:
         self.discovered_opportunities = []
         self.lock = Lock()
         
+        # Files are analyzed in a process pool when there are enough of them to pay for it
+        self.max_workers = os.cpu_count() or 1
+        self.parallel_min_files = 8
+        
+        # Per-file analyses are reused while the file content and ANALYZER_VERSION are unchanged
+        self.analysis_cache_stats = {'hits': 0, 'misses': 0}
+        self.last_run_cache_stats = {'hits': 0, 'misses': 0}
+        
         # Database for persistent storage
         self.db_path = cache_dir / "discovery_cache.db"
-        self._init_database()
-        
-    def _init_database(self):
-        """Initialize discovery database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS code_metrics (
-                    file_path TEXT PRIMARY KEY,
-                    metrics_data TEXT NOT NULL,
-                    timestamp REAL NOT NULL
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS enhancement_opportunities (
-                    opportunity_id TEXT PRIMARY KEY,
-                    opportunity_data TEXT NOT NULL,
-                    priority_rank INTEGER DEFAULT 0,
-                    status TEXT DEFAULT 'discovered',
-                    timestamp REAL NOT NULL
-                )
-            """)
+        self.db = SQLiteDatabase(self.db_path, DISCOVERY_MIGRATIONS)
             
     def discover_enhancement_opportunities(self, 
                                          target_files: List[str], 
-                                         context: Dict[str, Any] = None) -> List[EnhancementOpportunity]:
-        """Discover enhancement opportunities with sophisticated analysis"""
+                                         context: Dict[str, Any] = None,
+                                         max_workers: Optional[int] = None) -> List[EnhancementOpportunity]:
+        """Discover enhancement opportunities with sophisticated analysis
+        
+        Files are parsed and analyzed in parallel worker processes (up to
+        ``max_workers``, default one per core); results are merged in
+        ``target_files`` order so the outcome does not depend on scheduling.
+        """
         
         logging.info(f"Starting enhancement discovery for {len(target_files)} files")
         
         all_opportunities = []
         code_samples = []
+        metrics = []
         
+        for analysis in self._analyze_files(target_files, context, max_workers):
+            if analysis.error:
+                logging.error(f"Failed to analyze {analysis.file_path}: {analysis.error}")
+            all_opportunities.extend(analysis.opportunities)
+            if analysis.metrics and not analysis.cached:
+                metrics.append(analysis.metrics)
+            # Collect code samples for ML analysis
+            if analysis.content is not None:
+                code_samples.append(analysis.content)
+        
+        self._store_metrics_batch(metrics)
+        
+        # The ML analyzer is shared between discovery runs
         with self.lock:
-            for file_path in target_files:
-                try:
-                    # Analyze individual file
-                    opportunities = self._analyze_file_for_opportunities(file_path, context)
-                    all_opportunities.extend(opportunities)
-                    
-                    # Collect code samples for ML analysis
-                    with open(file_path, 'r', encoding='utf-8') as f:
-                        code_samples.append(f.read())
-                        
-                except Exception as e:
-                    logging.error(f"Failed to analyze {file_path}: {e}")
-                    
             # Perform ML-enhanced analysis
             if code_samples:
                 ml_insights = self.ml_analyzer.analyze_code_patterns(code_samples)
@@ -922,75 +552,214 @@ class EnhancementDiscoveryEngine:
             # Rank opportunities using ML
             ranked_opportunities = self.ml_analyzer.predict_enhancement_priority(all_opportunities)
             
-            # Store opportunities in database
-            self._store_opportunities(ranked_opportunities)
+        # Store opportunities in database
+        self._store_opportunities(ranked_opportunities)
             
-        logging.info(f"Discovered {len(ranked_opportunities)} enhancement opportunities")
+        logging.info(f"Discovered {len(ranked_opportunities)} enhancement opportunities "
+                     f"({self.last_run_cache_stats['hits']} of {len(target_files)} files unchanged)")
         return ranked_opportunities
         
-    def _analyze_file_for_opportunities(self, 
-                                      file_path: str, 
-                                      context: Dict[str, Any] = None) -> List[EnhancementOpportunity]:
-        """Analyze single file for enhancement opportunities"""
-        opportunities = []
+    def _analyze_files(self, 
+                       target_files: List[str], 
+                       context: Dict[str, Any] = None,
+                       max_workers: Optional[int] = None) -> List[FileAnalysis]:
+        """Analyze files, reusing cached analyses of unchanged files, in input order
+        
+        A cached analysis is reused only when the file's SHA-256 content hash
+        and ANALYZER_VERSION both match; anything else re-analyzes the file
+        and replaces the cache row. Unreadable files are never cached.
+        """
+        results: Dict[str, FileAnalysis] = {}
+        sources: Dict[str, str] = {}
+        for file_path in dict.fromkeys(target_files):
+            try:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    sources[file_path] = f.read()
+            except Exception as e:
+                results[file_path] = FileAnalysis(file_path, None, None, [], error=str(e))
+        hashes = {path: hashlib.sha256(content.encode('utf-8')).hexdigest() for path, content in sources.items()}
+        
+        results.update(self._load_cached_analyses(hashes, sources))
+        stale = [path for path in sources if path not in results]
+        analyses = self._run_analyses(stale, sources, context, max_workers)
+        self._cache_analyses(analyses, hashes)
+        results.update((analysis.file_path, analysis) for analysis in analyses)
+        
+        self.last_run_cache_stats = {'hits': len(sources) - len(stale), 'misses': len(stale)}
+        for key, value in self.last_run_cache_stats.items():
+            self.analysis_cache_stats[key] += value
+        return [results[file_path] for file_path in target_files]
+        
+    def _run_analyses(self, 
+                      file_paths: List[str], 
+                      sources: Dict[str, str],
+                      context: Dict[str, Any] = None,
+                      max_workers: Optional[int] = None) -> List[FileAnalysis]:
+        """Analyze files in worker processes, falling back to this process, in input order"""
+        contents = [sources[file_path] for file_path in file_paths]
+        workers = min(max_workers or self.max_workers, len(file_paths))
+        if workers > 1 and len(file_paths) >= self.parallel_min_files:
+            try:
+                chunksize = max(1, len(file_paths) // (workers * 4))
+                with ProcessPoolExecutor(max_workers=workers, initializer=_init_analysis_worker,
+                                         initargs=(self.cache_dir,)) as executor:
+                    return list(executor.map(_analyze_in_worker, file_paths, itertools.repeat(context), contents,
+                                             chunksize=chunksize))
+            except Exception as e:
+                logging.warning(f"Parallel file analysis unavailable, analyzing serially: {e}")
+        return [self.analyze_file(file_path, context, content) for file_path, content in zip(file_paths, contents)]
+        
+    def _load_cached_analyses(self, hashes: Dict[str, str], sources: Dict[str, str]) -> Dict[str, FileAnalysis]:
+        """Cached analyses of files whose content hash and analyzer version match"""
+        cached = {}
+        with self.db.snapshot() as conn:
+            for file_path, content_hash in hashes.items():
+                row = conn.execute(
+                    "SELECT metrics_data, opportunities_data, error FROM file_analysis_cache "
+                    "WHERE file_path = ? AND content_hash = ? AND analyzer_version = ?",
+                    (file_path, content_hash, ANALYZER_VERSION)
+                ).fetchone()
+                if row is None:
+                    continue
+                metrics_data, opportunities_data, error = row
+                cached[file_path] = FileAnalysis(
+                    file_path=file_path,
+                    content=sources[file_path],
+                    metrics=CodeMetrics(**json.loads(metrics_data)) if metrics_data else None,
+                    opportunities=[EnhancementOpportunity(**data) for data in json.loads(opportunities_data)],
+                    error=error,
+                    cached=True
+                )
+        return cached
+        
+    def _cache_analyses(self, analyses: List[FileAnalysis], hashes: Dict[str, str]):
+        """Remember analyses (including parse failures) keyed by content hash"""
+        self.db.executemany(
+            "INSERT OR REPLACE INTO file_analysis_cache "
+            "(file_path, content_hash, analyzer_version, metrics_data, opportunities_data, error, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(analysis.file_path, hashes[analysis.file_path], ANALYZER_VERSION,
+              json.dumps(asdict(analysis.metrics)) if analysis.metrics else None,
+              json.dumps([asdict(opp) for opp in analysis.opportunities]), analysis.error, time.time())
+             for analysis in analyses]
+        )
+            
+    def invalidate_analysis_cache(self, file_paths: Optional[List[str]] = None) -> int:
+        """Drop cached analyses for ``file_paths``, or for files that no longer exist when omitted"""
+        with self.db.transaction() as conn:
+            if file_paths is None:
+                cached_paths = [row[0] for row in conn.execute("SELECT file_path FROM file_analysis_cache")]
+                file_paths = [path for path in cached_paths if not Path(path).exists()]
+            conn.executemany("DELETE FROM file_analysis_cache WHERE file_path = ?",
+                             [(path,) for path in file_paths])
+        return len(file_paths)
+        
+    def get_analysis_cache_report(self) -> Dict[str, Any]:
+        """Hit rates of the per-file analysis cache, for the last run and since startup"""
+        def rate(stats):
+            total = stats['hits'] + stats['misses']
+            return stats['hits'] / total if total else 0.0
+        
+        entries, current = self.db.execute(
+            "SELECT COUNT(*), SUM(analyzer_version = ?) FROM file_analysis_cache", (ANALYZER_VERSION,)
+        ).fetchone()
+        return {
+            'analyzer_version': ANALYZER_VERSION,
+            'entries': entries,
+            'stale_entries': entries - (current or 0),
+            'last_run': dict(self.last_run_cache_stats, hit_rate=rate(self.last_run_cache_stats)),
+            'total': dict(self.analysis_cache_stats, hit_rate=rate(self.analysis_cache_stats)),
+        }
         
+    def analyze_file(self, file_path: str, context: Dict[str, Any] = None, content: Optional[str] = None) -> FileAnalysis:
+        """Read (unless ``content`` is given), parse and analyze one file without touching shared state
+        
+        Metrics and every AST pattern detector are fed from a single walk of the tree.
+        """
         try:
             # Read and parse file
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
+            if content is None:
+                with open(file_path, 'r', encoding='utf-8') as f:
+                    content = f.read()
                 
             tree = ast.parse(content)
             
+            metric_passes = self._metric_passes(content)
+            pattern_passes = self.pattern_matcher.create_passes()
+            pipeline = ASTPipeline(list(metric_passes.values()) +
+                                   [analysis_pass for _, _, analysis_pass in pattern_passes])
+            pipeline.run(tree)
+            
             # Calculate comprehensive metrics
-            metrics = self._calculate_comprehensive_metrics(file_path, content, tree)
+            metrics = self._calculate_comprehensive_metrics(file_path, content, tree, metric_passes,
+                                                            pipeline.failures)
             
             # Pattern-based analysis
-            detected_patterns = self.pattern_matcher.analyze_patterns(file_path, tree)
+            detected_patterns = self.pattern_matcher.collect_patterns(file_path, pattern_passes, content,
+                                                                      pipeline.failures)
             
             # Convert patterns to opportunities
+            opportunities = []
             for pattern in detected_patterns:
                 opportunity = self._pattern_to_opportunity(file_path, pattern, metrics)
                 if opportunity:
                     opportunities.append(opportunity)
                     
             # Metric-based opportunities
-            metric_opportunities = self._metrics_to_opportunities(file_path, metrics)
-            opportunities.extend(metric_opportunities)
-            
-            # Store metrics
-            self._store_metrics(file_path, metrics)
+            opportunities.extend(self._metrics_to_opportunities(file_path, metrics))
+            return FileAnalysis(file_path, content, metrics, opportunities)
             
         except Exception as e:
-            logging.error(f"File analysis failed for {file_path}: {e}")
-            
-        return opportunities
+            return FileAnalysis(file_path, content, None, [], error=str(e))
         
-    def _calculate_comprehensive_metrics(self, file_path: str, content: str, tree: ast.AST) -> CodeMetrics:
-        """Calculate comprehensive code metrics"""
+    def _analyze_file_for_opportunities(self, 
+                                      file_path: str, 
+                                      context: Dict[str, Any] = None) -> List[EnhancementOpportunity]:
+        """Analyze single file for enhancement opportunities"""
+        analysis = self.analyze_file(file_path, context)
+        if analysis.error:
+            logging.error(f"File analysis failed for {file_path}: {analysis.error}")
+        if analysis.metrics:
+            self._store_metrics(file_path, analysis.metrics)
+        return analysis.opportunities
+        
+    def _metric_passes(self, content: str) -> Dict[str, AnalysisPass]:
+        """Fresh passes behind the AST-derived parts of CodeMetrics"""
+        return {
+            'complexity': ComplexityCalculator(),
+            'performance': PerformanceScorePass(),
+            'security': SecurityScorePass(content),
+            'dependencies': DependencyPass(),
+            'code_smells': CodeSmellPass(),
+        }
+        
+    def _calculate_comprehensive_metrics(self, file_path: str, content: str, tree: ast.AST,
+                                         passes: Optional[Dict[str, AnalysisPass]] = None,
+                                         failures: Optional[Dict[AnalysisPass, Exception]] = None) -> CodeMetrics:
+        """Calculate comprehensive code metrics from metric passes that have already walked ``tree``"""
+        if passes is None:
+            passes = self._metric_passes(content)
+            pipeline = ASTPipeline(passes.values())
+            pipeline.run(tree)
+            failures = pipeline.failures
+        for analysis_pass in passes.values():
+            if failures and analysis_pass in failures:
+                raise failures[analysis_pass]
+                
         lines = content.split('\n')
         total_lines = len(lines)
         blank_lines = sum(1 for line in lines if not line.strip())
         comment_lines = sum(1 for line in lines if line.strip().startswith('#'))
         code_lines = total_lines - blank_lines - comment_lines
         
-        # Calculate complexity metrics
-        complexity_visitor = ComplexityCalculator()
-        complexity_visitor.visit(tree)
+        complexity = passes['complexity'].cyclomatic_complexity
         
         # Calculate maintainability index (simplified)
         maintainability_index = self._calculate_maintainability_index(
-            code_lines, complexity_visitor.cyclomatic_complexity, comment_lines
+            code_lines, complexity, comment_lines
         )
         
-        # Calculate other scores
-        performance_score = self._calculate_performance_score(tree)
-        security_score = self._calculate_security_score(tree, content)
-        
-        # Extract dependencies
-        dependencies = self._extract_dependencies(tree)
-        
-        # Detect code smells
-        code_smells = self._detect_code_smells(tree, content)
+        code_smells = passes['code_smells'].smells
         
         return CodeMetrics(
             file_path=file_path,
@@ -998,15 +767,15 @@ class EnhancementDiscoveryEngine:
             code_lines=code_lines,
             comment_lines=comment_lines,
             blank_lines=blank_lines,
-            complexity_score=complexity_visitor.cyclomatic_complexity,
+            complexity_score=complexity,
             maintainability_index=maintainability_index,
             technical_debt_score=len(code_smells) / max(code_lines, 1),
-            performance_score=performance_score,
-            security_score=security_score,
+            performance_score=passes['performance'].score,
+            security_score=passes['security'].score,
             test_coverage=0.0,  # Would need external tool integration
             documentation_score=comment_lines / max(code_lines, 1),
             code_smells=code_smells,
-            dependencies=dependencies,
+            dependencies=passes['dependencies'].dependencies,
             api_usage={},  # Would be populated by more detailed analysis
             timestamp=time.time()
         )
@@ -1023,78 +792,6 @@ class EnhancementDiscoveryEngine:
         mi = max(0, (171 - 5.2 * np.log(volume) - 0.23 * complexity - 16.2 * np.log(loc) + 50 * np.sin(np.sqrt(2.4 * comment_ratio))) / 171)
         return min(1.0, mi)
         
-    def _calculate_performance_score(self, tree: ast.AST) -> float:
-        """Calculate performance score based on code patterns"""
-        score = 1.0
-        
-        # Deduct points for performance anti-patterns
-        for node in ast.walk(tree):
-            if isinstance(node, ast.For):
-                # Nested loops penalty
-                nested_loops = sum(1 for child in ast.walk(node) if isinstance(child, (ast.For, ast.While)))
-                if nested_loops > 2:
-                    score -= 0.1
-                    
-            elif isinstance(node, ast.Call):
-                # Inefficient operations
-                if isinstance(node.func, ast.Attribute) and node.func.attr in ['append', 'insert']:
-                    score -= 0.02
-                    
-        return max(0.0, score)
-        
-    def _calculate_security_score(self, tree: ast.AST, content: str) -> float:
-        """Calculate security score"""
-        score = 1.0
-        
-        # Check for security anti-patterns
-        dangerous_functions = ['eval', 'exec', 'compile']
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Call) and isinstance(node.func, ast.Name):
-                if node.func.id in dangerous_functions:
-                    score -= 0.3
-                    
-        # Check for hardcoded secrets (simplified)
-        if re.search(r'password\s*=\s*["\'][^"\']+["\']', content, re.IGNORECASE):
-            score -= 0.5
-            
-        return max(0.0, score)
-        
-    def _extract_dependencies(self, tree: ast.AST) -> List[str]:
-        """Extract dependencies from import statements"""
-        dependencies = []
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.Import):
-                for alias in node.names:
-                    dependencies.append(alias.name)
-            elif isinstance(node, ast.ImportFrom):
-                if node.module:
-                    dependencies.append(node.module)
-                    
-        return list(set(dependencies))
-        
-    def _detect_code_smells(self, tree: ast.AST, content: str) -> List[str]:
-        """Detect code smells"""
-        smells = []
-        
-        # Long method smell
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                if hasattr(node, 'end_lineno') and node.end_lineno:
-                    method_length = node.end_lineno - node.lineno
-                    if method_length > 50:
-                        smells.append(f"Long method: {node.name} ({method_length} lines)")
-                        
-        # Large class smell
-        for node in ast.walk(tree):
-            if isinstance(node, ast.ClassDef):
-                method_count = sum(1 for n in node.body if isinstance(n, ast.FunctionDef))
-                if method_count > 20:
-                    smells.append(f"Large class: {node.name} ({method_count} methods)")
-                    
-        return smells
-        
     def _pattern_to_opportunity(self, 
                               file_path: str, 
                               pattern: Dict[str, Any], 
@@ -1268,69 +965,87 @@ class EnhancementDiscoveryEngine:
                         opp.confidence = min(1.0, opp.confidence + confidence_boost)
                         
     def _store_opportunities(self, opportunities: List[EnhancementOpportunity]):
-        """Store opportunities in database"""
-        with sqlite3.connect(self.db_path) as conn:
-            for opp in opportunities:
-                conn.execute(
-                    "INSERT OR REPLACE INTO enhancement_opportunities (opportunity_id, opportunity_data, priority_rank, timestamp) VALUES (?, ?, ?, ?)",
-                    (opp.opportunity_id, json.dumps(asdict(opp)), opp.priority_rank, opp.timestamp)
-                )
+        """Store opportunities in database, keeping the status of ones already stored"""
+        self.db.executemany(
+            "INSERT INTO enhancement_opportunities "
+            "(opportunity_id, opportunity_data, file_path, opportunity_type, priority_rank, timestamp) "
+            "VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT (opportunity_id) DO UPDATE SET "
+            "opportunity_data = excluded.opportunity_data, file_path = excluded.file_path, "
+            "opportunity_type = excluded.opportunity_type, priority_rank = excluded.priority_rank, "
+            "timestamp = excluded.timestamp",
+            [(opp.opportunity_id, json.dumps(asdict(opp)), opp.file_path, opp.opportunity_type,
+              opp.priority_rank, opp.timestamp) for opp in opportunities]
+        )
+            
+    def update_opportunity_status(self, opportunity_ids: List[str], status: str) -> int:
+        """Set the status (e.g. 'implemented', 'rejected') of stored opportunities"""
+        return self.db.executemany(
+            "UPDATE enhancement_opportunities SET status = ? WHERE opportunity_id = ?",
+            [(status, opportunity_id) for opportunity_id in opportunity_ids]
+        )
                 
     def _store_metrics(self, file_path: str, metrics: CodeMetrics):
         """Store code metrics in database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO code_metrics (file_path, metrics_data, timestamp) VALUES (?, ?, ?)",
-                (file_path, json.dumps(asdict(metrics)), metrics.timestamp)
-            )
+        self.db.execute(
+            "INSERT OR REPLACE INTO code_metrics (file_path, metrics_data, timestamp) VALUES (?, ?, ?)",
+            (file_path, json.dumps(asdict(metrics)), metrics.timestamp)
+        )
+            
+    def _store_metrics_batch(self, metrics_list: List[CodeMetrics]):
+        """Store code metrics for many files in one transaction"""
+        self.db.executemany(
+            "INSERT OR REPLACE INTO code_metrics (file_path, metrics_data, timestamp) VALUES (?, ?, ?)",
+            [(metrics.file_path, json.dumps(asdict(metrics)), metrics.timestamp) for metrics in metrics_list]
+        )
             
     def get_cached_opportunities(self, 
                                file_path: str = None, 
                                opportunity_type: str = None,
-                               min_priority: int = 0) -> List[EnhancementOpportunity]:
-        """Get cached enhancement opportunities"""
+                               min_priority: int = 0,
+                               status: str = None) -> List[EnhancementOpportunity]:
+        """Get cached enhancement opportunities, highest priority first"""
         opportunities = []
         
-        with sqlite3.connect(self.db_path) as conn:
-            query = "SELECT opportunity_data FROM enhancement_opportunities WHERE priority_rank >= ?"
-            params = [min_priority]
-            
-            if file_path:
-                query += " AND opportunity_data LIKE ?"
-                params.append(f'%"file_path": "{file_path}"%')
-                
-            if opportunity_type:
-                query += " AND opportunity_data LIKE ?"
-                params.append(f'%"opportunity_type": "{opportunity_type}"%')
-                
-            query += " ORDER BY priority_rank DESC"
-            
-            cursor = conn.execute(query, params)
-            for row in cursor.fetchall():
-                opp_data = json.loads(row[0])
-                opportunities.append(EnhancementOpportunity(**opp_data))
+        query, params = self._opportunity_query(file_path, opportunity_type, min_priority, status)
+        
+        cursor = self.db.execute(query, params)
+        for row in cursor.fetchall():
+            opp_data = json.loads(row[0])
+            opportunities.append(EnhancementOpportunity(**opp_data))
                 
         return opportunities
         
+    def _opportunity_query(self, file_path: str = None, opportunity_type: str = None,
+                           min_priority: int = 0, status: str = None) -> Tuple[str, List[Any]]:
+        """SQL for get_cached_opportunities; each filter is an equality on an indexed column"""
+        query = "SELECT opportunity_data FROM enhancement_opportunities WHERE priority_rank >= ?"
+        params = [min_priority]
+        
+        # Filters are listed most selective first; unary + keeps the later ones off their
+        # indexes so the planner seeks on the first one instead of guessing without ANALYZE stats
+        for column, value in (('file_path', file_path), ('opportunity_type', opportunity_type), ('status', status)):
+            if value:
+                query += f" AND {'+' if len(params) > 1 else ''}{column} = ?"
+                params.append(value)
+                
+        query += " ORDER BY priority_rank DESC"
+        return query, params
+        
     def get_discovery_statistics(self) -> Dict[str, Any]:
         """Get discovery engine statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.snapshot() as conn:
             # Opportunity statistics
             cursor = conn.execute("SELECT COUNT(*), AVG(priority_rank) FROM enhancement_opportunities")
             opp_count, avg_priority = cursor.fetchone()
             
             # Opportunity types
             cursor = conn.execute("""
-                SELECT opportunity_data, COUNT(*) 
+                SELECT COALESCE(opportunity_type, 'unknown'), COUNT(*) 
                 FROM enhancement_opportunities 
-                GROUP BY json_extract(opportunity_data, '$.opportunity_type')
+                GROUP BY opportunity_type
             """)
-            
-            type_distribution = {}
-            for row in cursor.fetchall():
-                opp_data = json.loads(row[0])
-                opp_type = opp_data.get('opportunity_type', 'unknown')
-                type_distribution[opp_type] = row[1]
+            type_distribution = dict(cursor.fetchall())
                 
             # Metrics statistics
             cursor = conn.execute("SELECT COUNT(*) FROM code_metrics")
@@ -1342,31 +1057,401 @@ class EnhancementDiscoveryEngine:
             'opportunity_types': type_distribution,
             'analyzed_files': metrics_count or 0,
             'ml_analysis_available': ML_AVAILABLE,
-            'patterns_detected': len(self.pattern_matcher.patterns)
+            'patterns_detected': len(self.pattern_matcher.patterns),
+            'analysis_cache': self.get_analysis_cache_report()
         }
 
-class ComplexityCalculator(ast.NodeVisitor):
+# Engine used by each analysis worker process, created once by the pool initializer
+_worker_engine: Optional[EnhancementDiscoveryEngine] = None
+
+def _init_analysis_worker(cache_dir: Path):
+    global _worker_engine
+    _worker_engine = EnhancementDiscoveryEngine(cache_dir)
+
+def _analyze_in_worker(file_path: str, context: Dict[str, Any] = None, content: Optional[str] = None) -> FileAnalysis:
+    return _worker_engine.analyze_file(file_path, context, content)
+
+class ComplexityCalculator(CyclomaticComplexity):
     """Calculate cyclomatic complexity"""
-    
+
+# Metric passes; one instance per file, all fed by the same walk
+
+class PerformanceScorePass(AnalysisPass):
+    """Performance score: penalties for deeply nested loops and append/insert calls"""
+
     def __init__(self):
-        self.cyclomatic_complexity = 1  # Base complexity
-        
-    def visit_If(self, node):
-        self.cyclomatic_complexity += 1
-        self.generic_visit(node)
-        
-    def visit_While(self, node):
-        self.cyclomatic_complexity += 1
-        self.generic_visit(node)
-        
+        self.score = 1.0
+        self.loops_seen = 0
+        self.loop_starts = []
+
     def visit_For(self, node):
-        self.cyclomatic_complexity += 1
-        self.generic_visit(node)
-        
-    def visit_ExceptHandler(self, node):
-        self.cyclomatic_complexity += 1
-        self.generic_visit(node)
-        
-    def visit_BoolOp(self, node):
-        self.cyclomatic_complexity += len(node.values) - 1
-        self.generic_visit(node)
\ No newline at end of file
+        self.loop_starts.append(self.loops_seen)
+        self.loops_seen += 1
+
+    def leave_For(self, node):
+        # Loops in this for statement's subtree, itself included
+        if self.loops_seen - self.loop_starts.pop() > 2:
+            self.score -= 0.1
+
+    def visit_While(self, node):
+        self.loops_seen += 1
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ['append', 'insert']:
+            self.score -= 0.02
+
+    def finish(self):
+        self.score = max(0.0, self.score)
+
+class SecurityScorePass(AnalysisPass):
+    """Security score: penalties for eval/exec/compile calls and a hardcoded password"""
+
+    dangerous_functions = ['eval', 'exec', 'compile']
+
+    def __init__(self, content: str = ""):
+        self.content = content
+        self.score = 1.0
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in self.dangerous_functions:
+            self.score -= 0.3
+
+    def finish(self):
+        # Check for hardcoded secrets (simplified)
+        if re.search(r'password\s*=\s*["\'][^"\']+["\']', self.content, re.IGNORECASE):
+            self.score -= 0.5
+        self.score = max(0.0, self.score)
+
+class DependencyPass(AnalysisPass):
+    """Modules named by import statements"""
+
+    def __init__(self):
+        self.found = set()
+        self.dependencies = []
+
+    def visit_Import(self, node):
+        self.found.update(alias.name for alias in node.names)
+
+    def visit_ImportFrom(self, node):
+        if node.module:
+            self.found.add(node.module)
+
+    def finish(self):
+        self.dependencies = list(self.found)
+
+class CodeSmellPass(AnalysisPass):
+    """Long methods and large classes"""
+
+    def __init__(self):
+        self.long_methods = []
+        self.large_classes = []
+        self.smells = []
+
+    def visit_FunctionDef(self, node):
+        if hasattr(node, 'end_lineno') and node.end_lineno:
+            method_length = node.end_lineno - node.lineno
+            if method_length > 50:
+                self.long_methods.append(f"Long method: {node.name} ({method_length} lines)")
+
+    def visit_ClassDef(self, node):
+        method_count = sum(1 for n in node.body if isinstance(n, ast.FunctionDef))
+        if method_count > 20:
+            self.large_classes.append(f"Large class: {node.name} ({method_count} methods)")
+
+    def finish(self):
+        self.smells = self.long_methods + self.large_classes
+
+# Pattern detector passes used by CodePatternMatcher
+
+class PatternPass(AnalysisPass):
+    """Collects matches as ``{'location', 'context', 'suggestions'}`` dicts"""
+
+    suggestions: List[str] = []
+
+    def __init__(self):
+        self.matches = []
+
+    def match(self, line: int, context: Dict[str, Any]):
+        self.matches.append({
+            'location': {'line': line},
+            'context': context,
+            'suggestions': list(self.suggestions)
+        })
+
+class LoopDepthPass(PatternPass):
+    """Tracks how many for/while loops enclose the current node"""
+
+    def __init__(self):
+        super().__init__()
+        self.loop_depth = 0
+
+    def _enter_loop(self, node):
+        self.loop_depth += 1
+
+    def _leave_loop(self, node):
+        self.loop_depth -= 1
+
+    visit_For = visit_While = _enter_loop
+    leave_For = leave_While = _leave_loop
+
+class NestedLoopAppendPass(LoopDepthPass):
+    """Detect nested loops with append operations"""
+
+    suggestions = [
+        'Consider using list comprehensions',
+        'Pre-allocate list size if known',
+        'Use numpy arrays for numerical data'
+    ]
+
+    def visit_Call(self, node):
+        if (self.loop_depth >= 2 and
+            isinstance(node.func, ast.Attribute) and
+            node.func.attr == 'append'):
+            self.match(getattr(node, 'lineno', 0), {'loop_depth': self.loop_depth})
+
+class StringConcatLoopPass(LoopDepthPass):
+    """Detect string concatenation in loops"""
+
+    suggestions = [
+        'Use str.join() for better performance',
+        'Use list.append() then join',
+        'Consider using StringIO for complex cases'
+    ]
+
+    def visit_AugAssign(self, node):
+        # Any += in a loop counts; the operand types are not known statically
+        if self.loop_depth and isinstance(node.op, ast.Add):
+            self.match(getattr(node, 'lineno', 0), {'operation': 'string_concatenation'})
+
+class ListRemovePass(PatternPass):
+    """Detect use of inefficient data structures"""
+
+    suggestions = [
+        'Consider using set for O(1) removal',
+        'Use collections.deque for frequent removals',
+        'Pre-filter data to avoid removals'
+    ]
+
+    def visit_Call(self, node):
+        # Check for list operations that should use sets
+        if (isinstance(node.func, ast.Attribute) and
+            node.func.attr == 'remove' and
+            isinstance(node.func.value, ast.Name)):
+            self.match(getattr(node, 'lineno', 0), {'operation': 'list_remove'})
+
+class RepeatedComputationPass(PatternPass):
+    """Detect plain function calls repeated more than three times"""
+
+    suggestions = [
+        'Consider caching the result',
+        'Move computation outside loop if possible',
+        'Use memoization decorator'
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.function_calls = defaultdict(list)
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name):
+            self.function_calls[node.func.id].append(getattr(node, 'lineno', 0))
+
+    def finish(self):
+        for func_name, lines in self.function_calls.items():
+            if len(lines) > 3:  # Called more than 3 times
+                self.match(min(lines), {'function': func_name, 'call_count': len(lines)})
+
+class LongParameterListPass(PatternPass):
+    """Detect functions with too many parameters"""
+
+    suggestions = [
+        'Use a configuration object or dataclass',
+        'Group related parameters into structs',
+        'Consider using **kwargs for optional parameters'
+    ]
+
+    def visit_FunctionDef(self, node):
+        param_count = len(node.args.args)
+        if param_count > 5:  # Threshold for too many parameters
+            self.match(node.lineno, {'function': node.name, 'param_count': param_count})
+
+class DeepNestingPass(PatternPass):
+    """Detect deeply nested code"""
+
+    suggestions = [
+        'Extract nested logic into separate functions',
+        'Use early returns to reduce nesting',
+        'Consider using guard clauses'
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.nesting_level = 0
+        self.max_nesting = 0
+
+    def _enter_block(self, node):
+        self.nesting_level += 1
+        self.max_nesting = max(self.max_nesting, self.nesting_level)
+
+    def _leave_block(self, node):
+        self.nesting_level -= 1
+
+    def visit_If(self, node):
+        self._enter_block(node)
+        if self.nesting_level > 4:  # Deep nesting threshold
+            self.match(node.lineno, {'nesting_level': self.nesting_level})
+
+    visit_For = visit_While = _enter_block
+    leave_If = leave_For = leave_While = _leave_block
+
+class LargeClassPass(PatternPass):
+    """Detect classes that are too large"""
+
+    suggestions = [
+        'Split class into smaller, focused classes',
+        'Extract related methods into mixins',
+        'Use composition instead of inheritance'
+    ]
+
+    def visit_ClassDef(self, node):
+        method_count = sum(1 for n in node.body if isinstance(n, ast.FunctionDef))
+        if method_count > 15:  # Too many methods
+            self.match(node.lineno, {'class': node.name, 'method_count': method_count})
+
+class DuplicateCodePass(PatternPass):
+    """Detect functions whose dumped ASTs share most of their tokens"""
+
+    suggestions = [
+        'Extract common code into shared function',
+        'Use template method pattern',
+        'Consider parameterizing the differences'
+    ]
+
+    def __init__(self):
+        super().__init__()
+        self.function_bodies = []
+
+    def visit_FunctionDef(self, node):
+        self.function_bodies.append((node.name, node.lineno, set(ast.dump(node).split())))
+
+    def finish(self):
+        for i, (name1, line1, tokens1) in enumerate(self.function_bodies):
+            for name2, _, tokens2 in self.function_bodies[i + 1:]:
+                similarity = token_similarity(tokens1, tokens2)
+                if similarity > 0.8:  # High similarity threshold
+                    self.match(line1, {'function1': name1, 'function2': name2, 'similarity': similarity})
+
+class DangerousEvalPass(PatternPass):
+    """Detect dangerous use of eval/exec"""
+
+    suggestions = [
+        'Use ast.literal_eval for safe evaluation',
+        'Consider using a whitelist of allowed operations',
+        'Validate and sanitize input before evaluation'
+    ]
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Name) and node.func.id in ['eval', 'exec']:
+            self.match(getattr(node, 'lineno', 0), {'function': node.func.id})
+
+class SqlInjectionPass(PatternPass):
+    """Detect SQL injection risks"""
+
+    suggestions = [
+        'Use parameterized queries',
+        'Use ORM query builders',
+        'Validate and escape input parameters'
+    ]
+
+    def visit_Call(self, node):
+        # Look for %-formatted strings passed to SQL-like calls
+        if isinstance(node.func, ast.Attribute) and node.func.attr in ['execute', 'query']:
+            for arg in node.args:
+                if isinstance(arg, ast.BinOp) and isinstance(arg.op, ast.Mod):
+                    self.match(getattr(node, 'lineno', 0), {'method': node.func.attr})
+
+class UnsafeDeserializationPass(PatternPass):
+    """Detect unsafe deserialization"""
+
+    suggestions = [
+        'Use safe_load for YAML',
+        'Validate data before deserialization',
+        'Use JSON instead of pickle when possible'
+    ]
+    unsafe_functions = ['pickle.loads', 'pickle.load', 'yaml.load']
+
+    def visit_Call(self, node):
+        if isinstance(node.func, ast.Attribute):
+            owner = node.func.value.id if isinstance(node.func.value, ast.Name) else 'unknown'
+            func_name = f"{owner}.{node.func.attr}"
+            if func_name in self.unsafe_functions:
+                self.match(getattr(node, 'lineno', 0), {'function': func_name})
+
+class MissingTypeHintsPass(PatternPass):
+    """Detect functions without type hints"""
+
+    suggestions = [
+        'Add type hints for better code clarity',
+        'Use typing module for complex types',
+        'Consider using mypy for type checking'
+    ]
+
+    def visit_FunctionDef(self, node):
+        has_return_annotation = node.returns is not None
+        has_arg_annotations = any(arg.annotation for arg in node.args.args)
+        if not has_return_annotation or not has_arg_annotations:
+            self.match(node.lineno, {'function': node.name})
+
+class OldStringFormattingPass(PatternPass):
+    """Detect old-style string formatting"""
+
+    suggestions = [
+        'Use f-strings for better performance and readability',
+        'Use str.format() for complex formatting',
+        'Consider using template strings for user-facing text'
+    ]
+
+    def visit_BinOp(self, node):
+        if (isinstance(node.op, ast.Mod) and isinstance(node.left, ast.Constant) and
+            isinstance(node.left.value, str)):
+            self.match(getattr(node, 'lineno', 0), {'type': 'percent_formatting'})
+
+class AsyncOpportunityPass(PatternPass):
+    """Detect I/O operations that could be async"""
+
+    suggestions = [
+        'Consider using async/await for I/O operations',
+        'Use aiohttp for HTTP requests',
+        'Use aiofiles for file operations'
+    ]
+    io_functions = ['open', 'requests.get', 'requests.post', 'urlopen', 'read', 'write']
+
+    def visit_Call(self, node):
+        func_name = None
+        if isinstance(node.func, ast.Name):
+            func_name = node.func.id
+        elif isinstance(node.func, ast.Attribute):
+            func_name = node.func.attr
+        if func_name in self.io_functions:
+            self.match(getattr(node, 'lineno', 0), {'function': func_name})
+
+class OutdatedPatternPass(PatternPass):
+    """Detect usage of outdated patterns"""
+
+    suggestions = [
+        'Consider using enumerate() when you need both index and value',
+        'Use direct iteration when index is not needed'
+    ]
+
+    def visit_Call(self, node):
+        # Single-argument range() directly in a for loop; needs parent links on the tree
+        if isinstance(node.func, ast.Name) and node.func.id == 'range':
+            parent = getattr(node, 'parent', None)
+            if parent and isinstance(parent, ast.For) and len(node.args) == 1:
+                self.match(getattr(node, 'lineno', 0), {'pattern': 'range_one_arg'})
+
+def token_similarity(tokens1: Set[str], tokens2: Set[str]) -> float:
+    """Jaccard similarity of two token sets"""
+    if not tokens1 or not tokens2:
+        return 0.0
+    return len(tokens1 & tokens2) / len(tokens1 | tokens2)
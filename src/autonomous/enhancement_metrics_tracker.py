@@ -3,10 +3,10 @@ Advanced Enhancement Metrics Tracker for SuperMini
 Comprehensive tracking and measurement of enhancement effectiveness
 """
 
+import ast
 import time
 import json
 import logging
-import sqlite3
 import asyncio
 import psutil
 import threading
@@ -22,6 +22,9 @@ import hashlib
 import subprocess
 import sys
 
+from ..core.ast_pipeline import AnalysisPass, ASTPipeline, CyclomaticComplexity, ParseCache, parse_source
+from ..core.sqlite_db import SQLiteDatabase
+
 @dataclass
 class PerformanceMetrics:
     """Performance metrics for code execution"""
@@ -210,6 +213,26 @@ class PerformanceBenchmarker:
             timestamp=time.time()
         )
 
+class TypeHintCoveragePass(AnalysisPass):
+    """Share of functions annotated on both parameters and return type"""
+    
+    def __init__(self):
+        self.total_functions = 0
+        self.typed_functions = 0
+        
+    def visit_FunctionDef(self, node):
+        self.total_functions += 1
+        has_return_type = node.returns is not None
+        has_param_types = any(arg.annotation for arg in node.args.args)
+        if has_return_type and has_param_types:
+            self.typed_functions += 1
+            
+    @property
+    def coverage(self) -> float:
+        if self.total_functions == 0:
+            return 1.0  # No functions to type
+        return self.typed_functions / self.total_functions
+
 class QualityAnalyzer:
     """Code quality analysis system"""
     
@@ -218,24 +241,30 @@ class QualityAnalyzer:
         self.analysis_cache = cache_dir / "quality_analysis"
         self.analysis_cache.mkdir(parents=True, exist_ok=True)
         
-    def analyze_code_quality(self, file_path: str) -> QualityMetrics:
-        """Analyze code quality metrics"""
+    def analyze_code_quality(self, file_path: str, parse_cache: Optional[ParseCache] = None) -> QualityMetrics:
+        """Analyze code quality metrics
+        
+        Pass the run's ``parse_cache`` to reuse a tree other analyzers already parsed.
+        """
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            # Parse AST for analysis
-            import ast
-            tree = ast.parse(content)
+            source = parse_source(file_path, cache=parse_cache)
+            content = source.content
+            
+            # Complexity and type hint coverage come from a single walk
+            complexity_pass = CyclomaticComplexity()
+            type_hint_pass = TypeHintCoveragePass()
+            pipeline = ASTPipeline([complexity_pass, type_hint_pass])
+            pipeline.run(source.tree)
+            pipeline.raise_failure()
             
             # Calculate various quality metrics
-            complexity = self._calculate_cyclomatic_complexity(tree)
+            complexity = float(complexity_pass.cyclomatic_complexity)
             maintainability = self._calculate_maintainability_index(content, complexity)
             test_coverage = self._estimate_test_coverage(file_path)
             duplication = self._calculate_code_duplication(content)
             documentation = self._calculate_documentation_coverage(content)
             security = self._calculate_security_score(content)
-            type_hints = self._calculate_type_hint_coverage(tree)
+            type_hints = type_hint_pass.coverage
             
             return QualityMetrics(
                 cyclomatic_complexity=complexity,
@@ -252,18 +281,6 @@ class QualityAnalyzer:
             logging.error(f"Quality analysis failed for {file_path}: {e}")
             return self._get_default_quality_metrics()
             
-    def _calculate_cyclomatic_complexity(self, tree: ast.AST) -> float:
-        """Calculate cyclomatic complexity"""
-        complexity = 1  # Base complexity
-        
-        for node in ast.walk(tree):
-            if isinstance(node, (ast.If, ast.While, ast.For, ast.ExceptHandler)):
-                complexity += 1
-            elif isinstance(node, ast.BoolOp):
-                complexity += len(node.values) - 1
-                
-        return float(complexity)
-        
     def _calculate_maintainability_index(self, content: str, complexity: float) -> float:
         """Calculate maintainability index"""
         lines = content.split('\n')
@@ -357,29 +374,6 @@ class QualityAnalyzer:
                 
         return max(0.0, score)
         
-    def _calculate_type_hint_coverage(self, tree: ast.AST) -> float:
-        """Calculate type hint coverage"""
-        total_functions = 0
-        typed_functions = 0
-        
-        for node in ast.walk(tree):
-            if isinstance(node, ast.FunctionDef):
-                total_functions += 1
-                
-                # Check for return type annotation
-                has_return_type = node.returns is not None
-                
-                # Check for parameter type annotations
-                has_param_types = any(arg.annotation for arg in node.args.args)
-                
-                if has_return_type and has_param_types:
-                    typed_functions += 1
-                    
-        if total_functions == 0:
-            return 1.0  # No functions to type
-            
-        return typed_functions / total_functions
-        
     def _get_default_quality_metrics(self) -> QualityMetrics:
         """Get default quality metrics when analysis fails"""
         return QualityMetrics(
@@ -762,6 +756,7 @@ class EnhancementMetricsTracker:
         
         # Database for metrics storage
         self.db_path = cache_dir / "metrics.db"
+        self.db = SQLiteDatabase(self.db_path)
         self._init_database()
         
         # Real-time monitoring
@@ -771,7 +766,7 @@ class EnhancementMetricsTracker:
         
     def _init_database(self):
         """Initialize metrics database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.transaction() as conn:
             conn.execute("""
                 CREATE TABLE IF NOT EXISTS enhancement_impacts (
                     enhancement_id TEXT PRIMARY KEY,
@@ -801,15 +796,21 @@ class EnhancementMetricsTracker:
                                        file_path: str,
                                        enhancement_type: str,
                                        pre_enhancement_callback: Callable = None,
-                                       post_enhancement_callback: Callable = None) -> EnhancementImpact:
-        """Measure the impact of an enhancement"""
+                                       post_enhancement_callback: Callable = None,
+                                       parse_cache: Optional[ParseCache] = None) -> EnhancementImpact:
+        """Measure the impact of an enhancement
+        
+        The before and after quality analyses share ``parse_cache`` (the
+        caller's run-wide cache, or a new one), so an unchanged file is parsed once.
+        """
+        parse_cache = parse_cache or ParseCache()
         
         logging.info(f"Measuring impact for enhancement: {enhancement_id}")
         
         # Measure baseline metrics
         logging.info("Measuring baseline metrics...")
         performance_before = await self.benchmarker.benchmark_code(file_path)
-        quality_before = self.quality_analyzer.analyze_code_quality(file_path)
+        quality_before = self.quality_analyzer.analyze_code_quality(file_path, parse_cache)
         
         # Record start time
         start_time = time.time()
@@ -824,7 +825,7 @@ class EnhancementMetricsTracker:
         # Measure post-enhancement metrics
         logging.info("Measuring post-enhancement metrics...")
         performance_after = await self.benchmarker.benchmark_code(file_path)
-        quality_after = self.quality_analyzer.analyze_code_quality(file_path)
+        quality_after = self.quality_analyzer.analyze_code_quality(file_path, parse_cache)
         
         if post_enhancement_callback:
             await post_enhancement_callback()
@@ -988,11 +989,10 @@ class EnhancementMetricsTracker:
             
     def _store_impact(self, impact: EnhancementImpact):
         """Store impact in database"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute(
-                "INSERT OR REPLACE INTO enhancement_impacts (enhancement_id, impact_data, timestamp) VALUES (?, ?, ?)",
-                (impact.enhancement_id, json.dumps(asdict(impact), default=str), impact.timestamp)
-            )
+        self.db.execute(
+            "INSERT OR REPLACE INTO enhancement_impacts (enhancement_id, impact_data, timestamp) VALUES (?, ?, ?)",
+            (impact.enhancement_id, json.dumps(asdict(impact), default=str), impact.timestamp)
+        )
             
     def start_real_time_monitoring(self):
         """Start real-time system monitoring"""
@@ -1020,11 +1020,10 @@ class EnhancementMetricsTracker:
                 
                 # Store metrics
                 metric_id = f"system_{int(time.time())}"
-                with sqlite3.connect(self.db_path) as conn:
-                    conn.execute(
-                        "INSERT INTO system_metrics (metric_id, metric_data, timestamp) VALUES (?, ?, ?)",
-                        (metric_id, json.dumps(asdict(system_metrics)), time.time())
-                    )
+                self.db.execute(
+                    "INSERT INTO system_metrics (metric_id, metric_data, timestamp) VALUES (?, ?, ?)",
+                    (metric_id, json.dumps(asdict(system_metrics)), time.time())
+                )
                     
                 # Sleep for monitoring interval
                 time.sleep(60)  # Monitor every minute
@@ -1083,23 +1082,22 @@ class EnhancementMetricsTracker:
         # Get recent impacts
         cutoff_time = time.time() - (days * 24 * 3600)
         
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.execute(
-                "SELECT impact_data FROM enhancement_impacts WHERE timestamp > ? ORDER BY timestamp DESC",
-                (cutoff_time,)
-            )
+        cursor = self.db.execute(
+            "SELECT impact_data FROM enhancement_impacts WHERE timestamp > ? ORDER BY timestamp DESC",
+            (cutoff_time,)
+        )
+        
+        impacts = []
+        for row in cursor.fetchall():
+            impact_data = json.loads(row[0])
             
-            impacts = []
-            for row in cursor.fetchall():
-                impact_data = json.loads(row[0])
-                
-                # Reconstruct nested objects
-                impact_data['performance_before'] = PerformanceMetrics(**impact_data['performance_before'])
-                impact_data['performance_after'] = PerformanceMetrics(**impact_data['performance_after'])
-                impact_data['quality_before'] = QualityMetrics(**impact_data['quality_before'])
-                impact_data['quality_after'] = QualityMetrics(**impact_data['quality_after'])
-                
-                impacts.append(EnhancementImpact(**impact_data))
+            # Reconstruct nested objects
+            impact_data['performance_before'] = PerformanceMetrics(**impact_data['performance_before'])
+            impact_data['performance_after'] = PerformanceMetrics(**impact_data['performance_after'])
+            impact_data['quality_before'] = QualityMetrics(**impact_data['quality_before'])
+            impact_data['quality_after'] = QualityMetrics(**impact_data['quality_after'])
+            
+            impacts.append(EnhancementImpact(**impact_data))
                 
         if not impacts:
             logging.warning("No enhancement impacts found for report generation")
@@ -1113,7 +1111,7 @@ class EnhancementMetricsTracker:
         
     def get_metrics_summary(self) -> Dict[str, Any]:
         """Get summary of all metrics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self.db.snapshot() as conn:
             # Enhancement metrics
             cursor = conn.execute("SELECT COUNT(*), AVG(json_extract(impact_data, '$.overall_score')) FROM enhancement_impacts")
             total_enhancements, avg_score = cursor.fetchone()
@@ -14,11 +14,11 @@ from dataclasses import dataclass, asdict
 from pathlib import Path
 import re
 from urllib.parse import quote_plus
-import sqlite3
-from threading import Lock
 import openai
 from bs4 import BeautifulSoup
 
+from ..core.sqlite_db import Migration, SQLiteDatabase
+
 @dataclass
 class ResearchResult:
     """Research result from internet search"""
@@ -56,6 +56,33 @@ class ResearchQuery:
     include_academic: bool = True
     include_github: bool = True
 
+# Schema of research_cache.db; append new steps, never edit applied ones
+RESEARCH_CACHE_MIGRATIONS = [
+    Migration(1, "research results and enhancement patterns", """
+        CREATE TABLE IF NOT EXISTS research_cache (
+            query_hash TEXT PRIMARY KEY,
+            query TEXT NOT NULL,
+            results TEXT NOT NULL,
+            timestamp REAL NOT NULL,
+            access_count INTEGER DEFAULT 1,
+            relevance_score REAL DEFAULT 0.0
+        );
+        CREATE TABLE IF NOT EXISTS enhancement_patterns (
+            pattern_id TEXT PRIMARY KEY,
+            pattern_data TEXT NOT NULL,
+            usage_count INTEGER DEFAULT 0,
+            success_rate REAL DEFAULT 0.0,
+            last_used REAL NOT NULL
+        );
+    """),
+    Migration(2, "indexed improvement_type on enhancement patterns", """
+        ALTER TABLE enhancement_patterns ADD COLUMN improvement_type TEXT;
+        UPDATE enhancement_patterns SET improvement_type = json_extract(pattern_data, '$.improvement_type');
+        CREATE INDEX idx_patterns_type ON enhancement_patterns (improvement_type, usage_count DESC, success_rate DESC);
+        CREATE INDEX idx_patterns_usage ON enhancement_patterns (usage_count DESC, success_rate DESC);
+    """),
+]
+
 class ResearchCache:
     """Intelligent caching system for research results"""
     
@@ -63,60 +90,32 @@ class ResearchCache:
         self.cache_dir = cache_dir
         self.cache_dir.mkdir(parents=True, exist_ok=True)
         self.db_path = cache_dir / "research_cache.db"
-        self.lock = Lock()
-        self._init_database()
-        
-    def _init_database(self):
-        """Initialize SQLite database for caching"""
-        with sqlite3.connect(self.db_path) as conn:
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS research_cache (
-                    query_hash TEXT PRIMARY KEY,
-                    query TEXT NOT NULL,
-                    results TEXT NOT NULL,
-                    timestamp REAL NOT NULL,
-                    access_count INTEGER DEFAULT 1,
-                    relevance_score REAL DEFAULT 0.0
-                )
-            """)
-            
-            conn.execute("""
-                CREATE TABLE IF NOT EXISTS enhancement_patterns (
-                    pattern_id TEXT PRIMARY KEY,
-                    pattern_data TEXT NOT NULL,
-                    usage_count INTEGER DEFAULT 0,
-                    success_rate REAL DEFAULT 0.0,
-                    last_used REAL NOT NULL
-                )
-            """)
+        self.db = SQLiteDatabase(self.db_path, RESEARCH_CACHE_MIGRATIONS)
             
     def get_cached_results(self, query: str, max_age: float = 86400) -> Optional[List[ResearchResult]]:
         """Get cached research results if available and fresh"""
         query_hash = hashlib.sha256(query.encode()).hexdigest()
         
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                cursor = conn.execute(
-                    "SELECT results, timestamp FROM research_cache WHERE query_hash = ? AND ? - timestamp < ?",
-                    (query_hash, time.time(), max_age)
-                )
-                row = cursor.fetchone()
+        row = self.db.execute(
+            "SELECT results, timestamp FROM research_cache WHERE query_hash = ? AND ? - timestamp < ?",
+            (query_hash, time.time(), max_age)
+        ).fetchone()
+        
+        if row:
+            # Update access count
+            self.db.execute(
+                "UPDATE research_cache SET access_count = access_count + 1 WHERE query_hash = ?",
+                (query_hash,)
+            )
+            
+            results_data = json.loads(row[0])
+            results = [ResearchResult(**data) for data in results_data]
+            
+            # Mark as cached
+            for result in results:
+                result.cached = True
                 
-                if row:
-                    # Update access count
-                    conn.execute(
-                        "UPDATE research_cache SET access_count = access_count + 1 WHERE query_hash = ?",
-                        (query_hash,)
-                    )
-                    
-                    results_data = json.loads(row[0])
-                    results = [ResearchResult(**data) for data in results_data]
-                    
-                    # Mark as cached
-                    for result in results:
-                        result.cached = True
-                        
-                    return results
+            return results
                     
         return None
         
@@ -128,44 +127,40 @@ class ResearchCache:
         # Calculate average relevance score
         avg_relevance = sum(r.relevance_score for r in results) / max(len(results), 1)
         
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "INSERT OR REPLACE INTO research_cache (query_hash, query, results, timestamp, relevance_score) VALUES (?, ?, ?, ?, ?)",
-                    (query_hash, query, json.dumps(results_data), time.time(), avg_relevance)
-                )
+        self.db.execute(
+            "INSERT OR REPLACE INTO research_cache (query_hash, query, results, timestamp, relevance_score) VALUES (?, ?, ?, ?, ?)",
+            (query_hash, query, json.dumps(results_data), time.time(), avg_relevance)
+        )
                 
     def store_enhancement_pattern(self, pattern: EnhancementPattern):
         """Store discovered enhancement pattern"""
         pattern_data = json.dumps(asdict(pattern))
         
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                conn.execute(
-                    "INSERT OR REPLACE INTO enhancement_patterns (pattern_id, pattern_data, last_used) VALUES (?, ?, ?)",
-                    (pattern.pattern_id, pattern_data, time.time())
-                )
+        self.db.execute(
+            "INSERT OR REPLACE INTO enhancement_patterns (pattern_id, pattern_data, improvement_type, last_used) "
+            "VALUES (?, ?, ?, ?)",
+            (pattern.pattern_id, pattern_data, pattern.improvement_type, time.time())
+        )
                 
     def get_enhancement_patterns(self, enhancement_type: str = None) -> List[EnhancementPattern]:
         """Get stored enhancement patterns"""
-        with self.lock:
-            with sqlite3.connect(self.db_path) as conn:
-                if enhancement_type:
-                    cursor = conn.execute(
-                        "SELECT pattern_data FROM enhancement_patterns WHERE pattern_data LIKE ? ORDER BY usage_count DESC, success_rate DESC",
-                        (f'%"improvement_type": "{enhancement_type}"%',)
-                    )
-                else:
-                    cursor = conn.execute(
-                        "SELECT pattern_data FROM enhancement_patterns ORDER BY usage_count DESC, success_rate DESC"
-                    )
-                    
-                patterns = []
-                for row in cursor.fetchall():
-                    pattern_data = json.loads(row[0])
-                    patterns.append(EnhancementPattern(**pattern_data))
-                    
-                return patterns
+        if enhancement_type:
+            cursor = self.db.execute(
+                "SELECT pattern_data FROM enhancement_patterns WHERE improvement_type = ? "
+                "ORDER BY usage_count DESC, success_rate DESC",
+                (enhancement_type,)
+            )
+        else:
+            cursor = self.db.execute(
+                "SELECT pattern_data FROM enhancement_patterns ORDER BY usage_count DESC, success_rate DESC"
+            )
+            
+        patterns = []
+        for row in cursor.fetchall():
+            pattern_data = json.loads(row[0])
+            patterns.append(EnhancementPattern(**pattern_data))
+            
+        return patterns
 
 class MultiSourceSearchEngine:
     """Multi-source search engine for comprehensive research"""
@@ -696,9 +691,10 @@ class EnhancementResearchEngine:
         unique_patterns = self._deduplicate_patterns(enhancement_patterns)
         ranked_patterns = self._rank_patterns(unique_patterns, analysis_results)
         
-        # Store patterns in cache
-        for pattern in ranked_patterns:
-            self.cache.store_enhancement_pattern(pattern)
+        # Store patterns in cache, committed together
+        with self.cache.db.transaction():
+            for pattern in ranked_patterns:
+                self.cache.store_enhancement_pattern(pattern)
             
         return ranked_patterns[:10]  # Top 10 patterns
         
@@ -1074,7 +1070,7 @@ except Exception as e:
         
     def get_research_statistics(self) -> Dict[str, Any]:
         """Get research engine statistics"""
-        with sqlite3.connect(self.cache.db_path) as conn:
+        with self.cache.db.snapshot() as conn:
             # Query cache statistics
             cursor = conn.execute("SELECT COUNT(*), AVG(relevance_score) FROM research_cache")
             cache_count, avg_relevance = cursor.fetchone()
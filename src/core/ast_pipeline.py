@@ -0,0 +1,170 @@
+"""
+Single-pass AST analysis shared by the code analyzers.
+Analyzers are written as AnalysisPass subclasses that register hooks by node
+type (``visit_For`` on entry, ``leave_For`` after the children). An
+ASTPipeline walks each tree once and feeds every registered pass, and a
+ParseCache lets the analyzers of one run share parsed trees instead of
+re-reading and re-parsing the same file.
+"""
+
+import ast
+import logging
+from dataclasses import dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+
+@dataclass
+class ParsedSource:
+    """A file's source text and its parsed tree"""
+    path: str
+    content: str
+    tree: ast.AST
+
+
+class ParseCache:
+    """Parsed trees shared by the analyzers of one run
+
+    Files are still read on every lookup so edits made during the run are
+    picked up; the tree is reused only while the text is unchanged.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, ParsedSource] = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = Lock()
+
+    def get(self, file_path: Union[str, Path], content: Optional[str] = None) -> ParsedSource:
+        """Parsed source of ``file_path``; raises SyntaxError/OSError like ``ast.parse``/``open``"""
+        path = str(file_path)
+        if content is None:
+            with open(path, 'r', encoding='utf-8') as f:
+                content = f.read()
+        with self.lock:
+            cached = self.entries.get(path)
+            if cached is not None and cached.content == content:
+                self.hits += 1
+                return cached
+            self.misses += 1
+        source = ParsedSource(path, content, ast.parse(content))
+        with self.lock:
+            self.entries[path] = source
+        return source
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+
+
+def parse_source(file_path: Union[str, Path], content: Optional[str] = None,
+                 cache: Optional[ParseCache] = None) -> ParsedSource:
+    """Read and parse a file, through ``cache`` when one is given"""
+    if cache is not None:
+        return cache.get(file_path, content)
+    if content is None:
+        with open(file_path, 'r', encoding='utf-8') as f:
+            content = f.read()
+    return ParsedSource(str(file_path), content, ast.parse(content))
+
+
+class AnalysisPass:
+    """One analyzer fed by an ASTPipeline
+
+    Define ``visit_<NodeType>(node)`` to be called when the walk enters a node
+    and ``leave_<NodeType>(node)`` to be called once its children are done.
+    Children are always visited, so hooks never call ``generic_visit``.
+    ``finish`` runs after the whole tree has been walked.
+    """
+
+    def finish(self):
+        pass
+
+    def visit(self, tree: ast.AST) -> 'AnalysisPass':
+        """Run this pass alone over ``tree``"""
+        pipeline = ASTPipeline([self])
+        pipeline.run(tree)
+        pipeline.raise_failure()
+        return self
+
+
+class ASTPipeline:
+    """Walks a tree once, dispatching every node to the hooks of all passes
+
+    Nodes are visited depth first in the same order as ``ast.NodeVisitor``.
+    A pass whose hook raises is dropped for the rest of the walk and its
+    exception is kept in ``failures``; the other passes carry on.
+    """
+
+    def __init__(self, passes: Iterable[AnalysisPass]):
+        self.passes: List[AnalysisPass] = list(passes)
+        self.failures: Dict[AnalysisPass, Exception] = {}
+        self._hooks: Dict[type, Tuple[list, list]] = {}
+
+    def _hooks_for(self, node_type: type) -> Tuple[list, list]:
+        hooks = self._hooks.get(node_type)
+        if hooks is None:
+            name = node_type.__name__
+            active = [p for p in self.passes if p not in self.failures]
+            hooks = (
+                [(p, getattr(p, 'visit_' + name)) for p in active if hasattr(p, 'visit_' + name)],
+                [(p, getattr(p, 'leave_' + name)) for p in active if hasattr(p, 'leave_' + name)],
+            )
+            self._hooks[node_type] = hooks
+        return hooks
+
+    def _call(self, hooks: list, node: ast.AST):
+        for analysis_pass, hook in hooks:
+            if analysis_pass in self.failures:
+                continue
+            try:
+                hook(node)
+            except Exception as e:
+                logging.debug(f"{type(analysis_pass).__name__} failed at line {getattr(node, 'lineno', '?')}: {e}")
+                self.failures[analysis_pass] = e
+                self._hooks.clear()
+
+    def run(self, tree: ast.AST) -> List[AnalysisPass]:
+        stack: List[Tuple[ast.AST, bool]] = [(tree, False)]
+        while stack:
+            node, leaving = stack.pop()
+            enter_hooks, leave_hooks = self._hooks_for(type(node))
+            if leaving:
+                self._call(leave_hooks, node)
+                continue
+            if enter_hooks:
+                self._call(enter_hooks, node)
+            if leave_hooks:
+                stack.append((node, True))
+            children = list(ast.iter_child_nodes(node))
+            children.reverse()
+            stack.extend((child, False) for child in children)
+
+        for analysis_pass in self.passes:
+            if analysis_pass not in self.failures:
+                try:
+                    analysis_pass.finish()
+                except Exception as e:
+                    self.failures[analysis_pass] = e
+        return self.passes
+
+    def raise_failure(self):
+        """Re-raise the first pass failure, for callers that need every pass to succeed"""
+        for error in self.failures.values():
+            raise error
+
+
+class CyclomaticComplexity(AnalysisPass):
+    """Cyclomatic complexity of a whole tree: 1 plus one per branch point"""
+
+    def __init__(self):
+        self.cyclomatic_complexity = 1
+
+    def _branch(self, node):
+        self.cyclomatic_complexity += 1
+
+    visit_If = visit_While = visit_For = visit_ExceptHandler = _branch
+
+    def visit_BoolOp(self, node):
+        self.cyclomatic_complexity += len(node.values) - 1
@@ -0,0 +1,268 @@
+"""
+Out-of-core CSV profiling for SuperMini analytics tasks.
+CSV files are read in fixed-size chunks and summarized with streaming
+per-column statistics, so large files never have to fit in memory.
+Profiles are cached by file content hash.
+"""
+
+import os
+import json
+import time
+import logging
+import numpy as np
+import pandas as pd
+from dataclasses import dataclass, field, asdict
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from src.core.document_chunker import file_content_hash
+from src.core.sqlite_db import SQLiteDatabase
+
+_NUMERIC_KINDS = {'integer', 'float'}
+_HASH_SPACE = float(2 ** 64)
+
+
+def _series_kind(series: pd.Series) -> str:
+    if series.isna().all():
+        return 'empty'
+    if pd.api.types.is_bool_dtype(series):
+        return 'boolean'
+    if pd.api.types.is_integer_dtype(series):
+        return 'integer'
+    if pd.api.types.is_float_dtype(series):
+        return 'float'
+    if pd.api.types.is_datetime64_any_dtype(series):
+        return 'datetime'
+    return 'string'
+
+
+def _merge_kinds(a: str, b: str) -> str:
+    # Chunks are typed independently; integers widen to float, anything else mixed is text
+    if a == 'empty':
+        return b
+    if b == 'empty' or a == b:
+        return a
+    if {a, b} <= _NUMERIC_KINDS:
+        return 'float'
+    return 'string'
+
+
+class ColumnStats:
+    """Streaming statistics for one CSV column
+
+    Quantiles come from a fixed-size reservoir sample of the numeric values
+    and the distinct count from a k-minimum-values sketch of value hashes,
+    so memory stays constant however many rows are read.
+    """
+
+    def __init__(self, name: str, sample_size: int = 10_000, sketch_size: int = 1024, seed: int = 0):
+        self.name = name
+        self.kind = 'empty'
+        self.count = 0
+        self.nulls = 0
+        self.minimum: Optional[float] = None
+        self.maximum: Optional[float] = None
+        self.total = 0.0
+        self.numeric_count = 0
+        self.sample_size = sample_size
+        self.sketch_size = sketch_size
+        self._reservoir = np.empty(0, dtype=np.float64)
+        self._seen = 0
+        self._hashes = np.empty(0, dtype=np.uint64)
+        self._rng = np.random.default_rng(seed)
+
+    def update(self, series: pd.Series):
+        """Fold one chunk of the column into the running statistics"""
+        self.count += len(series)
+        self.nulls += int(series.isna().sum())
+        self.kind = _merge_kinds(self.kind, _series_kind(series))
+
+        values = series.dropna()
+        if values.empty:
+            return
+        hashes = pd.util.hash_pandas_object(values.astype(str), index=False).to_numpy(dtype=np.uint64)
+        merged = np.unique(np.concatenate([self._hashes, hashes]))
+        self._hashes = merged[:self.sketch_size]
+
+        if pd.api.types.is_numeric_dtype(values) and not pd.api.types.is_bool_dtype(values):
+            self._update_numeric(values.to_numpy(dtype=np.float64))
+
+    def _update_numeric(self, values: np.ndarray):
+        low, high = float(values.min()), float(values.max())
+        self.minimum = low if self.minimum is None else min(self.minimum, low)
+        self.maximum = high if self.maximum is None else max(self.maximum, high)
+        self.total += float(values.sum())
+        self.numeric_count += len(values)
+
+        free = self.sample_size - len(self._reservoir)
+        if free > 0:
+            self._reservoir = np.concatenate([self._reservoir, values[:free]])
+            self._seen += min(free, len(values))
+            values = values[free:]
+        if len(values):
+            # Algorithm R, vectorized over the chunk
+            positions = self._seen + np.arange(1, len(values) + 1)
+            slots = (self._rng.random(len(values)) * positions).astype(np.int64)
+            keep = slots < self.sample_size
+            self._reservoir[slots[keep]] = values[keep]
+            self._seen += len(values)
+
+    def distinct_estimate(self) -> int:
+        """Approximate number of distinct non-null values (exact below the sketch size)"""
+        if len(self._hashes) < self.sketch_size:
+            return int(len(self._hashes))
+        kth = float(self._hashes[-1]) / _HASH_SPACE
+        return int(round((self.sketch_size - 1) / kth)) if kth > 0 else int(len(self._hashes))
+
+    def to_dict(self) -> Dict[str, Any]:
+        profile = {
+            'name': self.name,
+            'kind': self.kind,
+            'count': self.count,
+            'nulls': self.nulls,
+            'distinct': self.distinct_estimate(),
+        }
+        # A column that turned out to hold text keeps no numeric summary from its numeric-looking chunks
+        if self.kind in _NUMERIC_KINDS and self.numeric_count:
+            quantiles = np.quantile(self._reservoir, [0.25, 0.5, 0.75]) if len(self._reservoir) else []
+            profile.update({
+                'min': self.minimum,
+                'max': self.maximum,
+                'mean': self.total / self.numeric_count,
+                'quantiles': {q: float(v) for q, v in zip(('p25', 'p50', 'p75'), quantiles)},
+            })
+        return profile
+
+
+@dataclass
+class CsvProfile:
+    """Summary of a CSV file built from streaming column statistics"""
+    source: str
+    rows: int
+    columns: List[Dict[str, Any]]
+    chunks_read: int
+    truncated: bool = False
+    profiled_at: float = field(default_factory=time.time)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'CsvProfile':
+        return cls(**data)
+
+    def summary(self) -> str:
+        """Compact text description of the file for a model prompt"""
+        rows = f"{self.rows}+" if self.truncated else str(self.rows)
+        lines = [f"CSV {self.source}: {rows} rows, {len(self.columns)} columns"]
+        for column in self.columns:
+            parts = [column['kind'], f"{column['nulls']} nulls", f"~{column['distinct']} distinct"]
+            if 'min' in column:
+                q = column['quantiles']
+                parts.append(f"min {column['min']:g}, max {column['max']:g}, mean {column['mean']:.4g}")
+                if q:
+                    parts.append(f"p25/p50/p75 {q['p25']:g}/{q['p50']:g}/{q['p75']:g}")
+            lines.append(f"- {column['name']}: " + ", ".join(parts))
+        return "\n".join(lines)
+
+
+def profile_csv(file_path: str, chunk_rows: int = 100_000, max_rows: Optional[int] = None,
+                sample_size: int = 10_000, sketch_size: int = 1024) -> CsvProfile:
+    """Profile a CSV file by reading it ``chunk_rows`` rows at a time
+
+    ``max_rows`` stops reading early on very large files; the profile is
+    then marked as truncated.
+    """
+    stats: Dict[str, ColumnStats] = {}
+    rows = 0
+    chunks_read = 0
+    truncated = False
+    reader = pd.read_csv(file_path, chunksize=chunk_rows, low_memory=True)
+    try:
+        for chunk in reader:
+            if max_rows is not None and rows + len(chunk) > max_rows:
+                chunk = chunk.iloc[:max_rows - rows]
+                truncated = True
+            for name in chunk.columns:
+                column = stats.get(name)
+                if column is None:
+                    column = stats[name] = ColumnStats(str(name), sample_size, sketch_size)
+                column.update(chunk[name])
+            rows += len(chunk)
+            chunks_read += 1
+            if truncated:
+                break
+    finally:
+        reader.close()
+    return CsvProfile(Path(file_path).name, rows, [column.to_dict() for column in stats.values()],
+                      chunks_read, truncated)
+
+
+class CsvProfileCache:
+    """SQLite cache of CSV profiles keyed by file content hash
+
+    A file whose path, size and mtime are unchanged is looked up without
+    being hashed; otherwise its content hash decides, so copies and touched
+    files reuse an existing profile.
+    """
+
+    def __init__(self, db_path: Path, chunk_rows: int = 100_000, max_rows: Optional[int] = None):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.max_rows = max_rows
+        self.row_limit = max_rows or 0
+        self.db = SQLiteDatabase(self.db_path)
+        self.stats = {'hits': 0, 'misses': 0}
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize SQLite database for cached profiles"""
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS csv_profiles (
+                    content_hash TEXT NOT NULL,
+                    row_limit INTEGER NOT NULL,
+                    profile TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    PRIMARY KEY (content_hash, row_limit)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS csv_files (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL
+                )
+            """)
+
+    def _content_hash(self, path: str, stat: os.stat_result) -> str:
+        row = self.db.execute("SELECT mtime, size, content_hash FROM csv_files WHERE path = ?", (path,)).fetchone()
+        if row is not None and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            return row[2]
+        content_hash = file_content_hash(path)
+        self.db.execute("INSERT OR REPLACE INTO csv_files (path, mtime, size, content_hash) VALUES (?, ?, ?, ?)",
+                        (path, stat.st_mtime, stat.st_size, content_hash))
+        return content_hash
+
+    def get_profile(self, file_path: str) -> CsvProfile:
+        """Return the cached profile for a file, profiling it on a miss"""
+        path = os.path.abspath(file_path)
+        content_hash = self._content_hash(path, os.stat(path))
+        row = self.db.execute("SELECT profile FROM csv_profiles WHERE content_hash = ? AND row_limit = ?",
+                              (content_hash, self.row_limit)).fetchone()
+        if row is not None:
+            self.stats['hits'] += 1
+            profile = CsvProfile.from_dict(json.loads(row[0]))
+            profile.source = Path(path).name
+            return profile
+
+        self.stats['misses'] += 1
+        profile = profile_csv(path, chunk_rows=self.chunk_rows, max_rows=self.max_rows)
+        self.db.execute(
+            "INSERT OR REPLACE INTO csv_profiles (content_hash, row_limit, profile, created_at) VALUES (?, ?, ?, ?)",
+            (content_hash, self.row_limit, json.dumps(profile.to_dict()), time.time())
+        )
+        logging.info(f"Profiled CSV {profile.source}: {profile.rows} rows in {profile.chunks_read} chunks")
+        return profile
@@ -0,0 +1,354 @@
+"""
+Streaming document chunking and relevance selection for SuperMini RAG tasks.
+Files are read incrementally, split on paragraph or top-level code
+boundaries, embedded, and only the chunks most relevant to the prompt are
+kept, within a token budget.
+"""
+
+import os
+import re
+import time
+import heapq
+import zlib
+import sqlite3
+import hashlib
+import logging
+import numpy as np
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from src.core.sqlite_db import SQLiteDatabase
+
+# Extensions whose chunks are cut at top-level definitions instead of blank lines
+CODE_EXTENSIONS = {
+    '.py', '.js', '.ts', '.jsx', '.tsx', '.java', '.go', '.rb', '.rs', '.c', '.h',
+    '.cpp', '.hpp', '.cs', '.php', '.swift', '.kt', '.scala', '.sh'
+}
+
+_CODE_BOUNDARY = re.compile(
+    r"^(def |async def |class |function |export |public |private |protected |func |fn |impl |struct |interface |@)"
+)
+_WORD_PATTERN = re.compile(r"[a-z0-9_]+")
+
+
+@dataclass
+class DocumentChunk:
+    """A contiguous piece of a document"""
+    source: str
+    index: int
+    start_line: int
+    end_line: int
+    text: str
+
+    @property
+    def tokens(self) -> int:
+        return estimate_tokens(self.text)
+
+
+@dataclass
+class ChunkSelection:
+    """Chunks picked for one prompt, with counts for that call only"""
+    chunks: List[DocumentChunk]
+    scanned: int
+    indexed: int = 0
+    reused: int = 0
+
+    @property
+    def tokens(self) -> int:
+        return sum(chunk.tokens for chunk in self.chunks)
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token)"""
+    return max(1, len(text) // 4)
+
+
+def _is_boundary(line: str, is_code: bool) -> bool:
+    if is_code:
+        return bool(_CODE_BOUNDARY.match(line))
+    return not line.strip()
+
+
+def iter_file_chunks(file_path: str, max_chars: int = 2000) -> Iterator[DocumentChunk]:
+    """Yield chunks of a text file without reading it into memory at once
+
+    Prose is split on blank lines and code on unindented definitions. Pieces
+    are merged up to ``max_chars``; lines longer than that are read and cut
+    in ``max_chars`` pieces, so memory use never depends on the file size.
+    """
+    source = Path(file_path).name
+    is_code = Path(file_path).suffix.lower() in CODE_EXTENSIONS
+    buffer: List[str] = []
+    buffer_chars = 0
+    start_line = 1
+    last_line = 0
+    index = 0
+
+    def flush() -> Optional[DocumentChunk]:
+        nonlocal buffer, buffer_chars, index
+        text = "".join(buffer).strip()
+        chunk = None
+        if text:
+            chunk = DocumentChunk(source, index, start_line, last_line, text)
+            index += 1
+        buffer, buffer_chars = [], 0
+        return chunk
+
+    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
+        line_number = 1
+        for piece in iter(lambda: f.readline(max_chars), ''):
+            # Start a new chunk at a structural boundary once the current one is substantial,
+            # or when the piece would overflow it
+            if buffer and ((buffer_chars >= max_chars // 2 and _is_boundary(piece, is_code))
+                           or buffer_chars + len(piece) > max_chars):
+                chunk = flush()
+                if chunk:
+                    yield chunk
+            if not buffer:
+                start_line = line_number
+            buffer.append(piece)
+            buffer_chars += len(piece)
+            last_line = line_number
+            if piece.endswith('\n'):
+                line_number += 1
+        chunk = flush()
+        if chunk:
+            yield chunk
+
+
+class HashingEmbedder:
+    """Dependency-free bag-of-words embedding using the hashing trick
+
+    Word counts are hashed into a fixed-width vector, log-scaled and L2
+    normalized, so cosine similarity is a dot product. Hashes are stable
+    across processes.
+    """
+
+    def __init__(self, dimensions: int = 1024):
+        self.dimensions = dimensions
+        self.name = f"hashing-{dimensions}"
+
+    def __call__(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.zeros((len(texts), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(texts):
+            for word in _WORD_PATTERN.findall(text.lower()):
+                vectors[row, zlib.crc32(word.encode()) % self.dimensions] += 1.0
+        np.log1p(vectors, out=vectors)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+
+class ChunkSelector:
+    """Pick the chunks most relevant to a prompt under a token budget
+
+    Chunks are embedded in batches as they stream in and only the best
+    ``top_k`` are kept, so memory stays bounded by ``top_k`` plus one batch
+    no matter how large the documents are.
+    """
+
+    def __init__(self, embedding_function: Optional[Callable[[Sequence[str]], Iterable]] = None,
+                 top_k: int = 24, batch_size: int = 64):
+        self.embedding_function = embedding_function or HashingEmbedder()
+        self.top_k = top_k
+        self.batch_size = batch_size
+
+    def _embed(self, texts: Sequence[str]) -> np.ndarray:
+        vectors = np.asarray(self.embedding_function(list(texts)), dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return vectors / norms
+
+    def embed_chunks(self, chunks: Iterable[DocumentChunk]) -> Iterator[Tuple[DocumentChunk, np.ndarray]]:
+        """Pair each chunk with its normalized embedding, embedding in batches"""
+        batch: List[DocumentChunk] = []
+        for chunk in chunks:
+            batch.append(chunk)
+            if len(batch) >= self.batch_size:
+                yield from zip(batch, self._embed([c.text for c in batch]))
+                batch = []
+        if batch:
+            yield from zip(batch, self._embed([c.text for c in batch]))
+
+    def select(self, prompt: str, chunks: Iterable[DocumentChunk], token_budget: int) -> ChunkSelection:
+        """Return the highest scoring chunks that fit the budget, in document order"""
+        return self.select_embedded(prompt, self.embed_chunks(chunks), token_budget)
+
+    def select_embedded(self, prompt: str, embedded_chunks: Iterable[Tuple[DocumentChunk, np.ndarray]],
+                        token_budget: int) -> ChunkSelection:
+        """Like ``select`` for chunks whose embeddings were already computed"""
+        query = self._embed([prompt])[0]
+        best = []  # min-heap of (score, sequence, chunk)
+        scanned = 0
+
+        for sequence, (chunk, vector) in enumerate(embedded_chunks):
+            scanned += 1
+            entry = (float(np.dot(vector, query)), sequence, chunk)
+            if len(best) < self.top_k:
+                heapq.heappush(best, entry)
+            elif entry[0] > best[0][0]:
+                heapq.heapreplace(best, entry)
+
+        selected = []
+        used = 0
+        for score, order, chunk in sorted(best, key=lambda entry: (-entry[0], entry[1])):
+            if used + chunk.tokens > token_budget:
+                continue
+            selected.append((order, chunk))
+            used += chunk.tokens
+        return ChunkSelection([chunk for _, chunk in sorted(selected, key=lambda item: item[0])], scanned)
+
+
+def select_document_chunks(prompt: str, files: Iterable[str], token_budget: int, max_chars: int = 2000,
+                           selector: Optional[ChunkSelector] = None) -> ChunkSelection:
+    """Stream every file through the chunker and select relevant chunks for the prompt"""
+    selector = selector or ChunkSelector()
+
+    def all_chunks():
+        for file_path in files:
+            try:
+                yield from iter_file_chunks(file_path, max_chars)
+            except OSError as e:
+                logging.error(f"Failed to read document {file_path}: {e}")
+
+    return selector.select(prompt, all_chunks(), token_budget)
+
+
+def file_content_hash(file_path: str, block_size: int = 1 << 20) -> str:
+    """SHA-256 of a file, read in blocks"""
+    digest = hashlib.sha256()
+    with open(file_path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class DocumentChunkIndex:
+    """Persistent per-file store of document chunks and their embeddings
+
+    Files are keyed by absolute path. A file whose size and mtime are
+    unchanged is reused without being read; if only the mtime changed, its
+    content hash decides. Changed files, or files indexed with a different
+    chunk size or embedder, are re-chunked and re-embedded.
+    """
+
+    def __init__(self, index_dir: Path, selector: ChunkSelector, max_chars: int = 2000):
+        self.index_dir = Path(index_dir)
+        self.index_dir.mkdir(parents=True, exist_ok=True)
+        self.db_path = self.index_dir / "chunk_index.db"
+        self.selector = selector
+        self.max_chars = max_chars
+        self.embedder_name = getattr(selector.embedding_function, 'name',
+                                     type(selector.embedding_function).__name__)
+        self.db = SQLiteDatabase(self.db_path)
+        self.stats = {'reused': 0, 'indexed': 0}
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize SQLite database for the chunk index"""
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS indexed_files (
+                    path TEXT PRIMARY KEY,
+                    mtime REAL NOT NULL,
+                    size INTEGER NOT NULL,
+                    content_hash TEXT NOT NULL,
+                    chunk_chars INTEGER NOT NULL,
+                    embedder TEXT NOT NULL,
+                    chunk_count INTEGER NOT NULL,
+                    indexed_at REAL NOT NULL
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS chunks (
+                    path TEXT NOT NULL,
+                    chunk_index INTEGER NOT NULL,
+                    start_line INTEGER NOT NULL,
+                    end_line INTEGER NOT NULL,
+                    text TEXT NOT NULL,
+                    embedding BLOB NOT NULL,
+                    PRIMARY KEY (path, chunk_index)
+                )
+            """)
+
+    def ensure_indexed(self, file_path: str) -> bool:
+        """Index a file if it is new or changed; return True if it was (re)indexed"""
+        path = os.path.abspath(file_path)
+        stat = os.stat(path)
+        row = self.db.execute(
+            "SELECT mtime, size, content_hash, chunk_chars, embedder FROM indexed_files WHERE path = ?", (path,)
+        ).fetchone()
+        settings_match = row is not None and row[3] == self.max_chars and row[4] == self.embedder_name
+        if settings_match and row[0] == stat.st_mtime and row[1] == stat.st_size:
+            self.stats['reused'] += 1
+            return False
+
+        content_hash = file_content_hash(path)
+        if settings_match and row[2] == content_hash:
+            # Touched but not modified
+            self.db.execute("UPDATE indexed_files SET mtime = ?, size = ? WHERE path = ?",
+                            (stat.st_mtime, stat.st_size, path))
+            self.stats['reused'] += 1
+            return False
+
+        self._index_file(path, stat, content_hash)
+        self.stats['indexed'] += 1
+        return True
+
+    def _index_file(self, path: str, stat: os.stat_result, content_hash: str):
+        # Chunk and embed before taking the write lock, so other writers only wait for the inserts
+        rows = [
+            (path, chunk.index, chunk.start_line, chunk.end_line, chunk.text, vector.astype(np.float32).tobytes())
+            for chunk, vector in self.selector.embed_chunks(iter_file_chunks(path, self.max_chars))
+        ]
+        with self.db.transaction() as conn:
+            conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+            count = conn.executemany(
+                "INSERT INTO chunks (path, chunk_index, start_line, end_line, text, embedding) VALUES (?, ?, ?, ?, ?, ?)",
+                rows
+            ).rowcount
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed_files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (path, stat.st_mtime, stat.st_size, content_hash, self.max_chars, self.embedder_name, count, time.time())
+            )
+        logging.info(f"Indexed {count} chunks from {Path(path).name}")
+
+    def iter_chunks(self, file_path: str) -> Iterator[Tuple[DocumentChunk, np.ndarray]]:
+        """Stream a file's stored chunks with their embeddings"""
+        path = os.path.abspath(file_path)
+        source = Path(path).name
+        cursor = self.db.execute(
+            "SELECT chunk_index, start_line, end_line, text, embedding FROM chunks WHERE path = ? ORDER BY chunk_index",
+            (path,)
+        )
+        for index, start_line, end_line, text, embedding in cursor:
+            yield (DocumentChunk(source, index, start_line, end_line, text),
+                   np.frombuffer(embedding, dtype=np.float32))
+
+    def select(self, prompt: str, files: Iterable[str], token_budget: int) -> ChunkSelection:
+        """Index files as needed and select the chunks most relevant to the prompt"""
+        counts = {'reused': 0, 'indexed': 0}
+
+        def embedded_chunks():
+            for file_path in files:
+                try:
+                    counts['indexed' if self.ensure_indexed(file_path) else 'reused'] += 1
+                except (OSError, sqlite3.Error) as e:
+                    logging.error(f"Failed to index document {file_path}: {e}")
+                    continue
+                yield from self.iter_chunks(file_path)
+
+        selection = self.selector.select_embedded(prompt, embedded_chunks(), token_budget)
+        selection.indexed, selection.reused = counts['indexed'], counts['reused']
+        return selection
+
+    def prune(self) -> int:
+        """Drop entries for files that no longer exist and return how many were removed"""
+        with self.db.transaction() as conn:
+            missing = [path for (path,) in conn.execute("SELECT path FROM indexed_files")
+                       if not os.path.exists(path)]
+            for path in missing:
+                conn.execute("DELETE FROM chunks WHERE path = ?", (path,))
+                conn.execute("DELETE FROM indexed_files WHERE path = ?", (path,))
+        return len(missing)
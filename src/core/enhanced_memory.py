@@ -8,20 +8,21 @@ import logging
 import json
 import numpy as np
 from typing import Dict, List, Any, Optional, Tuple, Set
-from dataclasses import dataclass, asdict
+from dataclasses import dataclass, asdict, fields
 from pathlib import Path
 from collections import defaultdict, deque
 import hashlib
+import zlib
+import base64
 from threading import Lock
 import pickle
 
-try:
-    import chromadb
-    from chromadb.utils import embedding_functions
-    CHROMADB_AVAILABLE = True
-except ImportError:
-    chromadb = None
-    CHROMADB_AVAILABLE = False
+from src.core.insight_aggregator import InsightAggregator
+from src.core.memory_backend import (
+    CHROMADB_AVAILABLE, get_client, get_embedding_function, initialize_in_background
+)
+
+if not CHROMADB_AVAILABLE:
     logging.warning("ChromaDB not available")
 
 @dataclass
@@ -62,6 +63,109 @@ class LearningInsight:
     actionable: bool
     recommendation: str
 
+# Fixed-width numeric layout of the features used for re-ranking
+KEYWORD_BINS = 128
+FILE_TYPE_BINS = 16
+_PROMPT_LENGTH, _FILE_COUNT, _HAS_FILES, _AUTONOMOUS, _AUTO_CONTINUE, _MEMORY_ENABLED = range(6)
+_KEYWORDS = slice(6, 6 + KEYWORD_BINS)
+_FILE_TYPES = slice(6 + KEYWORD_BINS, 6 + KEYWORD_BINS + FILE_TYPE_BINS)
+FEATURE_DIM = 6 + KEYWORD_BINS + FILE_TYPE_BINS
+
+def _hash_bins(values: List[str], bins: int) -> np.ndarray:
+    vector = np.zeros(bins, dtype=np.float32)
+    for value in values:
+        vector[zlib.crc32(str(value).encode()) % bins] = 1.0
+    return vector
+
+def encode_features(features: Dict[str, Any]) -> np.ndarray:
+    """Pack a feature dict (task or query) into a FEATURE_DIM float32 vector
+
+    Keywords and input file types are hashed into fixed bins, so set
+    overlaps become dot products; scalars are normalized as in
+    _calculate_complexity_similarity.
+    """
+    complexity = features.get("complexity", {})
+    content = features.get("content", {})
+    context = features.get("context", {})
+    vector = np.zeros(FEATURE_DIM, dtype=np.float32)
+    vector[_PROMPT_LENGTH] = min(complexity.get("prompt_length", 0) / 10000, 1.0)
+    vector[_FILE_COUNT] = min(complexity.get("file_count", 0) / 20, 1.0)
+    vector[_HAS_FILES] = bool(content.get("has_files"))
+    vector[_AUTONOMOUS] = bool(context.get("has_autonomous_mode", False))
+    vector[_AUTO_CONTINUE] = bool(context.get("has_auto_continue", False))
+    vector[_MEMORY_ENABLED] = bool(context.get("memory_enabled", False))
+    vector[_KEYWORDS] = _hash_bins(content.get("keywords", []), KEYWORD_BINS)
+    vector[_FILE_TYPES] = _hash_bins(context.get("input_file_types", []), FILE_TYPE_BINS)
+    return vector
+
+def pack_vector(vector: np.ndarray) -> str:
+    """Serialize a feature vector for ChromaDB metadata"""
+    return base64.b64encode(vector.astype(np.float32).tobytes()).decode('ascii')
+
+def unpack_vector(packed: str) -> Optional[np.ndarray]:
+    vector = np.frombuffer(base64.b64decode(packed), dtype=np.float32)
+    return vector if vector.shape == (FEATURE_DIM,) else None
+
+# Fields ChromaDB metadata cannot hold directly (it only takes str, int, float
+# and bool values); they are stored as JSON strings
+JSON_METADATA_FIELDS = ("context", "algorithm_config", "generated_files", "subtasks",
+                        "resource_usage", "user_feedback", "features")
+
+def task_metadata(task_memory: 'TaskMemory', features: Dict[str, Any], embedding_text: str) -> Dict[str, Any]:
+    """ChromaDB metadata for a task, its features and packed feature vector"""
+    metadata = asdict(task_memory)
+    metadata["features"] = features
+    for name in JSON_METADATA_FIELDS:
+        metadata[name] = json.dumps(metadata[name], default=str)
+    metadata["feature_vector"] = pack_vector(encode_features(features))
+    metadata["embedding_text"] = embedding_text
+    return metadata
+
+def metadata_field(metadata: Dict[str, Any], name: str, default: Any = None) -> Any:
+    """A stored metadata value, decoded from JSON for the nested fields"""
+    value = metadata.get(name, default)
+    if name in JSON_METADATA_FIELDS and isinstance(value, str):
+        try:
+            return json.loads(value)
+        except ValueError:
+            return default
+    return value
+
+def task_from_metadata(metadata: Dict[str, Any]) -> 'TaskMemory':
+    """Rebuild the TaskMemory saved by ``task_metadata``; raises TypeError if fields are missing"""
+    return TaskMemory(**{field.name: metadata_field(metadata, field.name)
+                         for field in fields(TaskMemory) if field.name in metadata})
+
+def _set_overlap(query: np.ndarray, tasks: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Jaccard overlap of hashed sets, and whether both sides are non-empty"""
+    intersection = tasks @ query
+    union = tasks.sum(axis=1) + query.sum() - intersection
+    both = (tasks.sum(axis=1) > 0) & (query.sum() > 0)
+    return np.where(both, intersection / np.maximum(union, 1.0), 0.0), both
+
+def rerank_similarity(query_vector: np.ndarray, query_type: str,
+                      task_vectors: np.ndarray, task_types: List[str]) -> np.ndarray:
+    """Enhanced similarity of one query against many tasks in one pass
+
+    Matrix form of EnhancedMemoryManager._calculate_enhanced_similarity:
+    40% content, 30% complexity and 30% context similarity.
+    """
+    same_type = np.array([task_type == query_type for task_type in task_types], dtype=np.float64)
+    keyword_overlap, _ = _set_overlap(query_vector[_KEYWORDS], task_vectors[:, _KEYWORDS])
+    file_match = np.where(task_vectors[:, _HAS_FILES] == query_vector[_HAS_FILES], 1.0, 0.5)
+    content = same_type * (keyword_overlap * 0.7 + file_match * 0.3)
+
+    prompt_sim = 1.0 - np.abs(task_vectors[:, _PROMPT_LENGTH] - query_vector[_PROMPT_LENGTH])
+    file_sim = 1.0 - np.abs(task_vectors[:, _FILE_COUNT] - query_vector[_FILE_COUNT])
+    complexity = prompt_sim * 0.6 + file_sim * 0.4
+
+    flags = [_AUTONOMOUS, _AUTO_CONTINUE, _MEMORY_ENABLED]
+    flag_matches = (task_vectors[:, flags] == query_vector[flags]).sum(axis=1)
+    type_overlap, both_typed = _set_overlap(query_vector[_FILE_TYPES], task_vectors[:, _FILE_TYPES])
+    context = (flag_matches + type_overlap) / np.where(both_typed, 4.0, 3.0)
+
+    return content * 0.4 + complexity * 0.3 + context * 0.3
+
 class EnhancedMemoryManager:
     """Enhanced memory manager with advanced pattern recognition"""
     
@@ -84,14 +188,19 @@ class EnhancedMemoryManager:
         # Pattern recognition
         self.feature_extractors = {}
         self.similarity_threshold = 0.7
+        self.rerank_pool_factor = 10  # Candidates fetched per requested result for re-ranking
         self.learning_enabled = True
         
         # Thread safety
         self.memory_lock = Lock()
         
-        # Initialize system
-        self.setup_enhanced_memory()
+        # Running per-task-type statistics behind discover_learning_insights
+        self.insights = InsightAggregator(self.enhanced_memory_dir / "insights.db")
+        
+        # Initialize system; ChromaDB and the embedding model load in the
+        # background and the collections stay None until they are ready
         self._register_feature_extractors()
+        self.ready = initialize_in_background(self.setup_enhanced_memory, "enhanced-memory-init")
         
     def setup_enhanced_memory(self):
         """Setup enhanced memory system with multiple collections"""
@@ -101,35 +210,41 @@ class EnhancedMemoryManager:
                 return
                 
             self.memory_dir.mkdir(parents=True, exist_ok=True)
-            client = chromadb.PersistentClient(path=str(self.memory_dir))
-            
-            # Create specialized collections
-            self.task_collection = client.get_or_create_collection(
-                "enhanced_tasks",
-                embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"
-                )
-            )
+            client = get_client(self.memory_dir)
+            embedding_function = get_embedding_function()
             
+            # Create specialized collections, all sharing one loaded model
             self.pattern_collection = client.get_or_create_collection(
-                "task_patterns",
-                embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"
-                )
+                "task_patterns", embedding_function=embedding_function
             )
             
             self.insight_collection = client.get_or_create_collection(
-                "learning_insights",
-                embedding_function=embedding_functions.SentenceTransformerEmbeddingFunction(
-                    model_name="all-MiniLM-L6-v2"
-                )
+                "learning_insights", embedding_function=embedding_function
+            )
+            
+            task_collection = client.get_or_create_collection(
+                "enhanced_tasks", embedding_function=embedding_function
             )
+            # Before the collection is published, so no task can be both saved and backfilled
+            if not self.insights.is_backfilled():
+                self._backfill_insights(task_collection)
+            
+            # Assigned last: a non-None task collection means the store is fully ready
+            self.task_collection = task_collection
             
             logging.info("Enhanced memory system initialized")
             
         except Exception as e:
             logging.error(f"Enhanced memory setup failed: {e}")
             self.task_collection = None
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until background setup finishes; True if the collections are usable"""
+        try:
+            self.ready.result(timeout)
+        except Exception:
+            pass
+        return self.task_collection is not None
             
     def save_enhanced_task(self, task_memory: TaskMemory) -> bool:
         """Save task with enhanced metadata and features"""
@@ -144,15 +259,10 @@ class EnhancedMemoryManager:
                 # Create embedding text
                 embedding_text = self._create_embedding_text(task_memory, features)
                 
-                # Prepare metadata
-                metadata = asdict(task_memory)
-                metadata["features"] = features
-                metadata["embedding_text"] = embedding_text
-                
                 # Save to ChromaDB
                 self.task_collection.add(
                     documents=[embedding_text],
-                    metadatas=[metadata],
+                    metadatas=[task_metadata(task_memory, features, embedding_text)],
                     ids=[task_memory.task_id]
                 )
                 
@@ -164,11 +274,17 @@ class EnhancedMemoryManager:
                     self._analyze_recent_patterns()
                     
                 logging.debug(f"Saved enhanced task: {task_memory.task_id}")
-                return True
                 
         except Exception as e:
             logging.error(f"Failed to save enhanced task: {e}")
             return False
+        
+        # Only tasks that reached the collection are counted, matching what a backfill would see
+        try:
+            self.insights.record(task_memory)
+        except Exception as e:
+            logging.error(f"Failed to update task statistics: {e}")
+        return True
             
     def retrieve_similar_tasks(self, prompt: str, task_type: str, 
                              context: Dict[str, Any] = None, 
@@ -182,86 +298,71 @@ class EnhancedMemoryManager:
             query_features = self._extract_query_features(prompt, task_type, context or {})
             query_text = self._create_query_text(prompt, task_type, query_features)
             
-            # Query ChromaDB
+            # Query ChromaDB for a wide candidate pool; re-ranking it is one matrix operation
             results = self.task_collection.query(
                 query_texts=[query_text],
-                n_results=n_results * 2,  # Get more results for filtering
+                n_results=n_results * self.rerank_pool_factor,
                 include=['documents', 'metadatas', 'distances']
             )
             
-            if not results["documents"]:
+            if not results["documents"] or not results["metadatas"][0]:
                 return []
                 
-            # Convert to pattern matches with enhanced similarity
-            pattern_matches = []
+            metadatas = results["metadatas"][0]
+            task_vectors = np.stack([self._feature_vector(metadata) for metadata in metadatas])
+            task_types = [metadata.get("task_type", "") for metadata in metadatas]
+            similarities = rerank_similarity(encode_features(query_features), task_type, task_vectors, task_types)
+            confidences = np.minimum(similarities, 1.0 - np.asarray(results["distances"][0], dtype=np.float64))
             
-            for doc, metadata, distance in zip(results["documents"][0], 
-                                             results["metadatas"][0], 
-                                             results["distances"][0]):
-                
-                # Calculate enhanced similarity
-                similarity = self._calculate_enhanced_similarity(query_features, metadata.get("features", {}))
-                
-                if similarity >= self.similarity_threshold:
-                    task_memory = TaskMemory(**{k: v for k, v in metadata.items() 
-                                              if k not in ["features", "embedding_text"]})
-                    
-                    matching_features = self._identify_matching_features(query_features, metadata.get("features", {}))
-                    confidence = min(similarity, 1.0 - distance)
-                    
-                    pattern_matches.append(PatternMatch(
-                        similarity=similarity,
-                        task_memory=task_memory,
-                        matching_features=matching_features,
-                        confidence=confidence
-                    ))
+            candidates = np.flatnonzero(similarities >= self.similarity_threshold)
+            ranked = candidates[np.argsort(-confidences[candidates], kind="stable")][:n_results]
             
-            # Sort by confidence and return top results
-            pattern_matches.sort(key=lambda x: x.confidence, reverse=True)
-            return pattern_matches[:n_results]
+            pattern_matches = []
+            for i in ranked:
+                metadata = metadatas[i]
+                pattern_matches.append(PatternMatch(
+                    similarity=float(similarities[i]),
+                    task_memory=task_from_metadata(metadata),
+                    matching_features=self._identify_matching_features(
+                        query_features, metadata_field(metadata, "features", {})),
+                    confidence=float(confidences[i])
+                ))
+            return pattern_matches
             
         except Exception as e:
             logging.error(f"Enhanced task retrieval failed: {e}")
             return []
             
+    def _feature_vector(self, metadata: Dict[str, Any]) -> np.ndarray:
+        """Stored feature vector of a task, encoded from its feature dict for older records"""
+        packed = metadata.get("feature_vector")
+        vector = unpack_vector(packed) if isinstance(packed, str) else None
+        if vector is None:
+            vector = encode_features(metadata_field(metadata, "features", {}))
+        return vector
+            
     def discover_learning_insights(self, time_window: float = 86400) -> List[LearningInsight]:
         """Discover actionable learning insights from task history"""
-        if not self.task_collection:
-            return []
-            
         try:
-            # Get recent tasks
-            current_time = time.time()
-            recent_threshold = current_time - time_window
-            
-            # Query recent tasks
-            all_results = self.task_collection.get(
-                include=['metadatas']
-            )
+            summary = self.insights.summarize(time_window)
+            by_type = summary["by_type"]
             
-            recent_tasks = [
-                TaskMemory(**{k: v for k, v in metadata.items() 
-                           if k not in ["features", "embedding_text"]})
-                for metadata in all_results["metadatas"]
-                if metadata.get("timestamp", 0) >= recent_threshold
-            ]
-            
-            if len(recent_tasks) < 10:
+            if sum(stats["tasks"] for stats in by_type.values()) < 10:
                 return []
                 
             insights = []
             
             # Analyze performance patterns
-            insights.extend(self._analyze_performance_patterns(recent_tasks))
+            insights.extend(self._analyze_performance_patterns(by_type))
             
             # Analyze failure patterns
-            insights.extend(self._analyze_failure_patterns(recent_tasks))
+            insights.extend(self._analyze_failure_patterns(by_type, summary["failure_signatures"]))
             
             # Analyze resource usage patterns
-            insights.extend(self._analyze_resource_patterns(recent_tasks))
+            insights.extend(self._analyze_resource_patterns(by_type))
             
             # Analyze complexity patterns
-            insights.extend(self._analyze_complexity_patterns(recent_tasks))
+            insights.extend(self._analyze_complexity_patterns(by_type))
             
             # Cache insights
             for insight in insights:
@@ -272,6 +373,22 @@ class EnhancedMemoryManager:
         except Exception as e:
             logging.error(f"Learning insight discovery failed: {e}")
             return []
+    
+    def _backfill_insights(self, task_collection):
+        """Seed the task statistics from tasks saved before they were tracked"""
+        try:
+            results = task_collection.get(include=['metadatas'])
+            # One commit for the whole history and the marker, so a crash cannot count it twice
+            with self.insights.db.transaction():
+                for metadata in results["metadatas"]:
+                    try:
+                        self.insights.record(task_from_metadata(metadata))
+                    except TypeError:
+                        continue
+                self.insights.mark_backfilled()
+            logging.info(f"Backfilled task statistics from {len(results['metadatas'])} saved tasks")
+        except Exception as e:
+            logging.error(f"Failed to backfill task statistics: {e}")
             
     def get_adaptive_context(self, prompt: str, task_type: str, 
                            context: Dict[str, Any] = None) -> Dict[str, Any]:
@@ -599,32 +716,23 @@ class EnhancedMemoryManager:
             "quality_trend": "improving" if recent_success_rate > overall_success_rate else "stable"
         }
         
-    def _analyze_performance_patterns(self, tasks: List[TaskMemory]) -> List[LearningInsight]:
+    def _analyze_performance_patterns(self, by_type: Dict[str, Dict[str, Any]]) -> List[LearningInsight]:
         """Analyze performance patterns in tasks"""
         insights = []
         
-        # Group by task type
-        type_groups = defaultdict(list)
-        for task in tasks:
-            type_groups[task.task_type].append(task)
-            
-        for task_type, task_list in type_groups.items():
-            if len(task_list) < 5:
+        for task_type, stats in by_type.items():
+            if stats["tasks"] < 5:
                 continue
                 
-            # Analyze execution time trends
-            times = [t.execution_time for t in task_list]
-            avg_time = sum(times) / len(times)
+            # Find significantly slow tasks from the execution time histogram
+            slow_tasks = round(InsightAggregator.count_slower_than(stats["duration_histogram"], stats["avg_time"] * 2))
             
-            # Find significantly slow tasks
-            slow_tasks = [t for t in task_list if t.execution_time > avg_time * 2]
-            
-            if len(slow_tasks) > len(task_list) * 0.2:  # More than 20% are slow
+            if slow_tasks > stats["tasks"] * 0.2:  # More than 20% are slow
                 insight = LearningInsight(
                     insight_id=f"perf_{task_type}_{int(time.time())}",
                     insight_type="performance",
                     description=f"Performance degradation detected in {task_type} tasks",
-                    evidence=[f"{len(slow_tasks)} out of {len(task_list)} tasks are significantly slower"],
+                    evidence=[f"{slow_tasks} out of {stats['tasks']} tasks are significantly slower"],
                     confidence=0.8,
                     actionable=True,
                     recommendation=f"Consider optimizing {task_type} task processing algorithms"
@@ -633,52 +741,41 @@ class EnhancedMemoryManager:
                 
         return insights
         
-    def _analyze_failure_patterns(self, tasks: List[TaskMemory]) -> List[LearningInsight]:
+    def _analyze_failure_patterns(self, by_type: Dict[str, Dict[str, Any]],
+                                  failure_signatures: Dict[str, int]) -> List[LearningInsight]:
         """Analyze failure patterns in tasks"""
         insights = []
         
-        failed_tasks = [t for t in tasks if not t.success]
+        total = sum(stats["tasks"] for stats in by_type.values())
+        failed = total - sum(stats["successes"] for stats in by_type.values())
         
-        if len(failed_tasks) > len(tasks) * 0.3:  # More than 30% failures
-            # Analyze common failure characteristics
-            failure_features = defaultdict(int)
-            
-            for task in failed_tasks:
-                if task.execution_time > 60:  # Long execution time
-                    failure_features["long_execution"] += 1
-                if len(task.prompt) > 5000:  # Complex prompt
-                    failure_features["complex_prompt"] += 1
-                if task.recursion_depth > 2:  # Deep recursion
-                    failure_features["deep_recursion"] += 1
-                    
+        if failed > total * 0.3 and failure_signatures:  # More than 30% failures
             # Find most common failure factor
-            if failure_features:
-                most_common = max(failure_features.items(), key=lambda x: x[1])
-                
-                insight = LearningInsight(
-                    insight_id=f"failure_{int(time.time())}",
-                    insight_type="failure_pattern",
-                    description=f"High failure rate detected: {len(failed_tasks)}/{len(tasks)} tasks failed",
-                    evidence=[f"Most common factor: {most_common[0]} ({most_common[1]} cases)"],
-                    confidence=0.7,
-                    actionable=True,
-                    recommendation=f"Focus on handling {most_common[0]} scenarios better"
-                )
-                insights.append(insight)
+            most_common = max(failure_signatures.items(), key=lambda x: x[1])
+            
+            insight = LearningInsight(
+                insight_id=f"failure_{int(time.time())}",
+                insight_type="failure_pattern",
+                description=f"High failure rate detected: {failed}/{total} tasks failed",
+                evidence=[f"Most common factor: {most_common[0]} ({most_common[1]} cases)"],
+                confidence=0.7,
+                actionable=True,
+                recommendation=f"Focus on handling {most_common[0]} scenarios better"
+            )
+            insights.append(insight)
                 
         return insights
         
-    def _analyze_resource_patterns(self, tasks: List[TaskMemory]) -> List[LearningInsight]:
+    def _analyze_resource_patterns(self, by_type: Dict[str, Dict[str, Any]]) -> List[LearningInsight]:
         """Analyze resource usage patterns"""
         insights = []
         
         # Calculate average resource usage
-        cpu_usages = [t.resource_usage.get("cpu", 0) for t in tasks if t.resource_usage]
-        memory_usages = [t.resource_usage.get("memory", 0) for t in tasks if t.resource_usage]
+        resource_tasks = sum(stats["resource_tasks"] for stats in by_type.values())
         
-        if cpu_usages and memory_usages:
-            avg_cpu = sum(cpu_usages) / len(cpu_usages)
-            avg_memory = sum(memory_usages) / len(memory_usages)
+        if resource_tasks:
+            avg_cpu = sum(stats["cpu_total"] for stats in by_type.values()) / resource_tasks
+            avg_memory = sum(stats["memory_total"] for stats in by_type.values()) / resource_tasks
             
             if avg_cpu > 70 or avg_memory > 70:
                 insight = LearningInsight(
@@ -694,16 +791,17 @@ class EnhancedMemoryManager:
                 
         return insights
         
-    def _analyze_complexity_patterns(self, tasks: List[TaskMemory]) -> List[LearningInsight]:
+    def _analyze_complexity_patterns(self, by_type: Dict[str, Dict[str, Any]]) -> List[LearningInsight]:
         """Analyze task complexity patterns"""
         insights = []
         
         # Analyze relationship between complexity and success
-        complex_tasks = [t for t in tasks if len(t.prompt) > 2000 or t.recursion_depth > 1]
+        complex_tasks = sum(stats["complex_tasks"] for stats in by_type.values())
         
         if complex_tasks:
-            complex_success_rate = sum(1 for t in complex_tasks if t.success) / len(complex_tasks)
-            overall_success_rate = sum(1 for t in tasks if t.success) / len(tasks)
+            complex_success_rate = sum(stats["complex_successes"] for stats in by_type.values()) / complex_tasks
+            overall_success_rate = (sum(stats["successes"] for stats in by_type.values()) /
+                                    sum(stats["tasks"] for stats in by_type.values()))
             
             if complex_success_rate < overall_success_rate - 0.2:  # 20% lower success
                 insight = LearningInsight(
@@ -0,0 +1,199 @@
+"""
+Incremental task statistics for SuperMini learning insights.
+Each saved task updates running per-task-type counters in hourly buckets of
+a small SQLite sidecar, so summarizing a time window reads a handful of
+aggregate rows instead of the whole task history.
+"""
+
+import math
+import time
+from collections import defaultdict
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from src.core.sqlite_db import SQLiteDatabase
+
+# Upper bounds (seconds) of the execution time histogram bins; the last bin is open-ended
+DURATION_BIN_EDGES = [0.5 * 2 ** i for i in range(14)]
+
+# Characteristics counted for failed tasks, with the test that detects each
+FAILURE_SIGNATURES = {
+    'long_execution': lambda task: task.execution_time > 60,
+    'complex_prompt': lambda task: len(task.prompt) > 5000,
+    'deep_recursion': lambda task: task.recursion_depth > 2,
+}
+
+
+def duration_bin(seconds: float) -> int:
+    for index, edge in enumerate(DURATION_BIN_EDGES):
+        if seconds <= edge:
+            return index
+    return len(DURATION_BIN_EDGES)
+
+
+def _bin_bounds(index: int):
+    lower = DURATION_BIN_EDGES[index - 1] if index > 0 else 0.0
+    upper = DURATION_BIN_EDGES[index] if index < len(DURATION_BIN_EDGES) else math.inf
+    return lower, upper
+
+
+def is_complex(task) -> bool:
+    return len(task.prompt) > 2000 or task.recursion_depth > 1
+
+
+class InsightAggregator:
+    """Running per-task-type statistics persisted in SQLite"""
+
+    def __init__(self, db_path: Path, bucket_seconds: int = 3600):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.bucket_seconds = bucket_seconds
+        self.db = SQLiteDatabase(self.db_path)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize SQLite database for aggregated task statistics"""
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS task_stats (
+                    task_type TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    tasks INTEGER NOT NULL DEFAULT 0,
+                    successes INTEGER NOT NULL DEFAULT 0,
+                    total_time REAL NOT NULL DEFAULT 0,
+                    resource_tasks INTEGER NOT NULL DEFAULT 0,
+                    cpu_total REAL NOT NULL DEFAULT 0,
+                    memory_total REAL NOT NULL DEFAULT 0,
+                    complex_tasks INTEGER NOT NULL DEFAULT 0,
+                    complex_successes INTEGER NOT NULL DEFAULT 0,
+                    PRIMARY KEY (task_type, bucket)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS duration_bins (
+                    task_type TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    bin INTEGER NOT NULL,
+                    tasks INTEGER NOT NULL,
+                    PRIMARY KEY (task_type, bucket, bin)
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS failure_signatures (
+                    task_type TEXT NOT NULL,
+                    bucket INTEGER NOT NULL,
+                    signature TEXT NOT NULL,
+                    tasks INTEGER NOT NULL,
+                    PRIMARY KEY (task_type, bucket, signature)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_task_stats_bucket ON task_stats(bucket)")
+            has_state = conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'aggregator_state'"
+            ).fetchone()
+            if not has_state:
+                conn.execute("""
+                    CREATE TABLE aggregator_state (
+                        key TEXT PRIMARY KEY,
+                        value TEXT NOT NULL
+                    )
+                """)
+                # Statistics kept before the marker existed already include the saved history
+                conn.execute("""
+                    INSERT INTO aggregator_state (key, value)
+                    SELECT 'backfilled', 'existing' WHERE EXISTS (SELECT 1 FROM task_stats)
+                """)
+
+    def record(self, task):
+        """Fold one TaskMemory into the running statistics"""
+        bucket = int(task.timestamp // self.bucket_seconds)
+        resources = task.resource_usage or {}
+        complex_task = is_complex(task)
+        signatures = [] if task.success else [name for name, test in FAILURE_SIGNATURES.items() if test(task)]
+        with self.db.transaction() as conn:
+            conn.execute("""
+                INSERT INTO task_stats (task_type, bucket, tasks, successes, total_time, resource_tasks,
+                                        cpu_total, memory_total, complex_tasks, complex_successes)
+                VALUES (?, ?, 1, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (task_type, bucket) DO UPDATE SET
+                    tasks = tasks + 1,
+                    successes = successes + excluded.successes,
+                    total_time = total_time + excluded.total_time,
+                    resource_tasks = resource_tasks + excluded.resource_tasks,
+                    cpu_total = cpu_total + excluded.cpu_total,
+                    memory_total = memory_total + excluded.memory_total,
+                    complex_tasks = complex_tasks + excluded.complex_tasks,
+                    complex_successes = complex_successes + excluded.complex_successes
+            """, (task.task_type, bucket, int(task.success), task.execution_time, int(bool(resources)),
+                  resources.get("cpu", 0), resources.get("memory", 0),
+                  int(complex_task), int(complex_task and task.success)))
+            conn.execute("""
+                INSERT INTO duration_bins (task_type, bucket, bin, tasks) VALUES (?, ?, ?, 1)
+                ON CONFLICT (task_type, bucket, bin) DO UPDATE SET tasks = tasks + 1
+            """, (task.task_type, bucket, duration_bin(task.execution_time)))
+            conn.executemany("""
+                INSERT INTO failure_signatures (task_type, bucket, signature, tasks) VALUES (?, ?, ?, 1)
+                ON CONFLICT (task_type, bucket, signature) DO UPDATE SET tasks = tasks + 1
+            """, [(task.task_type, bucket, name) for name in signatures])
+
+    def is_empty(self) -> bool:
+        return self.db.execute("SELECT 1 FROM task_stats LIMIT 1").fetchone() is None
+
+    def is_backfilled(self) -> bool:
+        """True once tasks saved before the statistics existed have been recorded"""
+        return self.db.execute("SELECT 1 FROM aggregator_state WHERE key = 'backfilled'").fetchone() is not None
+
+    def mark_backfilled(self):
+        """Record that the backfill ran; call inside the backfill's transaction"""
+        self.db.execute("INSERT OR REPLACE INTO aggregator_state (key, value) VALUES ('backfilled', ?)",
+                        (str(time.time()),))
+
+    def summarize(self, time_window: float, now: Optional[float] = None) -> Dict[str, Any]:
+        """Aggregate statistics of tasks saved within ``time_window`` seconds of ``now``
+
+        Buckets are whole hours, so the window is rounded out to the bucket
+        containing its start.
+        """
+        first_bucket = int(((now or time.time()) - time_window) // self.bucket_seconds)
+        with self.db.snapshot() as conn:
+            rows = conn.execute("""
+                SELECT task_type, SUM(tasks), SUM(successes), SUM(total_time), SUM(resource_tasks),
+                       SUM(cpu_total), SUM(memory_total), SUM(complex_tasks), SUM(complex_successes)
+                FROM task_stats WHERE bucket >= ? GROUP BY task_type
+            """, (first_bucket,)).fetchall()
+            bins = conn.execute("""
+                SELECT task_type, bin, SUM(tasks) FROM duration_bins WHERE bucket >= ? GROUP BY task_type, bin
+            """, (first_bucket,)).fetchall()
+            failures = conn.execute("""
+                SELECT signature, SUM(tasks) FROM failure_signatures WHERE bucket >= ? GROUP BY signature
+            """, (first_bucket,)).fetchall()
+
+        histograms = defaultdict(dict)
+        for task_type, index, count in bins:
+            histograms[task_type][index] = count
+        by_type = {}
+        for task_type, tasks, successes, total_time, resource_tasks, cpu, memory, complex_tasks, complex_successes in rows:
+            by_type[task_type] = {
+                'tasks': tasks,
+                'successes': successes,
+                'avg_time': total_time / tasks,
+                'resource_tasks': resource_tasks,
+                'cpu_total': cpu,
+                'memory_total': memory,
+                'complex_tasks': complex_tasks,
+                'complex_successes': complex_successes,
+                'duration_histogram': histograms[task_type],
+            }
+        return {'by_type': by_type, 'failure_signatures': dict(failures)}
+
+    @staticmethod
+    def count_slower_than(histogram: Dict[int, int], seconds: float) -> float:
+        """Approximate number of tasks slower than ``seconds``, interpolating within a bin"""
+        slower = 0.0
+        for index, count in histogram.items():
+            lower, upper = _bin_bounds(index)
+            if lower >= seconds:
+                slower += count
+            elif upper > seconds:
+                slower += count * ((upper - seconds) / (upper - lower) if math.isfinite(upper) else 1.0)
+        return slower
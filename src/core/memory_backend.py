@@ -0,0 +1,66 @@
+"""
+Shared ChromaDB clients and embedding model for SuperMini memory stores.
+Opening a persistent client and loading the sentence-transformer model are
+slow, so each is done once per process and off the UI thread.
+"""
+
+import logging
+import threading
+from concurrent.futures import Future
+from pathlib import Path
+from threading import Lock
+from typing import Any, Callable, Dict
+
+try:
+    import chromadb
+    from chromadb.utils import embedding_functions
+    CHROMADB_AVAILABLE = True
+except ImportError:
+    chromadb = None
+    embedding_functions = None
+    CHROMADB_AVAILABLE = False
+
+DEFAULT_EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+
+_lock = Lock()
+_clients: Dict[str, Any] = {}
+_embedding_functions: Dict[str, Any] = {}
+
+
+def get_client(path: Path):
+    """Get the process-wide persistent ChromaDB client for a directory"""
+    key = str(Path(path).resolve())
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            client = _clients[key] = chromadb.PersistentClient(path=key)
+        return client
+
+
+def get_embedding_function(model_name: str = DEFAULT_EMBEDDING_MODEL):
+    """Get the process-wide sentence-transformer embedding function for a model
+
+    Every collection embedded with the same model shares one instance, so
+    the model weights are loaded and kept in memory only once.
+    """
+    with _lock:
+        function = _embedding_functions.get(model_name)
+        if function is None:
+            function = _embedding_functions[model_name] = \
+                embedding_functions.SentenceTransformerEmbeddingFunction(model_name=model_name)
+        return function
+
+
+def initialize_in_background(setup: Callable[[], Any], name: str) -> Future:
+    """Run a setup function on a daemon thread; the future completes when it returns"""
+    future: Future = Future()
+
+    def run():
+        try:
+            future.set_result(setup())
+        except Exception as e:
+            logging.error(f"{name} failed: {e}")
+            future.set_exception(e)
+
+    threading.Thread(target=run, name=name, daemon=True).start()
+    return future
@@ -0,0 +1,242 @@
+"""
+Recall and latency benchmark for the SuperMini memory stores.
+Synthetic task histories of a given size are written to a fresh
+MemoryManager and EnhancedMemoryManager, then labeled queries measure
+retrieval latency percentiles and recall@k. Results are plain JSON so runs
+from different commits can be compared with ``compare_reports``.
+
+    python -m src.core.memory_benchmark --sizes 1000 10000 --output memory_benchmark.json
+"""
+
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+from src.core.enhanced_memory import EnhancedMemoryManager, TaskMemory
+
+TASK_TYPES = ["code", "multimedia", "rag", "automation", "analytics"]
+TOPICS = {
+    "code": ["parser", "cache", "scheduler", "tokenizer", "router", "migration", "retry", "socket"],
+    "multimedia": ["thumbnail", "waveform", "transcode", "caption", "palette", "frame", "sprite", "mixdown"],
+    "rag": ["contract", "handbook", "invoice", "transcript", "policy", "manual", "report", "thesis"],
+    "automation": ["backup", "cron", "deploy", "cleanup", "rename", "sync", "archive", "notify"],
+    "analytics": ["churn", "revenue", "cohort", "funnel", "forecast", "latency", "retention", "inventory"],
+}
+VERBS = ["Build", "Fix", "Explain", "Optimize", "Refactor", "Summarize", "Automate", "Chart"]
+HISTORY_START = 1_700_000_000.0  # Fixed so histories are identical across runs
+EXTENSIONS = {"code": "py", "multimedia": "png", "rag": "pdf", "automation": "sh", "analytics": "csv"}
+
+# Retrieval metrics where a larger value is worse, used when comparing reports
+LOWER_IS_BETTER = ('p50_ms', 'p99_ms', 'disk_bytes')
+
+
+def synthetic_tasks(count: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Deterministic task history; every task carries a unique ``marker`` identifier"""
+    rng = random.Random(seed)
+    tasks = []
+    for i in range(count):
+        task_type = TASK_TYPES[i % len(TASK_TYPES)]
+        topic, other = rng.sample(TOPICS[task_type], 2)
+        marker = f"{topic}_{i:06d}"
+        prompt = f"{rng.choice(VERBS)} the {topic} {other} job ({marker}) for the {rng.choice(TOPICS[task_type])} team"
+        tasks.append({
+            'marker': marker,
+            'prompt': prompt,
+            'task_type': task_type,
+            'result': f"Completed {marker}: handled {topic} and {other} in {rng.randint(2, 40)} steps.",
+            'files': [f"{topic}_{i}.{EXTENSIONS[task_type]}"],
+            'success': rng.random() > 0.1,
+            'score': round(rng.uniform(0.4, 1.0), 3),
+            'execution_time': round(rng.uniform(0.5, 30.0), 2),
+            'timestamp': HISTORY_START + i * 60,
+        })
+    return tasks
+
+
+def labeled_queries(tasks: List[Dict[str, Any]], count: int, seed: int = 1) -> List[Tuple[str, str, str]]:
+    """(query, task type, relevant marker) pairs phrased differently from the saved prompts"""
+    rng = random.Random(seed)
+    picked = rng.sample(tasks, min(count, len(tasks)))
+    return [(f"What did we do for {task['marker']}?", task['task_type'], task['marker']) for task in picked]
+
+
+def percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def directory_size(path: Path) -> int:
+    return sum(f.stat().st_size for f in Path(path).rglob("*") if f.is_file())
+
+
+def _measure(queries: List[Tuple[str, str, str]], retrieve: Callable[[str, str], List[str]],
+             k: int) -> Dict[str, float]:
+    """Latency percentiles and recall@k; ``retrieve`` returns the texts of the top hits"""
+    latencies, hits = [], 0
+    for query, task_type, marker in queries:
+        start_time = time.perf_counter()
+        texts = retrieve(query, task_type)
+        latencies.append((time.perf_counter() - start_time) * 1000)
+        if any(marker in text for text in texts[:k]):
+            hits += 1
+    return {
+        'queries': len(queries),
+        'p50_ms': percentile(latencies, 0.50),
+        'p99_ms': percentile(latencies, 0.99),
+        f'recall_at_{k}': hits / max(len(queries), 1),
+    }
+
+
+def benchmark_memory_manager(data_dir: Path, tasks: List[Dict[str, Any]],
+                             queries: List[Tuple[str, str, str]], k: int = 3) -> Dict[str, Any]:
+    """Insert throughput, retrieve_context latency, recall@k and disk size of a MemoryManager"""
+    from supermini import MemoryManager
+
+    # No retrieval cache, so every query reaches the store
+    memory = MemoryManager(data_dir, write_batch_size=256, retrieval_cache_size=0, similarity_threshold=0)
+    try:
+        if not memory.wait_until_ready():
+            raise RuntimeError("MemoryManager store is unavailable (is chromadb installed?)")
+        start_time = time.perf_counter()
+        for task in tasks:
+            memory.save_task({key: value for key, value in task.items() if key != 'marker'})
+        memory.flush()
+        insert_seconds = time.perf_counter() - start_time
+
+        def retrieve(query, task_type):
+            return memory.retrieve_context(query, task_type, n_results=k).split("\n\nPrevious: ")
+
+        report = {
+            'records': len(tasks),
+            'insert_per_second': len(tasks) / max(insert_seconds, 1e-9),
+        }
+        report.update(_measure(queries, retrieve, k))
+    finally:
+        memory.close()
+    report['disk_bytes'] = directory_size(data_dir)
+    return report
+
+
+def benchmark_enhanced_memory(data_dir: Path, tasks: List[Dict[str, Any]],
+                              queries: List[Tuple[str, str, str]], k: int = 3) -> Dict[str, Any]:
+    """Insert throughput, retrieve_similar_tasks latency, recall@k and disk size of an EnhancedMemoryManager"""
+    manager = EnhancedMemoryManager(data_dir)
+    if not manager.wait_until_ready():
+        raise RuntimeError("EnhancedMemoryManager store is unavailable (is chromadb installed?)")
+    start_time = time.perf_counter()
+    saved = 0
+    for i, task in enumerate(tasks):
+        saved += manager.save_enhanced_task(TaskMemory(
+            task_id=f"bench_{i}", timestamp=task['timestamp'], prompt=task['prompt'], task_type=task['task_type'],
+            context={'files': task['files']}, result=task['result'], success=task['success'],
+            execution_time=task['execution_time'], quality_score=task['score'], algorithm_config={},
+            generated_files=[], subtasks=[], recursion_depth=0, resource_usage={}
+        ))
+    insert_seconds = time.perf_counter() - start_time
+    if saved != len(tasks):
+        # save_enhanced_task logs and returns False on errors; recall over a partial store would be meaningless
+        raise RuntimeError(f"EnhancedMemoryManager saved only {saved} of {len(tasks)} tasks")
+
+    def retrieve(query, task_type):
+        matches = manager.retrieve_similar_tasks(query, task_type, n_results=k)
+        return [f"{match.task_memory.prompt}\n{match.task_memory.result}" for match in matches]
+
+    report = {
+        'records': len(tasks),
+        'saved': saved,
+        'insert_per_second': len(tasks) / max(insert_seconds, 1e-9),
+    }
+    report.update(_measure(queries, retrieve, k))
+    report['disk_bytes'] = directory_size(data_dir)
+    return report
+
+
+def _git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=Path(__file__).parent).stdout.strip()
+    except Exception:
+        return None
+
+
+def run_benchmarks(sizes: Sequence[int] = (1000, 10000, 100000), work_dir: Optional[Path] = None,
+                   query_count: int = 200, k: int = 3, seed: int = 0,
+                   stores: Sequence[str] = ("memory_manager", "enhanced_memory")) -> Dict[str, Any]:
+    """Benchmark each store at each history size in fresh directories under ``work_dir``"""
+    benchmarks = {'memory_manager': benchmark_memory_manager, 'enhanced_memory': benchmark_enhanced_memory}
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'k': k,
+        'seed': seed,
+        'results': {},
+    }
+    with tempfile.TemporaryDirectory(dir=work_dir) as root:
+        for size in sizes:
+            tasks = synthetic_tasks(size, seed)
+            queries = labeled_queries(tasks, query_count, seed + 1)
+            report['results'][str(size)] = {
+                store: benchmarks[store](Path(root) / f"{store}_{size}", tasks, queries, k) for store in stores
+            }
+    return report
+
+
+def compare_reports(baseline: Dict[str, Any], current: Dict[str, Any], tolerance: float = 0.2) -> List[str]:
+    """Metrics of ``current`` that are more than ``tolerance`` worse than ``baseline``"""
+    regressions = []
+    for size, stores in current.get('results', {}).items():
+        for store, metrics in stores.items():
+            previous = baseline.get('results', {}).get(size, {}).get(store)
+            if not previous:
+                continue
+            for metric, value in metrics.items():
+                old = previous.get(metric)
+                if not isinstance(old, (int, float)) or metric in ('records', 'queries', 'saved') or old == 0:
+                    continue
+                change = (value - old) / abs(old)
+                worse = change > tolerance if metric in LOWER_IS_BETTER else change < -tolerance
+                if worse:
+                    regressions.append(f"{store} @ {size}: {metric} {old:.4g} -> {value:.4g} ({change:+.0%})")
+    return regressions
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark SuperMini memory recall and latency")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000, 100000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("-k", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stores", nargs="+", default=["memory_manager", "enhanced_memory"],
+                        choices=["memory_manager", "enhanced_memory"])
+    parser.add_argument("--work-dir", type=Path, default=None, help="Where temporary stores are created")
+    parser.add_argument("--output", type=Path, help="Write the JSON report here")
+    parser.add_argument("--baseline", type=Path, help="Earlier JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    report = run_benchmarks(args.sizes, args.work_dir, args.queries, args.k, args.seed, args.stores)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        args.output.write_text(text)
+    print(text)
+
+    if args.baseline:
+        regressions = compare_reports(json.loads(args.baseline.read_text()), report, args.tolerance)
+        for regression in regressions:
+            print(f"REGRESSION {regression}", file=sys.stderr)
+        return 1 if regressions else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
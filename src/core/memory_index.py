@@ -0,0 +1,269 @@
+"""
+Structured metadata index for the SuperMini memory store.
+ChromaDB metadata only holds flat values, so lists such as attached files
+end up stringified and cannot be filtered. This SQLite companion keeps the
+filterable fields of each memory record in typed, indexed columns keyed by
+the ChromaDB id, so filtered recall narrows to matching ids before any
+vector search. An FTS5 table over the same records provides BM25 lexical
+search, which reciprocal-rank fusion combines with vector hits.
+"""
+
+import re
+import time
+import sqlite3
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from src.core.sqlite_db import SQLiteDatabase
+
+LANGUAGE_BY_EXTENSION = {
+    'py': 'python', 'js': 'javascript', 'jsx': 'javascript', 'ts': 'typescript', 'tsx': 'typescript',
+    'java': 'java', 'go': 'go', 'rb': 'ruby', 'rs': 'rust', 'c': 'c', 'h': 'c', 'cpp': 'cpp', 'hpp': 'cpp',
+    'cs': 'csharp', 'php': 'php', 'swift': 'swift', 'kt': 'kotlin', 'scala': 'scala', 'sh': 'bash',
+    'sql': 'sql', 'r': 'r', 'html': 'html', 'css': 'css'
+}
+_FENCE_LANGUAGE = re.compile(r"```([A-Za-z0-9_+#-]+)")
+_QUERY_TOKEN = re.compile(r"\w+")
+# Query terms beyond this are dropped so a long prompt stays a cheap FTS query
+MAX_QUERY_TERMS = 32
+
+
+def file_extension(path: str) -> str:
+    return Path(str(path)).suffix.lower().lstrip('.')
+
+
+def infer_language(files: Iterable[str] = (), text: str = "") -> Optional[str]:
+    """Programming language of a task: the first fenced code block, else the first code file"""
+    match = _FENCE_LANGUAGE.search(text or "")
+    if match:
+        return match.group(1).lower()
+    for path in files:
+        language = LANGUAGE_BY_EXTENSION.get(file_extension(path))
+        if language:
+            return language
+    return None
+
+
+@dataclass
+class MemoryFilter:
+    """Structured pre-filter for memory retrieval; unset fields match everything"""
+    task_type: Optional[str] = None
+    success: Optional[bool] = None
+    min_score: Optional[float] = None
+    since: Optional[float] = None
+    until: Optional[float] = None
+    file_extension: Optional[str] = None
+    language: Optional[str] = None
+
+    def cache_key(self) -> str:
+        return repr(tuple(vars(self).values()))
+
+
+def fts_query(text: str) -> str:
+    """FTS5 MATCH expression that ORs the distinct words of ``text``, each quoted literally"""
+    terms = list(dict.fromkeys(token.lower() for token in _QUERY_TOKEN.findall(text or "")))
+    return " OR ".join(f'"{term}"' for term in terms[:MAX_QUERY_TERMS])
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[str]], weights: Optional[Sequence[float]] = None,
+                           k: int = 60) -> List[str]:
+    """Merge ranked id lists; each list contributes ``weight / (k + rank)`` to an id's score"""
+    weights = weights or [1.0] * len(rankings)
+    scores: Dict[str, float] = defaultdict(float)
+    for ranking, weight in zip(rankings, weights):
+        if weight <= 0:
+            continue
+        for rank, record_id in enumerate(ranking, start=1):
+            scores[record_id] += weight / (k + rank)
+    return sorted(scores, key=lambda record_id: -scores[record_id])
+
+
+def benchmark_fusion(labeled: List[Tuple[str, str]], vector_search: Callable[[str, int], List[str]],
+                     lexical_search: Callable[[str, int], List[str]],
+                     weight_grid: Sequence[Tuple[float, float]] = ((1.0, 0.0), (0.0, 1.0), (1.0, 1.0), (1.0, 0.5)),
+                     k: int = 3, pool: int = 20) -> Dict[str, Dict[str, float]]:
+    """Recall@k, MRR and latency of fused retrieval for each (vector, lexical) weight pair
+
+    ``labeled`` holds (query, relevant id) pairs; the searches return ranked ids.
+    """
+    rankings = []
+    latency = {'vector': 0.0, 'lexical': 0.0}
+    for query, _ in labeled:
+        start_time = time.perf_counter()
+        vector_ids = vector_search(query, pool)
+        latency['vector'] += time.perf_counter() - start_time
+        start_time = time.perf_counter()
+        lexical_ids = lexical_search(query, pool)
+        latency['lexical'] += time.perf_counter() - start_time
+        rankings.append((vector_ids, lexical_ids))
+
+    count = max(len(labeled), 1)
+    report = {}
+    for vector_weight, lexical_weight in weight_grid:
+        hits, reciprocal_ranks, fusion_time = 0, 0.0, 0.0
+        for (_, relevant), lists in zip(labeled, rankings):
+            start_time = time.perf_counter()
+            fused = reciprocal_rank_fusion(lists, [vector_weight, lexical_weight])
+            fusion_time += time.perf_counter() - start_time
+            fused = fused[:pool]
+            if relevant in fused[:k]:
+                hits += 1
+            if relevant in fused:
+                reciprocal_ranks += 1.0 / (fused.index(relevant) + 1)
+        report[f"vector={vector_weight:g},lexical={lexical_weight:g}"] = {
+            f'recall_at_{k}': hits / count,
+            'mrr': reciprocal_ranks / count,
+            'mean_latency_ms': (latency['vector'] * (vector_weight > 0) + latency['lexical'] * (lexical_weight > 0)
+                                + fusion_time) / count * 1000,
+        }
+    report['latency_ms'] = {name: total / count * 1000 for name, total in latency.items()}
+    return report
+
+
+class MemoryMetadataIndex:
+    """SQLite index of memory record metadata joined to ChromaDB ids"""
+
+    def __init__(self, db_path: Path):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = SQLiteDatabase(self.db_path)
+        self._init_database()
+
+    def _init_database(self):
+        """Initialize SQLite database for the metadata index"""
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_records (
+                    id TEXT PRIMARY KEY,
+                    kind TEXT NOT NULL,
+                    task_type TEXT,
+                    success INTEGER,
+                    score REAL,
+                    timestamp REAL NOT NULL,
+                    language TEXT
+                )
+            """)
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS memory_files (
+                    id TEXT NOT NULL,
+                    path TEXT NOT NULL,
+                    extension TEXT NOT NULL,
+                    generated INTEGER NOT NULL,
+                    PRIMARY KEY (id, path, generated)
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_type_time ON memory_records(task_type, timestamp)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_success ON memory_records(success, score)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_records_language ON memory_records(language)")
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_files_extension ON memory_files(extension, id)")
+            # Rows share the rowid of their memory_records entry; underscores keep identifiers whole
+            conn.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS memory_text USING fts5(body, tokenize=\"unicode61 tokenchars '_'\")"
+            )
+
+    def add(self, record_id: str, kind: str, task_type: Optional[str] = None, success: Optional[bool] = None,
+            score: Optional[float] = None, timestamp: Optional[float] = None, files: Sequence[str] = (),
+            generated_files: Sequence[str] = (), language: Optional[str] = None, text: str = ""):
+        """Index one memory record (replacing any previous entry with the same id)
+
+        ``text`` is made searchable with ``lexical_search``.
+        """
+        file_rows = [(record_id, str(path), file_extension(path), 0) for path in files or ()]
+        file_rows += [(record_id, str(path), file_extension(path), 1) for path in generated_files or ()]
+        with self.db.transaction() as conn:
+            self._delete_text(conn, [record_id])
+            conn.execute("DELETE FROM memory_files WHERE id = ?", (record_id,))
+            cursor = conn.execute(
+                "INSERT OR REPLACE INTO memory_records (id, kind, task_type, success, score, timestamp, language) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (record_id, kind, task_type, None if success is None else int(success), score,
+                 timestamp or time.time(), language)
+            )
+            if text:
+                conn.execute("INSERT INTO memory_text (rowid, body) VALUES (?, ?)", (cursor.lastrowid, text))
+            conn.executemany(
+                "INSERT OR IGNORE INTO memory_files (id, path, extension, generated) VALUES (?, ?, ?, ?)", file_rows
+            )
+
+    @staticmethod
+    def _delete_text(conn, record_ids: Sequence[str]):
+        conn.executemany("DELETE FROM memory_text WHERE rowid = (SELECT rowid FROM memory_records WHERE id = ?)",
+                         [(record_id,) for record_id in record_ids])
+
+    def remove(self, record_ids: Sequence[str]):
+        rows = [(record_id,) for record_id in record_ids]
+        with self.db.transaction() as conn:
+            self._delete_text(conn, record_ids)
+            conn.executemany("DELETE FROM memory_records WHERE id = ?", rows)
+            conn.executemany("DELETE FROM memory_files WHERE id = ?", rows)
+
+    def _where(self, memory_filter: MemoryFilter):
+        clauses, params = [], []
+        if memory_filter.task_type is not None:
+            clauses.append("r.task_type = ?")
+            params.append(memory_filter.task_type)
+        if memory_filter.success is not None:
+            clauses.append("r.success = ?")
+            params.append(int(memory_filter.success))
+        if memory_filter.min_score is not None:
+            clauses.append("r.score >= ?")
+            params.append(memory_filter.min_score)
+        if memory_filter.since is not None:
+            clauses.append("r.timestamp >= ?")
+            params.append(memory_filter.since)
+        if memory_filter.until is not None:
+            clauses.append("r.timestamp <= ?")
+            params.append(memory_filter.until)
+        if memory_filter.language is not None:
+            clauses.append("r.language = ?")
+            params.append(memory_filter.language.lower())
+        if memory_filter.file_extension is not None:
+            clauses.append("r.id IN (SELECT id FROM memory_files WHERE extension = ?)")
+            params.append(memory_filter.file_extension.lower().lstrip('.'))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query_ids(self, memory_filter: MemoryFilter, limit: Optional[int] = None) -> List[str]:
+        """Ids of matching records, newest first"""
+        where, params = self._where(memory_filter)
+        sql = f"SELECT r.id FROM memory_records r{where} ORDER BY r.timestamp DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        return [row[0] for row in self.db.execute(sql, params)]
+
+    def lexical_search(self, query: str, memory_filter: Optional[MemoryFilter] = None, limit: int = 10) -> List[str]:
+        """Ids of records whose text matches words of ``query``, best BM25 score first"""
+        match = fts_query(query)
+        if not match:
+            return []
+        where, params = self._where(memory_filter or MemoryFilter())
+        where = where.replace(" WHERE ", " AND ", 1)
+        rows = self.db.execute(
+            f"SELECT r.id FROM memory_text JOIN memory_records r ON r.rowid = memory_text.rowid "
+            f"WHERE memory_text MATCH ?{where} ORDER BY bm25(memory_text) LIMIT ?",
+            [match] + params + [limit]
+        )
+        return [row[0] for row in rows]
+
+    def search(self, memory_filter: MemoryFilter, limit: int = 100) -> List[Dict[str, Any]]:
+        """Matching records with their indexed fields and files, newest first"""
+        where, params = self._where(memory_filter)
+        conn = self.db.connection()
+        # The connection is pooled, so set the row factory on this cursor only
+        cursor = conn.cursor()
+        cursor.row_factory = sqlite3.Row
+        records = [dict(row) for row in cursor.execute(
+            f"SELECT r.* FROM memory_records r{where} ORDER BY r.timestamp DESC LIMIT ?", params + [limit]
+        )]
+        for record in records:
+            record['success'] = None if record['success'] is None else bool(record['success'])
+            files = conn.execute("SELECT path, generated FROM memory_files WHERE id = ?", (record['id'],))
+            record['files'], record['generated_files'] = [], []
+            for path, generated in files:
+                record['generated_files' if generated else 'files'].append(path)
+        return records
+
+    def count(self) -> int:
+        return self.db.execute("SELECT COUNT(*) FROM memory_records").fetchone()[0]
@@ -0,0 +1,182 @@
+"""
+Retention, compaction and archival for the SuperMini task memory collection.
+Near-duplicate tasks are collapsed, old tasks are compacted to short
+summaries, and records past the age or count caps are evicted. Every raw
+record that is removed or rewritten is first appended to a compressed
+JSONL archive.
+"""
+
+import re
+import gzip
+import json
+import time
+import logging
+import numpy as np
+from dataclasses import dataclass, asdict, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from src.core.document_chunker import HashingEmbedder
+
+_CODE_BLOCK = re.compile(r"```[^\n]*\n(.*?)```", re.DOTALL)
+_DAY = 24 * 3600
+
+
+@dataclass
+class RetentionPolicy:
+    """Limits applied to saved tasks by a retention pass"""
+    max_age_days: float = 180.0  # Tasks older than this are evicted (0 keeps them)
+    max_records: int = 5000  # Only the newest tasks up to this count are kept (0 is unlimited)
+    compact_after_days: float = 30.0  # Older tasks are rewritten as compact summaries (0 never compacts)
+    dedup_threshold: float = 0.97  # Prompt similarity at which older tasks of the same type are dropped (0 disables)
+    summary_chars: int = 400  # Length of the result kept in a compacted task
+
+
+@dataclass
+class RetentionReport:
+    """Outcome of one retention pass"""
+    scanned: int = 0
+    deduplicated: int = 0
+    expired: int = 0
+    over_capacity: int = 0
+    compacted: int = 0
+    archived: int = 0
+    duration: float = 0.0
+    # Ids removed from the collection, so companion indexes can drop them too
+    evicted_ids: List[str] = field(default_factory=list, repr=False)
+
+    @property
+    def evicted(self) -> int:
+        return self.deduplicated + self.expired + self.over_capacity
+
+    def to_dict(self) -> Dict[str, Any]:
+        report = asdict(self)
+        del report['evicted_ids']
+        report['evicted'] = self.evicted
+        return report
+
+
+def summarize_result(text: str, max_chars: int = 400) -> str:
+    """Shorten a task result: code blocks become line counts and the prose is truncated"""
+    def code_marker(match):
+        return f"[code: {match.group(1).count(chr(10))} lines]"
+
+    summary = " ".join(_CODE_BLOCK.sub(code_marker, text or "").split())
+    if len(summary) > max_chars:
+        summary = summary[:max_chars - 3].rstrip() + "..."
+    return summary
+
+
+class MemoryRetention:
+    """Apply a RetentionPolicy to the task records of a ChromaDB collection"""
+
+    def __init__(self, archive_dir: Path, policy: Optional[RetentionPolicy] = None,
+                 task_types: Sequence[str] = (), id_prefix: str = "task_"):
+        self.archive_dir = Path(archive_dir)
+        self.policy = policy or RetentionPolicy()
+        self.task_types = list(task_types)
+        self.id_prefix = id_prefix
+        self.embedder = HashingEmbedder(dimensions=512)
+
+    def archive_path(self, now: Optional[float] = None) -> Path:
+        """Archive file for the month of ``now``"""
+        month = datetime.fromtimestamp(now or time.time()).strftime("%Y-%m")
+        return self.archive_dir / f"task_memory-{month}.jsonl.gz"
+
+    def _archive(self, records: List[Dict[str, Any]], now: float) -> int:
+        if not records:
+            return 0
+        self.archive_dir.mkdir(parents=True, exist_ok=True)
+        with gzip.open(self.archive_path(now), 'at', encoding='utf-8') as archive:
+            for record in records:
+                archive.write(json.dumps({**record, 'archived_at': now}, default=str) + "\n")
+        return len(records)
+
+    def _load(self, collection) -> List[Dict[str, Any]]:
+        where = {"task_type": {"$in": self.task_types}} if self.task_types else None
+        results = collection.get(where=where, include=["documents", "metadatas"])
+        records = []
+        for record_id, document, metadata in zip(results["ids"], results["documents"], results["metadatas"]):
+            if record_id.startswith(self.id_prefix):
+                metadata = metadata or {}
+                records.append({
+                    'id': record_id,
+                    'document': document,
+                    'metadata': metadata,
+                    'timestamp': float(metadata.get('timestamp') or 0.0)
+                })
+        # Newest first, so the record kept from a group of duplicates is the latest
+        records.sort(key=lambda record: record['timestamp'], reverse=True)
+        return records
+
+    def _duplicates(self, records: List[Dict[str, Any]]) -> List[int]:
+        """Indexes of records whose prompt nearly repeats a newer record of the same task type"""
+        if self.policy.dedup_threshold <= 0 or len(records) < 2:
+            return []
+        prompts = [" ".join(str(record['metadata'].get('prompt', '')).lower().split()) for record in records]
+        vectors = self.embedder(prompts)
+        duplicates = []
+        kept_by_type: Dict[str, List[int]] = {}
+        for i, record in enumerate(records):
+            kept = kept_by_type.setdefault(record['metadata'].get('task_type', ''), [])
+            if kept and vectors[i].any():
+                similarity = vectors[kept] @ vectors[i]
+                if float(similarity.max()) >= self.policy.dedup_threshold:
+                    duplicates.append(i)
+                    continue
+            kept.append(i)
+        return duplicates
+
+    def run(self, collection, now: Optional[float] = None) -> RetentionReport:
+        """Run one retention pass over ``collection`` and return what it did"""
+        start = time.time()
+        now = now or start
+        policy = self.policy
+        records = self._load(collection)
+        report = RetentionReport(scanned=len(records))
+
+        evicted: Dict[int, str] = {i: 'duplicate' for i in self._duplicates(records)}
+        report.deduplicated = len(evicted)
+
+        survivors = 0
+        for i, record in enumerate(records):
+            if i in evicted:
+                continue
+            if policy.max_age_days > 0 and now - record['timestamp'] > policy.max_age_days * _DAY:
+                evicted[i] = 'expired'
+                report.expired += 1
+            elif policy.max_records > 0 and survivors >= policy.max_records:
+                evicted[i] = 'over_capacity'
+                report.over_capacity += 1
+            else:
+                survivors += 1
+
+        compacted = [
+            i for i, record in enumerate(records)
+            if i not in evicted and policy.compact_after_days > 0
+            and not record['metadata'].get('compacted')
+            and now - record['timestamp'] > policy.compact_after_days * _DAY
+        ]
+
+        archived = [dict(records[i], reason=reason) for i, reason in evicted.items()]
+        archived += [dict(records[i], reason='compacted') for i in compacted]
+        report.archived = self._archive(archived, now)
+
+        if evicted:
+            report.evicted_ids = [records[i]['id'] for i in evicted]
+            collection.delete(ids=report.evicted_ids)
+        if compacted:
+            documents, metadatas = [], []
+            for i in compacted:
+                metadata = dict(records[i]['metadata'])
+                summary = summarize_result(str(metadata.get('result', '')), policy.summary_chars)
+                metadata.update({'result': summary, 'compacted': True})
+                documents.append(f"Prompt: {metadata.get('prompt', '')}\nType: {metadata.get('task_type', '')}\nResult: {summary}")
+                metadatas.append(metadata)
+            collection.update(ids=[records[i]['id'] for i in compacted], documents=documents, metadatas=metadatas)
+            report.compacted = len(compacted)
+
+        report.duration = time.time() - start
+        logging.info(f"Memory retention: {report.to_dict()}")
+        return report
@@ -0,0 +1,211 @@
+"""
+Portable snapshots of a SuperMini memory collection.
+Documents, metadata and their precomputed embeddings are exported in pages
+to a compressed columnar Parquet file (or gzip JSONL when pyarrow is not
+installed) and streamed back in batches with the stored embeddings, so
+seeding a fresh store never re-runs the embedding model.
+"""
+
+import gzip
+import json
+import time
+import base64
+import logging
+import numpy as np
+from dataclasses import dataclass, asdict
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+    PYARROW_AVAILABLE = True
+except ImportError:
+    pa = None
+    pq = None
+    PYARROW_AVAILABLE = False
+
+SNAPSHOT_FORMAT = "supermini-memory"
+SNAPSHOT_VERSION = 1
+
+
+@dataclass
+class SnapshotBatch:
+    """One page of records; ``embeddings`` is None when any record lacks one"""
+    ids: List[str]
+    documents: List[str]
+    metadatas: List[Dict[str, Any]]
+    embeddings: Optional[np.ndarray]
+
+
+@dataclass
+class SnapshotStats:
+    """Outcome of an export or import"""
+    format: str
+    records: int = 0
+    bytes: int = 0
+    duration: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+def default_snapshot_suffix() -> str:
+    return ".parquet" if PYARROW_AVAILABLE else ".jsonl.gz"
+
+
+def snapshot_format(path: Path) -> str:
+    name = Path(path).name.lower()
+    if name.endswith(".parquet"):
+        if not PYARROW_AVAILABLE:
+            raise ImportError("pyarrow is required for Parquet memory snapshots; use a .jsonl.gz file instead")
+        return "parquet"
+    if name.endswith(".jsonl.gz"):
+        return "jsonl"
+    raise ValueError(f"Unsupported memory snapshot file: {path} (expected .parquet or .jsonl.gz)")
+
+
+def _embedding_matrix(embeddings) -> Optional[np.ndarray]:
+    if embeddings is None or any(embedding is None or len(embedding) == 0 for embedding in embeddings):
+        return None
+    return np.asarray(embeddings, dtype=np.float32)
+
+
+def read_collection(collection, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+    """Page through every record of a ChromaDB collection with its embedding"""
+    offset = 0
+    while True:
+        page = collection.get(include=["documents", "metadatas", "embeddings"], limit=batch_size, offset=offset)
+        ids = list(page["ids"])
+        if not ids:
+            return
+        yield SnapshotBatch(ids, list(page["documents"]), [dict(m or {}) for m in page["metadatas"]],
+                            _embedding_matrix(page.get("embeddings")))
+        if len(ids) < batch_size:
+            return
+        offset += len(ids)
+
+
+class _ParquetWriter:
+    def __init__(self, path: Path):
+        self.path = path
+        self.writer = None
+
+    def write(self, batch: SnapshotBatch):
+        embeddings = batch.embeddings if batch.embeddings is not None else [None] * len(batch.ids)
+        table = pa.table({
+            'id': pa.array(batch.ids, pa.string()),
+            'document': pa.array(batch.documents, pa.string()),
+            'metadata': pa.array([json.dumps(m) for m in batch.metadatas], pa.string()),
+            'embedding': pa.array([None if e is None else list(e) for e in embeddings], pa.list_(pa.float32())),
+        })
+        if self.writer is None:
+            schema = table.schema.with_metadata({'format': SNAPSHOT_FORMAT, 'version': str(SNAPSHOT_VERSION)})
+            self.writer = pq.ParquetWriter(str(self.path), schema, compression='zstd')
+        self.writer.write_table(table.replace_schema_metadata(self.writer.schema.metadata))
+
+    def close(self):
+        if self.writer is None:
+            self.write(SnapshotBatch([], [], [], None))
+        self.writer.close()
+
+
+class _JsonlWriter:
+    def __init__(self, path: Path):
+        self.file = gzip.open(path, 'wt', encoding='utf-8')
+        self.file.write(json.dumps({'format': SNAPSHOT_FORMAT, 'version': SNAPSHOT_VERSION}) + "\n")
+
+    def write(self, batch: SnapshotBatch):
+        for i, record_id in enumerate(batch.ids):
+            embedding = None
+            if batch.embeddings is not None:
+                embedding = base64.b64encode(batch.embeddings[i].astype(np.float32).tobytes()).decode('ascii')
+            self.file.write(json.dumps({'id': record_id, 'document': batch.documents[i],
+                                        'metadata': batch.metadatas[i], 'embedding': embedding}) + "\n")
+
+    def close(self):
+        self.file.close()
+
+
+def export_snapshot(collection, path: Path, batch_size: int = 1000) -> SnapshotStats:
+    """Write every record of ``collection`` to a snapshot file"""
+    start = time.time()
+    path = Path(path)
+    fmt = snapshot_format(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    stats = SnapshotStats(format=fmt)
+    writer = _ParquetWriter(path) if fmt == "parquet" else _JsonlWriter(path)
+    try:
+        for batch in read_collection(collection, batch_size):
+            writer.write(batch)
+            stats.records += len(batch.ids)
+    finally:
+        writer.close()
+    stats.bytes = path.stat().st_size
+    stats.duration = time.time() - start
+    logging.info(f"Exported memory snapshot {path}: {stats.to_dict()}")
+    return stats
+
+
+def _read_parquet(path: Path, batch_size: int) -> Iterator[SnapshotBatch]:
+    parquet = pq.ParquetFile(str(path))
+    for record_batch in parquet.iter_batches(batch_size=batch_size):
+        columns = record_batch.to_pydict()
+        yield SnapshotBatch(columns['id'], columns['document'], [json.loads(m) for m in columns['metadata']],
+                            _embedding_matrix(columns['embedding']))
+
+
+def _read_jsonl(path: Path, batch_size: int) -> Iterator[SnapshotBatch]:
+    with gzip.open(path, 'rt', encoding='utf-8') as f:
+        header = json.loads(f.readline() or "{}")
+        if header.get('format') != SNAPSHOT_FORMAT:
+            raise ValueError(f"{path} is not a memory snapshot")
+        records = []
+        for line in f:
+            records.append(json.loads(line))
+            if len(records) >= batch_size:
+                yield _jsonl_batch(records)
+                records = []
+        if records:
+            yield _jsonl_batch(records)
+
+
+def _jsonl_batch(records: List[Dict[str, Any]]) -> SnapshotBatch:
+    embeddings = [np.frombuffer(base64.b64decode(r['embedding']), dtype=np.float32) if r['embedding'] else None
+                  for r in records]
+    return SnapshotBatch([r['id'] for r in records], [r['document'] for r in records],
+                         [r['metadata'] for r in records], _embedding_matrix(embeddings))
+
+
+def iter_snapshot(path: Path, batch_size: int = 1000) -> Iterator[SnapshotBatch]:
+    """Stream the records of a snapshot file in batches"""
+    path = Path(path)
+    if snapshot_format(path) == "parquet":
+        return _read_parquet(path, batch_size)
+    return _read_jsonl(path, batch_size)
+
+
+def import_snapshot(collection, path: Path, batch_size: int = 1000,
+                    on_batch: Optional[Callable[[SnapshotBatch], None]] = None) -> SnapshotStats:
+    """Upsert a snapshot into ``collection`` using its stored embeddings
+
+    Records keep their ids, so importing the same snapshot twice is harmless.
+    Batches with a record that has no stored embedding are embedded by the
+    collection as usual.
+    """
+    start = time.time()
+    path = Path(path)
+    stats = SnapshotStats(format=snapshot_format(path), bytes=path.stat().st_size)
+    for batch in iter_snapshot(path, batch_size):
+        if not batch.ids:
+            continue
+        kwargs = {'ids': batch.ids, 'documents': batch.documents, 'metadatas': batch.metadatas}
+        if batch.embeddings is not None:
+            kwargs['embeddings'] = batch.embeddings.tolist()
+        collection.upsert(**kwargs)
+        if on_batch:
+            on_batch(batch)
+        stats.records += len(batch.ids)
+    stats.duration = time.time() - start
+    logging.info(f"Imported memory snapshot {path}: {stats.to_dict()}")
+    return stats
@@ -0,0 +1,260 @@
+"""
+Shared helpers for the project's SQLite databases.
+SQLiteDatabase gives each thread one long-lived connection in WAL mode and
+batches writes into explicit transactions. Schemas evolve through numbered
+migrations recorded in ``PRAGMA user_version``, so each database is brought up
+to date exactly once, and ``query_plan`` exposes EXPLAIN QUERY PLAN output for
+checking that lookups hit an index.
+"""
+
+import os
+import sqlite3
+import logging
+import threading
+import weakref
+from contextlib import contextmanager
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, Iterable, Iterator, List, Sequence, Union
+
+
+@dataclass(frozen=True)
+class Migration:
+    """One schema step
+
+    ``apply`` is SQL text, possibly several statements, or a callable taking
+    the connection. Callables must use ``execute`` rather than ``executescript``,
+    which would commit the migration's transaction early.
+    """
+    version: int
+    description: str
+    apply: Union[str, Callable[[sqlite3.Connection], None]]
+
+
+def schema_version(conn: sqlite3.Connection) -> int:
+    return conn.execute("PRAGMA user_version").fetchone()[0]
+
+
+def table_columns(conn: sqlite3.Connection, table: str) -> List[str]:
+    return [row[1] for row in conn.execute(f"PRAGMA table_info({table})")]
+
+
+def migrate(conn: sqlite3.Connection, migrations: Sequence[Migration]) -> List[int]:
+    """Apply the migrations newer than the database's version, in order
+
+    Each migration runs in its own transaction together with the version bump,
+    so a failed step leaves the database at the previous version. Returns the
+    versions that were applied.
+    """
+    versions = [migration.version for migration in migrations]
+    if versions != sorted(set(versions)) or (versions and versions[0] < 1):
+        raise ValueError(f"Migration versions must be unique, ascending and positive: {versions}")
+
+    applied = []
+    current = schema_version(conn)
+    for migration in migrations:
+        if migration.version <= current:
+            continue
+        # Manage the transaction by hand so schema changes, data and the version bump commit together
+        previous_isolation = conn.isolation_level
+        conn.isolation_level = None
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            if schema_version(conn) >= migration.version:
+                # Another connection migrated while we waited for the write lock
+                conn.execute("COMMIT")
+                current = schema_version(conn)
+                continue
+            if callable(migration.apply):
+                migration.apply(conn)
+            else:
+                for statement in _split_statements(migration.apply):
+                    conn.execute(statement)
+            conn.execute(f"PRAGMA user_version = {int(migration.version)}")
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        finally:
+            conn.isolation_level = previous_isolation
+        logging.info(f"Applied schema migration {migration.version}: {migration.description}")
+        applied.append(migration.version)
+        current = migration.version
+    return applied
+
+
+def _split_statements(script: str) -> List[str]:
+    # A ';' only ends a statement when sqlite agrees it does (not inside quotes or triggers)
+    statements, pending = [], ""
+    for piece in script.split(";"):
+        pending += piece + ";"
+        if sqlite3.complete_statement(pending):
+            if pending.strip(" \t\n;"):
+                statements.append(pending.strip())
+            pending = ""
+    return statements
+
+
+def query_plan(conn: sqlite3.Connection, sql: str, params: Sequence = ()) -> List[str]:
+    """The ``detail`` lines of EXPLAIN QUERY PLAN, e.g. ``SEARCH t USING INDEX ...``"""
+    return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {sql}", tuple(params))]
+
+
+class SQLiteDatabase:
+    """Per-thread pooled connections to one SQLite file
+
+    Each thread opens its connection once and keeps it, so a lookup costs a
+    query rather than a connect plus schema load. Connections use WAL
+    journaling, where readers never wait for the writer, with
+    ``synchronous=NORMAL`` so commits are not fsynced individually (the log is
+    synced at checkpoints; a power cut can lose the last commits but never
+    corrupts the file) and a larger page cache.
+
+    Statements run outside ``transaction()`` commit on their own. Writes that
+    belong together go in a ``transaction()`` block, which takes the write
+    lock up front; nested blocks join the outermost one, so callers can batch
+    many small writes into a single commit.
+    """
+
+    def __init__(self, path: Union[str, Path], migrations: Sequence[Migration] = (),
+                 synchronous: str = "NORMAL", cache_size_kib: int = 8192, busy_timeout: float = 30.0):
+        self.path = str(path)
+        self.synchronous = synchronous
+        self.cache_size_kib = cache_size_kib
+        self.busy_timeout = busy_timeout
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._generation = 0
+        self._pid = os.getpid()
+        # Open connections by pool key; each is closed when its thread's locals
+        # are dropped, on close(), or when the database object is collected
+        self._connections: Dict[int, sqlite3.Connection] = {}
+        self._next_key = 0
+        weakref.finalize(self, _close_connections, self._connections, self._pid)
+        if migrations:
+            migrate(self.connection(), migrations)
+
+    def _open(self) -> sqlite3.Connection:
+        # Autocommit mode: transactions are only opened by transaction(), so
+        # idle connections never pin an old WAL snapshot. The pool hands each
+        # connection to one thread; check_same_thread is off so close() can
+        # run from anywhere.
+        conn = sqlite3.connect(self.path, timeout=self.busy_timeout, isolation_level=None,
+                               check_same_thread=False)
+        mode = conn.execute("PRAGMA journal_mode=WAL").fetchone()[0]
+        if mode.lower() != "wal":
+            logging.debug(f"{self.path} stays in {mode} journal mode")
+        conn.execute(f"PRAGMA synchronous={self.synchronous}")
+        conn.execute(f"PRAGMA cache_size={-int(self.cache_size_kib)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def connection(self) -> sqlite3.Connection:
+        """The calling thread's connection, opened on first use"""
+        if self._pid != os.getpid():
+            # Connections must not cross a fork; the child starts its own pool
+            self._pid = os.getpid()
+            self._local = threading.local()
+            self._connections.clear()
+        local = self._local
+        if getattr(local, 'generation', None) == self._generation:
+            return local.conn
+        conn = self._open()
+        previous = getattr(local, 'release', None)
+        if previous is not None:
+            # Connection from before close(); already closed unless it raced with it
+            previous()
+        with self._lock:
+            key = self._next_key
+            self._next_key += 1
+            self._connections[key] = conn
+            generation = self._generation
+        # The sentinel lives only in this thread's locals, so it is dropped when
+        # the thread ends (QThreads included) and the connection is closed with it
+        local.owner = _ConnectionOwner()
+        local.release = weakref.finalize(local.owner, _release_connection, self._connections, self._lock,
+                                         key, self._pid)
+        local.conn, local.generation, local.depth = conn, generation, 0
+        return conn
+
+    def transaction(self) -> ContextManager[sqlite3.Connection]:
+        """Run the block in one write transaction, committed on success
+
+        Nested blocks share the outermost transaction; an exception that
+        escapes any of them rolls back the whole batch.
+        """
+        return self._transaction("BEGIN IMMEDIATE")
+
+    def snapshot(self) -> ContextManager[sqlite3.Connection]:
+        """Run several reads against one consistent view, without blocking writers
+
+        Inside a ``transaction()`` this simply joins it. Do not open a write
+        transaction inside a snapshot; it would join the read-only one.
+        """
+        return self._transaction("BEGIN")
+
+    @contextmanager
+    def _transaction(self, begin: str) -> Iterator[sqlite3.Connection]:
+        conn = self.connection()
+        local = self._local
+        if local.depth:
+            local.depth += 1
+            try:
+                yield conn
+            finally:
+                local.depth -= 1
+            return
+        conn.execute(begin)
+        local.depth = 1
+        try:
+            yield conn
+        except BaseException:
+            if conn.in_transaction:
+                conn.execute("ROLLBACK")
+            raise
+        else:
+            conn.execute("COMMIT")
+        finally:
+            local.depth = 0
+
+    def execute(self, sql: str, params: Sequence = ()) -> sqlite3.Cursor:
+        """Run one statement on this thread's connection"""
+        return self.connection().execute(sql, params)
+
+    def executemany(self, sql: str, rows: Iterable[Sequence]) -> int:
+        """Run ``sql`` for every row in a single transaction; returns the rowcount"""
+        with self.transaction() as conn:
+            return conn.executemany(sql, rows).rowcount
+
+    def close(self):
+        """Close every pooled connection; threads reconnect on their next call"""
+        with self._lock:
+            self._generation += 1
+            _close_connections(self._connections, self._pid)
+
+
+class _ConnectionOwner:
+    """Per-thread sentinel whose collection releases the thread's pooled connection"""
+    __slots__ = ('__weakref__',)
+
+
+def _release_connection(connections: Dict[int, sqlite3.Connection], lock: threading.Lock, key: int, pid: int):
+    with lock:
+        conn = connections.pop(key, None)
+    if conn is not None and os.getpid() == pid:
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+
+
+def _close_connections(connections: Dict[int, sqlite3.Connection], pid: int):
+    if os.getpid() != pid:
+        # Inherited through a fork; they belong to the parent
+        return
+    for conn in connections.values():
+        try:
+            conn.close()
+        except sqlite3.Error:
+            pass
+    connections.clear()
@@ -0,0 +1,196 @@
+"""
+Local task classifier for SuperMini.
+Chooses a task type from the prompt text in milliseconds so the model round
+trip is only needed for prompts the classifier is unsure about.
+"""
+
+import re
+import math
+import time
+from collections import Counter, defaultdict
+from threading import Lock
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+# Labeled prompts the classifier starts from before any task history exists
+SEED_EXAMPLES = {
+    'code': [
+        "Write a Python function that reverses a linked list",
+        "Create a REST API endpoint in Flask",
+        "Fix the bug in this JavaScript code",
+        "Refactor this class to use dependency injection",
+        "Implement a binary search algorithm",
+        "Write unit tests for the parser module",
+        "Build a command line tool in Go",
+        "Debug why this script throws a TypeError",
+        "Generate a React component for a login form",
+        "Write a SQL query to join orders and customers",
+    ],
+    'multimedia': [
+        "Generate an image of a sunset over mountains",
+        "Resize these photos to 800x600",
+        "Convert this video to mp4 format",
+        "Create a logo for my coffee shop",
+        "Extract audio from the video file",
+        "Apply a blur filter to the picture",
+        "Make a thumbnail from the first frame of the clip",
+        "Describe what is shown in this image",
+        "Generate speech audio from this text",
+        "Edit the brightness and contrast of the photo",
+    ],
+    'rag': [
+        "Summarize this document",
+        "What does the attached PDF say about pricing",
+        "Answer questions about the contract terms",
+        "Find the key points in these meeting notes",
+        "Explain the main argument of this research paper",
+        "Search the documentation for installation steps",
+        "Give me a summary of the report chapters",
+        "What are the conclusions of this article",
+        "Extract the action items from the transcript",
+        "Compare the two documents and list the differences",
+    ],
+    'automation': [
+        "Rename all files in this folder by date",
+        "Schedule a daily backup of my documents",
+        "Organize my downloads folder by file type",
+        "Automate sending a weekly email report",
+        "Set up a cron job to clean temp files",
+        "Move old log files to an archive directory",
+        "Monitor a folder and copy new files to the server",
+        "Batch convert filenames to lowercase",
+        "Create a workflow that runs every morning",
+        "Delete duplicate files in the directory",
+    ],
+    'analytics': [
+        "Analyze this CSV file and show statistics",
+        "Create a bar chart of monthly sales",
+        "Calculate the correlation between these columns",
+        "Plot a histogram of the data distribution",
+        "Find trends in the quarterly revenue data",
+        "Compute the mean and standard deviation",
+        "Visualize the dataset with a scatter plot",
+        "Run a regression on the housing prices data",
+        "Identify outliers in the sensor readings",
+        "Build a dashboard of customer metrics",
+    ],
+}
+
+_TOKEN_PATTERN = re.compile(r"[a-z0-9_+#.]+")
+
+
+def tokenize(text: str) -> List[str]:
+    """Split text into lowercase word unigrams and bigrams"""
+    words = [word.strip('.') for word in _TOKEN_PATTERN.findall(text.lower())]
+    words = [word for word in words if word]
+    return words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+
+
+class LocalTaskClassifier:
+    """Multinomial naive Bayes task classifier over prompt n-grams
+
+    Scoring is a linear model over token counts, so prediction is a dictionary
+    lookup per token. It starts from ``SEED_EXAMPLES`` and learns from the
+    prompts of completed tasks, either in bulk via ``fit`` or one at a time
+    via ``learn``.
+    """
+
+    def __init__(self, task_types: Iterable[str], alpha: float = 1.0, use_seed_examples: bool = True):
+        self.task_types = list(task_types)
+        self.alpha = alpha
+        self.lock = Lock()
+        self.token_counts = {task_type: Counter() for task_type in self.task_types}
+        self.token_totals = {task_type: 0 for task_type in self.task_types}
+        self.doc_counts = {task_type: 0 for task_type in self.task_types}
+        self.vocabulary = set()
+        if use_seed_examples:
+            self.fit((prompt, task_type)
+                     for task_type, prompts in SEED_EXAMPLES.items() if task_type in self.token_counts
+                     for prompt in prompts)
+
+    @property
+    def trained_examples(self) -> int:
+        return sum(self.doc_counts.values())
+
+    def learn(self, prompt: str, task_type: str):
+        """Add one labeled prompt to the model"""
+        if task_type not in self.token_counts:
+            return
+        tokens = tokenize(prompt)
+        with self.lock:
+            self.token_counts[task_type].update(tokens)
+            self.token_totals[task_type] += len(tokens)
+            self.doc_counts[task_type] += 1
+            self.vocabulary.update(tokens)
+
+    def fit(self, examples: Iterable[Tuple[str, str]]) -> int:
+        """Add labeled (prompt, task_type) pairs and return how many were used"""
+        used = 0
+        for prompt, task_type in examples:
+            if prompt and task_type in self.token_counts:
+                self.learn(prompt, task_type)
+                used += 1
+        return used
+
+    def predict_proba(self, prompt: str) -> Dict[str, float]:
+        """Get the posterior probability of each task type"""
+        tokens = [token for token in tokenize(prompt) if token in self.vocabulary]
+        with self.lock:
+            total_docs = self.trained_examples
+            vocabulary_size = max(len(self.vocabulary), 1)
+            scores = {}
+            for task_type in self.task_types:
+                prior = (self.doc_counts[task_type] + 1) / (total_docs + len(self.task_types))
+                denominator = self.token_totals[task_type] + self.alpha * vocabulary_size
+                counts = self.token_counts[task_type]
+                scores[task_type] = math.log(prior) + sum(
+                    math.log((counts[token] + self.alpha) / denominator) for token in tokens
+                )
+
+        best = max(scores.values())
+        weights = {task_type: math.exp(score - best) for task_type, score in scores.items()}
+        total = sum(weights.values())
+        return {task_type: weight / total for task_type, weight in weights.items()}
+
+    def predict(self, prompt: str) -> Tuple[str, float]:
+        """Get the most likely task type and its probability
+
+        Prompts with no known tokens get a confidence of 0 so callers fall
+        back to the model.
+        """
+        if not any(token in self.vocabulary for token in tokenize(prompt)):
+            return self.task_types[0], 0.0
+        probabilities = self.predict_proba(prompt)
+        task_type = max(probabilities, key=probabilities.get)
+        return task_type, probabilities[task_type]
+
+
+def benchmark_classifiers(labeled: List[Tuple[str, str]],
+                          classifiers: Dict[str, Callable[[str], Tuple[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Compare accuracy and per-prompt latency of task classifiers
+
+    ``classifiers`` maps a name to a callable returning (task_type, confidence),
+    e.g. ``LocalTaskClassifier.predict`` and ``TaskProcessor.classify_task``.
+    """
+    report = {}
+    for name, classify in classifiers.items():
+        latencies = []
+        correct = 0
+        per_type = defaultdict(lambda: [0, 0])
+        for prompt, expected in labeled:
+            start_time = time.perf_counter()
+            predicted, _ = classify(prompt)
+            latencies.append(time.perf_counter() - start_time)
+            per_type[expected][1] += 1
+            if predicted == expected:
+                correct += 1
+                per_type[expected][0] += 1
+        latencies.sort()
+        count = max(len(labeled), 1)
+        report[name] = {
+            'accuracy': correct / count,
+            'mean_latency_ms': sum(latencies) / count * 1000,
+            'p95_latency_ms': latencies[min(len(latencies) - 1, int(0.95 * len(latencies)))] * 1000 if latencies else 0.0,
+            'per_type_accuracy': {task_type: hits / total for task_type, (hits, total) in per_type.items()}
+        }
+    return report
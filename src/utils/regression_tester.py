@@ -20,6 +20,8 @@ import traceback
 import pickle
 import ast
 
+from ..core.ast_pipeline import AnalysisPass, parse_source
+
 @dataclass
 class TestCase:
     """Individual test case definition"""
@@ -57,6 +59,20 @@ class RegressionSuite:
     created_at: float
     last_run: Optional[float] = None
 
+class DefinitionCollector(AnalysisPass):
+    """Public functions and all classes of a module, in source order"""
+    
+    def __init__(self):
+        self.functions = []
+        self.classes = []
+        
+    def visit_FunctionDef(self, node):
+        if not node.name.startswith('_'):  # Skip private functions
+            self.functions.append(node)
+            
+    def visit_ClassDef(self, node):
+        self.classes.append(node)
+
 class TestGenerator:
     """Automatically generates test cases from code analysis"""
     
@@ -70,25 +86,20 @@ class TestGenerator:
         logging.info(f"Generating tests for {file_path}")
         
         try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-                
-            tree = ast.parse(content)
+            source = parse_source(file_path)
+            definitions = DefinitionCollector().visit(source.tree)
             test_cases = []
             
             # Generate tests for functions
-            for node in ast.walk(tree):
-                if isinstance(node, ast.FunctionDef):
-                    if not node.name.startswith('_'):  # Skip private functions
-                        test_case = self._generate_function_test(file_path, node)
-                        if test_case:
-                            test_cases.append(test_case)
-                            
+            for node in definitions.functions:
+                test_case = self._generate_function_test(file_path, node)
+                if test_case:
+                    test_cases.append(test_case)
+                    
             # Generate tests for classes
-            for node in ast.walk(tree):
-                if isinstance(node, ast.ClassDef):
-                    class_tests = self._generate_class_tests(file_path, node)
-                    test_cases.extend(class_tests)
+            for node in definitions.classes:
+                class_tests = self._generate_class_tests(file_path, node)
+                test_cases.extend(class_tests)
                     
             logging.info(f"Generated {len(test_cases)} test cases for {file_path}")
             return test_cases
@@ -17,16 +17,36 @@ import shutil
 import base64
 import random
 import math
+import threading
+import queue
+import copy
+import itertools
+import argparse
+import hashlib
+import sqlite3
+import atexit
+import ast
+from collections import OrderedDict, deque
 from pathlib import Path
+from urllib.parse import urlparse
 
 # Disable HuggingFace tokenizers parallelism warning early
 os.environ["TOKENIZERS_PARALLELISM"] = "false"
-from typing import List, Dict, Tuple, Optional, Any
-from dataclasses import dataclass
+from typing import List, Dict, Tuple, Optional, Any, Callable, Iterator
+from dataclasses import dataclass, replace
+from concurrent.futures import Future, as_completed
 from datetime import datetime
 
 # Import task intelligence for autonomous decision-making
 from src.core.task_intelligence import TaskIntelligence, ResponseAnalyzer
+from src.core.task_classifier import LocalTaskClassifier
+from src.core.document_chunker import ChunkSelector, DocumentChunkIndex, HashingEmbedder, select_document_chunks
+from src.core.csv_profiler import CsvProfileCache, profile_csv
+from src.core.memory_backend import get_client, initialize_in_background
+from src.core.memory_retention import MemoryRetention, RetentionPolicy, RetentionReport
+from src.core.memory_index import MemoryFilter, MemoryMetadataIndex, infer_language, reciprocal_rank_fusion
+from src.core.memory_snapshot import SnapshotBatch, SnapshotStats, default_snapshot_suffix, export_snapshot, import_snapshot
+from src.core.sqlite_db import SQLiteDatabase
 
 # Third-party imports
 try:
@@ -69,10 +89,10 @@ try:
         QHBoxLayout, QGridLayout, QWidget, QLabel, QFileDialog, QMessageBox, QCheckBox,
         QProgressBar, QDialog, QTextBrowser, QFormLayout, QComboBox, QTextEdit,
         QSplitter, QTabWidget, QSlider, QSpinBox, QGroupBox, QScrollArea, QSizePolicy,
-        QTreeWidget, QTreeWidgetItem, QFrame, QStackedWidget
+        QTreeWidget, QTreeWidgetItem, QFrame, QStackedWidget, QProgressDialog
     )
     from PyQt6.QtCore import QThread, pyqtSignal, Qt, QTimer, QSettings, QPropertyAnimation, QEasingCurve, QPointF
-    from PyQt6.QtGui import QPixmap, QFont, QIcon, QPainter, QPen, QBrush, QLinearGradient, QRadialGradient, QColor
+    from PyQt6.QtGui import QPixmap, QFont, QIcon, QPainter, QPen, QBrush, QLinearGradient, QRadialGradient, QColor, QTextCursor
 except ImportError:
     print("Error: 'PyQt6' is required. Install it with 'pip install PyQt6'")
     sys.exit(1)
@@ -2268,32 +2288,492 @@ class AIConfig:
     ollama_model: str = "qwen2.5-coder:7b"
     max_tokens: int = 4096
     temperature: float = 0.7
+    stream_responses: bool = True  # Stream tokens to the UI as they are generated
+    hedge_requests: bool = False  # Race the backup model when the primary is slow
+    hedge_percentile: float = 0.95  # Primary latency percentile after which the backup is fired
+    hedge_default_delay: float = 10.0  # Seconds to wait before hedging until latencies are learned
+    response_cache: bool = True  # Reuse responses to repeated prompts from the on-disk cache
+    response_cache_ttl: float = 7 * 24 * 3600  # Seconds a cached response stays valid
+    response_cache_max_entries: int = 5000  # Least recently used entries are evicted past this
+    response_cache_max_temperature: float = 0.4  # Hotter (non-deterministic) queries bypass the cache
+    local_classifier: bool = True  # Classify tasks locally before asking the model
+    local_classifier_threshold: float = 0.7  # Below this confidence the model classifies instead
+    rag_token_budget: int = 6000  # Tokens of document chunks included in a RAG prompt
+    rag_chunk_chars: int = 2000  # Target size of a document chunk
+    rag_top_k: int = 24  # Best-matching chunks kept as candidates while streaming documents
+    max_concurrent_tasks: int = 3  # Worker threads in the task execution engine
+    claude_concurrency: int = 4  # Simultaneous Claude requests, to stay under API rate limits
+    ollama_concurrency: int = 1  # Simultaneous Ollama requests; one local GPU/CPU serves them serially
+    csv_profile_chunk_rows: int = 100_000  # Rows read at a time when profiling CSV files
+    csv_profile_max_rows: int = 0  # Stop profiling a CSV after this many rows (0 reads the whole file)
+    memory_write_batch_size: int = 32  # Buffered memory records written to ChromaDB in one batch
+    memory_flush_interval: float = 1.0  # Seconds a buffered memory record may wait before being written
+    retrieval_cache_size: int = 256  # Memory retrieval results kept in the in-process LRU cache
+    retrieval_similarity_threshold: float = 0.95  # Reuse results for prompts at least this similar (0 disables)
+    retrieval_vector_weight: float = 1.0  # Weight of semantic (ChromaDB) hits in reciprocal-rank fusion
+    retrieval_lexical_weight: float = 1.0  # Weight of BM25 keyword hits in reciprocal-rank fusion (0 disables)
+    memory_retention: bool = True  # Periodically deduplicate, compact and evict saved tasks
+    memory_max_age_days: float = 180.0  # Saved tasks older than this are archived and removed (0 keeps them)
+    memory_max_records: int = 5000  # Newest saved tasks kept in memory (0 is unlimited)
+    memory_compact_after_days: float = 30.0  # Saved tasks older than this keep only a short result summary
+    memory_retention_interval: float = 24 * 3600  # Seconds between retention passes
 
 class SafeRequests:
-    """Safe wrapper for requests with proper error handling"""
-    @staticmethod
-    def post(url: str, **kwargs) -> Optional[requests.Response]:
+    """Safe wrapper for requests with proper error handling
+    
+    All calls share one pooled HTTP adapter so connections to the same host
+    (typically the local Ollama server) are kept alive and reused. Each thread
+    gets its own ``requests.Session`` mounted on that adapter, since sessions
+    themselves are not safe to share across threads.
+    """
+    # (connect, read) timeouts per endpoint path; streaming reads are per chunk
+    ENDPOINT_TIMEOUTS = {
+        '/api/tags': (3, 10),
+        '/api/generate': (5, 120),
+        '/api/chat': (5, 120),
+        '/api/pull': (5, 600),
+    }
+    DEFAULT_TIMEOUTS = {'GET': (5, 10), 'POST': (5, 30)}
+    POOL_CONNECTIONS = 4   # Distinct hosts kept in the pool
+    POOL_MAXSIZE = 16      # Keep-alive connections per host
+    
+    _adapter = None
+    _adapter_lock = threading.Lock()
+    _local = threading.local()
+    _request_counts = {'requests': 0, 'errors': 0}
+    _counts_lock = threading.Lock()
+    
+    @classmethod
+    def _get_session(cls) -> requests.Session:
+        session = getattr(cls._local, 'session', None)
+        if session is None:
+            with cls._adapter_lock:
+                if cls._adapter is None:
+                    cls._adapter = requests.adapters.HTTPAdapter(
+                        pool_connections=cls.POOL_CONNECTIONS,
+                        pool_maxsize=cls.POOL_MAXSIZE,
+                        pool_block=False
+                    )
+            session = requests.Session()
+            session.mount('http://', cls._adapter)
+            session.mount('https://', cls._adapter)
+            cls._local.session = session
+        return session
+    
+    @classmethod
+    def timeout_for(cls, url: str, method: str) -> Tuple[float, float]:
+        """Get the (connect, read) timeout for an endpoint"""
+        path = urlparse(url).path.rstrip('/')
+        return cls.ENDPOINT_TIMEOUTS.get(path, cls.DEFAULT_TIMEOUTS[method])
+    
+    @classmethod
+    def request(cls, method: str, url: str, **kwargs) -> Optional[requests.Response]:
+        kwargs.setdefault('timeout', cls.timeout_for(url, method))
+        with cls._counts_lock:
+            cls._request_counts['requests'] += 1
         try:
-            return requests.post(url, timeout=30, **kwargs)
+            return cls._get_session().request(method, url, **kwargs)
         except requests.RequestException as e:
-            logging.error(f"POST request to {url} failed: {e}")
+            with cls._counts_lock:
+                cls._request_counts['errors'] += 1
+            logging.error(f"{method} request to {url} failed: {e}")
             return None
     
-    @staticmethod
-    def get(url: str, **kwargs) -> Optional[requests.Response]:
-        try:
-            return requests.get(url, timeout=10, **kwargs)
-        except requests.RequestException as e:
-            logging.error(f"GET request to {url} failed: {e}")
+    @classmethod
+    def post(cls, url: str, **kwargs) -> Optional[requests.Response]:
+        return cls.request('POST', url, **kwargs)
+    
+    @classmethod
+    def get(cls, url: str, **kwargs) -> Optional[requests.Response]:
+        return cls.request('GET', url, **kwargs)
+    
+    @classmethod
+    def get_connection_stats(cls) -> Dict[str, Any]:
+        """Report how many requests were served over reused keep-alive connections"""
+        opened = 0
+        served = 0
+        if cls._adapter is not None:
+            pools = cls._adapter.poolmanager.pools
+            for key in list(pools.keys()):
+                pool = pools.get(key)
+                if pool is not None:
+                    opened += pool.num_connections
+                    served += pool.num_requests
+        reused = max(0, served - opened)
+        return {
+            'http_requests': cls._request_counts['requests'],
+            'http_errors': cls._request_counts['errors'],
+            'http_connections_opened': opened,
+            'http_connections_reused': reused,
+            'http_reuse_rate': reused / served if served else 0.0
+        }
+
+class ResponseCache:
+    """SQLite-backed cache of model responses
+    
+    Entries are keyed on a hash of model, system prompt, temperature and
+    prompt, expire after ``ttl`` seconds and are evicted least recently used
+    first once more than ``max_entries`` are stored.
+    """
+    def __init__(self, db_path: Path, ttl: float, max_entries: int, max_temperature: float):
+        self.db_path = db_path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_temperature = max_temperature
+        self.lock = threading.Lock()  # Guards stats
+        self.stats = {'hits': 0, 'misses': 0, 'evictions': 0}
+        self._init_database()
+    
+    def _init_database(self):
+        """Initialize SQLite database for cached responses"""
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.db = SQLiteDatabase(self.db_path)
+        with self.db.transaction() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS response_cache (
+                    cache_key TEXT PRIMARY KEY,
+                    model TEXT NOT NULL,
+                    response TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    hit_count INTEGER DEFAULT 0
+                )
+            """)
+            conn.execute("CREATE INDEX IF NOT EXISTS idx_response_cache_last_access ON response_cache(last_access)")
+    
+    def key_for(self, model: str, system_prompt: str, temperature: float, prompt: str,
+                force: bool = False) -> Optional[str]:
+        """Get the cache key for a query, or None if the query bypasses the cache
+        
+        Queries above ``max_temperature`` are treated as non-deterministic and
+        are not cached unless ``force`` is set by a caller whose prompt has a
+        single right answer (e.g. task classification).
+        """
+        if temperature > self.max_temperature and not force:
             return None
+        payload = json.dumps([model, system_prompt, round(temperature, 4), prompt])
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def get(self, cache_key: str) -> Optional[str]:
+        """Get a fresh cached response and mark it as recently used"""
+        now = time.time()
+        row = self.db.execute(
+            "SELECT response FROM response_cache WHERE cache_key = ? AND ? - created < ?",
+            (cache_key, now, self.ttl)
+        ).fetchone()
+        if row is not None:
+            self.db.execute(
+                "UPDATE response_cache SET last_access = ?, hit_count = hit_count + 1 WHERE cache_key = ?",
+                (now, cache_key)
+            )
+        with self.lock:
+            self.stats['misses' if row is None else 'hits'] += 1
+        return None if row is None else row[0]
+    
+    def put(self, cache_key: str, model: str, response: str):
+        """Store a response, then drop expired and least recently used entries"""
+        now = time.time()
+        with self.db.transaction() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO response_cache (cache_key, model, response, created, last_access) VALUES (?, ?, ?, ?, ?)",
+                (cache_key, model, response, now, now)
+            )
+            evicted = conn.execute("DELETE FROM response_cache WHERE ? - created >= ?", (now, self.ttl)).rowcount
+            count = conn.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+            if count > self.max_entries:
+                evicted += conn.execute(
+                    "DELETE FROM response_cache WHERE cache_key IN "
+                    "(SELECT cache_key FROM response_cache ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,)
+                ).rowcount
+        with self.lock:
+            self.stats['evictions'] += evicted
+    
+    def clear(self):
+        """Remove every cached response"""
+        self.db.execute("DELETE FROM response_cache")
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Report hit/miss counters and the number of stored entries"""
+        entries = self.db.execute("SELECT COUNT(*) FROM response_cache").fetchone()[0]
+        with self.lock:
+            lookups = self.stats['hits'] + self.stats['misses']
+            return {
+                'response_cache_hits': self.stats['hits'],
+                'response_cache_misses': self.stats['misses'],
+                'response_cache_evictions': self.stats['evictions'],
+                'response_cache_entries': entries,
+                'response_cache_hit_rate': self.stats['hits'] / lookups if lookups else 0.0
+            }
+
+class ModelLatencyTracker:
+    """Thread-safe record of recent per-model response latencies"""
+    MAX_SAMPLES = 50  # Recent successful calls kept per model
+    MIN_SAMPLES = 5   # Samples needed before percentiles are trusted
+    
+    def __init__(self):
+        self._samples = {}
+        self._lock = threading.Lock()
+    
+    def record(self, model: str, seconds: float):
+        """Record the latency of a successful call"""
+        with self._lock:
+            self._samples.setdefault(model, deque(maxlen=self.MAX_SAMPLES)).append(seconds)
+    
+    def percentile(self, model: str, fraction: float) -> Optional[float]:
+        """Get the latency at ``fraction`` (0-1), or None until enough samples exist"""
+        with self._lock:
+            samples = sorted(self._samples.get(model, ()))
+        if len(samples) < self.MIN_SAMPLES:
+            return None
+        index = min(len(samples) - 1, max(0, math.ceil(fraction * len(samples)) - 1))
+        return samples[index]
+    
+    def get_stats(self) -> Dict[str, Dict[str, float]]:
+        """Report p50/p95 latency and sample count per model"""
+        with self._lock:
+            models = list(self._samples.keys())
+        stats = {}
+        for model in models:
+            with self._lock:
+                count = len(self._samples[model])
+            stats[model] = {
+                'p50': self.percentile(model, 0.5) or 0.0,
+                'p95': self.percentile(model, 0.95) or 0.0,
+                'samples': count
+            }
+        return stats
+
+class _HedgeCancelled(Exception):
+    """Raised inside a losing hedged query to abandon its stream"""
+
+class MemoryWriteBuffer:
+    """Write-behind buffer that adds memory records to ChromaDB in batches
+    
+    Records are queued by the calling thread and written by a background
+    thread once ``batch_size`` are pending or the oldest has waited
+    ``flush_interval`` seconds. Pending records are written on close(),
+    which also runs at interpreter exit.
+    """
+    
+    def __init__(self, write_batch: Callable[[List[str], List[Dict[str, Any]], List[str]], None],
+                 batch_size: int = 32, flush_interval: float = 1.0):
+        self.write_batch = write_batch
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.pending: List[Tuple[str, Dict[str, Any], str]] = []
+        self.condition = threading.Condition()
+        self.writing = 0
+        self.flush_requested = False
+        self.closed = False
+        self.stats = {
+            'records_queued': 0,
+            'records_written': 0,
+            'batches_written': 0,
+            'write_failures': 0,
+            'peak_queue_depth': 0
+        }
+        self.thread = threading.Thread(target=self._run, name="memory-write-behind", daemon=True)
+        self.thread.start()
+        atexit.register(self.close)
+    
+    def add(self, document: str, metadata: Dict[str, Any], record_id: str) -> bool:
+        """Queue a record; returns False once the buffer is closed"""
+        with self.condition:
+            if self.closed:
+                return False
+            self.pending.append((document, metadata, record_id))
+            self.stats['records_queued'] += 1
+            self.stats['peak_queue_depth'] = max(self.stats['peak_queue_depth'], len(self.pending))
+            self.condition.notify_all()
+        return True
+    
+    def _run(self):
+        while True:
+            with self.condition:
+                self.condition.wait_for(lambda: self.pending or self.closed)
+                # The first queued record starts the flush interval
+                self.condition.wait_for(
+                    lambda: self.closed or self.flush_requested or len(self.pending) >= self.batch_size,
+                    self.flush_interval
+                )
+                if not self.pending:
+                    return
+                batch = self.pending[:self.batch_size]
+                del self.pending[:self.batch_size]
+                if not self.pending:
+                    self.flush_requested = False
+                self.writing += 1
+            try:
+                self._write(batch)
+            finally:
+                with self.condition:
+                    self.writing -= 1
+                    self.condition.notify_all()
+    
+    def _write(self, batch: List[Tuple[str, Dict[str, Any], str]]):
+        # ChromaDB rejects a batch with repeated ids; keep the first, as single adds would
+        unique = {}
+        for document, metadata, record_id in batch:
+            unique.setdefault(record_id, (document, metadata))
+        ids = list(unique)
+        try:
+            self.write_batch([unique[i][0] for i in ids], [unique[i][1] for i in ids], ids)
+            with self.condition:
+                self.stats['records_written'] += len(ids)
+                self.stats['batches_written'] += 1
+            logging.debug(f"Wrote {len(ids)} memory records")
+        except Exception as e:
+            with self.condition:
+                self.stats['write_failures'] += len(ids)
+            logging.error(f"Failed to write {len(ids)} memory records: {e}")
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Block until every queued record has been written; False on timeout"""
+        with self.condition:
+            self.flush_requested = True
+            self.condition.notify_all()
+            return self.condition.wait_for(lambda: not self.pending and not self.writing, timeout)
+    
+    def close(self, timeout: Optional[float] = None):
+        """Write all pending records and stop the background thread"""
+        with self.condition:
+            if self.closed:
+                return
+            self.closed = True
+            self.condition.notify_all()
+        self.thread.join(timeout)
+        atexit.unregister(self.close)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.condition:
+            stats = {f'memory_{key}': value for key, value in self.stats.items()}
+            stats['memory_queue_depth'] = len(self.pending)
+        stats['memory_avg_batch_size'] = stats['memory_records_written'] / max(1, stats['memory_batches_written'])
+        return stats
+
+class RetrievalCache:
+    """In-process LRU cache of memory retrieval results
+    
+    Results are keyed by normalized prompt, task type and result count. On
+    an exact miss, a prompt whose hashed bag-of-words vector has cosine
+    similarity of at least ``similarity_threshold`` with a cached one reuses
+    its results. Every entry belongs to a memory generation; when the memory
+    generation advances (a write landed) the whole cache is dropped.
+    """
+    
+    def __init__(self, max_entries: int = 256, similarity_threshold: float = 0.95,
+                 embedder: Optional[HashingEmbedder] = None):
+        self.max_entries = max_entries
+        self.similarity_threshold = similarity_threshold
+        self.embedder = embedder or HashingEmbedder(dimensions=512)
+        self.entries: OrderedDict = OrderedDict()
+        self.generation = 0
+        self.lock = threading.Lock()
+        self.stats = {'exact_hits': 0, 'similar_hits': 0, 'misses': 0}
+    
+    @staticmethod
+    def normalize(prompt: str) -> str:
+        return " ".join(prompt.lower().split())
+    
+    def _sync_generation(self, generation: int) -> bool:
+        """Drop entries from older generations; False if ``generation`` is itself stale"""
+        if generation > self.generation:
+            self.entries.clear()
+            self.generation = generation
+        return generation == self.generation
+    
+    def get(self, prompt: str, task_type: str, n_results: int, generation: int) -> Tuple[Optional[str], Any]:
+        """Return (cached result or None, query vector to pass back to put)"""
+        key = (self.normalize(prompt), task_type, n_results)
+        with self.lock:
+            self._sync_generation(generation)
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+                self.stats['exact_hits'] += 1
+                return entry[1], entry[0]
+        
+        if self.similarity_threshold <= 0:
+            with self.lock:
+                self.stats['misses'] += 1
+            return None, None
+        
+        vector = self.embedder([key[0]])[0]
+        with self.lock:
+            self._sync_generation(generation)
+            candidates = [(k, entry) for k, entry in self.entries.items() if k[1:] == key[1:]]
+            if candidates and vector.any():
+                similarities = np.stack([entry[0] for _, entry in candidates]) @ vector
+                best = int(np.argmax(similarities))
+                if similarities[best] >= self.similarity_threshold:
+                    best_key, entry = candidates[best]
+                    self.entries.move_to_end(best_key)
+                    self.stats['similar_hits'] += 1
+                    return entry[1], vector
+            self.stats['misses'] += 1
+        return None, vector
+    
+    def put(self, prompt: str, task_type: str, n_results: int, generation: int, result: str, vector: Any = None):
+        if self.max_entries <= 0:
+            return
+        key = (self.normalize(prompt), task_type, n_results)
+        if vector is None:
+            vector = self.embedder([key[0]])[0]
+        with self.lock:
+            if not self._sync_generation(generation):
+                return
+            self.entries[key] = (vector, result)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        with self.lock:
+            hits = self.stats['exact_hits'] + self.stats['similar_hits']
+            return {
+                'retrieval_cache_entries': len(self.entries),
+                'retrieval_cache_exact_hits': self.stats['exact_hits'],
+                'retrieval_cache_similar_hits': self.stats['similar_hits'],
+                'retrieval_cache_misses': self.stats['misses'],
+                'retrieval_cache_hit_rate': hits / max(1, hits + self.stats['misses'])
+            }
 
 class MemoryManager:
     """Manages the ChromaDB memory system"""
-    def __init__(self, data_dir: Path):
+    def __init__(self, data_dir: Path, write_batch_size: int = 32, flush_interval: float = 1.0,
+                 retrieval_cache_size: int = 256, similarity_threshold: float = 0.95,
+                 retention: Optional[RetentionPolicy] = None, retention_interval: float = 24 * 3600,
+                 vector_weight: float = 1.0, lexical_weight: float = 1.0):
         self.data_dir = data_dir
         self.memory_dir = data_dir / "memory"
         self.collection = None
-        self.setup_memory()
+        # Evicted and compacted tasks are archived under memory_archive/
+        self.retention = MemoryRetention(data_dir / "memory_archive", retention, TASK_TYPES) if retention else None
+        self.retention_interval = retention_interval
+        self.retention_lock = threading.Lock()
+        self.retention_stop = threading.Event()
+        self.last_retention: Optional[RetentionReport] = None
+        # Incremented whenever records are written, so cached retrievals can tell they are stale
+        self.generation = 0
+        self.generation_lock = threading.Lock()
+        self.retrieval_cache = RetrievalCache(retrieval_cache_size, similarity_threshold)
+        # Typed copy of the filterable metadata, used to narrow filtered retrievals to matching ids
+        self.index = MemoryMetadataIndex(data_dir / "memory_index.db")
+        self.filter_candidate_limit = 1000
+        # Semantic and keyword hits are merged by weighted reciprocal-rank fusion
+        self.vector_weight = vector_weight
+        self.lexical_weight = lexical_weight
+        self.fusion_pool_factor = 3
+        self.last_task_micros = 0
+        self.task_id_lock = threading.Lock()
+        # ChromaDB is opened on a background thread; until it is ready reads
+        # return nothing and writes wait in the write-behind buffer
+        self.ready = initialize_in_background(self.setup_memory, "memory-init")
+        self.write_buffer = MemoryWriteBuffer(self._write_batch, write_batch_size, flush_interval)
+        if self.retention:
+            self.when_ready(self._start_retention_schedule)
+        self.when_ready(self._backfill_index)
     
     def setup_memory(self):
         try:
@@ -2301,18 +2781,99 @@ class MemoryManager:
             if not chromadb:
                 logging.warning("ChromaDB not available - memory features disabled")
                 return
-            client = chromadb.PersistentClient(path=str(self.memory_dir))
-            self.collection = client.get_or_create_collection("task_memory")
+            self.collection = get_client(self.memory_dir).get_or_create_collection("task_memory")
             logging.info("Memory system initialized")
         except Exception as e:
             logging.error(f"Memory setup failed: {e}")
             self.collection = None
     
+    @property
+    def available(self) -> bool:
+        """False only once initialization has finished without a usable collection"""
+        return not self.ready.done() or self.collection is not None
+    
+    def wait_until_ready(self, timeout: Optional[float] = None) -> bool:
+        """Block until initialization finishes; True if the memory store is usable"""
+        try:
+            self.ready.result(timeout)
+        except Exception:
+            pass
+        return self.collection is not None
+    
+    def when_ready(self, callback: Callable[[], None]):
+        """Call ``callback`` on the init thread once a usable memory store is open"""
+        def done(_):
+            if self.collection is not None:
+                try:
+                    callback()
+                except Exception as e:
+                    logging.error(f"Memory ready callback failed: {e}")
+        self.ready.add_done_callback(done)
+    
+    def _write_batch(self, documents: List[str], metadatas: List[Dict[str, Any]], ids: List[str]):
+        if not self.wait_until_ready():
+            raise RuntimeError("memory store is unavailable")
+        self.collection.add(documents=documents, metadatas=metadatas, ids=ids)
+        self._bump_generation()
+    
+    def _bump_generation(self):
+        """Mark cached retrievals stale after records were written"""
+        with self.generation_lock:
+            self.generation += 1
+    
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """Wait for queued memory writes to reach ChromaDB"""
+        return self.write_buffer.flush(timeout)
+    
+    def apply_retention(self, now: Optional[float] = None) -> Optional[RetentionReport]:
+        """Deduplicate, compact and evict saved tasks according to the retention policy"""
+        if not self.retention or not self.collection:
+            return None
+        # Queued tasks must be in the collection so duplicates and counts are judged on everything
+        self.flush()
+        with self.retention_lock:
+            try:
+                report = self.retention.run(self.collection, now)
+            except Exception as e:
+                logging.error(f"Memory retention failed: {e}")
+                return None
+            self.index.remove(report.evicted_ids)
+            self._bump_generation()
+            self.last_retention = report
+        return report
+    
+    def _start_retention_schedule(self):
+        def run():
+            while not self.retention_stop.is_set():
+                self.apply_retention()
+                self.retention_stop.wait(self.retention_interval)
+        threading.Thread(target=run, name="memory-retention", daemon=True).start()
+    
+    def close(self):
+        """Write any queued memory records and stop the background threads"""
+        self.retention_stop.set()
+        self.write_buffer.close()
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """Queue depth and throughput of the write-behind buffer, and retrieval cache hit rates"""
+        stats = self.write_buffer.get_stats()
+        stats.update(self.retrieval_cache.get_stats())
+        if self.last_retention:
+            stats['memory_retention_evicted'] = self.last_retention.evicted
+            stats['memory_retention_compacted'] = self.last_retention.compacted
+        return stats
+    
+    def _next_task_micros(self) -> int:
+        """Microsecond timestamp for a task id, bumped so tasks saved in the same microsecond stay distinct"""
+        with self.task_id_lock:
+            self.last_task_micros = max(int(time.time() * 1000000), self.last_task_micros + 1)
+            return self.last_task_micros
+    
     def save_task(self, task_data: Dict[str, Any]) -> bool:
-        if not self.collection:
+        if not self.available:
             return False
         try:
-            task_id = f"task_{int(time.time() * 1000000)}"
+            task_id = f"task_{self._next_task_micros()}"
             task_text = f"Prompt: {task_data.get('prompt', '')}\nType: {task_data.get('task_type', '')}\nResult: {task_data.get('result', '')}"
             
             # Convert any list values to strings for ChromaDB compatibility
@@ -2325,36 +2886,173 @@ class MemoryManager:
                 else:
                     clean_metadata[key] = value
             
-            self.collection.add(
-                documents=[task_text],
-                metadatas=[clean_metadata],
-                ids=[task_id]
-            )
-            logging.info(f"Saved task to memory: {task_id}")
-            return True
+            clean_metadata['record_id'] = task_id
+            
+            queued = self.write_buffer.add(task_text, clean_metadata, task_id)
+            if queued:
+                self._index_task(task_id, task_data)
+            logging.info(f"Queued task for memory: {task_id}")
+            return queued
         except Exception as e:
             logging.error(f"Failed to save task to memory: {e}")
             return False
     
-    def retrieve_context(self, prompt: str, task_type: str, n_results: int = 3) -> str:
+    def _index_task(self, task_id: str, task_data: Dict[str, Any]):
+        files = list(task_data.get('files') or [])
+        generated_files = list(task_data.get('generated_files') or [])
+        timestamp = task_data.get('timestamp')
+        self.index.add(
+            task_id, 'task',
+            task_type=task_data.get('task_type'),
+            success=task_data.get('success'),
+            score=task_data.get('score'),
+            timestamp=timestamp if isinstance(timestamp, (int, float)) else None,
+            files=files,
+            generated_files=generated_files,
+            language=infer_language(files + generated_files, str(task_data.get('result', ''))),
+            text=f"{task_data.get('prompt', '')}\n{task_data.get('result', '')}"
+        )
+    
+    def _index_stored_task(self, record_id: str, metadata: Dict[str, Any]):
+        """Index a task from its ChromaDB metadata, where file lists are stored as strings"""
+        task_data = dict(metadata)
+        for key in ('files', 'generated_files'):
+            try:
+                task_data[key] = ast.literal_eval(metadata.get(key) or '[]')
+            except (ValueError, SyntaxError):
+                task_data[key] = []
+        self._index_task(record_id, task_data)
+    
+    def _backfill_index(self):
+        """Index tasks saved before the metadata index existed and tag them with their record id"""
+        if self.index.count():
+            return
+        try:
+            results = self.collection.get(where={"task_type": {"$in": TASK_TYPES}}, include=["metadatas"])
+        except Exception as e:
+            logging.error(f"Failed to backfill memory index: {e}")
+            return
+        ids, metadatas = [], []
+        with self.index.db.transaction():
+            for record_id, metadata in zip(results["ids"], results["metadatas"]):
+                if not record_id.startswith("task_") or not metadata:
+                    continue
+                self._index_stored_task(record_id, metadata)
+                if 'record_id' not in metadata:
+                    ids.append(record_id)
+                    metadatas.append(dict(metadata, record_id=record_id))
+        if ids:
+            self.collection.update(ids=ids, metadatas=metadatas)
+        logging.info(f"Backfilled memory index with {len(results['ids'])} records")
+    
+    def export_snapshot(self, path: Path, ready_timeout: Optional[float] = None) -> Optional[SnapshotStats]:
+        """Write all memory records with their embeddings to a Parquet or gzip JSONL snapshot
+        
+        Returns None if the memory store is not usable within ``ready_timeout`` seconds.
+        """
+        if not self.wait_until_ready(ready_timeout):
+            return None
+        self.flush()
+        return export_snapshot(self.collection, path)
+    
+    def import_snapshot(self, path: Path, ready_timeout: Optional[float] = None) -> Optional[SnapshotStats]:
+        """Load a snapshot into the memory store without re-embedding its records
+        
+        Returns None if the memory store is not usable within ``ready_timeout`` seconds.
+        """
+        if not self.wait_until_ready(ready_timeout):
+            return None
+        
+        def index_batch(batch: SnapshotBatch):
+            with self.index.db.transaction():
+                for record_id, metadata in zip(batch.ids, batch.metadatas):
+                    if record_id.startswith("task_"):
+                        self._index_stored_task(record_id, metadata)
+        
+        stats = import_snapshot(self.collection, path, on_batch=index_batch)
+        self._bump_generation()
+        return stats
+    
+    def find_records(self, filters: MemoryFilter, limit: int = 100) -> List[Dict[str, Any]]:
+        """Indexed metadata of saved records matching ``filters``, newest first"""
+        return self.index.search(filters, limit)
+    
+    def get_task_history(self, limit: int = 2000) -> List[Tuple[str, str]]:
+        """Get (prompt, task_type) pairs of saved tasks for training the local classifier"""
         if not self.collection:
-            return ""
+            return []
         try:
-            query_text = f"Prompt: {prompt}\nType: {task_type}"
-            results = self.collection.query(query_texts=[query_text], n_results=n_results)
+            results = self.collection.get(where={"task_type": {"$in": TASK_TYPES}}, include=["metadatas"], limit=limit)
+            return [(meta.get('prompt', ''), meta.get('task_type', '')) for meta in results["metadatas"]]
+        except Exception as e:
+            logging.error(f"Failed to load task history: {e}")
+            return []
+    
+    def _fused_hits(self, prompt: str, task_type: str, n_results: int,
+                    filters: Optional[MemoryFilter]) -> List[Dict[str, Any]]:
+        """Metadata of the best records, fusing semantic and BM25 keyword rankings"""
+        candidate_ids = None
+        if filters is not None:
+            # Narrow to the newest matching ids first, so the vector search only ranks candidates
+            candidate_ids = self.index.query_ids(filters, limit=self.filter_candidate_limit)
+            if not candidate_ids:
+                return []
+        lexical_ids = []
+        if self.lexical_weight > 0:
+            lexical_ids = self.index.lexical_search(prompt, filters, limit=n_results * self.fusion_pool_factor)
+        
+        vector_ids, metadata_by_id = [], {}
+        if self.vector_weight > 0 or not lexical_ids:
+            pool = n_results * self.fusion_pool_factor if lexical_ids else n_results
+            kwargs = {}
+            if candidate_ids is not None:
+                pool = min(pool, len(candidate_ids))
+                kwargs['where'] = {"record_id": {"$in": candidate_ids}}
+            results = self.collection.query(query_texts=[f"Prompt: {prompt}\nType: {task_type}"], n_results=pool, **kwargs)
             if not results["documents"]:
-                return ""
-            context_parts = []
-            for doc, meta in zip(results["documents"][0], results["metadatas"][0]):
-                context_parts.append(f"Previous: {meta.get('prompt', '')}\nResult: {meta.get('result', '')}")
-            return "\n\n".join(context_parts)
+                return []
+            if not lexical_ids:
+                return list(results["metadatas"][0])[:n_results]
+            vector_ids = list(results["ids"][0])
+            metadata_by_id = dict(zip(vector_ids, results["metadatas"][0]))
+        
+        ranked = reciprocal_rank_fusion([vector_ids, lexical_ids], [self.vector_weight, self.lexical_weight])[:n_results]
+        missing = [record_id for record_id in ranked if record_id not in metadata_by_id]
+        if missing:
+            # Keyword-only hits; ids still waiting in the write buffer are simply not found yet
+            fetched = self.collection.get(ids=missing, include=["metadatas"])
+            metadata_by_id.update(zip(fetched["ids"], fetched["metadatas"]))
+        return [metadata_by_id[record_id] for record_id in ranked if record_id in metadata_by_id]
+    
+    def retrieve_context(self, prompt: str, task_type: str, n_results: int = 3,
+                         filters: Optional[MemoryFilter] = None) -> str:
+        """Context from the most relevant saved tasks, optionally restricted to those matching ``filters``
+
+        Semantic and keyword (BM25) hits are merged by reciprocal-rank fusion,
+        so exact identifiers and error strings are found even when the
+        embedding misses them.
+        """
+        if not self.collection:
+            return ""
+        try:
+            generation = self.generation
+            scope = task_type if filters is None else f"{task_type}|{filters.cache_key()}"
+            cached, vector = self.retrieval_cache.get(prompt, scope, n_results, generation)
+            if cached is not None:
+                return cached
+            metadatas = self._fused_hits(prompt, task_type, n_results, filters)
+            context = "\n\n".join(
+                f"Previous: {meta.get('prompt', '')}\nResult: {meta.get('result', '')}" for meta in metadatas
+            )
+            self.retrieval_cache.put(prompt, scope, n_results, generation, context, vector)
+            return context
         except Exception as e:
             logging.error(f"Memory retrieval failed: {e}")
             return ""
     
     def store_enhancement_success(self, opportunity, solution: str, assessment: dict, execution_result: dict):
         """Store successful enhancement for future learning"""
-        if not self.collection:
+        if not self.available:
             return False
         
         try:
@@ -2380,14 +3078,10 @@ Solution: {solution[:500]}"""
                 'timestamp': datetime.now().isoformat()
             }
             
-            self.collection.add(
-                documents=[enhancement_text],
-                metadatas=[metadata],
-                ids=[enhancement_id]
-            )
+            queued = self.write_buffer.add(enhancement_text, metadata, enhancement_id)
             
-            logging.info(f"Stored enhancement success: {enhancement_id}")
-            return True
+            logging.info(f"Queued enhancement success: {enhancement_id}")
+            return queued
             
         except Exception as e:
             logging.error(f"Failed to store enhancement success: {e}")
@@ -2395,7 +3089,7 @@ Solution: {solution[:500]}"""
     
     def store_context(self, context_id: str, data: dict, metadata: dict = None):
         """Store context data in memory with metadata"""
-        if not self.collection:
+        if not self.available:
             return False
         
         try:
@@ -2421,14 +3115,14 @@ Solution: {solution[:500]}"""
                 else:
                     clean_metadata[key] = value
             
-            self.collection.add(
-                documents=[data_text],
-                metadatas=[clean_metadata],
-                ids=[context_id]
-            )
+            clean_metadata['record_id'] = context_id
             
-            logging.debug(f"Stored context: {context_id}")
-            return True
+            queued = self.write_buffer.add(data_text, clean_metadata, context_id)
+            if queued:
+                self.index.add(context_id, 'context', task_type=metadata.get('task_type'), text=data_text)
+            
+            logging.debug(f"Queued context: {context_id}")
+            return queued
             
         except Exception as e:
             logging.error(f"Failed to store context {context_id}: {e}")
@@ -2471,7 +3165,7 @@ Solution: {solution[:500]}"""
     
     def add_memory(self, memory_data: Dict[str, Any]) -> bool:
         """Add arbitrary memory data to the collection"""
-        if not self.collection:
+        if not self.available:
             return False
         
         try:
@@ -2487,25 +3181,82 @@ Solution: {solution[:500]}"""
             if 'timestamp' not in metadata:
                 metadata['timestamp'] = time.time()
             
-            self.collection.add(
-                documents=[str(content)],
-                metadatas=[metadata],
-                ids=[memory_id]
-            )
+            queued = self.write_buffer.add(str(content), metadata, memory_id)
             
-            logging.info(f"Added memory to collection: {memory_id}")
-            return True
+            logging.info(f"Queued memory for collection: {memory_id}")
+            return queued
             
         except Exception as e:
             logging.error(f"Failed to add memory: {e}")
             return False
 
+def create_memory_manager(config: AIConfig, data_dir: Path) -> MemoryManager:
+    """Build the MemoryManager configured by ``config``"""
+    retention = None
+    if config.memory_retention:
+        retention = RetentionPolicy(
+            max_age_days=config.memory_max_age_days,
+            max_records=config.memory_max_records,
+            compact_after_days=config.memory_compact_after_days
+        )
+    return MemoryManager(data_dir, config.memory_write_batch_size, config.memory_flush_interval,
+                         config.retrieval_cache_size, config.retrieval_similarity_threshold,
+                         retention, config.memory_retention_interval,
+                         config.retrieval_vector_weight, config.retrieval_lexical_weight)
+
+class StreamInterrupted(Exception):
+    """Raised by ``stream_query`` when a stream fails after it started"""
+
+# Per-thread record of whether the last cached_query was served from the cache
+_query_state = threading.local()
+
+def cached_query(response_cache: Optional[ResponseCache], cache_key: Optional[str], model: str,
+                 monitor: Optional['SystemMonitor'], task_processor: Optional['TaskProcessor'],
+                 generate: Callable[[], Optional[str]],
+                 stream_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
+    """Serve a query from the response cache, or generate it and cache the result
+    
+    A cached response is forwarded to ``stream_callback`` as a single chunk.
+    Responses cut short by a stop request are not cached. Whether the answer
+    came from the cache is left in ``_query_state.cache_hit`` for callers that
+    time the query.
+    """
+    _query_state.cache_hit = False
+    if cache_key is None:
+        return generate()
+
+    try:
+        cached = response_cache.get(cache_key)
+    except sqlite3.Error as e:
+        logging.error(f"Response cache lookup failed: {e}")
+        cached = None
+    if cached is not None:
+        logging.debug(f"Response cache hit for {model}")
+        if monitor:
+            monitor.update_stats('response_cache_hits')
+        if stream_callback is not None:
+            stream_callback(cached)
+        _query_state.cache_hit = True
+        return cached
+
+    if monitor:
+        monitor.update_stats('response_cache_misses')
+    response = generate()
+    if response and not (task_processor and task_processor.stop_requested):
+        try:
+            response_cache.put(cache_key, model, response)
+        except sqlite3.Error as e:
+            logging.error(f"Failed to cache response: {e}")
+    return response
+
 class OllamaManager:
     """Manages Ollama local AI model interactions"""
-    def __init__(self, config: AIConfig, monitor: Optional['SystemMonitor'] = None, task_processor: Optional['TaskProcessor'] = None):
+    def __init__(self, config: AIConfig, monitor: Optional['SystemMonitor'] = None, task_processor: Optional['TaskProcessor'] = None,
+                 response_cache: Optional[ResponseCache] = None):
         self.config = config
         self.monitor = monitor
         self.task_processor = task_processor
+        self.response_cache = response_cache
         self.base_url = config.ollama_url
         self.model = config.ollama_model
         self.setup_ollama()
@@ -2531,7 +3282,26 @@ class OllamaManager:
             logging.error(f"Failed to start Ollama: {e}")
             return False
     
-    def query(self, prompt: str) -> Optional[str]:
+    def query(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None, cacheable: bool = False) -> Optional[str]:
+        cache_key = None
+        if self.response_cache:
+            cache_key = self.response_cache.key_for(self.model, "", self.config.temperature, prompt, force=cacheable)
+        return cached_query(self.response_cache, cache_key, self.model, self.monitor, self.task_processor,
+                            lambda: self._generate(prompt, stream_callback), stream_callback)
+
+    def _generate(self, prompt: str, stream_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Query the model, bypassing the response cache"""
+        if stream_callback is not None and self.config.stream_responses:
+            chunks = []
+            try:
+                for chunk in self.stream_query(prompt):
+                    chunks.append(chunk)
+                    stream_callback(chunk)
+            except StreamInterrupted:
+                # A partial answer must not pass for a response (or be cached)
+                return None
+            return "".join(chunks) or None
+
         start_time = time.time()
         try:
             response = SafeRequests.post(
@@ -2582,13 +3352,93 @@ class OllamaManager:
                 self.monitor.update_stats('errors')
             return None
 
+    def stream_query(self, prompt: str) -> Iterator[str]:
+        """Yield response text incrementally as Ollama generates it
+
+        Raises StreamInterrupted if the stream fails part way through.
+        """
+        start_time = time.time()
+        first_token_time = None
+        chunks = []
+        response = SafeRequests.post(
+            f"{self.base_url}/api/generate",
+            json={
+                "model": self.model,
+                "prompt": prompt,
+                "stream": True,
+                "options": {
+                    "temperature": self.config.temperature,
+                    "num_predict": self.config.max_tokens
+                }
+            },
+            stream=True
+        )
+        if not response or response.status_code != 200:
+            if response is not None:
+                # Hand the pooled connection back instead of leaking it
+                response.close()
+            if self.monitor:
+                self.monitor.update_stats('errors')
+            return
+
+        try:
+            for line in response.iter_lines():
+                if not line:
+                    continue
+                data = json.loads(line)
+                if data.get("error"):
+                    raise ValueError(f"Ollama reported an error: {data['error']}")
+                text = data.get("response", "")
+                if text:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    chunks.append(text)
+                    yield text
+                if data.get("done"):
+                    break
+                if self.task_processor and self.task_processor.stop_requested:
+                    logging.info("Ollama stream cut off by stop request")
+                    break
+        except (requests.RequestException, ValueError) as e:
+            logging.error(f"Ollama streaming query failed: {e}")
+            if self.monitor:
+                self.monitor.update_stats('errors')
+            raise StreamInterrupted(str(e)) from e
+        finally:
+            # Closing the response drops the connection so Ollama stops generating
+            response.close()
+
+        total_tokens = len(prompt.split()) + len("".join(chunks).split())
+        self._record_stream_metrics(total_tokens, time.time() - start_time, first_token_time)
+
+    def _record_stream_metrics(self, total_tokens: int, response_time: float, first_token_time: Optional[float]):
+        """Report metrics for a completed streaming query"""
+        if self.task_processor and self.task_processor.metrics_callback:
+            self.task_processor.metrics_callback(
+                task_type="ollama_query",
+                response_time=response_time,
+                tokens_used=total_tokens,
+                time_to_first_token=first_token_time
+            )
+
+        if self.monitor:
+            self.monitor.update_stats('total_prompts')
+            self.monitor.update_stats('ollama_prompts')
+            self.monitor.update_stats('total_tokens', total_tokens)
+            if first_token_time is not None and hasattr(self.monitor, 'log_time_to_first_token'):
+                self.monitor.log_time_to_first_token('ollama', first_token_time)
+
 
 class ClaudeManager:
     """Manages Claude API interactions with monitoring"""
-    def __init__(self, config: AIConfig, monitor: Optional['SystemMonitor'] = None, task_processor: Optional['TaskProcessor'] = None):
+    MODEL = "claude-3-5-sonnet-20241022"
+
+    def __init__(self, config: AIConfig, monitor: Optional['SystemMonitor'] = None, task_processor: Optional['TaskProcessor'] = None,
+                 response_cache: Optional[ResponseCache] = None):
         self.config = config
         self.monitor = monitor
         self.task_processor = task_processor
+        self.response_cache = response_cache
         self.client = None
         if config.use_claude and config.claude_api_key and Anthropic:
             try:
@@ -2597,26 +3447,50 @@ class ClaudeManager:
             except Exception as e:
                 logging.error(f"Claude initialization failed: {e}")
 
-    def query(self, prompt: str, system_prompt: str = "") -> Optional[str]:
+    def _resolve_system_prompt(self, system_prompt: str) -> str:
+        """Pick the explicit, task-specific or default system prompt"""
+        if system_prompt:
+            return system_prompt
+        if (self.task_processor and
+              hasattr(self.task_processor, 'current_task_prompts') and
+              self.task_processor.current_task_prompts):
+            # Use task-specific optimized prompt
+            return self.task_processor.current_task_prompts.get('system_prompt', system_prompt)
+        return "You are SuperMini, an AI assistant that helps with various tasks including code generation, data analysis, and multimedia processing."
+
+    def query(self, prompt: str, system_prompt: str = "", stream_callback: Optional[Callable[[str], None]] = None,
+              cacheable: bool = False) -> Optional[str]:
         """Query Claude model with monitoring"""
         if not self.client:
             return None
-        
+
+        cache_key = None
+        if self.response_cache:
+            cache_key = self.response_cache.key_for(self.MODEL, self._resolve_system_prompt(system_prompt),
+                                                    self.config.temperature, prompt, force=cacheable)
+        return cached_query(self.response_cache, cache_key, self.MODEL, self.monitor, self.task_processor,
+                            lambda: self._generate(prompt, system_prompt, stream_callback), stream_callback)
+
+    def _generate(self, prompt: str, system_prompt: str = "", stream_callback: Optional[Callable[[str], None]] = None) -> Optional[str]:
+        """Query Claude, bypassing the response cache"""
+        if stream_callback is not None and self.config.stream_responses:
+            chunks = []
+            try:
+                for chunk in self.stream_query(prompt, system_prompt):
+                    chunks.append(chunk)
+                    stream_callback(chunk)
+            except StreamInterrupted:
+                # A partial answer must not pass for a response (or be cached)
+                return None
+            return "".join(chunks) or None
+
         start_time = time.time()
         try:
             messages = [{"role": "user", "content": prompt}]
-            if system_prompt:
-                system = system_prompt
-            elif (self.task_processor and 
-                  hasattr(self.task_processor, 'current_task_prompts') and 
-                  self.task_processor.current_task_prompts):
-                # Use task-specific optimized prompt
-                system = self.task_processor.current_task_prompts.get('system_prompt', system_prompt)
-            else:
-                system = "You are SuperMini, an AI assistant that helps with various tasks including code generation, data analysis, and multimedia processing."
-            
+            system = self._resolve_system_prompt(system_prompt)
+
             response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model=self.MODEL,
                 max_tokens=self.config.max_tokens,
                 temperature=self.config.temperature,
                 system=system,
@@ -2655,7 +3529,62 @@ class ClaudeManager:
             if self.monitor:
                 self.monitor.update_stats('errors')
             return None
-    
+
+    def stream_query(self, prompt: str, system_prompt: str = "") -> Iterator[str]:
+        """Yield response text incrementally as Claude generates it
+
+        Raises StreamInterrupted if the stream fails part way through.
+        """
+        if not self.client:
+            return
+
+        start_time = time.time()
+        first_token_time = None
+        chunks = []
+        system = self._resolve_system_prompt(system_prompt)
+        try:
+            with self.client.messages.stream(
+                model=self.MODEL,
+                max_tokens=self.config.max_tokens,
+                temperature=self.config.temperature,
+                system=system,
+                messages=[{"role": "user", "content": prompt}]
+            ) as stream:
+                for text in stream.text_stream:
+                    if first_token_time is None:
+                        first_token_time = time.time() - start_time
+                    chunks.append(text)
+                    yield text
+                    if self.task_processor and self.task_processor.stop_requested:
+                        # Leaving the context manager closes the HTTP stream
+                        logging.info("Claude stream cut off by stop request")
+                        break
+        except AnthropicError as e:
+            logging.error(f"Claude streaming query failed: {e}")
+            if self.monitor:
+                self.monitor.update_stats('errors')
+            raise StreamInterrupted(str(e)) from e
+
+        total_tokens = len(prompt.split()) + len(system.split()) + len("".join(chunks).split())
+        self._record_stream_metrics(total_tokens, time.time() - start_time, first_token_time)
+
+    def _record_stream_metrics(self, total_tokens: int, response_time: float, first_token_time: Optional[float]):
+        """Report metrics for a completed streaming query"""
+        if self.task_processor and self.task_processor.metrics_callback:
+            self.task_processor.metrics_callback(
+                task_type="claude_query",
+                response_time=response_time,
+                tokens_used=total_tokens,
+                time_to_first_token=first_token_time
+            )
+
+        if self.monitor:
+            self.monitor.update_stats('total_prompts')
+            self.monitor.update_stats('claude_prompts')
+            self.monitor.update_stats('total_tokens', total_tokens)
+            if first_token_time is not None and hasattr(self.monitor, 'log_time_to_first_token'):
+                self.monitor.log_time_to_first_token('claude', first_token_time)
+
     def query_with_image(self, prompt: str, image_path: str) -> Optional[str]:
         if not self.client:
             return None
@@ -2679,7 +3608,7 @@ class ClaudeManager:
                 ]
             }
             response = self.client.messages.create(
-                model="claude-3-5-sonnet-20241022",
+                model=self.MODEL,
                 max_tokens=self.config.max_tokens,
                 messages=[message]
             )
@@ -4580,10 +5509,53 @@ class TaskProcessor:
         # Add stop flag for interrupting long-running operations
         self.stop_requested = False
         
+        # Receives incremental response text while a task is running (set by TaskThread)
+        self.stream_callback = None
+        # Receives partial text to remove when a streaming model fails (set by TaskThread)
+        self.stream_retract_callback = None
+        
+        # Recent per-model latencies used to decide when to hedge a slow primary
+        self.latency_tracker = ModelLatencyTracker()
+        
+        # Chunks and embeddings of attached documents, kept next to the memory store
+        self.document_index = None
+        try:
+            index_dir = (memory.data_dir if memory else output_dir / "data") / "chunk_index"
+            self.document_index = DocumentChunkIndex(index_dir, ChunkSelector(top_k=config.rag_top_k),
+                                                     max_chars=config.rag_chunk_chars)
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Failed to open document chunk index: {e}")
+        
+        # Streaming profiles of attached CSV files, keyed by content hash
+        self.csv_profiles = None
+        try:
+            self.csv_profiles = CsvProfileCache(output_dir / "data" / "csv_profiles.db",
+                                                chunk_rows=config.csv_profile_chunk_rows,
+                                                max_rows=config.csv_profile_max_rows or None)
+        except (OSError, sqlite3.Error) as e:
+            logging.error(f"Failed to open CSV profile cache: {e}")
+        
+        # Caps on simultaneous requests per backend, shared by all concurrently running tasks
+        self.backend_slots = {
+            'claude': threading.BoundedSemaphore(max(1, config.claude_concurrency)),
+            'ollama': threading.BoundedSemaphore(max(1, config.ollama_concurrency))
+        }
+        
+        # Created on first submit()
+        self.execution_engine = None
+        
         # Initialize task intelligence for autonomous decision-making
         self.task_intelligence = TaskIntelligence()
         self.response_analyzer = ResponseAnalyzer()
         
+        # Local classifier that spares the model round trip for confident task types
+        self.local_classifier = None
+        if config.local_classifier:
+            self.local_classifier = LocalTaskClassifier(TASK_TYPES)
+            if memory:
+                # Saved task history is loaded once the memory store has opened
+                memory.when_ready(self.train_local_classifier)
+        
         # Initialize new autonomous continuation engine
         try:
             from src.autonomous.autonomous_continuation_engine import AutonomousContinuationEngine
@@ -4592,10 +5564,25 @@ class TaskProcessor:
         except ImportError as e:
             logging.warning(f"Could not import autonomous continuation engine: {e}")
             self.autonomous_continuation_engine = None
+        # The continuation engine keeps learning history shared by all concurrent tasks
+        self.continuation_lock = threading.Lock()
+        
+        # Persistent cache of responses to repeated deterministic prompts
+        self.response_cache = None
+        if config.response_cache:
+            try:
+                self.response_cache = ResponseCache(
+                    output_dir / "data" / "response_cache.db",
+                    ttl=config.response_cache_ttl,
+                    max_entries=config.response_cache_max_entries,
+                    max_temperature=config.response_cache_max_temperature
+                )
+            except sqlite3.Error as e:
+                logging.error(f"Failed to open response cache: {e}")
         
         # Initialize AI managers with monitor and self reference for task-specific prompts
-        self.claude = ClaudeManager(config, monitor=monitor, task_processor=self)
-        self.ollama = OllamaManager(config, monitor=monitor, task_processor=self)
+        self.claude = ClaudeManager(config, monitor=monitor, task_processor=self, response_cache=self.response_cache)
+        self.ollama = OllamaManager(config, monitor=monitor, task_processor=self, response_cache=self.response_cache)
         
         # Initialize autonomous agent if available
         self.autonomous_agent = None
@@ -4637,29 +5624,206 @@ class TaskProcessor:
             {"timestamp": time.time()}
         )
     
-    def query_ai_with_primary_fallback(self, prompt: str, system_prompt: str = "") -> Optional[str]:
-        """Query AI based on primary model setting with fallback to backup model"""
+    def query_ai_with_primary_fallback(self, prompt: str, system_prompt: str = "", stream: bool = True,
+                                       cacheable: bool = False) -> Optional[str]:
+        """Query AI based on primary model setting with fallback to backup model
+        
+        When ``stream`` is set and a stream callback is registered, response text
+        is forwarded incrementally while the full response is still returned.
+        ``cacheable`` lets the response cache serve the prompt even at
+        temperatures it would otherwise treat as non-deterministic. With
+        ``hedge_requests`` enabled the backup is raced against a slow primary
+        instead of waiting for the primary to fail.
+        """
         primary_is_claude = self.config.primary_model == "Claude API (Recommended)"
+        stream_callback = self.stream_callback if stream else None
         
+        claude_query = lambda callback: self.claude.query(prompt, system_prompt, stream_callback=callback, cacheable=cacheable)
+        ollama_query = lambda callback: self.ollama.query(prompt, stream_callback=callback, cacheable=cacheable)
         if primary_is_claude:
             # Claude is primary, Ollama is backup
-            response = self.claude.query(prompt, system_prompt)
-            if not response:
-                logging.info("Claude (primary) failed, falling back to Ollama (backup)")
-                response = self.ollama.query(prompt)
+            primary, backup = ('claude', claude_query), ('ollama', ollama_query)
         else:
             # Ollama is primary, Claude is backup
-            response = self.ollama.query(prompt)
-            if not response:
-                logging.info("Ollama (primary) failed, falling back to Claude (backup)")
-                response = self.claude.query(prompt, system_prompt)
+            primary, backup = ('ollama', ollama_query), ('claude', claude_query)
+        
+        if self.config.hedge_requests:
+            return self._query_hedged(primary, backup, stream_callback)
+        
+        streamed = []
+        def forward(chunk: str):
+            streamed.append(chunk)
+            stream_callback(chunk)
+        
+        response = self._timed_query(primary[0], primary[1], forward if stream_callback else None)
+        if not response and not self.stop_requested:
+            self._retract_stream("".join(streamed))
+            logging.info(f"{primary[0].title()} (primary) failed, falling back to {backup[0].title()} (backup)")
+            response = self._timed_query(backup[0], backup[1], stream_callback)
+        
+        return response
+    
+    def _timed_query(self, model: str, query: Callable, stream_callback: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Run a model query within the backend's concurrency limit and record its latency if it succeeds
         
+        Cache hits are not recorded so they do not drag down the learned hedge delay.
+        """
+        _query_state.cache_hit = False
+        with self.backend_slots[model]:
+            start_time = time.time()
+            response = query(stream_callback)
+        if response and not _query_state.cache_hit:
+            self.latency_tracker.record(model, time.time() - start_time)
         return response
     
+    def hedge_delay(self, model: str) -> float:
+        """Seconds to wait on ``model`` before firing the backup in parallel"""
+        learned = self.latency_tracker.percentile(model, self.config.hedge_percentile)
+        return learned if learned is not None else self.config.hedge_default_delay
+    
+    def _query_hedged(self, primary: Tuple[str, Callable], backup: Tuple[str, Callable],
+                      stream_callback: Optional[Callable[[str], None]]) -> Optional[str]:
+        """Race the backup against the primary once the primary is slower than usual
+        
+        The first successful response wins and the other is discarded. When
+        streaming, the first model to produce a token owns the results panel
+        and the other model's stream is cut off at its next chunk. If the owner
+        then fails, its partial text is retracted, the panel is released and
+        any model that was cut off is run again.
+        """
+        results = queue.Queue()
+        queries = dict([primary, backup])
+        stream_owner = []
+        streamed = []
+        owner_lock = threading.Lock()
+        
+        def forward_for(model: str) -> Optional[Callable[[str], None]]:
+            if stream_callback is None:
+                return None
+            def forward(chunk: str):
+                with owner_lock:
+                    if not stream_owner:
+                        stream_owner.append(model)
+                    owns_stream = stream_owner[0] == model
+                    if owns_stream:
+                        streamed.append(chunk)
+                if not owns_stream:
+                    raise _HedgeCancelled()
+                stream_callback(chunk)
+            return forward
+        
+        def release_stream(model: str):
+            with owner_lock:
+                if stream_owner and stream_owner[0] == model:
+                    stream_owner.clear()
+                    self._retract_stream("".join(streamed))
+                    streamed.clear()
+        
+        def run(model: str, query: Callable):
+            cut_off = False
+            try:
+                response = self._timed_query(model, query, forward_for(model))
+            except _HedgeCancelled:
+                logging.debug(f"Hedged {model} query cut off by the streaming model")
+                response, cut_off = None, True
+            except Exception as e:
+                logging.error(f"Hedged {model} query failed: {e}")
+                response = None
+            if not response:
+                release_stream(model)
+            results.put((model, response, cut_off))
+        
+        def launch(model: str):
+            threading.Thread(target=run, args=(model, queries[model]), daemon=True, name=f"hedge-{model}").start()
+        
+        launch(primary[0])
+        pending = 1
+        delay = self.hedge_delay(primary[0])
+        try:
+            model, response, _ = results.get(timeout=delay)
+            pending -= 1
+            if response or self.stop_requested:
+                return response
+            logging.info(f"{primary[0].title()} (primary) failed, falling back to {backup[0].title()} (backup)")
+        except queue.Empty:
+            logging.info(f"{primary[0].title()} (primary) slower than {delay:.1f}s, racing {backup[0].title()} (backup)")
+        
+        launch(backup[0])
+        pending += 1
+        cut_off_models, retried = [], set()
+        while pending:
+            try:
+                model, response, cut_off = results.get(timeout=0.25)
+            except queue.Empty:
+                if self.stop_requested:
+                    return None
+                continue
+            pending -= 1
+            if response:
+                logging.info(f"Hedged request won by {model}")
+                return response
+            if cut_off and model not in retried:
+                cut_off_models.append(model)
+            if not pending and cut_off_models and not self.stop_requested:
+                # The model that owned the stream failed; rerun the ones it cut off
+                for model in cut_off_models:
+                    logging.info(f"Streaming model failed, rerunning {model}")
+                    retried.add(model)
+                    launch(model)
+                    pending += 1
+                cut_off_models.clear()
+        return None
+    
+    def _retract_stream(self, text: str):
+        """Ask the UI to remove partial text streamed by a model that then failed"""
+        if text and self.stream_retract_callback:
+            self.stream_retract_callback(text)
+    
     def reset_stop_flag(self):
         """Reset the stop flag for new operations"""
         self.stop_requested = False
     
+    def _continuation(self, method: str, *args):
+        """Call the shared continuation engine, one task at a time"""
+        with self.continuation_lock:
+            return getattr(self.autonomous_continuation_engine, method)(*args)
+    
+    def spawn_worker(self) -> 'TaskProcessor':
+        """Create a processor that can run a task alongside this one
+        
+        The worker gets its own config (temperature is tuned per task), stop
+        flag, model managers and task analysis helpers, and shares memory,
+        caches, the local classifier, the continuation engine (behind
+        ``continuation_lock``) and the backend concurrency limits with this
+        processor.
+        """
+        worker = copy.copy(self)
+        worker.config = replace(self.config)
+        worker.task_intelligence = TaskIntelligence()
+        worker.response_analyzer = ResponseAnalyzer()
+        worker.stop_requested = False
+        worker.stream_callback = None
+        worker.stream_retract_callback = None
+        worker.current_task_prompts = None
+        worker.execution_engine = None
+        for name in ('claude', 'ollama'):
+            manager = copy.copy(getattr(self, name))
+            manager.config = worker.config
+            manager.task_processor = worker
+            setattr(worker, name, manager)
+        return worker
+    
+    def submit(self, prompt: str, files: Optional[List[str]] = None, task_type: str = None,
+               priority: int = 0, **options) -> Future:
+        """Queue a task on the execution engine and return a Future for its TaskResult
+        
+        Tasks with a higher ``priority`` start first. ``options`` are passed on
+        to ``process_task`` (use_memory, auto_continue, max_continues, ...).
+        """
+        if self.execution_engine is None:
+            self.execution_engine = TaskExecutionEngine(self, self.config.max_concurrent_tasks)
+        return self.execution_engine.submit(prompt, files, task_type, priority, **options)
+    
     def setup_autonomous_capabilities(self):
         """Initialize autonomous agent and workflow manager"""
         try:
@@ -4680,7 +5844,18 @@ class TaskProcessor:
             self.autonomous_agent = None
             self.workflow_manager = None
     
+    def train_local_classifier(self):
+        """Train the local classifier on the task history saved in memory"""
+        trained = self.local_classifier.fit(self.memory.get_task_history())
+        logging.info(f"Local task classifier trained on {trained} saved tasks")
+    
     def classify_task(self, prompt: str) -> Tuple[str, float]:
+        if self.local_classifier:
+            task_type, confidence = self.local_classifier.predict(prompt)
+            if confidence >= self.config.local_classifier_threshold:
+                logging.debug(f"Local classifier chose '{task_type}' ({confidence:.2f})")
+                return task_type, confidence
+        
         classification_prompt = f"""
 Classify this task into one of these categories: {', '.join(TASK_TYPES)}
 
@@ -4696,7 +5871,7 @@ Categories:
 Respond with just the category name and confidence (0-1), separated by comma.
 Example: code,0.9
 """
-        response = self.query_ai_with_primary_fallback(classification_prompt)
+        response = self.query_ai_with_primary_fallback(classification_prompt, stream=False, cacheable=True)
         if response:
             try:
                 parts = response.strip().split(',')
@@ -4830,18 +6005,29 @@ Please provide a detailed response for this multimedia task. If this involves:
             return TaskResult(True, response, [], task_steps, score=0.7)
         return TaskResult(False, "Failed to process multimedia task", [], task_steps)
     
+    def select_document_context(self, prompt: str, files: List[str], task_steps: List[str]) -> List[str]:
+        """Pick the attached document chunks most relevant to the prompt under the token budget
+        
+        Chunks and embeddings come from the persistent document index, so
+        only new or modified files are read and embedded again.
+        """
+        if self.document_index is None:
+            selection = select_document_chunks(prompt, files, self.config.rag_token_budget,
+                                               self.config.rag_chunk_chars, ChunkSelector(top_k=self.config.rag_top_k))
+        else:
+            selection = self.document_index.select(prompt, files, self.config.rag_token_budget)
+            task_steps.append(f"Loaded {len(files)} documents ({selection.indexed} indexed, {selection.reused} from index)")
+        if selection.chunks:
+            task_steps.append(f"Selected {len(selection.chunks)} of {selection.scanned} document chunks "
+                              f"(~{selection.tokens} tokens)")
+        return [f"Document {chunk.source} (lines {chunk.start_line}-{chunk.end_line}):\n{chunk.text}"
+                for chunk in selection.chunks]
+    
     def execute_rag_task(self, prompt: str, files: List[str]) -> TaskResult:
         task_steps = ["Executing RAG task"]
         document_content = []
         if files:
-            for file_path in files:
-                try:
-                    with open(file_path, 'r', encoding='utf-8', errors='ignore') as f:
-                        content = f.read()
-                        document_content.append(f"Document {Path(file_path).name}:\n{content}")
-                        task_steps.append(f"Loaded document: {Path(file_path).name}")
-                except Exception as e:
-                    logging.error(f"Failed to read document {file_path}: {e}")
+            document_content = self.select_document_context(prompt, files, task_steps)
         
         rag_prompt = f"""
 {prompt}
@@ -4928,6 +6114,13 @@ Generate practical, executable automation solutions.
             return TaskResult(True, response, [], task_steps, score=0.7)
         return TaskResult(False, "Failed to process automation task", [], task_steps)
     
+    def profile_csv_file(self, file_path: str):
+        """Column statistics for a CSV file, read in chunks and cached by content hash"""
+        if self.csv_profiles is None:
+            return profile_csv(file_path, chunk_rows=self.config.csv_profile_chunk_rows,
+                               max_rows=self.config.csv_profile_max_rows or None)
+        return self.csv_profiles.get_profile(file_path)
+    
     def execute_analytics_task(self, prompt: str, files: List[str]) -> TaskResult:
         task_steps = ["Executing analytics task"]
         data_info = []
@@ -4935,10 +6128,9 @@ Generate practical, executable automation solutions.
             for file_path in files:
                 if file_path.lower().endswith('.csv'):
                     try:
-                        df = pd.read_csv(file_path)
-                        info = f"CSV {Path(file_path).name}: {df.shape[0]} rows, {df.shape[1]} columns\nColumns: {', '.join(df.columns.tolist())}"
-                        data_info.append(info)
-                        task_steps.append(f"Analyzed CSV: {Path(file_path).name}")
+                        profile = self.profile_csv_file(file_path)
+                        data_info.append(profile.summary())
+                        task_steps.append(f"Profiled CSV: {Path(file_path).name} ({profile.rows} rows)")
                     except Exception as e:
                         logging.error(f"Failed to analyze CSV {file_path}: {e}")
         
@@ -5205,7 +6397,7 @@ Please provide:
                     )
                     
                     # Get autonomous continuation decision
-                    continuation_plan = self.autonomous_continuation_engine.should_continue_autonomous(context)
+                    continuation_plan = self._continuation('should_continue_autonomous', context)
                     
                     if not continuation_plan.should_continue:
                         logging.info(f"Autonomous continuation stopped: {continuation_plan.reasoning}")
@@ -5222,7 +6414,7 @@ Please provide:
                     logging.info(f"Autonomous continuation triggered (iteration {continue_count}): {continuation_plan.continuation_type.value}")
                     
                     # Generate intelligent enhancement prompt
-                    enhancement_prompt = self.autonomous_continuation_engine.generate_enhancement_prompt(continuation_plan, context)
+                    enhancement_prompt = self._continuation('generate_enhancement_prompt', continuation_plan, context)
                     
                     log_activity(
                         ActivityType.TASK_START,
@@ -5296,8 +6488,8 @@ Please provide:
                             model_type="claude" if hasattr(self, 'claude') else "ollama"
                         )
                         
-                        self.autonomous_continuation_engine.update_from_result(
-                            continuation_plan, updated_context, new_result.result, new_result.generated_files or []
+                        self._continuation(
+                            'update_from_result', continuation_plan, updated_context, new_result.result, new_result.generated_files or []
                         )
                         
                         accumulated_result += f"\n\n--- {continuation_plan.continuation_type.value.title()} Enhancement {continue_count} ---\n\n{new_result.result}"
@@ -5424,10 +6616,13 @@ Please provide:
                 "files": files,
                 "generated_files": result.generated_files,
                 "score": result.score,
+                "success": result.success,
                 "execution_time": result.execution_time,
                 "timestamp": time.time()
             }
             self.memory.save_task(task_data)
+            if self.local_classifier:
+                self.local_classifier.learn(prompt, task_type)
         
         # Restore original temperature setting
         self.config.temperature = original_temperature
@@ -5832,10 +7027,117 @@ Please provide:
         else:
             return None
 
+class TaskExecutionEngine:
+    """Bounded worker pool that runs queued tasks concurrently
+    
+    Jobs wait in a priority queue and are picked up by up to ``max_workers``
+    threads, each running tasks on its own ``TaskProcessor.spawn_worker()``.
+    Model requests from all workers share the processor's per-backend
+    concurrency limits, so extra workers overlap Claude calls, file handling
+    and memory work without overloading a single local Ollama.
+    """
+    def __init__(self, processor: TaskProcessor, max_workers: int = 3):
+        self.processor = processor
+        self.max_workers = max(1, max_workers)
+        self.jobs = queue.PriorityQueue()
+        self.sequence = itertools.count()
+        self.workers = []
+        self.active_processors = []
+        self.lock = threading.Lock()
+        self.shutting_down = False
+        self.running = 0
+        self.stats = {'submitted': 0, 'completed': 0, 'failed': 0, 'cancelled': 0}
+    
+    def submit(self, prompt: str, files: Optional[List[str]] = None, task_type: str = None,
+               priority: int = 0, **options) -> Future:
+        """Queue a task and return a Future for its TaskResult"""
+        future = Future()
+        with self.lock:
+            if self.shutting_down:
+                raise RuntimeError("Task execution engine is shut down")
+            self.stats['submitted'] += 1
+            # Lower tuples come out first: negate priority, then keep FIFO order
+            self.jobs.put((-priority, next(self.sequence), future, prompt, files or [], task_type, options))
+            if len(self.workers) < self.max_workers:
+                worker = threading.Thread(target=self._worker_loop, daemon=True,
+                                          name=f"task-worker-{len(self.workers) + 1}")
+                self.workers.append(worker)
+                worker.start()
+        return future
+    
+    def _worker_loop(self):
+        processor = self.processor.spawn_worker()
+        with self.lock:
+            self.active_processors.append(processor)
+        while True:
+            _, _, future, *task = self.jobs.get()
+            if future is None:
+                break
+            prompt, files, task_type, options = task
+            if not future.set_running_or_notify_cancel():
+                with self.lock:
+                    self.stats['cancelled'] += 1
+                continue
+            with self.lock:
+                self.running += 1
+            processor.reset_stop_flag()
+            result, error = None, None
+            try:
+                result = processor.process_task(prompt, files, task_type, **options)
+            except Exception as e:
+                logging.error(f"Queued task failed: {e}", exc_info=True)
+                error = e
+            with self.lock:
+                self.running -= 1
+                self.stats['completed' if result and result.success else 'failed'] += 1
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+    
+    def request_stop(self):
+        """Interrupt the tasks currently running on every worker"""
+        with self.lock:
+            for processor in self.active_processors:
+                processor.request_stop()
+    
+    def shutdown(self, wait: bool = True, cancel_pending: bool = False):
+        """Stop accepting tasks and let the workers exit once the queue drains"""
+        with self.lock:
+            self.shutting_down = True
+            workers = list(self.workers)
+        if cancel_pending:
+            while True:
+                try:
+                    job = self.jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if job[2].cancel():
+                    with self.lock:
+                        self.stats['cancelled'] += 1
+            self.request_stop()
+        for _ in workers:
+            # None sorts after every job, so workers finish queued tasks first
+            self.jobs.put((float('inf'), next(self.sequence), None))
+        if wait:
+            for worker in workers:
+                worker.join()
+    
+    def get_stats(self) -> Dict[str, int]:
+        """Report queue depth, running workers and job outcomes"""
+        with self.lock:
+            stats = dict(self.stats)
+            stats['workers'] = len(self.workers)
+            stats['running'] = self.running
+        stats['queued'] = self.jobs.qsize()
+        return stats
+
 class TaskThread(QThread):
     """Thread for processing tasks asynchronously"""
     result_signal = pyqtSignal(TaskResult)
     progress_signal = pyqtSignal(int)
+    stream_signal = pyqtSignal(str)
+    stream_retract_signal = pyqtSignal(str)
     
     def __init__(self, processor: TaskProcessor, prompt: str, files: List[str], task_type: str = None, use_memory: bool = True, auto_continue: bool = False, max_continues: int = 10, autonomous_mode: bool = False):
         super().__init__()
@@ -5876,6 +7178,10 @@ class TaskThread(QThread):
                 self.result_signal.emit(TaskResult(False, "Task cancelled", [], ["Task cancelled by user"]))
                 return
             
+            # Forward streamed response text to the results panel as it arrives
+            self.processor.stream_callback = self.stream_signal.emit
+            self.processor.stream_retract_callback = self.stream_retract_signal.emit
+            
             result = self.processor.process_task(
                 self.prompt, 
                 self.files, 
@@ -5890,6 +7196,25 @@ class TaskThread(QThread):
         except Exception as e:
             logging.error(f"TaskThread error: {e}", exc_info=True)
             self.result_signal.emit(TaskResult(False, f"Error: {e}", [], ["Task execution failed"]))
+        finally:
+            self.processor.stream_callback = None
+            self.processor.stream_retract_callback = None
+
+class MemorySnapshotThread(QThread):
+    """Thread for exporting or importing a memory snapshot off the GUI thread"""
+    result_signal = pyqtSignal(object)  # SnapshotStats, or None if the memory store was not ready
+    error_signal = pyqtSignal(str)
+    
+    def __init__(self, operation: Callable[[], Optional[SnapshotStats]]):
+        super().__init__()
+        self.operation = operation
+    
+    def run(self):
+        try:
+            self.result_signal.emit(self.operation())
+        except Exception as e:
+            logging.error(f"Memory snapshot failed: {e}", exc_info=True)
+            self.error_signal.emit(str(e))
 
 class ExploreThread(QThread):
     """Thread for autonomous exploration mode"""
@@ -7319,6 +8644,9 @@ Generate a sophisticated meta-enhancement that will make future enhancements mor
 
 class SettingsDialog(QDialog):
     """Modern settings configuration dialog with updated design"""
+    # Seconds a snapshot export/import waits for the memory store to finish opening
+    SNAPSHOT_READY_TIMEOUT = 30.0
+    
     def __init__(self, parent=None):
         super().__init__(parent)
         self.setWindowTitle("⚙️ SuperMini Settings")
@@ -7552,6 +8880,11 @@ class SettingsDialog(QDialog):
         primary_layout.addWidget(primary_label)
         primary_layout.addWidget(self.primary_model)
         
+        self.hedge_requests = QCheckBox("Race the backup model when the primary is slow")
+        self.hedge_requests.setChecked(False)
+        self.hedge_requests.setToolTip("Start the backup model in parallel once the primary exceeds its usual (p95) latency and use whichever answers first")
+        primary_layout.addWidget(self.hedge_requests)
+        
         model_selection_layout.addLayout(primary_layout)
         model_selection_group.setLayout(model_selection_layout)
         
@@ -7718,6 +9051,18 @@ class SettingsDialog(QDialog):
         tokens_layout.addWidget(tokens_label)
         tokens_layout.addWidget(self.max_tokens)
         
+        # Streaming
+        self.stream_responses = QCheckBox("Stream responses as they are generated")
+        self.stream_responses.setChecked(True)
+        self.stream_responses.setToolTip("Show AI output incrementally in the results panel instead of waiting for the full response")
+        tokens_layout.addWidget(self.stream_responses)
+        
+        # Response cache
+        self.response_cache = QCheckBox("Cache responses to repeated prompts")
+        self.response_cache.setChecked(True)
+        self.response_cache.setToolTip("Reuse stored answers for identical low-temperature prompts instead of querying the model again")
+        tokens_layout.addWidget(self.response_cache)
+        
         # Autonomous Intelligence Status
         ai_status_layout = QVBoxLayout()
         ai_status_layout.setSpacing(8)
@@ -7812,6 +9157,15 @@ class SettingsDialog(QDialog):
             self.export_memory
         )
         
+        import_memory_btn = self.parent().create_button(
+            "Import Memory",
+            "📥",
+            "secondary",
+            "Import memory data from a snapshot file",
+            120,
+            self.import_memory
+        )
+        
         clear_memory_btn = self.parent().create_button(
             "Clear All Memory",
             ModernIcons.ACTIONS['delete'],
@@ -7823,6 +9177,7 @@ class SettingsDialog(QDialog):
         
         actions_layout.addWidget(view_memory_btn)
         actions_layout.addWidget(export_memory_btn)
+        actions_layout.addWidget(import_memory_btn)
         actions_layout.addWidget(clear_memory_btn)
         
         memory_layout.addLayout(status_layout)
@@ -8077,9 +9432,66 @@ Visit https://ollama.ai/library for more models."""
         QMessageBox.information(self, "Memory Statistics", "Memory statistics feature coming soon!")
     
     def export_memory(self):
-        """Export memory data"""
-        # This would export memory data
-        QMessageBox.information(self, "Export Memory", "Memory export feature coming soon!")
+        """Export memory data to a snapshot file"""
+        memory = getattr(self.parent(), 'memory', None)
+        if not memory or not memory.available:
+            QMessageBox.warning(self, "Export Memory", "Memory system is not available")
+            return
+        file_path, _ = QFileDialog.getSaveFileName(
+            self, "Export Memory", f"supermini_memory{default_snapshot_suffix()}",
+            "Memory Snapshots (*.parquet *.jsonl.gz);;All Files (*)"
+        )
+        if file_path:
+            self._run_snapshot(
+                "Export Memory", "Exporting memories...",
+                lambda: memory.export_snapshot(Path(file_path), ready_timeout=self.SNAPSHOT_READY_TIMEOUT),
+                lambda stats: f"Exported {stats.records} memories to {file_path} in {stats.duration:.1f}s"
+            )
+    
+    def import_memory(self):
+        """Import memory data from a snapshot file"""
+        memory = getattr(self.parent(), 'memory', None)
+        if not memory or not memory.available:
+            QMessageBox.warning(self, "Import Memory", "Memory system is not available")
+            return
+        file_path, _ = QFileDialog.getOpenFileName(
+            self, "Import Memory", "", "Memory Snapshots (*.parquet *.jsonl.gz);;All Files (*)"
+        )
+        if file_path:
+            self._run_snapshot(
+                "Import Memory", "Importing memories...",
+                lambda: memory.import_snapshot(Path(file_path), ready_timeout=self.SNAPSHOT_READY_TIMEOUT),
+                lambda stats: f"Imported {stats.records} memories in {stats.duration:.1f}s"
+            )
+    
+    def _run_snapshot(self, title: str, label: str, operation: Callable[[], Optional[SnapshotStats]],
+                      describe: Callable[[SnapshotStats], str]):
+        """Run a snapshot export or import on a worker thread behind a busy progress dialog"""
+        running = getattr(self, 'snapshot_thread', None)
+        if running is not None and running.isRunning():
+            QMessageBox.information(self, title, "A memory export or import is already running")
+            return
+        progress = QProgressDialog(label, None, 0, 0, self)
+        progress.setWindowTitle(title)
+        progress.setWindowModality(Qt.WindowModality.WindowModal)
+        progress.setMinimumDuration(0)
+        
+        def finished(stats: Optional[SnapshotStats]):
+            progress.close()
+            if stats is None:
+                QMessageBox.warning(self, title, f"Memory system was not ready within {self.SNAPSHOT_READY_TIMEOUT:.0f}s")
+            else:
+                QMessageBox.information(self, title, describe(stats))
+        
+        def failed(message: str):
+            progress.close()
+            QMessageBox.warning(self, f"{title} Error", f"Failed to {title.split()[0].lower()} memory: {message}")
+        
+        self.snapshot_thread = MemorySnapshotThread(operation)
+        self.snapshot_thread.result_signal.connect(finished)
+        self.snapshot_thread.error_signal.connect(failed)
+        self.snapshot_thread.start()
+        progress.show()
     
     def open_output_directory(self):
         """Open output directory"""
@@ -8146,6 +9558,12 @@ Visit https://ollama.ai/library for more models."""
         
         # Generation
         self.max_tokens.setValue(settings.value("max_tokens", 4096, type=int))
+        if hasattr(self, 'stream_responses'):
+            self.stream_responses.setChecked(settings.value("stream_responses", True, type=bool))
+        if hasattr(self, 'hedge_requests'):
+            self.hedge_requests.setChecked(settings.value("hedge_requests", False, type=bool))
+        if hasattr(self, 'response_cache'):
+            self.response_cache.setChecked(settings.value("response_cache", True, type=bool))
         # Temperature is now automatically managed by task intelligence
         if hasattr(self, 'memory_limit'):
             self.memory_limit.setValue(settings.value("memory_limit", 100, type=int))
@@ -8173,6 +9591,12 @@ Visit https://ollama.ai/library for more models."""
         
         # Generation
         settings.setValue("max_tokens", self.max_tokens.value())
+        if hasattr(self, 'stream_responses'):
+            settings.setValue("stream_responses", self.stream_responses.isChecked())
+        if hasattr(self, 'hedge_requests'):
+            settings.setValue("hedge_requests", self.hedge_requests.isChecked())
+        if hasattr(self, 'response_cache'):
+            settings.setValue("response_cache", self.response_cache.isChecked())
         # Temperature is now automatically managed by task intelligence
         
         # Save new settings
@@ -8221,6 +9645,7 @@ class SystemMonitor(QThread):
     def __init__(self):
         super().__init__()
         self.running = True
+        self.memory = None  # MemoryManager whose write queue is reported, set by the main window
         self.start_time = time.time()
         self.last_network_check = time.time()
         self.last_network_stats = None
@@ -8239,7 +9664,9 @@ class SystemMonitor(QThread):
             'safety_checks': 0,
             'successful_tasks': 0,
             'failed_tasks': 0,
-            'auto_continues': 0
+            'auto_continues': 0,
+            'response_cache_hits': 0,
+            'response_cache_misses': 0
         }
         
         # Performance history for trends
@@ -8251,6 +9678,9 @@ class SystemMonitor(QThread):
             'timestamps': []
         }
         self.max_history = 60  # Keep last 60 data points (2 minutes at 2s intervals)
+        
+        # Time-to-first-token samples from streaming queries, as (provider, seconds)
+        self.first_token_latencies = []
     
     def update_stats(self, stat_type: str, value: int = 1):
         """Update monitoring statistics"""
@@ -8262,6 +9692,23 @@ class SystemMonitor(QThread):
             else:
                 self.stats[stat_type] += value
     
+    def log_time_to_first_token(self, provider: str, seconds: float):
+        """Record how long a streaming query took to produce its first token"""
+        self.first_token_latencies.append((provider, seconds))
+        if len(self.first_token_latencies) > self.max_history:
+            self.first_token_latencies = self.first_token_latencies[-self.max_history:]
+    
+    def get_first_token_stats(self) -> Dict[str, float]:
+        """Summarize recent time-to-first-token samples"""
+        samples = [seconds for _, seconds in self.first_token_latencies]
+        if not samples:
+            return {'avg_time_to_first_token': 0.0, 'last_time_to_first_token': 0.0, 'streamed_responses': 0}
+        return {
+            'avg_time_to_first_token': sum(samples) / len(samples),
+            'last_time_to_first_token': samples[-1],
+            'streamed_responses': len(samples)
+        }
+    
     def get_elapsed_time(self) -> str:
         """Get formatted elapsed time since monitoring started"""
         elapsed = int(time.time() - self.start_time)
@@ -8546,6 +9993,10 @@ class SystemMonitor(QThread):
                     'successful_tasks': self.stats['successful_tasks'],
                     'failed_tasks': self.stats['failed_tasks'],
                     'auto_continues': self.stats['auto_continues'],
+                    'response_cache_hits': self.stats['response_cache_hits'],
+                    'response_cache_misses': self.stats['response_cache_misses'],
+                    'response_cache_hit_rate': (self.stats['response_cache_hits'] /
+                                                max(1, self.stats['response_cache_hits'] + self.stats['response_cache_misses'])),
                     
                     # Calculate rates
                     'prompts_per_hour': (self.stats['total_prompts'] / max(1, (time.time() - self.start_time) / 3600)),
@@ -8564,6 +10015,16 @@ class SystemMonitor(QThread):
                     'avg_memory': sum(self.performance_history['memory'][-10:]) / max(1, len(self.performance_history['memory'][-10:])),
                 }
                 
+                # Streaming latency
+                metrics.update(self.get_first_token_stats())
+                
+                # HTTP keep-alive connection reuse
+                metrics.update(SafeRequests.get_connection_stats())
+                
+                # Write-behind memory queue and retrieval cache
+                if self.memory is not None:
+                    metrics.update(self.memory.get_stats())
+                
                 # Add system health score
                 health_score, health_status = self.get_system_health_score(metrics)
                 metrics['health_score'] = health_score
@@ -8625,6 +10086,7 @@ class SystemMonitor(QThread):
             'memory_items': 0,
             'task_types': {t: 0 for t in TASK_TYPES}
         }
+        self.first_token_latencies = []
 
 # Enhanced monitoring display in SuperMiniMainWindow
 def create_control_panel(self) -> QWidget:
@@ -9167,7 +10629,10 @@ class SuperMiniMainWindow(QMainWindow):
             ollama_url=settings.value("ollama_url", "http://localhost:11434"),
             ollama_model=settings.value("ollama_model", "qwen2.5-coder:7b"),
             max_tokens=settings.value("max_tokens", 4096, type=int),
-            temperature=settings.value("temperature", 70, type=int) / 100.0
+            temperature=settings.value("temperature", 70, type=int) / 100.0,
+            stream_responses=settings.value("stream_responses", True, type=bool),
+            hedge_requests=settings.value("hedge_requests", False, type=bool),
+            response_cache=settings.value("response_cache", True, type=bool)
         )
         
         # Load theme preference
@@ -9185,6 +10650,9 @@ class SuperMiniMainWindow(QMainWindow):
         settings.setValue("ollama_model", self.config.ollama_model)
         settings.setValue("max_tokens", self.config.max_tokens)
         settings.setValue("temperature", int(self.config.temperature * 100))
+        settings.setValue("stream_responses", self.config.stream_responses)
+        settings.setValue("hedge_requests", self.config.hedge_requests)
+        settings.setValue("response_cache", self.config.response_cache)
         settings.setValue("theme", ModernTheme.get_current_theme())
     
     def toggle_theme(self):
@@ -9257,9 +10725,11 @@ class SuperMiniMainWindow(QMainWindow):
             'task_execution_times': []
         }
         
-        self.memory = MemoryManager(self.data_dir)
+        self.memory = create_memory_manager(self.config, self.data_dir)
         # Pass monitor to TaskProcessor so AI managers can log metrics
         monitor = getattr(self, 'monitor', None)
+        if monitor:
+            monitor.memory = self.memory
         self.processor = TaskProcessor(self.config, self.memory, self.data_dir, monitor, self.update_ai_metrics)
         
         # Initialize enhancement processor for self-improvement mode
@@ -12960,6 +14430,8 @@ class SuperMiniMainWindow(QMainWindow):
         )
         
         self.task_thread.progress_signal.connect(self.update_progress)
+        self.task_thread.stream_signal.connect(self.append_stream_chunk)
+        self.task_thread.stream_retract_signal.connect(self.retract_stream_text)
         self.task_thread.result_signal.connect(self.display_task_result)
         self.task_thread.finished.connect(self.task_finished)
         self.task_thread.start()
@@ -15638,7 +17110,8 @@ class SuperMiniMainWindow(QMainWindow):
         except Exception as e:
             logging.error(f"Error refreshing dashboard display: {e}")
     
-    def update_ai_metrics(self, task_type: str = None, response_time: float = 0, tokens_used: int = 0):
+    def update_ai_metrics(self, task_type: str = None, response_time: float = 0, tokens_used: int = 0,
+                          time_to_first_token: float = None):
         """Update AI metrics display in real-time"""
         try:
             current_time = time.time()
@@ -15648,6 +17121,15 @@ class SuperMiniMainWindow(QMainWindow):
             self.ai_metrics['response_times'].append(response_time)
             self.ai_metrics['token_usage'].append(tokens_used)
             
+            # Streaming queries report time-to-first-token separately from total response time
+            if time_to_first_token is not None:
+                ttft_samples = self.ai_metrics.setdefault('first_token_times', [])
+                ttft_samples.append(time_to_first_token)
+                self.ai_metrics['first_token_times'] = ttft_samples[-100:]
+                self.ai_metrics['avg_time_to_first_token'] = (
+                    sum(self.ai_metrics['first_token_times']) / len(self.ai_metrics['first_token_times'])
+                )
+            
             # Update counters
             self.ai_metrics['task_count'] += 1
             self.ai_metrics['total_tokens'] += tokens_used
@@ -15858,6 +17340,8 @@ class SuperMiniMainWindow(QMainWindow):
         )
         
         self.task_thread.progress_signal.connect(self.update_progress)
+        self.task_thread.stream_signal.connect(self.append_stream_chunk)
+        self.task_thread.stream_retract_signal.connect(self.retract_stream_text)
         self.task_thread.result_signal.connect(self.display_task_result)
         self.task_thread.finished.connect(self.task_finished)
         self.task_thread.start()
@@ -16034,6 +17518,25 @@ class SuperMiniMainWindow(QMainWindow):
             self.progress_bar.setValue(value)
     
 
+    def append_stream_chunk(self, chunk: str):
+        """Append streamed response text to the results panel while a task runs"""
+        if not hasattr(self, 'results_text'):
+            return
+        self.results_text.moveCursor(QTextCursor.MoveOperation.End)
+        self.results_text.insertPlainText(chunk)
+        self.results_text.ensureCursorVisible()
+    
+    def retract_stream_text(self, text: str):
+        """Remove partial streamed text left by a model that failed mid-response"""
+        if not hasattr(self, 'results_text') or not self.results_text.toPlainText().endswith(text):
+            return
+        cursor = self.results_text.textCursor()
+        cursor.movePosition(QTextCursor.MoveOperation.End)
+        end = cursor.position()
+        # Document positions count UTF-16 code units
+        cursor.setPosition(end - len(text.encode('utf-16-le')) // 2, QTextCursor.MoveMode.KeepAnchor)
+        cursor.removeSelectedText()
+    
     def display_task_result(self, result: TaskResult):
         """Display task result in the results panel with modern formatting"""
         # Update results tab with enhanced HTML formatting
@@ -16525,6 +18028,71 @@ class SuperMiniMainWindow(QMainWindow):
                             </div>
                         </div>
                         
+                        <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
+                                    border-left: 4px solid {ModernTheme.get_colors()['info']};'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <div>
+                                    <h4 style='margin: 0; color: {ModernTheme.get_colors()['text_primary']};'>⚡ Time to First Token</h4>
+                                    <p style='margin: 2px 0 0 0; color: {ModernTheme.get_colors()['text_muted']}; font-size: 12px;'>Average over {metrics.get('streamed_responses', 0)} streamed responses</p>
+                                </div>
+                                <div style='text-align: right;'>
+                                    <div style='font-size: 24px; font-weight: 600; color: {ModernTheme.get_colors()['info']};'>{metrics.get('avg_time_to_first_token', 0.0):.2f}s</div>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
+                                    border-left: 4px solid {ModernTheme.get_colors()['info']};'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <div>
+                                    <h4 style='margin: 0; color: {ModernTheme.get_colors()['text_primary']};'>🔌 Connection Reuse</h4>
+                                    <p style='margin: 2px 0 0 0; color: {ModernTheme.get_colors()['text_muted']}; font-size: 12px;'>{metrics.get('http_connections_reused', 0)} reused / {metrics.get('http_connections_opened', 0)} opened</p>
+                                </div>
+                                <div style='text-align: right;'>
+                                    <div style='font-size: 24px; font-weight: 600; color: {ModernTheme.get_colors()['info']};'>{metrics.get('http_reuse_rate', 0.0) * 100:.0f}%</div>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
+                                    border-left: 4px solid {ModernTheme.get_colors()['success']};'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <div>
+                                    <h4 style='margin: 0; color: {ModernTheme.get_colors()['text_primary']};'>💾 Response Cache</h4>
+                                    <p style='margin: 2px 0 0 0; color: {ModernTheme.get_colors()['text_muted']}; font-size: 12px;'>{metrics.get('response_cache_hits', 0)} hits / {metrics.get('response_cache_misses', 0)} misses</p>
+                                </div>
+                                <div style='text-align: right;'>
+                                    <div style='font-size: 24px; font-weight: 600; color: {ModernTheme.get_colors()['success']};'>{metrics.get('response_cache_hit_rate', 0.0) * 100:.0f}%</div>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
+                                    border-left: 4px solid {ModernTheme.get_colors()['info']};'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <div>
+                                    <h4 style='margin: 0; color: {ModernTheme.get_colors()['text_primary']};'>🧠 Memory Writes</h4>
+                                    <p style='margin: 2px 0 0 0; color: {ModernTheme.get_colors()['text_muted']}; font-size: 12px;'>{metrics.get('memory_records_written', 0)} written in {metrics.get('memory_batches_written', 0)} batches, {metrics.get('memory_write_failures', 0)} failed</p>
+                                </div>
+                                <div style='text-align: right;'>
+                                    <div style='font-size: 24px; font-weight: 600; color: {ModernTheme.get_colors()['info']};'>{metrics.get('memory_queue_depth', 0)} queued</div>
+                                </div>
+                            </div>
+                        </div>
+                        
+                        <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
+                                    border-left: 4px solid {ModernTheme.get_colors()['info']};'>
+                            <div style='display: flex; justify-content: space-between; align-items: center;'>
+                                <div>
+                                    <h4 style='margin: 0; color: {ModernTheme.get_colors()['text_primary']};'>🔎 Memory Retrieval Cache</h4>
+                                    <p style='margin: 2px 0 0 0; color: {ModernTheme.get_colors()['text_muted']}; font-size: 12px;'>{metrics.get('retrieval_cache_exact_hits', 0)} exact / {metrics.get('retrieval_cache_similar_hits', 0)} similar hits, {metrics.get('retrieval_cache_misses', 0)} misses</p>
+                                </div>
+                                <div style='text-align: right;'>
+                                    <div style='font-size: 24px; font-weight: 600; color: {ModernTheme.get_colors()['info']};'>{metrics.get('retrieval_cache_hit_rate', 0.0) * 100:.0f}%</div>
+                                </div>
+                            </div>
+                        </div>
+                        
                         <div style='background-color: {ModernTheme.get_colors()['bg_secondary']}; padding: 16px; border-radius: 8px; 
                                     border-left: 4px solid {ModernTheme.get_colors()['info']};'>
                             <div style='display: flex; justify-content: space-between; align-items: center;'>
@@ -16559,7 +18127,151 @@ class SuperMiniMainWindow(QMainWindow):
         except:
             return ModernTheme.get_colors()['text_muted']
 
+def load_batch_manifest(manifest_path: Path) -> List[Dict[str, Any]]:
+    """Read batch jobs from a JSONL manifest of {prompt, files, task_type} objects
+    
+    Jobs without an ``id`` are numbered by their line in the manifest, so
+    the ids stay stable across resumed runs.
+    """
+    jobs = []
+    with open(manifest_path, 'r', encoding='utf-8') as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            try:
+                job = json.loads(line)
+            except json.JSONDecodeError as e:
+                logging.error(f"Skipping invalid manifest line {line_number}: {e}")
+                continue
+            if not isinstance(job, dict) or not job.get('prompt'):
+                logging.error(f"Skipping manifest line {line_number}: a 'prompt' is required")
+                continue
+            job.setdefault('id', f"line-{line_number}")
+            job['id'] = str(job['id'])
+            job['files'] = job.get('files') or []
+            if job.get('task_type') not in TASK_TYPES:
+                job['task_type'] = None
+            jobs.append(job)
+    return jobs
+
+def load_batch_checkpoint(output_path: Path) -> set:
+    """Get the ids of jobs that already succeeded in an earlier run"""
+    completed = set()
+    if not output_path.exists():
+        return completed
+    with open(output_path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from an interrupted run
+            if record.get('success'):
+                completed.add(str(record.get('id')))
+    return completed
+
+def batch_record(job: Dict[str, Any], result: Optional[TaskResult] = None, error: Optional[Exception] = None) -> Dict[str, Any]:
+    """Build the output JSONL record for a finished batch job"""
+    record = {
+        'id': job['id'],
+        'prompt': job['prompt'],
+        'task_type': job.get('task_type'),
+        'finished_at': time.time()
+    }
+    if result is not None:
+        record.update({
+            'success': result.success,
+            'result': result.result,
+            'generated_files': result.generated_files,
+            'task_steps': result.task_steps,
+            'score': result.score,
+            'execution_time': result.execution_time
+        })
+    else:
+        record.update({'success': False, 'error': str(error)})
+    return record
+
+def run_batch(argv: List[str]) -> int:
+    """Process a JSONL manifest of tasks headlessly and stream results to JSONL
+    
+    No QApplication or window is created, so batch mode runs without a
+    display. Returns a process exit code: 0 if every job succeeded.
+    """
+    parser = argparse.ArgumentParser(prog="supermini.py batch", description="Run a manifest of SuperMini tasks headlessly")
+    parser.add_argument("manifest", type=Path, help="JSONL file with one {prompt, files, task_type} object per line")
+    parser.add_argument("-o", "--output", type=Path, help="JSONL file results are appended to (default: <manifest>.results.jsonl)")
+    parser.add_argument("--resume", action="store_true", help="Skip jobs that already succeeded in the output file")
+    parser.add_argument("-w", "--workers", type=int, default=AIConfig.max_concurrent_tasks, help="Tasks to run concurrently")
+    parser.add_argument("--output-dir", type=Path, default=Path.home() / "SuperMini_Output", help="Base directory for generated files and memory")
+    parser.add_argument("--primary", choices=["claude", "ollama"], default="claude", help="Primary model; the other is the backup")
+    parser.add_argument("--ollama-url", default=AIConfig.ollama_url)
+    parser.add_argument("--ollama-model", default=AIConfig.ollama_model)
+    parser.add_argument("--max-tokens", type=int, default=AIConfig.max_tokens)
+    parser.add_argument("--auto-continue", action="store_true", help="Let tasks auto-continue like in the app")
+    parser.add_argument("--no-memory", action="store_true", help="Neither read from nor save to task memory")
+    args = parser.parse_args(argv)
+    
+    output_path = args.output or args.manifest.with_suffix(".results.jsonl")
+    jobs = load_batch_manifest(args.manifest)
+    if args.resume:
+        completed = load_batch_checkpoint(output_path)
+        skipped = sum(1 for job in jobs if job['id'] in completed)
+        jobs = [job for job in jobs if job['id'] not in completed]
+        logging.info(f"Resuming batch: {skipped} jobs already done, {len(jobs)} remaining")
+    elif output_path.exists():
+        output_path.unlink()
+    if not jobs:
+        print(f"Nothing to do; results are in {output_path}")
+        return 0
+    
+    api_key = os.environ.get("ANTHROPIC_API_KEY", "")
+    config = AIConfig(
+        primary_model="Claude API (Recommended)" if args.primary == "claude" else "Local Ollama Models",
+        use_claude=bool(api_key),
+        claude_api_key=api_key,
+        ollama_url=args.ollama_url,
+        ollama_model=args.ollama_model,
+        max_tokens=args.max_tokens,
+        stream_responses=False,
+        max_concurrent_tasks=args.workers
+    )
+    data_dir = args.output_dir / "data"
+    data_dir.mkdir(parents=True, exist_ok=True)
+    memory = create_memory_manager(config, data_dir)
+    processor = TaskProcessor(config, memory, data_dir)
+    
+    futures = {
+        processor.submit(job['prompt'], job['files'], job['task_type'],
+                         use_memory=not args.no_memory, auto_continue=args.auto_continue): job
+        for job in jobs
+    }
+    succeeded = 0
+    try:
+        with open(output_path, 'a', encoding='utf-8') as output:
+            for done, future in enumerate(as_completed(futures), 1):
+                job = futures[future]
+                try:
+                    record = batch_record(job, result=future.result())
+                except Exception as e:
+                    record = batch_record(job, error=e)
+                output.write(json.dumps(record) + "\n")
+                output.flush()
+                succeeded += bool(record['success'])
+                print(f"[{done}/{len(jobs)}] {job['id']}: {'ok' if record['success'] else 'failed'}", flush=True)
+    except KeyboardInterrupt:
+        print("Interrupted; rerun with --resume to continue", file=sys.stderr)
+        processor.execution_engine.shutdown(wait=False, cancel_pending=True)
+        memory.close()
+        return 130
+    
+    processor.execution_engine.shutdown()
+    memory.close()
+    print(f"{succeeded}/{len(jobs)} jobs succeeded; results in {output_path}")
+    return 0 if succeeded == len(jobs) else 1
+
 def main():
+    if len(sys.argv) > 1 and sys.argv[1] == "batch":
+        sys.exit(run_batch(sys.argv[2:]))
+    
     # PyQt6 Note: High DPI scaling is enabled by default
     # The following attributes were removed in PyQt6:
     # - AA_EnableHighDpiScaling (always enabled)
@@ -16573,6 +18285,7 @@ def main():
     ModernTheme.initialize_scaling(app)
     
     window = SuperMiniMainWindow()
+    app.aboutToQuit.connect(window.memory.close)
     window.show()
     sys.exit(app.exec())
 
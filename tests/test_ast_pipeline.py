@@ -0,0 +1,120 @@
+"""
+Tests for the single-pass AST pipeline and the per-run parse cache.
+"""
+import ast
+import pytest
+
+from src.core.ast_pipeline import AnalysisPass, ASTPipeline, CyclomaticComplexity, ParseCache, parse_source
+
+SOURCE = '''
+def outer(items):
+    for item in items:
+        if item and item.ready or item.forced:
+            while item.pending:
+                item.step()
+    try:
+        return [x for x in items]
+    except ValueError:
+        return []
+
+class Holder:
+    def method(self):
+        return outer([])
+'''
+
+
+class _Recorder(AnalysisPass):
+    """Records the order hooks fire in"""
+
+    def __init__(self):
+        self.events = []
+
+    def visit_FunctionDef(self, node):
+        self.events.append(('enter', node.name))
+
+    def leave_FunctionDef(self, node):
+        self.events.append(('leave', node.name))
+
+    def visit_Call(self, node):
+        self.events.append(('call', getattr(node.func, 'attr', getattr(node.func, 'id', None))))
+
+
+class _Broken(AnalysisPass):
+    def visit_If(self, node):
+        raise RuntimeError("boom")
+
+
+class TestASTPipeline:
+    """Test hook dispatch over a single walk."""
+
+    @pytest.mark.unit
+    def test_order_matches_node_visitor(self):
+        tree = ast.parse(SOURCE)
+        expected = []
+
+        class Visitor(ast.NodeVisitor):
+            def generic_visit(self, node):
+                expected.append(type(node).__name__)
+                super().generic_visit(node)
+
+        Visitor().visit(tree)
+
+        class Everything(AnalysisPass):
+            def __init__(self):
+                self.seen = []
+
+        everything = Everything()
+        for name in set(expected):
+            setattr(everything, 'visit_' + name, lambda node: everything.seen.append(type(node).__name__))
+        ASTPipeline([everything]).run(tree)
+
+        assert everything.seen == expected
+
+    @pytest.mark.unit
+    def test_leave_hooks_follow_children(self):
+        recorder = _Recorder().visit(ast.parse(SOURCE))
+        assert recorder.events == [
+            ('enter', 'outer'), ('call', 'step'), ('leave', 'outer'),
+            ('enter', 'method'), ('call', 'outer'), ('leave', 'method'),
+        ]
+
+    @pytest.mark.unit
+    def test_failing_pass_does_not_stop_others(self):
+        broken, recorder, complexity = _Broken(), _Recorder(), CyclomaticComplexity()
+        pipeline = ASTPipeline([broken, recorder, complexity])
+        pipeline.run(ast.parse(SOURCE))
+
+        assert list(pipeline.failures) == [broken]
+        assert len(recorder.events) == 6
+        # for, if, while, except, and one extra operand in each of the two bool ops
+        assert complexity.cyclomatic_complexity == 7
+        with pytest.raises(RuntimeError):
+            pipeline.raise_failure()
+
+
+class TestParseCache:
+    """Test sharing parsed trees between analyzers."""
+
+    @pytest.mark.unit
+    def test_unchanged_files_reuse_the_tree(self, tmp_path):
+        path = tmp_path / "module.py"
+        path.write_text(SOURCE)
+        cache = ParseCache()
+
+        first = parse_source(path, cache=cache)
+        assert parse_source(path, cache=cache) is first
+        assert (cache.hits, cache.misses) == (1, 1)
+
+        path.write_text(SOURCE + "\nx = 1\n")
+        changed = cache.get(path)
+        assert changed is not first and changed.content.endswith("x = 1\n")
+        assert parse_source(path).tree is not changed.tree
+
+    @pytest.mark.unit
+    def test_syntax_errors_are_not_cached(self, tmp_path):
+        path = tmp_path / "broken.py"
+        path.write_text("def broken(:\n")
+        cache = ParseCache()
+        with pytest.raises(SyntaxError):
+            cache.get(path)
+        assert cache.entries == {}
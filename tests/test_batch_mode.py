@@ -0,0 +1,107 @@
+"""
+Tests for headless batch processing of task manifests.
+"""
+import json
+import pytest
+from types import SimpleNamespace
+from unittest.mock import Mock, patch
+
+import supermini
+from supermini import TaskProcessor, TaskResult, load_batch_checkpoint, load_batch_manifest, run_batch
+
+
+def _write_manifest(path, jobs):
+    path.write_text("\n".join(json.dumps(job) for job in jobs) + "\n")
+    return path
+
+
+def _fake_processor_factory(calls, fail_prompts=()):
+    def process_task(prompt, files, task_type, **options):
+        calls.append(prompt)
+        if prompt in fail_prompts:
+            return TaskResult(False, "failed", [], ["step"])
+        return TaskResult(True, f"answer: {prompt}", [], ["step"], score=0.9)
+
+    def factory(config, memory, output_dir, *args):
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.config = config
+        processor.stop_requested = False
+        processor.stream_callback = None
+        processor.execution_engine = None
+        processor.claude = SimpleNamespace(config=config, task_processor=processor)
+        processor.ollama = SimpleNamespace(config=config, task_processor=processor)
+        processor.process_task = process_task
+        return processor
+
+    return factory
+
+
+class TestBatchManifest:
+    """Test manifest and checkpoint parsing."""
+
+    @pytest.mark.unit
+    def test_manifest_assigns_ids_and_defaults(self, tmp_path):
+        manifest = tmp_path / "jobs.jsonl"
+        manifest.write_text(
+            json.dumps({"prompt": "one"}) + "\n"
+            + "not json\n"
+            + json.dumps({"prompt": "two", "id": 7, "files": ["a.csv"], "task_type": "analytics"}) + "\n"
+            + json.dumps({"files": []}) + "\n"
+            + json.dumps({"prompt": "three", "task_type": "unknown"}) + "\n"
+        )
+
+        jobs = load_batch_manifest(manifest)
+
+        assert [job['id'] for job in jobs] == ["line-1", "7", "line-5"]
+        assert jobs[0]['files'] == [] and jobs[0]['task_type'] is None
+        assert jobs[1]['task_type'] == "analytics"
+        assert jobs[2]['task_type'] is None
+
+    @pytest.mark.unit
+    def test_checkpoint_only_counts_successes(self, tmp_path):
+        output = tmp_path / "out.jsonl"
+        output.write_text(
+            json.dumps({"id": "a", "success": True}) + "\n"
+            + json.dumps({"id": "b", "success": False}) + "\n"
+            + '{"id": "c", "succ'
+        )
+        assert load_batch_checkpoint(output) == {"a"}
+
+
+class TestRunBatch:
+    """Test running a manifest end to end."""
+
+    @pytest.mark.unit
+    def test_results_streamed_to_output(self, tmp_path):
+        manifest = _write_manifest(tmp_path / "jobs.jsonl", [{"prompt": f"task {i}"} for i in range(4)])
+        output = tmp_path / "results.jsonl"
+        calls = []
+
+        with patch.object(supermini, 'TaskProcessor', _fake_processor_factory(calls)), \
+             patch.object(supermini, 'MemoryManager', Mock()):
+            code = run_batch([str(manifest), "-o", str(output), "--output-dir", str(tmp_path), "-w", "2"])
+
+        records = [json.loads(line) for line in output.read_text().splitlines()]
+        assert code == 0
+        assert sorted(record['id'] for record in records) == [f"line-{i}" for i in range(1, 5)]
+        assert all(record['success'] and record['result'].startswith("answer:") for record in records)
+
+    @pytest.mark.unit
+    def test_resume_skips_completed_jobs(self, tmp_path):
+        manifest = _write_manifest(tmp_path / "jobs.jsonl", [{"prompt": "good"}, {"prompt": "flaky"}])
+        output = tmp_path / "results.jsonl"
+        args = [str(manifest), "-o", str(output), "--output-dir", str(tmp_path)]
+
+        first_calls = []
+        with patch.object(supermini, 'TaskProcessor', _fake_processor_factory(first_calls, fail_prompts={"flaky"})), \
+             patch.object(supermini, 'MemoryManager', Mock()):
+            assert run_batch(args) == 1
+
+        second_calls = []
+        with patch.object(supermini, 'TaskProcessor', _fake_processor_factory(second_calls)), \
+             patch.object(supermini, 'MemoryManager', Mock()):
+            assert run_batch(args + ["--resume"]) == 0
+
+        assert sorted(first_calls) == ["flaky", "good"]
+        assert second_calls == ["flaky"]
+        assert load_batch_checkpoint(output) == {"line-1", "line-2"}
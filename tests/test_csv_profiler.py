@@ -0,0 +1,136 @@
+"""
+Tests for out-of-core CSV profiling and the per-file profile cache.
+"""
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import AIConfig, TaskProcessor
+from src.core.csv_profiler import ColumnStats, CsvProfileCache, profile_csv
+
+
+def _write_csv(path, frame):
+    frame.to_csv(path, index=False)
+    return str(path)
+
+
+def _column(profile, name):
+    return next(column for column in profile.columns if column['name'] == name)
+
+
+class TestProfileCsv:
+    """Test streaming per-column statistics."""
+
+    @pytest.mark.unit
+    def test_chunked_stats_match_full_read(self, tmp_path):
+        rng = np.random.default_rng(1)
+        frame = pd.DataFrame({
+            'amount': rng.normal(100, 15, 5000),
+            'count': rng.integers(0, 50, 5000),
+            'region': rng.choice(['north', 'south', 'east'], 5000),
+        })
+        frame.loc[::10, 'amount'] = np.nan
+        path = _write_csv(tmp_path / "sales.csv", frame)
+
+        profile = profile_csv(path, chunk_rows=700)
+
+        assert profile.rows == 5000
+        assert profile.chunks_read == 8
+        amount = _column(profile, 'amount')
+        assert amount['kind'] == 'float'
+        assert amount['nulls'] == 500
+        assert amount['min'] == pytest.approx(frame['amount'].min())
+        assert amount['max'] == pytest.approx(frame['amount'].max())
+        assert amount['mean'] == pytest.approx(frame['amount'].mean())
+        assert _column(profile, 'count')['kind'] == 'integer'
+        region = _column(profile, 'region')
+        assert region['kind'] == 'string' and region['distinct'] == 3
+        assert 'min' not in region
+
+    @pytest.mark.unit
+    def test_columns_mixed_across_chunks_widen(self, tmp_path):
+        path = tmp_path / "mixed.csv"
+        path.write_text("a,b\n" + "1,1\n" * 5 + "2.5,x\n" + "3,2\n" * 4)
+
+        profile = profile_csv(str(path), chunk_rows=5)
+
+        assert _column(profile, 'a')['kind'] == 'float'
+        b = _column(profile, 'b')
+        assert b['kind'] == 'string' and 'min' not in b
+
+    @pytest.mark.unit
+    def test_max_rows_truncates(self, tmp_path):
+        path = _write_csv(tmp_path / "big.csv", pd.DataFrame({'x': range(1000)}))
+
+        profile = profile_csv(path, chunk_rows=300, max_rows=450)
+
+        assert profile.rows == 450 and profile.truncated
+        assert _column(profile, 'x')['max'] == 449
+        assert profile.summary().startswith("CSV big.csv: 450+ rows, 1 columns")
+
+    @pytest.mark.unit
+    def test_sketches_stay_bounded(self):
+        stats = ColumnStats('x', sample_size=2000, sketch_size=256)
+        values = np.arange(200_000, dtype=np.float64)
+        for start in range(0, len(values), 10_000):
+            stats.update(pd.Series(values[start:start + 10_000]))
+
+        profile = stats.to_dict()
+        assert len(stats._reservoir) == 2000 and len(stats._hashes) == 256
+        assert profile['distinct'] == pytest.approx(200_000, rel=0.2)
+        assert profile['quantiles']['p50'] == pytest.approx(100_000, rel=0.1)
+
+
+class TestCsvProfileCache:
+    """Test reuse of profiles keyed by content hash."""
+
+    @pytest.mark.unit
+    def test_unchanged_file_is_not_reprofiled(self, tmp_path):
+        path = _write_csv(tmp_path / "data.csv", pd.DataFrame({'x': [1, 2, 3]}))
+        cache = CsvProfileCache(tmp_path / "profiles.db")
+
+        first = cache.get_profile(path)
+        with patch('src.core.csv_profiler.profile_csv') as profiler:
+            second = CsvProfileCache(tmp_path / "profiles.db").get_profile(path)
+        profiler.assert_not_called()
+        assert second.columns == first.columns
+
+    @pytest.mark.unit
+    def test_copy_reuses_profile_and_change_reprofiles(self, tmp_path):
+        path = _write_csv(tmp_path / "data.csv", pd.DataFrame({'x': [1, 2, 3]}))
+        copy = _write_csv(tmp_path / "copy.csv", pd.DataFrame({'x': [1, 2, 3]}))
+        cache = CsvProfileCache(tmp_path / "profiles.db")
+        cache.get_profile(path)
+
+        assert cache.get_profile(copy).source == "copy.csv"
+        assert cache.stats == {'hits': 1, 'misses': 1}
+
+        _write_csv(tmp_path / "data.csv", pd.DataFrame({'x': [1, 2, 3, 4]}))
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+        assert cache.get_profile(path).rows == 4
+        assert cache.stats['misses'] == 2
+
+
+class TestAnalyticsPrompt:
+    """Test execute_analytics_task sending profiles to the model."""
+
+    @pytest.mark.unit
+    def test_prompt_includes_column_statistics(self, tmp_path):
+        path = _write_csv(tmp_path / "sales.csv", pd.DataFrame({'revenue': [10.0, 20.0, None], 'city': ['a', 'b', 'a']}))
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.config = AIConfig()
+        processor.output_dir = tmp_path
+        processor.csv_profiles = CsvProfileCache(tmp_path / "profiles.db")
+        processor.query_ai_with_primary_fallback = Mock(return_value=None)
+
+        with patch('pandas.read_csv', wraps=pd.read_csv) as read_csv:
+            processor.execute_analytics_task("Summarize revenue", [path])
+        assert all(call.kwargs.get('chunksize') for call in read_csv.call_args_list)
+
+        analytics_prompt = processor.query_ai_with_primary_fallback.call_args.args[0]
+        assert "CSV sales.csv: 3 rows, 2 columns" in analytics_prompt
+        assert "- revenue: float, 1 nulls" in analytics_prompt
+        assert "min 10, max 20" in analytics_prompt
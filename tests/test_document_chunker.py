@@ -0,0 +1,207 @@
+"""
+Tests for streaming document chunking and token-budgeted chunk selection.
+"""
+import os
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import AIConfig, TaskProcessor
+from src.core.document_chunker import (
+    ChunkSelector, DocumentChunkIndex, HashingEmbedder, estimate_tokens, iter_file_chunks, select_document_chunks
+)
+
+
+def _write(path, text):
+    path.write_text(text)
+    return str(path)
+
+
+class TestIterFileChunks:
+    """Test structure-aware incremental chunking."""
+
+    @pytest.mark.unit
+    def test_prose_splits_on_paragraphs(self, tmp_path):
+        paragraph = "Sentence about the topic. " * 8 + "\n"
+        path = _write(tmp_path / "notes.txt", (paragraph + "\n") * 6)
+
+        chunks = list(iter_file_chunks(path, max_chars=500))
+
+        assert len(chunks) > 1
+        assert all(len(chunk.text) <= 500 for chunk in chunks)
+        assert all(chunk.text.startswith("Sentence") for chunk in chunks)
+        assert [chunk.index for chunk in chunks] == list(range(len(chunks)))
+
+    @pytest.mark.unit
+    def test_code_splits_on_definitions(self, tmp_path):
+        source = "".join(f"def func_{i}():\n    value = {i}\n    return value * 2\n\n" for i in range(30))
+        path = _write(tmp_path / "module.py", source)
+
+        chunks = list(iter_file_chunks(path, max_chars=200))
+
+        assert all(chunk.text.startswith("def func_") for chunk in chunks)
+        assert chunks[0].start_line == 1
+        assert chunks[1].start_line == chunks[0].end_line + 1
+
+    @pytest.mark.unit
+    def test_long_lines_are_cut_to_chunk_size(self, tmp_path):
+        path = _write(tmp_path / "log.txt", "x" * 5000 + "\nlast line\n")
+
+        chunks = list(iter_file_chunks(path, max_chars=1000))
+
+        assert all(len(chunk.text) <= 1000 for chunk in chunks)
+        assert "".join(chunk.text for chunk in chunks[:-1]) == "x" * 5000
+        assert chunks[-1].text.endswith("last line")
+        assert chunks[-1].end_line == 2
+
+
+class TestChunkSelector:
+    """Test relevance ranking under a token budget."""
+
+    @pytest.mark.unit
+    def test_hashing_embedder_is_normalized(self):
+        vectors = HashingEmbedder(dimensions=64)(["alpha beta", ""])
+        assert vectors.shape == (2, 64)
+        assert abs(float((vectors[0] ** 2).sum()) - 1.0) < 1e-5
+        assert float(abs(vectors[1]).sum()) == 0.0
+
+    @pytest.mark.unit
+    def test_relevant_chunks_selected_in_document_order(self, tmp_path):
+        filler = "Unrelated text about gardening and weather.\n\n" * 40
+        text = filler + "The invoice total for March was 4200 dollars.\n\n" + filler
+        path = _write(tmp_path / "report.txt", text)
+
+        chunks = select_document_chunks("What was the invoice total for March?", [path],
+                                        token_budget=100, max_chars=200).chunks
+
+        assert any("invoice total" in chunk.text for chunk in chunks)
+        assert sum(chunk.tokens for chunk in chunks) <= 100
+        assert [chunk.index for chunk in chunks] == sorted(chunk.index for chunk in chunks)
+
+    @pytest.mark.unit
+    def test_candidates_bounded_by_top_k(self, tmp_path):
+        path = _write(tmp_path / "big.txt", "word " * 40 + "\n\n" + ("line of text\n\n" * 500))
+        selector = ChunkSelector(top_k=3, batch_size=10)
+
+        selection = selector.select("text", iter_file_chunks(path, max_chars=100), token_budget=10_000)
+
+        assert len(selection.chunks) == 3
+        assert selection.scanned > 3
+
+    @pytest.mark.unit
+    def test_missing_files_are_skipped(self, tmp_path):
+        path = _write(tmp_path / "a.txt", "hello world\n")
+        chunks = select_document_chunks("hello", [str(tmp_path / "missing.txt"), path], token_budget=100).chunks
+        assert [chunk.source for chunk in chunks] == ["a.txt"]
+
+
+class TestDocumentChunkIndex:
+    """Test reuse and incremental re-indexing of document chunks."""
+
+    def _make_index(self, tmp_path):
+        return DocumentChunkIndex(tmp_path / "chunk_index", ChunkSelector(), max_chars=200)
+
+    @pytest.mark.unit
+    def test_unchanged_files_are_not_reembedded(self, tmp_path):
+        path = _write(tmp_path / "doc.txt", "First paragraph about apples.\n\nSecond about pears.\n")
+        index = self._make_index(tmp_path)
+
+        assert index.ensure_indexed(path) is True
+        with patch('src.core.document_chunker.iter_file_chunks') as chunker:
+            assert index.ensure_indexed(path) is False
+            assert self._make_index(tmp_path).ensure_indexed(path) is False
+        chunker.assert_not_called()
+
+    @pytest.mark.unit
+    def test_touched_file_with_same_content_is_reused(self, tmp_path):
+        path = _write(tmp_path / "doc.txt", "Some text\n")
+        index = self._make_index(tmp_path)
+        index.ensure_indexed(path)
+
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert index.ensure_indexed(path) is False
+        assert index.stats == {'reused': 1, 'indexed': 1}
+
+    @pytest.mark.unit
+    def test_modified_file_is_reindexed(self, tmp_path):
+        path = _write(tmp_path / "doc.txt", "Old content about apples\n")
+        index = self._make_index(tmp_path)
+        index.ensure_indexed(path)
+
+        _write(tmp_path / "doc.txt", "New content about oranges and more\n")
+        stat = os.stat(path)
+        os.utime(path, (stat.st_atime, stat.st_mtime + 10))
+
+        assert index.ensure_indexed(path) is True
+        assert [chunk.text for chunk, _ in index.iter_chunks(path)] == ["New content about oranges and more"]
+
+    @pytest.mark.unit
+    def test_stored_embeddings_match_fresh_selection(self, tmp_path):
+        text = "Gardening notes and weather.\n\n" * 30 + "The server password rotates monthly.\n\n" + "More notes.\n\n" * 30
+        path = _write(tmp_path / "doc.txt", text)
+        index = self._make_index(tmp_path)
+
+        indexed = index.select("how often does the password rotate", [path], token_budget=60).chunks
+        fresh = select_document_chunks("how often does the password rotate", [path], token_budget=60, max_chars=200).chunks
+
+        assert [chunk.text for chunk in indexed] == [chunk.text for chunk in fresh]
+        assert any("password" in chunk.text for chunk in indexed)
+
+    @pytest.mark.unit
+    def test_embedding_runs_outside_write_transaction(self, tmp_path):
+        path = _write(tmp_path / "doc.txt", "Some text\n\nMore text\n")
+        in_transaction = []
+        embedder = HashingEmbedder()
+
+        def embed(texts):
+            in_transaction.append(index.db.connection().in_transaction)
+            return embedder(texts)
+
+        index = DocumentChunkIndex(tmp_path / "chunk_index", ChunkSelector(embed), max_chars=200)
+        assert index.ensure_indexed(path) is True
+
+        assert in_transaction == [False]
+        assert len(list(index.iter_chunks(path))) == 1
+
+    @pytest.mark.unit
+    def test_select_reports_counts_for_its_own_call(self, tmp_path):
+        first = _write(tmp_path / "first.txt", "Apples grow on trees.\n\nPears do too.\n")
+        second = _write(tmp_path / "second.txt", "Oranges are citrus.\n")
+        index = self._make_index(tmp_path)
+        index.select("apples", [first], token_budget=100)
+
+        selection = index.select("fruit", [first, second], token_budget=100)
+
+        assert (selection.indexed, selection.reused) == (1, 1)
+        assert selection.scanned == 2
+
+    @pytest.mark.unit
+    def test_prune_removes_deleted_files(self, tmp_path):
+        path = _write(tmp_path / "doc.txt", "Some text\n")
+        index = self._make_index(tmp_path)
+        index.ensure_indexed(path)
+        os.remove(path)
+
+        assert index.prune() == 1
+        assert list(index.iter_chunks(path)) == []
+
+
+class TestRagPrompt:
+    """Test execute_rag_task building a bounded prompt."""
+
+    @pytest.mark.unit
+    def test_rag_prompt_respects_token_budget(self, tmp_path):
+        big = _write(tmp_path / "big.txt", "Padding paragraph with filler words.\n\n" * 5000
+                     + "The launch code word is pineapple.\n")
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.config = AIConfig(rag_token_budget=500, rag_chunk_chars=400)
+        processor.output_dir = tmp_path
+        processor.document_index = None
+        processor.query_ai_with_primary_fallback = Mock(return_value=None)
+
+        processor.execute_rag_task("What is the launch code word?", [big])
+
+        rag_prompt = processor.query_ai_with_primary_fallback.call_args.args[0]
+        assert "pineapple" in rag_prompt
+        assert estimate_tokens(rag_prompt) < 700
@@ -0,0 +1,125 @@
+"""
+Tests for EnhancedMemoryManager re-ranking of similar tasks.
+"""
+import time
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from src.core.enhanced_memory import (
+    FEATURE_DIM, EnhancedMemoryManager, TaskMemory, encode_features, metadata_field, pack_vector, rerank_similarity,
+    task_from_metadata, unpack_vector
+)
+
+
+class _ScalarMetadataCollection:
+    """Stand-in collection that, like ChromaDB, only accepts str/int/float/bool metadata values"""
+
+    def __init__(self):
+        self.metadatas = []
+        self.query = Mock()
+
+    def add(self, documents, metadatas, ids):
+        for metadata in metadatas:
+            for key, value in metadata.items():
+                if not isinstance(value, (str, int, float, bool)):
+                    raise ValueError(f"Expected metadata value to be a str, int, float or bool, got {value!r} "
+                                     f"for key {key}")
+        self.metadatas.extend(metadatas)
+
+
+def _make_manager(tmp_path, collection=None):
+    with patch('src.core.enhanced_memory.CHROMADB_AVAILABLE', False):
+        manager = EnhancedMemoryManager(tmp_path)
+        manager.wait_until_ready(timeout=5)
+    manager.task_collection = collection
+    return manager
+
+
+def _task(task_id, prompt, task_type="code", files=(), **overrides):
+    values = dict(
+        task_id=task_id, timestamp=time.time(), prompt=prompt, task_type=task_type,
+        context={'files': list(files), 'auto_continue': True}, result="ok", success=True,
+        execution_time=2.0, quality_score=0.8, algorithm_config={'temperature': 0.2},
+        generated_files=list(files), subtasks=[], recursion_depth=0, resource_usage={'cpu': 20}
+    )
+    values.update(overrides)
+    return TaskMemory(**values)
+
+
+class TestFeatureVectors:
+    """Test the fixed-width feature encoding."""
+
+    @pytest.mark.unit
+    def test_pack_roundtrip(self):
+        vector = np.arange(FEATURE_DIM, dtype=np.float32)
+        assert np.array_equal(unpack_vector(pack_vector(vector)), vector)
+        assert unpack_vector(pack_vector(np.zeros(3))) is None
+
+    @pytest.mark.unit
+    def test_matrix_similarity_matches_scalar_similarity(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        tasks = [
+            _task("a", "Refactor the payment service module for clarity", files=["pay.py"]),
+            _task("b", "Refactor payment module and write tests", files=["pay.py", "test.py", "notes.md"]),
+            _task("c", "Summarize quarterly report findings", task_type="rag", files=["q3.pdf"]),
+            _task("d", "Build dashboard charts from sales data " * 40, task_type="analytics"),
+            _task("e", "Refactor service", context={'autonomous_mode': True, 'files': []}),
+        ]
+        query = manager._extract_query_features("Refactor the payment module", "code",
+                                                {'files': ["pay.py"], 'auto_continue': True})
+        task_features = [manager._extract_task_features(task) for task in tasks]
+
+        expected = [manager._calculate_enhanced_similarity(query, features) for features in task_features]
+        actual = rerank_similarity(encode_features(query), "code",
+                                   np.stack([encode_features(f) for f in task_features]),
+                                   [task.task_type for task in tasks])
+
+        assert actual == pytest.approx(expected, abs=1e-6)
+
+
+class TestRetrieveSimilarTasks:
+    """Test retrieve_similar_tasks ranking a candidate pool."""
+
+    @pytest.mark.unit
+    def test_ranks_by_confidence_from_stored_vectors(self, tmp_path):
+        collection = _ScalarMetadataCollection()
+        manager = _make_manager(tmp_path, collection)
+        tasks = [
+            _task("close", "Refactor the payment module", files=["pay.py"]),
+            _task("other_type", "Refactor the payment module", task_type="rag"),
+            _task("partial", "Refactor the billing module", files=["pay.py"]),
+        ]
+        for task in tasks:
+            assert manager.save_enhanced_task(task)
+        metadatas = collection.metadatas
+        legacy = dict(metadatas[2])
+        del legacy['feature_vector']
+        collection.query.return_value = {
+            'documents': [["d"] * 3],
+            'metadatas': [[metadatas[0], metadatas[1], legacy]],
+            'distances': [[0.1, 0.05, 0.2]],
+        }
+
+        with patch.object(manager, '_calculate_enhanced_similarity') as scalar:
+            matches = manager.retrieve_similar_tasks("Refactor the payment module", "code",
+                                                     {'files': ["pay.py"], 'auto_continue': True}, n_results=2)
+        scalar.assert_not_called()
+
+        assert [match.task_memory.task_id for match in matches] == ["close", "partial"]
+        assert matches[0].confidence >= matches[1].confidence
+        assert collection.query.call_args.kwargs['n_results'] == 2 * manager.rerank_pool_factor
+
+    @pytest.mark.unit
+    def test_nested_fields_round_trip_through_scalar_metadata(self, tmp_path):
+        collection = _ScalarMetadataCollection()
+        manager = _make_manager(tmp_path, collection)
+        task = _task("t", "Refactor the payment module", files=["pay.py"], user_feedback={'rating': 5})
+
+        assert manager.save_enhanced_task(task)
+        metadata = collection.metadatas[0]
+
+        assert task_from_metadata(metadata) == task
+        assert metadata_field(metadata, "features") == manager._extract_task_features(task)
+        assert np.array_equal(manager._feature_vector(metadata),
+                              encode_features(manager._extract_task_features(task)))
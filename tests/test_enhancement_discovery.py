@@ -0,0 +1,240 @@
+"""
+Tests for file analysis, the per-file analysis cache and the opportunity store of the enhancement discovery engine.
+"""
+import ast
+import json
+import time
+import sqlite3
+import pytest
+from dataclasses import asdict
+from unittest.mock import patch
+
+from src.autonomous.enhancement_discovery_engine import (
+    ANALYZER_VERSION, EnhancementDiscoveryEngine, EnhancementOpportunity
+)
+from src.core.sqlite_db import query_plan
+
+SAMPLE = '''
+import pickle
+
+def load(path, a, b, c, d, e, f):
+    result = ""
+    for line in open(path):
+        result += line
+    return pickle.loads(result)
+'''
+
+
+def _write_files(root, count):
+    paths = []
+    for i in range(count):
+        path = root / f"module_{i}.py"
+        path.write_text(SAMPLE.replace("load", f"load_{i}"))
+        paths.append(str(path))
+    broken = root / "broken.py"
+    broken.write_text("def broken(:\n")
+    paths.insert(count // 2, str(broken))
+    return paths
+
+
+def _summary(opportunities):
+    return [(opp.file_path, opp.opportunity_type, opp.title, opp.priority_rank) for opp in opportunities]
+
+
+class TestParallelDiscovery:
+    """Test process-pool analysis against the serial path."""
+
+    @pytest.mark.unit
+    def test_parallel_matches_serial(self, tmp_path):
+        files = _write_files(tmp_path, 6)
+        engine = EnhancementDiscoveryEngine(tmp_path / "parallel_cache")
+        engine.parallel_min_files = 2
+
+        parallel = engine.discover_enhancement_opportunities(files, max_workers=2)
+        serial = EnhancementDiscoveryEngine(tmp_path / "serial_cache").discover_enhancement_opportunities(
+            files, max_workers=1)
+
+        assert parallel and _summary(parallel) == _summary(serial)
+        assert engine.get_discovery_statistics()['analyzed_files'] == 6
+
+    @pytest.mark.unit
+    def test_files_are_read_once_outside_the_lock(self, tmp_path):
+        files = _write_files(tmp_path, 2)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        opened = []
+        real_open = open
+
+        def tracking_open(path, *args, **kwargs):
+            opened.append(str(path))
+            assert not engine.lock.locked()
+            return real_open(path, *args, **kwargs)
+
+        with patch('builtins.open', tracking_open):
+            engine.discover_enhancement_opportunities(files, max_workers=1)
+
+        assert sorted(opened) == sorted(files)
+
+    @pytest.mark.unit
+    def test_broken_pool_falls_back_to_serial(self, tmp_path):
+        files = _write_files(tmp_path, 3)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        engine.parallel_min_files = 2
+
+        with patch('src.autonomous.enhancement_discovery_engine.ProcessPoolExecutor', side_effect=OSError("no fork")):
+            analyses = engine._analyze_files(files, max_workers=2)
+
+        assert [analysis.file_path for analysis in analyses] == files
+        assert [analysis.error is not None for analysis in analyses] == [False, True, False, False]
+
+    @pytest.mark.unit
+    def test_file_is_parsed_and_walked_once(self, tmp_path):
+        files = _write_files(tmp_path, 1)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+
+        with patch('src.autonomous.enhancement_discovery_engine.ast.parse', wraps=ast.parse) as parse, \
+             patch('src.core.ast_pipeline.ast.iter_child_nodes', wraps=ast.iter_child_nodes) as children:
+            analysis = engine.analyze_file(files[-1])
+
+        parse.assert_called_once()
+        assert children.call_count == sum(1 for _ in ast.walk(ast.parse(analysis.content)))
+        names = {opp.title for opp in analysis.opportunities}
+        assert {'String Concatenation In Loop', 'Long Parameter List', 'Missing Type Hints'} <= names
+
+
+class TestAnalysisCache:
+    """Test reuse and invalidation of cached per-file analyses."""
+
+    @pytest.mark.unit
+    def test_unchanged_files_are_not_reanalyzed(self, tmp_path):
+        files = _write_files(tmp_path, 4)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        first = engine.discover_enhancement_opportunities(files, max_workers=1)
+
+        with patch.object(engine, 'analyze_file') as analyze:
+            second = engine.discover_enhancement_opportunities(files, max_workers=1)
+        analyze.assert_not_called()
+
+        assert _summary(second) == _summary(first)
+        assert {opp.opportunity_id for opp in second} == {opp.opportunity_id for opp in first}
+        report = engine.get_analysis_cache_report()
+        assert report['last_run'] == {'hits': 5, 'misses': 0, 'hit_rate': 1.0}
+        assert report['total']['hit_rate'] == 0.5 and report['entries'] == 5
+
+    @pytest.mark.unit
+    def test_content_and_version_changes_invalidate(self, tmp_path):
+        files = _write_files(tmp_path, 3)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        engine.discover_enhancement_opportunities(files, max_workers=1)
+
+        with open(files[0], 'a') as f:
+            f.write("\nx = 1\n")
+        engine.discover_enhancement_opportunities(files, max_workers=1)
+        assert engine.last_run_cache_stats == {'hits': 3, 'misses': 1}
+
+        with patch('src.autonomous.enhancement_discovery_engine.ANALYZER_VERSION', ANALYZER_VERSION + 1):
+            engine.discover_enhancement_opportunities(files, max_workers=1)
+            assert engine.last_run_cache_stats == {'hits': 0, 'misses': 4}
+            assert engine.get_analysis_cache_report()['stale_entries'] == 0
+
+    @pytest.mark.unit
+    def test_status_survives_cached_rerun(self, tmp_path):
+        files = _write_files(tmp_path, 2)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        first = engine.discover_enhancement_opportunities(files, max_workers=1)
+        implemented = first[0].opportunity_id
+        assert engine.update_opportunity_status([implemented], "implemented") == 1
+
+        engine.discover_enhancement_opportunities(files, max_workers=1)
+
+        assert engine.last_run_cache_stats['misses'] == 0
+        assert [opp.opportunity_id for opp in engine.get_cached_opportunities(status="implemented")] == [implemented]
+
+    @pytest.mark.unit
+    def test_invalidate_removes_deleted_files(self, tmp_path):
+        files = _write_files(tmp_path, 2)
+        engine = EnhancementDiscoveryEngine(tmp_path / "cache")
+        engine.discover_enhancement_opportunities(files, max_workers=1)
+
+        (tmp_path / "module_0.py").unlink()
+        assert engine.invalidate_analysis_cache() == 1
+        assert engine.invalidate_analysis_cache([files[-1]]) == 1
+        assert engine.get_analysis_cache_report()['entries'] == 1
+
+
+def _opportunity(i, file_path, opportunity_type, priority):
+    return EnhancementOpportunity(
+        opportunity_id=f"opp_{i}", file_path=file_path, opportunity_type=opportunity_type, title=f"Opportunity {i}",
+        description="", impact_score=0.5, effort_estimate=0.5, risk_level="low", confidence=0.5,
+        related_patterns=[], code_context={}, improvement_suggestions=[], research_keywords=[],
+        priority_rank=priority, estimated_benefit={}, timestamp=float(i)
+    )
+
+
+class TestOpportunityStore:
+    """Test indexed lookups of stored opportunities."""
+
+    @pytest.mark.unit
+    def test_legacy_database_is_migrated(self, tmp_path):
+        legacy = _opportunity(1, "src/app.py", "performance_antipatterns", 40)
+        with sqlite3.connect(tmp_path / "discovery_cache.db") as conn:
+            conn.execute("""CREATE TABLE enhancement_opportunities (opportunity_id TEXT PRIMARY KEY,
+                            opportunity_data TEXT NOT NULL, priority_rank INTEGER DEFAULT 0,
+                            status TEXT DEFAULT 'discovered', timestamp REAL NOT NULL)""")
+            conn.execute("INSERT INTO enhancement_opportunities (opportunity_id, opportunity_data, priority_rank, timestamp) "
+                         "VALUES (?, ?, ?, ?)", (legacy.opportunity_id, json.dumps(asdict(legacy)), 40, 1.0))
+
+        engine = EnhancementDiscoveryEngine(tmp_path)
+
+        assert [opp.opportunity_id for opp in engine.get_cached_opportunities(file_path="src/app.py")] == ["opp_1"]
+        assert engine.get_discovery_statistics()['opportunity_types'] == {"performance_antipatterns": 1}
+
+    @pytest.mark.unit
+    def test_filters_use_column_equality(self, tmp_path):
+        engine = EnhancementDiscoveryEngine(tmp_path)
+        engine._store_opportunities([
+            _opportunity(1, "a.py", "security_vulnerabilities", 90),
+            _opportunity(2, "a.py", "modern_improvements", 30),
+            _opportunity(3, "a.py.bak", "security_vulnerabilities", 80),
+            _opportunity(4, "b.py", "security_vulnerabilities", 10),
+        ])
+        assert engine.update_opportunity_status(["opp_3"], "implemented") == 1
+
+        def ids(**filters):
+            return [opp.opportunity_id for opp in engine.get_cached_opportunities(**filters)]
+
+        assert ids(file_path="a.py") == ["opp_1", "opp_2"]
+        assert ids(opportunity_type="security_vulnerabilities", min_priority=20) == ["opp_1", "opp_3"]
+        assert ids(status="discovered", opportunity_type="security_vulnerabilities") == ["opp_1", "opp_4"]
+
+    @pytest.mark.performance
+    def test_lookups_are_index_seeks(self, tmp_path, capsys):
+        engine = EnhancementDiscoveryEngine(tmp_path)
+        types = ["performance_antipatterns", "maintainability_issues", "security_vulnerabilities", "modern_improvements"]
+        engine._store_opportunities([_opportunity(i, f"src/module_{i % 500}.py", types[i % 4], i % 100)
+                                     for i in range(20000)])
+
+        with sqlite3.connect(engine.db_path) as conn:
+            for filters, index in (({'file_path': "src/module_7.py"}, "idx_opportunities_file"),
+                                   ({'opportunity_type': types[2], 'min_priority': 50}, "idx_opportunities_type"),
+                                   ({'status': "discovered"}, "idx_opportunities_status"),
+                                   ({'file_path': "src/module_7.py", 'status': "discovered"}, "idx_opportunities_file")):
+                plan = query_plan(conn, *engine._opportunity_query(**filters))
+                assert len(plan) == 1 and "=?" in plan[0], plan
+                assert plan[0].startswith(f"SEARCH enhancement_opportunities USING INDEX {index} ("), plan
+
+            legacy = ("SELECT opportunity_data FROM enhancement_opportunities WHERE priority_rank >= ? "
+                      "AND opportunity_data LIKE ? ORDER BY priority_rank DESC")
+
+            def timed(sql, params, repeat=20):
+                start = time.perf_counter()
+                for _ in range(repeat):
+                    rows = conn.execute(sql, params).fetchall()
+                return (time.perf_counter() - start) / repeat * 1000, len(rows)
+
+            like_ms, like_rows = timed(legacy, [0, '%"file_path": "src/module_7.py"%'])
+            seek_ms, seek_rows = timed(*engine._opportunity_query(file_path="src/module_7.py"))
+
+        with capsys.disabled():
+            print(f"\nfile_path lookup over 20000 opportunities: LIKE {like_ms:.2f} ms, index {seek_ms:.2f} ms")
+        assert like_rows == seek_rows == 40
+        assert seek_ms < like_ms
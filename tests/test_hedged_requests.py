@@ -0,0 +1,163 @@
+"""
+Tests for hedged primary/backup model racing in TaskProcessor.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock
+
+from supermini import AIConfig, ModelLatencyTracker, ResponseCache, TaskProcessor, cached_query
+
+
+def _make_processor(claude_query, ollama_query, **config):
+    processor = TaskProcessor.__new__(TaskProcessor)
+    processor.config = AIConfig(hedge_requests=True, **config)
+    processor.stop_requested = False
+    processor.stream_callback = None
+    processor.stream_retract_callback = None
+    processor.latency_tracker = ModelLatencyTracker()
+    processor.backend_slots = {'claude': threading.BoundedSemaphore(4), 'ollama': threading.BoundedSemaphore(1)}
+    processor.claude = Mock()
+    processor.claude.query.side_effect = claude_query
+    processor.ollama = Mock()
+    processor.ollama.query.side_effect = ollama_query
+    return processor
+
+
+class TestModelLatencyTracker:
+    """Test per-model latency percentiles."""
+
+    @pytest.mark.unit
+    def test_percentile_requires_minimum_samples(self):
+        tracker = ModelLatencyTracker()
+        for _ in range(ModelLatencyTracker.MIN_SAMPLES - 1):
+            tracker.record('ollama', 1.0)
+        assert tracker.percentile('ollama', 0.95) is None
+
+    @pytest.mark.unit
+    def test_percentiles_from_recent_samples(self):
+        tracker = ModelLatencyTracker()
+        for seconds in range(1, 21):
+            tracker.record('claude', float(seconds))
+
+        stats = tracker.get_stats()['claude']
+        assert stats['p50'] == 10.0
+        assert stats['p95'] == 19.0
+        assert stats['samples'] == 20
+
+    @pytest.mark.unit
+    def test_cache_hits_are_not_recorded(self, tmp_path):
+        cache = ResponseCache(tmp_path / "response_cache.db", ttl=3600, max_entries=100, max_temperature=1.0)
+        key = cache.key_for("model", "", 0.0, "prompt", force=True)
+        processor = _make_processor(None, None)
+        query = lambda callback: cached_query(cache, key, "model", None, None, lambda: "answer", callback)
+
+        assert processor._timed_query('ollama', query, None) == "answer"
+        assert processor._timed_query('ollama', query, None) == "answer"
+        assert processor.latency_tracker.get_stats()['ollama']['samples'] == 1
+
+
+class TestHedgedQuery:
+    """Test racing the backup model against a slow primary."""
+
+    @pytest.mark.unit
+    def test_fast_primary_does_not_fire_backup(self):
+        processor = _make_processor(lambda *a, **k: "claude answer", lambda *a, **k: "ollama answer",
+                                    hedge_default_delay=5.0)
+
+        assert processor.query_ai_with_primary_fallback("hi") == "claude answer"
+        processor.ollama.query.assert_not_called()
+
+    @pytest.mark.unit
+    def test_slow_primary_loses_to_backup(self):
+        release = threading.Event()
+
+        def slow_claude(*args, **kwargs):
+            release.wait(5)
+            return "late claude answer"
+
+        processor = _make_processor(slow_claude, lambda *a, **k: "ollama answer", hedge_default_delay=0.05)
+        start = time.time()
+        try:
+            assert processor.query_ai_with_primary_fallback("hi") == "ollama answer"
+            assert time.time() - start < 2
+        finally:
+            release.set()
+
+    @pytest.mark.unit
+    def test_failed_primary_falls_back_immediately(self):
+        processor = _make_processor(lambda *a, **k: None, lambda *a, **k: "ollama answer",
+                                    hedge_default_delay=5.0)
+
+        start = time.time()
+        assert processor.query_ai_with_primary_fallback("hi") == "ollama answer"
+        assert time.time() - start < 2
+
+    @pytest.mark.unit
+    def test_learned_latency_sets_hedge_delay(self):
+        processor = _make_processor(lambda *a, **k: "x", lambda *a, **k: "y", hedge_default_delay=30.0)
+        assert processor.hedge_delay('claude') == 30.0
+
+        for _ in range(ModelLatencyTracker.MIN_SAMPLES):
+            processor.latency_tracker.record('claude', 0.5)
+        assert processor.hedge_delay('claude') == 0.5
+
+    @pytest.mark.unit
+    def test_losing_stream_is_cut_off(self):
+        received = []
+        release = threading.Event()
+        loser_chunks = []
+
+        def slow_claude(prompt, system_prompt, stream_callback=None, **kwargs):
+            release.wait(5)
+            try:
+                stream_callback("claude chunk")
+                loser_chunks.append("claude chunk")
+            finally:
+                release.clear()
+            return "claude answer"
+
+        def ollama(prompt, stream_callback=None, **kwargs):
+            stream_callback("ollama chunk")
+            release.set()
+            return "ollama answer"
+
+        processor = _make_processor(slow_claude, ollama, hedge_default_delay=0.05)
+        processor.stream_callback = received.append
+
+        assert processor.query_ai_with_primary_fallback("hi") == "ollama answer"
+        deadline = time.time() + 2
+        while release.is_set() and time.time() < deadline:
+            time.sleep(0.01)
+        assert received == ["ollama chunk"]
+        assert loser_chunks == []
+
+    @pytest.mark.unit
+    def test_stream_owner_failure_hands_panel_to_backup(self):
+        received, retracted = [], []
+        primary_streaming = threading.Event()
+        backup_cut_off = threading.Event()
+
+        def failing_claude(prompt, system_prompt, stream_callback=None, **kwargs):
+            stream_callback("partial claude")
+            primary_streaming.set()
+            backup_cut_off.wait(5)
+            return None
+
+        def ollama(prompt, stream_callback=None, **kwargs):
+            primary_streaming.wait(5)
+            try:
+                stream_callback("ollama answer")
+            except BaseException:
+                backup_cut_off.set()
+                raise
+            return "ollama answer"
+
+        processor = _make_processor(failing_claude, ollama, hedge_default_delay=0.05)
+        processor.stream_callback = received.append
+        processor.stream_retract_callback = retracted.append
+
+        assert processor.query_ai_with_primary_fallback("hi") == "ollama answer"
+        assert retracted == ["partial claude"]
+        assert received == ["partial claude", "ollama answer"]
+        assert processor.ollama.query.call_count == 2
@@ -0,0 +1,126 @@
+"""
+Tests for incremental task statistics behind learning insights.
+"""
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from src.core.enhanced_memory import EnhancedMemoryManager, TaskMemory
+from src.core.insight_aggregator import InsightAggregator, duration_bin
+
+NOW = 1_700_000_000.0
+
+
+def _task(i, task_type="code", success=True, execution_time=2.0, age=0.0, prompt="Do the thing", cpu=10, memory=10):
+    return TaskMemory(
+        task_id=f"t{i}", timestamp=NOW - age, prompt=prompt, task_type=task_type, context={}, result="",
+        success=success, execution_time=execution_time, quality_score=0.8, algorithm_config={},
+        generated_files=[], subtasks=[], recursion_depth=0, resource_usage={'cpu': cpu, 'memory': memory}
+    )
+
+
+def _make_manager(tmp_path):
+    with patch('src.core.enhanced_memory.CHROMADB_AVAILABLE', False):
+        manager = EnhancedMemoryManager(tmp_path)
+        manager.wait_until_ready(timeout=5)
+    manager.task_collection = Mock()
+    return manager
+
+
+class TestInsightAggregator:
+    """Test running statistics and time windows."""
+
+    @pytest.mark.unit
+    def test_summary_aggregates_by_type_and_window(self, tmp_path):
+        aggregator = InsightAggregator(tmp_path / "insights.db")
+        for i in range(4):
+            aggregator.record(_task(i, execution_time=i + 1.0, success=i != 0))
+        aggregator.record(_task(10, task_type="rag", execution_time=100, success=False))
+        aggregator.record(_task(11, age=3 * 86400))
+
+        summary = aggregator.summarize(86400, now=NOW)
+
+        code = summary['by_type']['code']
+        assert (code['tasks'], code['successes']) == (4, 3)
+        assert code['avg_time'] == pytest.approx(2.5)
+        assert summary['by_type']['rag']['duration_histogram'] == {duration_bin(100): 1}
+        assert summary['failure_signatures'] == {'long_execution': 1}
+        assert sum(s['tasks'] for s in aggregator.summarize(7 * 86400, now=NOW)['by_type'].values()) == 6
+
+    @pytest.mark.unit
+    def test_statistics_persist(self, tmp_path):
+        InsightAggregator(tmp_path / "insights.db").record(_task(1))
+        reopened = InsightAggregator(tmp_path / "insights.db")
+        assert not reopened.is_empty()
+        assert reopened.summarize(86400, now=NOW)['by_type']['code']['tasks'] == 1
+
+    @pytest.mark.unit
+    def test_count_slower_than_interpolates(self):
+        histogram = {duration_bin(1.0): 10, duration_bin(30.0): 4}
+        assert InsightAggregator.count_slower_than(histogram, 10.0) == pytest.approx(4)
+        assert InsightAggregator.count_slower_than(histogram, 0.0) == pytest.approx(14)
+
+    @pytest.mark.unit
+    def test_existing_statistics_count_as_backfilled(self, tmp_path):
+        aggregator = InsightAggregator(tmp_path / "insights.db")
+        assert not aggregator.is_backfilled()
+
+        aggregator.record(_task(1))
+        aggregator.db.execute("DROP TABLE aggregator_state")  # as written before the marker existed
+
+        assert InsightAggregator(tmp_path / "insights.db").is_backfilled()
+
+
+class TestDiscoverLearningInsights:
+    """Test insights computed from aggregates rather than the collection."""
+
+    @pytest.mark.unit
+    def test_insights_without_scanning_collection(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        for i in range(8):
+            manager.save_enhanced_task(_task(i, execution_time=1.0, age=0, cpu=90, memory=80))
+        for i in range(8, 12):
+            manager.save_enhanced_task(_task(i, execution_time=120.0, success=False, prompt="x" * 3000, cpu=90))
+
+        with patch('src.core.enhanced_memory.time.time', return_value=NOW):
+            insights = {insight.insight_type: insight for insight in manager.discover_learning_insights()}
+
+        assert set(insights) == {"performance", "failure_pattern", "resource_usage", "complexity"}
+        # Slow tasks are counted from the duration histogram, so the count is approximate
+        assert insights["performance"].evidence[0].endswith("out of 12 tasks are significantly slower")
+        assert insights["failure_pattern"].description == "High failure rate detected: 4/12 tasks failed"
+        assert "long_execution (4 cases)" in insights["failure_pattern"].evidence[0]
+
+    @pytest.mark.unit
+    def test_too_few_tasks_gives_no_insights(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        manager.save_enhanced_task(_task(1, age=time.time() - NOW))
+        assert manager.discover_learning_insights() == []
+
+    @pytest.mark.unit
+    def test_only_saved_tasks_are_recorded(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        manager.task_collection.add.side_effect = ValueError("rejected")
+        assert manager.save_enhanced_task(_task(1)) is False
+
+        manager.task_collection = None
+        assert manager.save_enhanced_task(_task(2)) is False
+
+        assert manager.insights.is_empty()
+
+    @pytest.mark.unit
+    def test_backfill_runs_once(self, tmp_path):
+        manager = _make_manager(tmp_path)
+        collection = Mock()
+        collection.get.return_value = {"metadatas": []}
+
+        manager._backfill_insights(collection)
+        assert manager.insights.is_backfilled()
+        assert manager.insights.is_empty()
+
+        with patch.object(manager, '_backfill_insights') as backfill, \
+                patch('src.core.enhanced_memory.CHROMADB_AVAILABLE', True), \
+                patch('src.core.enhanced_memory.get_client'), \
+                patch('src.core.enhanced_memory.get_embedding_function'):
+            manager.setup_enhanced_memory()
+        backfill.assert_not_called()
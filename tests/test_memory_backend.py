@@ -0,0 +1,95 @@
+"""
+Tests for lazy, shared initialization of the memory stores.
+"""
+import threading
+import pytest
+from unittest.mock import Mock, patch
+
+import src.core.memory_backend as memory_backend
+from supermini import MemoryManager
+from src.core.enhanced_memory import EnhancedMemoryManager
+
+
+class TestSharedBackend:
+    """Test process-wide clients and embedding functions."""
+
+    @pytest.mark.unit
+    def test_embedding_function_loaded_once_per_model(self):
+        factory = Mock(side_effect=lambda model_name: object())
+        with patch.object(memory_backend, 'embedding_functions', Mock(SentenceTransformerEmbeddingFunction=factory)), \
+             patch.dict(memory_backend._embedding_functions, clear=True):
+            first = memory_backend.get_embedding_function()
+            assert memory_backend.get_embedding_function() is first
+            assert memory_backend.get_embedding_function("other-model") is not first
+        assert factory.call_count == 2
+
+    @pytest.mark.unit
+    def test_initialize_in_background_reports_errors(self):
+        def fail():
+            raise ValueError("no model")
+        future = memory_backend.initialize_in_background(fail, "test-init")
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+
+
+class TestLazyMemoryManager:
+    """Test MemoryManager before and after its store is ready."""
+
+    @pytest.mark.unit
+    def test_construction_does_not_wait_for_store(self, tmp_path):
+        release = threading.Event()
+        collection = Mock()
+        collection.query.return_value = {"documents": [["d"]], "metadatas": [[{"prompt": "p", "result": "r"}]]}
+
+        def slow_setup(self):
+            release.wait(5)
+            self.collection = collection
+
+        with patch.object(MemoryManager, 'setup_memory', slow_setup):
+            memory = MemoryManager(tmp_path, flush_interval=0.01)
+            assert not memory.ready.done()
+            assert memory.retrieve_context("prompt", "code") == ""
+            assert memory.save_task({'prompt': 'early', 'task_type': 'code'})
+
+            release.set()
+            assert memory.wait_until_ready(timeout=5)
+        memory.flush(timeout=5)
+        collection.add.assert_called_once()
+        assert memory.retrieve_context("prompt", "code") == "Previous: p\nResult: r"
+        memory.close()
+
+    @pytest.mark.unit
+    def test_unavailable_store_rejects_writes(self, tmp_path):
+        with patch.object(MemoryManager, 'setup_memory', lambda self: None):
+            memory = MemoryManager(tmp_path)
+            assert memory.wait_until_ready(timeout=5) is False
+        assert memory.save_task({'prompt': 'p'}) is False
+        memory.close()
+
+    @pytest.mark.unit
+    def test_ready_callback_runs_after_setup(self, tmp_path):
+        called = threading.Event()
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', Mock())):
+            memory = MemoryManager(tmp_path)
+            memory.when_ready(called.set)
+            assert called.wait(5)
+        memory.close()
+
+
+class TestLazyEnhancedMemory:
+    """Test EnhancedMemoryManager sharing one embedding function."""
+
+    @pytest.mark.unit
+    def test_collections_share_embedding_function(self, tmp_path):
+        client = Mock()
+        shared = object()
+        with patch('src.core.enhanced_memory.CHROMADB_AVAILABLE', True), \
+             patch('src.core.enhanced_memory.get_client', return_value=client), \
+             patch('src.core.enhanced_memory.get_embedding_function', return_value=shared) as get_function:
+            manager = EnhancedMemoryManager(tmp_path)
+            assert manager.wait_until_ready(timeout=5)
+
+        get_function.assert_called_once()
+        assert client.get_or_create_collection.call_count == 3
+        assert all(call.kwargs['embedding_function'] is shared
+                   for call in client.get_or_create_collection.call_args_list)
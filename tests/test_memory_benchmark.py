@@ -0,0 +1,111 @@
+"""
+Tests for the memory recall and latency benchmark harness.
+"""
+import json
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import MemoryManager
+from src.core.memory_benchmark import (
+    benchmark_enhanced_memory, compare_reports, directory_size, labeled_queries, percentile, run_benchmarks,
+    synthetic_tasks, _measure
+)
+
+
+class TestSyntheticData:
+    """Test the generated task histories and queries."""
+
+    @pytest.mark.unit
+    def test_histories_are_deterministic_and_unique(self):
+        tasks = synthetic_tasks(500, seed=3)
+        assert tasks == synthetic_tasks(500, seed=3)
+        assert len({task['marker'] for task in tasks}) == 500
+        assert all(task['marker'] in task['prompt'] and task['marker'] in task['result'] for task in tasks)
+
+        queries = labeled_queries(tasks, 20)
+        assert len(queries) == 20
+        for query, task_type, marker in queries:
+            assert marker in query and task_type in ("code", "multimedia", "rag", "automation", "analytics")
+
+    @pytest.mark.unit
+    def test_measure_recall_and_percentiles(self):
+        queries = [("q1", "code", "m1"), ("q2", "code", "m2"), ("q3", "rag", "m3"), ("q4", "rag", "m4")]
+        answers = {"q1": ["m1"], "q2": ["x", "x", "x", "m2"], "q3": ["a", "m3"], "q4": []}
+
+        report = _measure(queries, lambda query, task_type: answers[query], k=3)
+
+        assert report['recall_at_3'] == 0.5 and report['queries'] == 4
+        assert 0 <= report['p50_ms'] <= report['p99_ms']
+        assert percentile([5, 1, 3, 2, 4], 0.5) == 3 and percentile([], 0.99) == 0.0
+
+    @pytest.mark.unit
+    def test_directory_size(self, tmp_path):
+        (tmp_path / "a").mkdir()
+        (tmp_path / "a" / "f.bin").write_bytes(b"x" * 10)
+        (tmp_path / "g.bin").write_bytes(b"x" * 5)
+        assert directory_size(tmp_path) == 15
+
+
+class TestCompareReports:
+    """Test regression detection between benchmark runs."""
+
+    @pytest.mark.unit
+    def test_flags_worse_metrics_only(self):
+        baseline = {'results': {'1000': {'memory_manager': {
+            'records': 1000, 'insert_per_second': 500.0, 'p50_ms': 4.0, 'p99_ms': 10.0, 'recall_at_3': 0.9}}}}
+        current = {'results': {'1000': {'memory_manager': {
+            'records': 1000, 'insert_per_second': 300.0, 'p50_ms': 3.0, 'p99_ms': 11.0, 'recall_at_3': 0.6}},
+            '10000': {'memory_manager': {'p50_ms': 50.0}}}}
+
+        regressions = compare_reports(baseline, current, tolerance=0.2)
+
+        assert len(regressions) == 2
+        assert any("insert_per_second" in r for r in regressions)
+        assert any("recall_at_3" in r for r in regressions)
+
+
+class TestMemoryIds:
+    """Test that tasks saved in a tight loop keep distinct ids."""
+
+    @pytest.mark.unit
+    def test_task_ids_are_unique(self, tmp_path):
+        collection = Mock()
+        collection.get.return_value = {'ids': [], 'metadatas': []}
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)):
+            memory = MemoryManager(tmp_path, write_batch_size=1000, flush_interval=30)
+            memory.wait_until_ready(timeout=5)
+        for task in synthetic_tasks(300):
+            memory.save_task(task)
+        memory.flush()
+        ids = [i for call in collection.add.call_args_list for i in call.kwargs['ids']]
+        assert len(ids) == len(set(ids)) == 300
+        memory.close()
+
+
+class TestMemoryBenchmark:
+    """Run the harness against real ChromaDB stores."""
+
+    @pytest.mark.performance
+    @pytest.mark.slow
+    def test_small_run_reports_json(self, tmp_path, capsys):
+        pytest.importorskip("chromadb")
+        report = run_benchmarks(sizes=[200], work_dir=tmp_path, query_count=20)
+        with capsys.disabled():
+            print("\n" + json.dumps(report, indent=2))
+
+        metrics = report['results']['200']['memory_manager']
+        assert metrics['records'] == 200 and metrics['disk_bytes'] > 0
+        assert metrics['recall_at_3'] >= 0.5
+        enhanced = report['results']['200']['enhanced_memory']
+        assert enhanced['saved'] == enhanced['records'] == 200
+        assert compare_reports(report, report) == []
+
+    @pytest.mark.unit
+    def test_failed_saves_abort_the_run(self, tmp_path):
+        manager = Mock()
+        manager.wait_until_ready.return_value = True
+        manager.save_enhanced_task.side_effect = [True, False, True]
+        with patch('src.core.memory_benchmark.EnhancedMemoryManager', return_value=manager):
+            with pytest.raises(RuntimeError, match="saved only 2 of 3"):
+                benchmark_enhanced_memory(tmp_path, synthetic_tasks(3), [], k=3)
+        manager.retrieve_similar_tasks.assert_not_called()
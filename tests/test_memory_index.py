@@ -0,0 +1,197 @@
+"""
+Tests for the structured memory metadata index, filtered and hybrid retrieval.
+"""
+import json
+import numpy as np
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import MemoryManager
+from src.core.document_chunker import HashingEmbedder
+from src.core.memory_index import (
+    MemoryFilter, MemoryMetadataIndex, benchmark_fusion, fts_query, infer_language, reciprocal_rank_fusion
+)
+
+NOW = 1_700_000_000.0
+
+
+def _populate(index):
+    index.add("task_1", 'task', task_type="code", success=True, score=0.9, timestamp=NOW - 100,
+              files=["app.py"], language="python")
+    index.add("task_2", 'task', task_type="code", success=False, score=0.3, timestamp=NOW - 50,
+              files=["index.ts"], generated_files=["out.js"], language="typescript")
+    index.add("task_3", 'task', task_type="rag", success=True, score=0.7, timestamp=NOW,
+              files=["report.PDF"])
+
+
+class TestMemoryMetadataIndex:
+    """Test structured filters over indexed records."""
+
+    @pytest.mark.unit
+    def test_filters_combine(self, tmp_path):
+        index = MemoryMetadataIndex(tmp_path / "index.db")
+        _populate(index)
+
+        assert index.query_ids(MemoryFilter()) == ["task_3", "task_2", "task_1"]
+        assert index.query_ids(MemoryFilter(task_type="code", success=True)) == ["task_1"]
+        assert index.query_ids(MemoryFilter(min_score=0.5, since=NOW - 60)) == ["task_3"]
+        assert index.query_ids(MemoryFilter(file_extension=".pdf")) == ["task_3"]
+        assert index.query_ids(MemoryFilter(file_extension="js")) == ["task_2"]
+        assert index.query_ids(MemoryFilter(language="Python", until=NOW - 100)) == ["task_1"]
+        assert index.query_ids(MemoryFilter(task_type="code"), limit=1) == ["task_2"]
+
+    @pytest.mark.unit
+    def test_search_and_remove(self, tmp_path):
+        index = MemoryMetadataIndex(tmp_path / "index.db")
+        _populate(index)
+        record = index.search(MemoryFilter(success=False))[0]
+        assert (record['id'], record['success']) == ("task_2", False)
+        assert (record['files'], record['generated_files']) == (["index.ts"], ["out.js"])
+
+        index.remove(["task_1", "task_2"])
+        assert index.count() == 1
+        assert index.search(MemoryFilter(file_extension="ts")) == []
+
+    @pytest.mark.unit
+    def test_infer_language(self):
+        assert infer_language(["notes.md", "main.go"]) == "go"
+        assert infer_language(["main.go"], "Here:\n```Python\nprint(1)\n```") == "python"
+        assert infer_language(["notes.md"]) is None
+
+
+class TestFilteredRetrieval:
+    """Test MemoryManager narrowing retrieval through the index."""
+
+    def _make_memory(self, tmp_path, collection):
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)):
+            memory = MemoryManager(tmp_path, flush_interval=30)
+            memory.wait_until_ready(timeout=5)
+        return memory
+
+    @pytest.mark.unit
+    def test_filtered_query_restricts_to_matching_ids(self, tmp_path):
+        collection = Mock()
+        collection.get.return_value = {'ids': [], 'metadatas': []}
+        collection.query.return_value = {'documents': [["d"]], 'metadatas': [[{'prompt': 'p', 'result': 'r'}]]}
+        memory = self._make_memory(tmp_path, collection)
+        memory.save_task({'prompt': 'fix bug', 'task_type': 'code', 'files': ['a.py'], 'success': True,
+                          'score': 0.8, 'timestamp': NOW})
+        memory.save_task({'prompt': 'summarize', 'task_type': 'rag', 'files': ['b.pdf'], 'timestamp': NOW + 1})
+        memory.flush()
+        python_id = collection.add.call_args.kwargs['ids'][0]
+        assert collection.add.call_args.kwargs['metadatas'][0]['record_id'] == python_id
+        collection.query.return_value['ids'] = [[python_id]]
+
+        context = memory.retrieve_context("fix it", "code", n_results=3, filters=MemoryFilter(language="python"))
+
+        assert context == "Previous: p\nResult: r"
+        kwargs = collection.query.call_args.kwargs
+        assert kwargs['where'] == {"record_id": {"$in": [python_id]}} and kwargs['n_results'] == 1
+
+        collection.query.reset_mock()
+        assert memory.retrieve_context("fix it", "code", filters=MemoryFilter(task_type="analytics")) == ""
+        collection.query.assert_not_called()
+        memory.close()
+
+    @pytest.mark.unit
+    def test_backfill_indexes_legacy_tasks(self, tmp_path):
+        collection = Mock()
+        collection.get.return_value = {
+            'ids': ["task_1", "memory_1"],
+            'metadatas': [{'task_type': 'code', 'files': "['x.rs']", 'timestamp': NOW}, {'task_type': 'code'}],
+        }
+        memory = self._make_memory(tmp_path, collection)
+        memory._backfill_index()  # the init thread may still be running its ready callbacks
+
+        assert memory.find_records(MemoryFilter(language="rust"))[0]['id'] == "task_1"
+        assert collection.update.call_args.kwargs['metadatas'][0]['record_id'] == "task_1"
+        memory.close()
+
+
+class TestLexicalSearch:
+    """Test BM25 keyword search and rank fusion."""
+
+    @pytest.mark.unit
+    def test_identifiers_match_exactly(self, tmp_path):
+        index = MemoryMetadataIndex(tmp_path / "index.db")
+        index.add("task_1", 'task', task_type="code", text="Fix KeyError in parse_config when the file is empty")
+        index.add("task_2", 'task', task_type="code", text="Write a config parser for YAML files")
+        index.add("task_3", 'task', task_type="rag", text="Summarize the parse_config design notes")
+
+        assert set(index.lexical_search("parse_config")) == {"task_1", "task_3"}
+        assert index.lexical_search("KeyError parse_config")[0] == "task_1"
+        assert index.lexical_search("parse_config", MemoryFilter(task_type="rag")) == ["task_3"]
+        assert index.lexical_search("?!") == []
+
+        index.add("task_1", 'task', task_type="code", text="Rename the module")
+        index.remove(["task_3"])
+        assert index.lexical_search("parse_config") == []
+
+    @pytest.mark.unit
+    def test_fts_query_quotes_terms(self):
+        assert fts_query('Fix "AND" OR x.y') == '"fix" OR "and" OR "or" OR "x" OR "y"'
+
+    @pytest.mark.unit
+    def test_reciprocal_rank_fusion(self):
+        assert reciprocal_rank_fusion([["a", "b", "c"], ["c", "b"]]) == ["c", "b", "a"]
+        assert reciprocal_rank_fusion([["a", "b"], ["b"]], [1.0, 0.0]) == ["a", "b"]
+
+
+class TestHybridRetrieval:
+    """Test MemoryManager fusing vector and keyword hits."""
+
+    @pytest.mark.unit
+    def test_keyword_only_hit_is_fetched(self, tmp_path):
+        collection = Mock()
+        collection.get.return_value = {'ids': [], 'metadatas': []}
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)):
+            memory = MemoryManager(tmp_path, flush_interval=30)
+            memory.wait_until_ready(timeout=5)
+        memory.save_task({'prompt': 'Fix ValueError in load_rows', 'task_type': 'code', 'result': 'patched'})
+        memory.flush()
+        exact_id = collection.add.call_args.kwargs['ids'][0]
+        collection.query.return_value = {'ids': [["task_a", "task_b"]], 'documents': [["a", "b"]],
+                                         'metadatas': [[{'prompt': 'semantic a'}, {'prompt': 'semantic b'}]]}
+        collection.get.return_value = {'ids': [exact_id], 'metadatas': [{'prompt': 'exact', 'result': 'patched'}]}
+
+        context = memory.retrieve_context("load_rows raises ValueError", "code", n_results=2)
+
+        assert "Previous: exact\nResult: patched" in context
+        assert "semantic a" in context and "semantic b" not in context
+        assert collection.query.call_args.kwargs['n_results'] == 2 * memory.fusion_pool_factor
+        memory.close()
+
+
+class TestFusionBenchmark:
+    """Benchmark fusion weights on identifier-heavy queries."""
+
+    @pytest.mark.performance
+    def test_hybrid_recall_and_latency(self, tmp_path, capsys):
+        rng = np.random.default_rng(7)
+        words = ["parse", "config", "load", "rows", "cache", "render", "chart", "query", "retry", "socket"]
+        index = MemoryMetadataIndex(tmp_path / "index.db")
+        documents = {}
+        for i in range(400):
+            body = " ".join(rng.choice(words, size=12))
+            documents[f"task_{i}"] = f"{body} handle_{i}_error in module_{i % 40}"
+            index.add(f"task_{i}", 'task', task_type="code", text=documents[f"task_{i}"])
+        ids = list(documents)
+        # Stand-in for a semantic embedding: narrow hashing vectors blur exact identifiers
+        embedder = HashingEmbedder(dimensions=32)
+        matrix = embedder([documents[i] for i in ids])
+
+        def vector_search(query, limit):
+            scores = matrix @ embedder([query])[0]
+            return [ids[i] for i in np.argsort(-scores)[:limit]]
+
+        def lexical_search(query, limit):
+            return index.lexical_search(query, limit=limit)
+
+        labeled = [(f"why does handle_{i}_error fail", f"task_{i}") for i in range(0, 400, 8)]
+        report = benchmark_fusion(labeled, vector_search, lexical_search)
+        with capsys.disabled():
+            print("\n" + json.dumps(report, indent=2))
+
+        assert report["vector=1,lexical=1"]["recall_at_3"] >= report["vector=1,lexical=0"]["recall_at_3"]
+        assert report["vector=1,lexical=1"]["recall_at_3"] >= 0.9
+        assert report["latency_ms"]["lexical"] < 50
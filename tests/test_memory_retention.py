@@ -0,0 +1,129 @@
+"""
+Tests for task memory retention, compaction and archival.
+"""
+import gzip
+import json
+import pytest
+from unittest.mock import patch
+
+from supermini import MemoryManager
+from src.core.memory_retention import MemoryRetention, RetentionPolicy, summarize_result
+
+DAY = 24 * 3600
+NOW = 1_700_000_000.0
+
+
+class _Collection:
+    """Minimal in-memory stand-in for a ChromaDB collection"""
+
+    def __init__(self):
+        self.records = {}
+
+    def add(self, documents, metadatas, ids):
+        for record_id, document, metadata in zip(ids, documents, metadatas):
+            self.records.setdefault(record_id, (document, dict(metadata)))
+
+    def get(self, where=None, include=None):
+        ids = list(self.records)
+        return {'ids': ids,
+                'documents': [self.records[i][0] for i in ids],
+                'metadatas': [self.records[i][1] for i in ids]}
+
+    def delete(self, ids):
+        for record_id in ids:
+            self.records.pop(record_id, None)
+
+    def update(self, ids, documents, metadatas):
+        for record_id, document, metadata in zip(ids, documents, metadatas):
+            self.records[record_id] = (document, metadata)
+
+
+def _add_task(collection, record_id, prompt, age_days, task_type="code", result="done"):
+    metadata = {'prompt': prompt, 'task_type': task_type, 'result': result, 'timestamp': NOW - age_days * DAY}
+    collection.add([f"Prompt: {prompt}"], [metadata], [record_id])
+
+
+def _archived(archive_dir):
+    records = []
+    for path in archive_dir.glob("*.jsonl.gz"):
+        with gzip.open(path, 'rt', encoding='utf-8') as f:
+            records.extend(json.loads(line) for line in f)
+    return records
+
+
+class TestMemoryRetention:
+    """Test a retention pass over saved tasks."""
+
+    @pytest.mark.unit
+    def test_near_duplicates_keep_newest(self, tmp_path):
+        collection = _Collection()
+        _add_task(collection, "task_1", "Write a script to back up my documents folder", 3)
+        _add_task(collection, "task_2", "write a script to back up my Documents folder", 1)
+        _add_task(collection, "task_3", "write a script to back up my documents folder", 2, task_type="automation")
+        _add_task(collection, "memory_1", "write a script to back up my documents folder", 5)
+
+        report = MemoryRetention(tmp_path, RetentionPolicy(compact_after_days=0)).run(collection, NOW)
+
+        assert report.deduplicated == 1
+        assert set(collection.records) == {"task_2", "task_3", "memory_1"}
+        assert [(r['id'], r['reason']) for r in _archived(tmp_path)] == [("task_1", "duplicate")]
+
+    @pytest.mark.unit
+    def test_age_and_count_caps(self, tmp_path):
+        collection = _Collection()
+        for i in range(6):
+            _add_task(collection, f"task_{i}", f"distinct task number {i} about topic {i * 7}", age_days=i * 10)
+        policy = RetentionPolicy(max_age_days=45, max_records=3, compact_after_days=0, dedup_threshold=0)
+
+        report = MemoryRetention(tmp_path, policy).run(collection, NOW)
+
+        assert (report.expired, report.over_capacity) == (1, 2)
+        assert set(collection.records) == {"task_0", "task_1", "task_2"}
+        assert report.archived == 3
+
+    @pytest.mark.unit
+    def test_old_tasks_are_compacted_once(self, tmp_path):
+        collection = _Collection()
+        long_result = "Here is the script.\n```python\n" + "print('x')\n" * 200 + "```\nRun it daily. " * 5
+        _add_task(collection, "task_old", "Create a backup script", 40, result=long_result)
+        _add_task(collection, "task_new", "Plot the sales data", 1, result=long_result)
+        retention = MemoryRetention(tmp_path, RetentionPolicy(compact_after_days=30, summary_chars=120))
+
+        assert retention.run(collection, NOW).compacted == 1
+        document, metadata = collection.records["task_old"]
+        assert metadata['compacted'] is True and len(metadata['result']) <= 120
+        assert "[code: 200 lines]" in metadata['result'] and "[code:" in document
+        assert collection.records["task_new"][1]['result'] == long_result
+        assert _archived(tmp_path)[0]['metadata']['result'] == long_result
+
+        assert retention.run(collection, NOW).compacted == 0
+
+    @pytest.mark.unit
+    def test_summarize_result(self):
+        assert summarize_result("a\n\n b ```js\nx\ny\n``` c") == "a b [code: 2 lines] c"
+        assert summarize_result("word " * 100, max_chars=20).endswith("...")
+
+
+class TestMemoryManagerRetention:
+    """Test MemoryManager running retention passes."""
+
+    @pytest.mark.unit
+    def test_apply_retention_flushes_and_invalidates(self, tmp_path):
+        collection = _Collection()
+        policy = RetentionPolicy(max_records=1, compact_after_days=0)
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)), \
+             patch.object(MemoryManager, '_start_retention_schedule', lambda self: None):
+            memory = MemoryManager(tmp_path, flush_interval=30, retention=policy)
+            memory.wait_until_ready(timeout=5)
+
+        memory.save_task({'prompt': 'first distinct task', 'task_type': 'code', 'timestamp': NOW - 10})
+        memory.save_task({'prompt': 'second unrelated job', 'task_type': 'rag', 'timestamp': NOW})
+        generation = memory.generation
+
+        report = memory.apply_retention(now=NOW)
+
+        assert report.over_capacity == 1 and len(collection.records) == 1
+        assert memory.generation > generation
+        assert memory.get_stats()['memory_retention_evicted'] == 1
+        assert (tmp_path / "memory_archive").exists()
+        memory.close()
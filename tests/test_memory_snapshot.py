@@ -0,0 +1,151 @@
+"""
+Tests for memory snapshot export and import.
+"""
+import gzip
+import threading
+import numpy as np
+import pytest
+from unittest.mock import patch
+
+from supermini import MemoryManager, MemorySnapshotThread
+from src.core.memory_index import MemoryFilter
+from src.core.memory_snapshot import export_snapshot, import_snapshot, iter_snapshot, snapshot_format
+
+
+class _Collection:
+    """Minimal in-memory stand-in for a ChromaDB collection with stored embeddings"""
+
+    def __init__(self, dimension=4):
+        self.dimension = dimension
+        self.records = {}
+        self.embedded = 0
+
+    def _embed(self, document):
+        self.embedded += 1
+        return [float(len(document) % 7)] * self.dimension
+
+    def upsert(self, ids, documents, metadatas, embeddings=None):
+        for i, record_id in enumerate(ids):
+            embedding = embeddings[i] if embeddings is not None else self._embed(documents[i])
+            self.records[record_id] = (documents[i], dict(metadatas[i]), list(embedding))
+
+    def add(self, documents, metadatas, ids):
+        self.upsert(ids, documents, metadatas)
+
+    def get(self, where=None, include=None, limit=None, offset=0):
+        ids = list(self.records)[offset:None if limit is None else offset + limit]
+        return {'ids': ids,
+                'documents': [self.records[i][0] for i in ids],
+                'metadatas': [self.records[i][1] for i in ids],
+                'embeddings': [self.records[i][2] for i in ids]}
+
+
+def _filled_collection(count):
+    collection = _Collection()
+    rng = np.random.default_rng(0)
+    collection.upsert(
+        ids=[f"task_{i}" for i in range(count)],
+        documents=[f"Prompt: task {i}" for i in range(count)],
+        metadatas=[{'task_type': 'code', 'files': "['m.py']", 'score': i / count} for i in range(count)],
+        embeddings=rng.normal(size=(count, 4)).astype(np.float32).tolist(),
+    )
+    return collection
+
+
+class TestSnapshotFiles:
+    """Test round-tripping collections through snapshot files."""
+
+    @pytest.mark.unit
+    def test_jsonl_roundtrip_keeps_embeddings(self, tmp_path):
+        source = _filled_collection(25)
+        path = tmp_path / "memory.jsonl.gz"
+
+        exported = export_snapshot(source, path, batch_size=10)
+        target = _Collection()
+        imported = import_snapshot(target, path, batch_size=7)
+
+        assert exported.records == imported.records == 25 and exported.bytes > 0
+        assert target.embedded == 0
+        for record_id, (document, metadata, embedding) in source.records.items():
+            assert target.records[record_id][:2] == (document, metadata)
+            assert target.records[record_id][2] == pytest.approx(embedding)
+        assert [len(batch.ids) for batch in iter_snapshot(path, batch_size=7)] == [7, 7, 7, 4]
+
+    @pytest.mark.unit
+    def test_missing_embeddings_are_recomputed(self, tmp_path):
+        source = _filled_collection(3)
+        source.records["task_1"] = source.records["task_1"][:2] + ([],)
+        path = tmp_path / "memory.jsonl.gz"
+        export_snapshot(source, path)
+
+        target = _Collection()
+        import_snapshot(target, path)
+        assert target.embedded == 3
+
+    @pytest.mark.unit
+    def test_format_validation(self, tmp_path):
+        with pytest.raises(ValueError):
+            snapshot_format(tmp_path / "memory.csv")
+        path = tmp_path / "other.jsonl.gz"
+        with gzip.open(path, 'wt') as f:
+            f.write('{"format": "something-else"}\n')
+        with pytest.raises(ValueError):
+            list(iter_snapshot(path))
+
+    @pytest.mark.unit
+    def test_parquet_roundtrip(self, tmp_path):
+        pytest.importorskip("pyarrow")
+        source = _filled_collection(12)
+        path = tmp_path / "memory.parquet"
+        export_snapshot(source, path, batch_size=5)
+        target = _Collection()
+        assert import_snapshot(target, path).records == 12 and target.embedded == 0
+
+
+class TestMemoryManagerSnapshots:
+    """Test MemoryManager export and import."""
+
+    @pytest.mark.unit
+    def test_import_populates_metadata_index(self, tmp_path):
+        source = _filled_collection(5)
+        path = tmp_path / "memory.jsonl.gz"
+        export_snapshot(source, path)
+        target = _Collection()
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', target)):
+            memory = MemoryManager(tmp_path / "fresh", flush_interval=30)
+            memory.wait_until_ready(timeout=5)
+        generation = memory.generation
+
+        assert memory.import_snapshot(path).records == 5
+        assert memory.generation > generation
+        assert len(memory.find_records(MemoryFilter(language="python", min_score=0.5))) == 2
+        memory.close()
+
+    @pytest.mark.unit
+    def test_export_gives_up_when_store_is_not_ready(self, tmp_path):
+        opened = threading.Event()
+        with patch.object(MemoryManager, 'setup_memory', lambda self: opened.wait(5)):
+            memory = MemoryManager(tmp_path / "slow", flush_interval=30)
+            try:
+                assert memory.export_snapshot(tmp_path / "memory.jsonl.gz", ready_timeout=0.05) is None
+            finally:
+                opened.set()
+                memory.close()
+
+    @pytest.mark.unit
+    def test_snapshot_thread_reports_result_and_errors(self, qapp):
+        results, errors = [], []
+
+        def fail():
+            raise OSError("disk full")
+
+        for operation in (lambda: None, fail):
+            thread = MemorySnapshotThread(operation)
+            thread.result_signal.connect(results.append)
+            thread.error_signal.connect(errors.append)
+            thread.start()
+            assert thread.wait(5000)
+            qapp.processEvents()
+
+        assert results == [None]
+        assert errors == ["disk full"]
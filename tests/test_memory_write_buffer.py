@@ -0,0 +1,112 @@
+"""
+Tests for batched write-behind memory writes.
+"""
+import threading
+import time
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import MemoryManager, MemoryWriteBuffer
+
+
+class _Recorder:
+    def __init__(self, delay=0.0):
+        self.batches = []
+        self.delay = delay
+        self.lock = threading.Lock()
+
+    def __call__(self, documents, metadatas, ids):
+        time.sleep(self.delay)
+        with self.lock:
+            self.batches.append(list(ids))
+
+
+class TestMemoryWriteBuffer:
+    """Test batching, flushing and shutdown of the write-behind buffer."""
+
+    @pytest.mark.unit
+    def test_full_batches_are_written_together(self):
+        recorder = _Recorder()
+        buffer = MemoryWriteBuffer(recorder, batch_size=5, flush_interval=30)
+
+        for i in range(10):
+            buffer.add(f"doc {i}", {}, f"id-{i}")
+        assert buffer.flush(timeout=5)
+
+        assert recorder.batches == [[f"id-{i}" for i in range(5)], [f"id-{i}" for i in range(5, 10)]]
+        buffer.close()
+
+    @pytest.mark.unit
+    def test_partial_batch_written_after_interval(self):
+        recorder = _Recorder()
+        buffer = MemoryWriteBuffer(recorder, batch_size=100, flush_interval=0.05)
+
+        buffer.add("doc", {}, "only")
+        deadline = time.time() + 5
+        while not recorder.batches and time.time() < deadline:
+            time.sleep(0.01)
+
+        assert recorder.batches == [["only"]]
+        buffer.close()
+
+    @pytest.mark.unit
+    def test_add_does_not_wait_for_write(self):
+        recorder = _Recorder(delay=0.3)
+        buffer = MemoryWriteBuffer(recorder, batch_size=1, flush_interval=30)
+
+        start = time.perf_counter()
+        for i in range(3):
+            buffer.add("doc", {}, f"id-{i}")
+        assert time.perf_counter() - start < 0.1
+        assert buffer.get_stats()['memory_queue_depth'] >= 1
+
+        buffer.close()
+        assert sum(len(batch) for batch in recorder.batches) == 3
+
+    @pytest.mark.unit
+    def test_close_writes_pending_records_and_rejects_new_ones(self):
+        recorder = _Recorder()
+        buffer = MemoryWriteBuffer(recorder, batch_size=100, flush_interval=30)
+        buffer.add("a", {}, "a")
+        buffer.add("b", {}, "b")
+
+        buffer.close()
+
+        assert recorder.batches == [["a", "b"]]
+        assert buffer.add("c", {}, "c") is False
+        stats = buffer.get_stats()
+        assert stats['memory_records_written'] == 2 and stats['memory_queue_depth'] == 0
+
+    @pytest.mark.unit
+    def test_duplicate_ids_and_failures(self):
+        write = Mock(side_effect=[None, RuntimeError("disk full")])
+        buffer = MemoryWriteBuffer(write, batch_size=100, flush_interval=30)
+        buffer.add("first", {}, "same")
+        buffer.add("second", {}, "same")
+        buffer.flush(timeout=5)
+        buffer.add("third", {}, "other")
+        buffer.close()
+
+        assert write.call_args_list[0].args == (["first"], [{}], ["same"])
+        assert buffer.get_stats()['memory_write_failures'] == 1
+
+
+class TestMemoryManagerWrites:
+    """Test MemoryManager routing writes through the buffer."""
+
+    @pytest.mark.unit
+    def test_save_task_is_batched(self, tmp_path):
+        collection = Mock()
+        with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)):
+            memory = MemoryManager(tmp_path, write_batch_size=10, flush_interval=30)
+            assert memory.wait_until_ready(timeout=5)
+
+        for i in range(3):
+            assert memory.save_task({'prompt': f"task {i}", 'task_type': 'code', 'files': ['a.py']})
+        assert memory.add_memory({'content': 'note', 'metadata': {'source': 'test'}})
+        collection.add.assert_not_called()
+
+        memory.close()
+        collection.add.assert_called_once()
+        assert len(collection.add.call_args.kwargs['ids']) == 4
+        assert collection.add.call_args.kwargs['metadatas'][0]['files'] == "['a.py']"
@@ -0,0 +1,133 @@
+"""
+Tests for the persistent model response cache.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+import supermini
+from supermini import AIConfig, OllamaManager, ResponseCache
+
+
+def _make_cache(tmp_path, **overrides):
+    options = dict(ttl=3600, max_entries=100, max_temperature=0.4)
+    options.update(overrides)
+    return ResponseCache(tmp_path / "data" / "response_cache.db", **options)
+
+
+def _make_ollama(cache, temperature=0.2, monitor=None):
+    with patch.object(OllamaManager, 'setup_ollama', return_value=True):
+        return OllamaManager(AIConfig(temperature=temperature), monitor=monitor, response_cache=cache)
+
+
+class TestResponseCache:
+    """Test keying, expiry and eviction."""
+
+    @pytest.mark.unit
+    def test_key_covers_model_system_prompt_temperature_and_prompt(self, tmp_path):
+        cache = _make_cache(tmp_path)
+        base = cache.key_for("m", "sys", 0.2, "prompt")
+
+        assert base == cache.key_for("m", "sys", 0.2, "prompt")
+        assert base != cache.key_for("other", "sys", 0.2, "prompt")
+        assert base != cache.key_for("m", "other", 0.2, "prompt")
+        assert base != cache.key_for("m", "sys", 0.3, "prompt")
+        assert base != cache.key_for("m", "sys", 0.2, "other")
+
+    @pytest.mark.unit
+    def test_hot_temperatures_bypass_unless_forced(self, tmp_path):
+        cache = _make_cache(tmp_path)
+        assert cache.key_for("m", "", 0.9, "prompt") is None
+        assert cache.key_for("m", "", 0.9, "prompt", force=True) is not None
+
+    @pytest.mark.unit
+    def test_round_trip_and_stats(self, tmp_path):
+        cache = _make_cache(tmp_path)
+        key = cache.key_for("m", "", 0.2, "prompt")
+
+        assert cache.get(key) is None
+        cache.put(key, "m", "answer")
+        assert cache.get(key) == "answer"
+
+        stats = cache.get_stats()
+        assert stats['response_cache_hits'] == 1
+        assert stats['response_cache_misses'] == 1
+        assert stats['response_cache_entries'] == 1
+        assert stats['response_cache_hit_rate'] == 0.5
+
+    @pytest.mark.unit
+    def test_expired_entries_miss(self, tmp_path):
+        cache = _make_cache(tmp_path, ttl=10)
+        key = cache.key_for("m", "", 0.2, "prompt")
+        with patch.object(supermini.time, 'time', return_value=1000.0):
+            cache.put(key, "m", "answer")
+        with patch.object(supermini.time, 'time', return_value=1011.0):
+            assert cache.get(key) is None
+
+    @pytest.mark.unit
+    def test_least_recently_used_entries_are_evicted(self, tmp_path):
+        cache = _make_cache(tmp_path, ttl=float("inf"), max_entries=2)
+        keys = [cache.key_for("m", "", 0.2, f"prompt {i}") for i in range(3)]
+
+        with patch.object(supermini.time, 'time', return_value=1000.0):
+            cache.put(keys[0], "m", "a0")
+        with patch.object(supermini.time, 'time', return_value=1001.0):
+            cache.put(keys[1], "m", "a1")
+        with patch.object(supermini.time, 'time', return_value=1002.0):
+            assert cache.get(keys[0]) == "a0"
+        with patch.object(supermini.time, 'time', return_value=1003.0):
+            cache.put(keys[2], "m", "a2")
+
+        assert cache.get(keys[1]) is None
+        assert cache.get(keys[0]) == "a0"
+        assert cache.get(keys[2]) == "a2"
+        assert cache.get_stats()['response_cache_evictions'] == 1
+
+
+class TestCachedQueries:
+    """Test the cache wired into the model managers."""
+
+    @pytest.mark.unit
+    def test_repeated_query_served_from_cache(self, tmp_path):
+        monitor = Mock()
+        manager = _make_ollama(_make_cache(tmp_path), monitor=monitor)
+
+        with patch.object(manager, '_generate', return_value="answer") as generate:
+            assert manager.query("same prompt") == "answer"
+            assert manager.query("same prompt") == "answer"
+
+        generate.assert_called_once()
+        monitor.update_stats.assert_any_call('response_cache_hits')
+        monitor.update_stats.assert_any_call('response_cache_misses')
+
+    @pytest.mark.unit
+    def test_cache_hit_is_streamed_as_one_chunk(self, tmp_path):
+        manager = _make_ollama(_make_cache(tmp_path))
+        received = []
+
+        with patch.object(manager, '_generate', return_value="answer"):
+            manager.query("same prompt")
+            manager.query("same prompt", stream_callback=received.append)
+
+        assert received == ["answer"]
+
+    @pytest.mark.unit
+    def test_non_deterministic_temperature_bypasses_cache(self, tmp_path):
+        manager = _make_ollama(_make_cache(tmp_path), temperature=0.8)
+
+        with patch.object(manager, '_generate', return_value="answer") as generate:
+            manager.query("same prompt")
+            manager.query("same prompt")
+            manager.query("same prompt", cacheable=True)
+            manager.query("same prompt", cacheable=True)
+
+        assert generate.call_count == 3
+
+    @pytest.mark.unit
+    def test_failed_queries_are_not_cached(self, tmp_path):
+        manager = _make_ollama(_make_cache(tmp_path))
+
+        with patch.object(manager, '_generate', side_effect=[None, "answer"]) as generate:
+            assert manager.query("prompt") is None
+            assert manager.query("prompt") == "answer"
+
+        assert generate.call_count == 2
@@ -0,0 +1,94 @@
+"""
+Tests for the in-process memory retrieval cache.
+"""
+import pytest
+from unittest.mock import Mock, patch
+
+from supermini import MemoryManager, RetrievalCache
+
+
+def _query_results(prompt="old task", result="old result"):
+    return {"ids": [["task_1"]], "documents": [["doc"]], "metadatas": [[{"prompt": prompt, "result": result}]]}
+
+
+def _make_memory(tmp_path, **kwargs):
+    collection = Mock()
+    collection.query.return_value = _query_results()
+    collection.get.return_value = {"ids": [], "metadatas": []}
+    with patch.object(MemoryManager, 'setup_memory', lambda self: setattr(self, 'collection', collection)):
+        memory = MemoryManager(tmp_path, flush_interval=30, **kwargs)
+        memory.wait_until_ready(timeout=5)
+    return memory, collection
+
+
+class TestRetrievalCache:
+    """Test exact, similar and stale lookups."""
+
+    @pytest.mark.unit
+    def test_exact_hit_ignores_case_and_whitespace(self):
+        cache = RetrievalCache(similarity_threshold=0)
+        cache.put("Sort a  CSV file", "code", 3, 0, "context")
+
+        assert cache.get("sort a csv file\n", "code", 3, 0)[0] == "context"
+        assert cache.get("sort a csv file", "analytics", 3, 0)[0] is None
+        assert cache.get_stats()['retrieval_cache_exact_hits'] == 1
+
+    @pytest.mark.unit
+    def test_similar_prompt_reuses_results(self):
+        cache = RetrievalCache(similarity_threshold=0.8)
+        cache.put("write a python script that sorts a csv file by the date column", "code", 3, 0, "context")
+
+        assert cache.get("write a python script that sorts a csv file by the date column please", "code", 3, 0)[0] == "context"
+        assert cache.get("summarize these research papers", "code", 3, 0)[0] is None
+        stats = cache.get_stats()
+        assert stats['retrieval_cache_similar_hits'] == 1 and stats['retrieval_cache_misses'] == 1
+
+    @pytest.mark.unit
+    def test_new_generation_drops_entries(self):
+        cache = RetrievalCache()
+        cache.put("prompt", "code", 3, 0, "context")
+
+        assert cache.get("prompt", "code", 3, 1)[0] is None
+        cache.put("prompt", "code", 3, 0, "stale")
+        assert cache.get("prompt", "code", 3, 1)[0] is None
+
+    @pytest.mark.unit
+    def test_least_recently_used_evicted(self):
+        cache = RetrievalCache(max_entries=2, similarity_threshold=0)
+        cache.put("a", "code", 3, 0, "A")
+        cache.put("b", "code", 3, 0, "B")
+        cache.get("a", "code", 3, 0)
+        cache.put("c", "code", 3, 0, "C")
+
+        assert cache.get("b", "code", 3, 0)[0] is None
+        assert cache.get("a", "code", 3, 0)[0] == "A"
+
+
+class TestRetrieveContext:
+    """Test MemoryManager.retrieve_context using the cache."""
+
+    @pytest.mark.unit
+    def test_repeated_query_skips_collection(self, tmp_path):
+        memory, collection = _make_memory(tmp_path)
+
+        first = memory.retrieve_context("Fix the parser", "code")
+        second = memory.retrieve_context("fix the parser", "code")
+
+        assert first == second == "Previous: old task\nResult: old result"
+        assert collection.query.call_count == 1
+        memory.close()
+
+    @pytest.mark.unit
+    def test_written_records_invalidate_cache(self, tmp_path):
+        memory, collection = _make_memory(tmp_path)
+        memory.retrieve_context("Fix the parser", "code")
+
+        memory.save_task({'prompt': 'Fix the lexer', 'task_type': 'code', 'result': 'done'})
+        assert memory.retrieve_context("Fix the parser", "code")
+        assert collection.query.call_count == 1
+
+        memory.flush(timeout=5)
+        collection.query.return_value = _query_results("Fix the lexer", "done")
+        assert "Fix the lexer" in memory.retrieve_context("Fix the parser", "code")
+        assert collection.query.call_count == 2
+        memory.close()
@@ -0,0 +1,97 @@
+"""
+Tests for the pooled SafeRequests HTTP wrapper.
+"""
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import requests
+
+from supermini import SafeRequests
+
+
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"models": []}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def local_server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+    server.daemon_threads = True
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+class TestSafeRequestsTimeouts:
+    """Test per-endpoint timeout selection."""
+
+    @pytest.mark.unit
+    def test_known_endpoints_use_their_timeouts(self):
+        assert SafeRequests.timeout_for("http://localhost:11434/api/tags", "GET") == (3, 10)
+        assert SafeRequests.timeout_for("http://localhost:11434/api/generate", "POST") == (5, 120)
+
+    @pytest.mark.unit
+    def test_unknown_endpoints_fall_back_to_method_default(self):
+        assert SafeRequests.timeout_for("http://example.com/other", "GET") == SafeRequests.DEFAULT_TIMEOUTS['GET']
+        assert SafeRequests.timeout_for("http://example.com/other", "POST") == SafeRequests.DEFAULT_TIMEOUTS['POST']
+
+    @pytest.mark.unit
+    def test_explicit_timeout_is_kept(self):
+        with patch.object(requests.Session, 'request') as request:
+            SafeRequests.post("http://localhost:11434/api/generate", json={}, timeout=7)
+        assert request.call_args.kwargs['timeout'] == 7
+
+    @pytest.mark.unit
+    def test_request_errors_return_none(self):
+        before = SafeRequests.get_connection_stats()['http_errors']
+        with patch.object(requests.Session, 'request', side_effect=requests.ConnectionError("down")):
+            assert SafeRequests.get("http://localhost:11434/api/tags") is None
+        assert SafeRequests.get_connection_stats()['http_errors'] == before + 1
+
+
+class TestSafeRequestsPooling:
+    """Test keep-alive connection reuse."""
+
+    @pytest.mark.unit
+    def test_threads_get_separate_sessions_on_one_adapter(self):
+        sessions = []
+
+        def grab():
+            sessions.append(SafeRequests._get_session())
+
+        worker = threading.Thread(target=grab)
+        worker.start()
+        worker.join()
+        grab()
+
+        assert sessions[0] is not sessions[1]
+        assert sessions[0].get_adapter("http://x") is sessions[1].get_adapter("http://x")
+
+    @pytest.mark.unit
+    def test_connections_are_reused(self, local_server):
+        before = SafeRequests.get_connection_stats()
+
+        for _ in range(5):
+            response = SafeRequests.get(f"{local_server}/api/tags")
+            assert response.status_code == 200
+
+        stats = SafeRequests.get_connection_stats()
+        assert stats['http_requests'] - before['http_requests'] == 5
+        assert stats['http_connections_opened'] - before['http_connections_opened'] == 1
+        assert stats['http_connections_reused'] - before['http_connections_reused'] == 4
+        assert 0 < stats['http_reuse_rate'] <= 1
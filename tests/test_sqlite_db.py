@@ -0,0 +1,221 @@
+"""
+Tests for the shared SQLite helpers.
+"""
+import sqlite3
+import threading
+import time
+import pytest
+
+from src.core.sqlite_db import Migration, SQLiteDatabase, migrate, query_plan, schema_version, table_columns
+
+MIGRATIONS = [
+    Migration(1, "items", "CREATE TABLE items (id INTEGER PRIMARY KEY, data TEXT NOT NULL);"),
+    Migration(2, "kind column", """
+        ALTER TABLE items ADD COLUMN kind TEXT;
+        UPDATE items SET kind = json_extract(data, '$.kind');
+        CREATE INDEX idx_items_kind ON items (kind);
+    """),
+]
+
+
+class TestMigrations:
+    """Test the versioned migration runner."""
+
+    @pytest.mark.unit
+    def test_applies_pending_steps_once(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "db.sqlite")
+        assert migrate(conn, MIGRATIONS[:1]) == [1]
+        conn.execute("""INSERT INTO items (data) VALUES ('{"kind": "a"}')""")
+        conn.commit()
+
+        assert migrate(conn, MIGRATIONS) == [2]
+        assert migrate(conn, MIGRATIONS) == []
+        assert schema_version(conn) == 2
+        assert table_columns(conn, "items") == ["id", "data", "kind"]
+        assert conn.execute("SELECT kind FROM items").fetchone() == ("a",)
+
+    @pytest.mark.unit
+    def test_failed_step_rolls_back(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "db.sqlite")
+        broken = MIGRATIONS + [Migration(3, "broken", "CREATE TABLE other (x); ALTER TABLE missing ADD COLUMN y;")]
+
+        with pytest.raises(sqlite3.OperationalError):
+            migrate(conn, broken)
+
+        assert schema_version(conn) == 2
+        assert conn.execute("SELECT name FROM sqlite_master WHERE name = 'other'").fetchone() is None
+
+    @pytest.mark.unit
+    def test_versions_must_ascend(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "db.sqlite")
+        with pytest.raises(ValueError):
+            migrate(conn, list(reversed(MIGRATIONS)))
+
+    @pytest.mark.unit
+    def test_query_plan_reports_index_use(self, tmp_path):
+        conn = sqlite3.connect(tmp_path / "db.sqlite")
+        migrate(conn, MIGRATIONS)
+        assert query_plan(conn, "SELECT data FROM items WHERE kind = ?", ["a"]) == [
+            "SEARCH items USING INDEX idx_items_kind (kind=?)"]
+        assert query_plan(conn, "SELECT id FROM items WHERE data LIKE ?", ["%a%"])[0].startswith("SCAN items")
+
+
+class TestSQLiteDatabase:
+    """Test pooled per-thread connections and batched transactions."""
+
+    @pytest.mark.unit
+    def test_connections_are_per_thread_and_reused(self, tmp_path):
+        db = SQLiteDatabase(tmp_path / "db.sqlite", MIGRATIONS)
+        conn = db.connection()
+        assert db.connection() is conn
+        assert db.execute("PRAGMA journal_mode").fetchone() == ("wal",)
+        assert db.execute("PRAGMA synchronous").fetchone() == (1,)  # NORMAL
+        assert schema_version(conn) == 2
+
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.connection()))
+        thread.start()
+        thread.join()
+        assert other[0] is not conn
+
+        db.close()
+        assert db.connection() is not conn
+        with pytest.raises(sqlite3.ProgrammingError):
+            conn.execute("SELECT 1")
+
+    @pytest.mark.unit
+    def test_finished_thread_connection_is_closed(self, tmp_path):
+        db = SQLiteDatabase(tmp_path / "db.sqlite", MIGRATIONS)
+        db.connection()
+        other = []
+        thread = threading.Thread(target=lambda: other.append(db.connection()))
+        thread.start()
+        thread.join()
+
+        assert len(db._connections) == 1
+        with pytest.raises(sqlite3.ProgrammingError):
+            other[0].execute("SELECT 1")
+
+    @pytest.mark.unit
+    def test_live_qthread_connection_is_not_closed(self, tmp_path, qapp):
+        from PyQt6.QtCore import QThread
+
+        db = SQLiteDatabase(tmp_path / "db.sqlite", MIGRATIONS)
+        opened, proceed = threading.Event(), threading.Event()
+        results = []
+
+        class Worker(QThread):
+            def run(self):
+                db.execute("INSERT INTO items (data) VALUES ('before')")
+                opened.set()
+                proceed.wait(5)
+                try:
+                    db.execute("INSERT INTO items (data) VALUES ('after')")
+                    results.append("ok")
+                except sqlite3.Error as e:
+                    results.append(e)
+
+        worker = Worker()
+        worker.start()
+        assert opened.wait(5)
+        # Connections opened by other threads must leave the QThread's alone
+        thread = threading.Thread(target=db.connection)
+        thread.start()
+        thread.join()
+        db.connection()
+        proceed.set()
+        assert worker.wait(5000)
+
+        assert results == ["ok"]
+        assert db.execute("SELECT COUNT(*) FROM items").fetchone() == (2,)
+
+    @pytest.mark.unit
+    def test_nested_transactions_commit_as_one_batch(self, tmp_path):
+        db = SQLiteDatabase(tmp_path / "db.sqlite", MIGRATIONS)
+        reader = sqlite3.connect(tmp_path / "db.sqlite")
+
+        with db.transaction():
+            for i in range(3):
+                with db.transaction() as conn:
+                    conn.execute("INSERT INTO items (data) VALUES (?)", (str(i),))
+            assert reader.execute("SELECT COUNT(*) FROM items").fetchone() == (0,)
+        assert reader.execute("SELECT COUNT(*) FROM items").fetchone() == (3,)
+
+        with pytest.raises(ValueError):
+            with db.transaction():
+                db.executemany("INSERT INTO items (data) VALUES (?)", [("a",), ("b",)])
+                raise ValueError("abandon the batch")
+        assert db.execute("SELECT COUNT(*) FROM items").fetchone() == (3,)
+        assert not db.connection().in_transaction
+
+    @pytest.mark.unit
+    def test_concurrent_writers_and_snapshot_reads(self, tmp_path):
+        db = SQLiteDatabase(tmp_path / "db.sqlite", MIGRATIONS)
+        errors = []
+
+        def write(worker):
+            try:
+                for i in range(100):
+                    with db.transaction() as conn:
+                        conn.execute("INSERT INTO items (data, kind) VALUES (?, ?)", (str(i), f"w{worker}"))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=write, args=(worker,)) for worker in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert errors == []
+
+        with db.snapshot() as conn:
+            before = conn.execute("SELECT COUNT(*) FROM items").fetchone()[0]
+            writer = threading.Thread(target=write, args=(4,))
+            writer.start()
+            writer.join()
+            # Another thread committed while this snapshot was open
+            assert conn.execute("SELECT COUNT(*) FROM items").fetchone()[0] == before == 400
+        assert db.execute("SELECT COUNT(*) FROM items").fetchone()[0] == 500
+
+    @pytest.mark.performance
+    def test_pooled_lookups_beat_connect_per_call(self, tmp_path, capsys):
+        path = tmp_path / "db.sqlite"
+        db = SQLiteDatabase(path, MIGRATIONS)
+        db.executemany("INSERT INTO items (id, data) VALUES (?, ?)", [(i, str(i)) for i in range(1000)])
+
+        def per_call(i):
+            with sqlite3.connect(path) as conn:
+                return conn.execute("SELECT data FROM items WHERE id = ?", (i,)).fetchone()
+
+        def pooled(i):
+            return db.execute("SELECT data FROM items WHERE id = ?", (i,)).fetchone()
+
+        timings = {}
+        for name, lookup in (("connect per call", per_call), ("pooled", pooled)):
+            start = time.perf_counter()
+            assert [lookup(i) for i in range(500)] == [(str(i),) for i in range(500)]
+            timings[name] = time.perf_counter() - start
+        with capsys.disabled():
+            print(f"\n500 lookups: " + ", ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in timings.items()))
+        assert timings["pooled"] < timings["connect per call"]
+
+
+class TestResearchCacheSchema:
+    """Test the migrated enhancement pattern table of the research cache."""
+
+    @pytest.mark.unit
+    def test_patterns_filter_on_indexed_type(self, tmp_path):
+        pytest.importorskip("aiohttp")
+        from src.autonomous.enhancement_research_engine import EnhancementPattern, ResearchCache
+
+        cache = ResearchCache(tmp_path)
+        for i in range(4):
+            cache.store_enhancement_pattern(EnhancementPattern(
+                f"p{i}", "name", "description", "", "performance" if i % 2 else "security",
+                0.5, 0.5, [], 0, 0.0))
+
+        assert sorted(p.pattern_id for p in cache.get_enhancement_patterns("performance")) == ["p1", "p3"]
+        conn = sqlite3.connect(cache.db_path)
+        plan = query_plan(conn, "SELECT pattern_data FROM enhancement_patterns WHERE improvement_type = ? "
+                                "ORDER BY usage_count DESC, success_rate DESC", ["performance"])
+        assert plan == ["SEARCH enhancement_patterns USING INDEX idx_patterns_type (improvement_type=?)"]
@@ -0,0 +1,227 @@
+"""
+Tests for streaming token responses from the Claude and Ollama managers.
+"""
+import json
+import threading
+import pytest
+import requests
+from unittest.mock import Mock, MagicMock, patch
+
+import supermini
+from supermini import (AIConfig, ClaudeManager, ModelLatencyTracker, OllamaManager, ResponseCache,
+                       StreamInterrupted, TaskProcessor)
+
+
+def _make_ollama(config, task_processor=None, monitor=None):
+    with patch.object(OllamaManager, 'setup_ollama', return_value=True):
+        return OllamaManager(config, monitor=monitor, task_processor=task_processor)
+
+
+def _ollama_stream_response(chunks):
+    lines = [json.dumps({"response": chunk, "done": False}).encode() for chunk in chunks]
+    lines.append(json.dumps({"response": "", "done": True}).encode())
+    response = Mock(status_code=200)
+    response.iter_lines.return_value = iter(lines)
+    return response
+
+
+class TestOllamaStreaming:
+    """Test incremental Ollama responses."""
+
+    @pytest.mark.unit
+    def test_stream_query_yields_chunks(self):
+        manager = _make_ollama(AIConfig())
+        response = _ollama_stream_response(["def ", "add(a, b):", " return a + b"])
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response) as post:
+            chunks = list(manager.stream_query("write add"))
+
+        assert chunks == ["def ", "add(a, b):", " return a + b"]
+        assert post.call_args.kwargs['json']['stream'] is True
+        assert post.call_args.kwargs['stream'] is True
+        response.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_query_forwards_chunks_to_callback(self):
+        manager = _make_ollama(AIConfig())
+        response = _ollama_stream_response(["Hello", ", ", "world"])
+        received = []
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            result = manager.query("greet", stream_callback=received.append)
+
+        assert result == "Hello, world"
+        assert received == ["Hello", ", ", "world"]
+
+    @pytest.mark.unit
+    def test_stream_stops_when_stop_requested(self):
+        processor = Mock(stop_requested=False, metrics_callback=None)
+        manager = _make_ollama(AIConfig(), task_processor=processor)
+        response = _ollama_stream_response(["one", "two", "three"])
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            chunks = []
+            for chunk in manager.stream_query("count"):
+                chunks.append(chunk)
+                processor.stop_requested = True
+
+        assert chunks == ["one"]
+        response.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_time_to_first_token_reported(self):
+        monitor = Mock()
+        metrics_callback = Mock()
+        processor = Mock(stop_requested=False, metrics_callback=metrics_callback)
+        manager = _make_ollama(AIConfig(), task_processor=processor, monitor=monitor)
+        response = _ollama_stream_response(["a", "b"])
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            list(manager.stream_query("letters"))
+
+        monitor.log_time_to_first_token.assert_called_once()
+        provider, seconds = monitor.log_time_to_first_token.call_args.args
+        assert provider == 'ollama'
+        assert seconds >= 0
+        assert metrics_callback.call_args.kwargs['time_to_first_token'] is not None
+
+    @pytest.mark.unit
+    def test_streaming_disabled_uses_blocking_request(self):
+        manager = _make_ollama(AIConfig(stream_responses=False))
+        response = Mock(status_code=200)
+        response.json.return_value = {"response": "full text"}
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response) as post:
+            result = manager.query("prompt", stream_callback=Mock())
+
+        assert result == "full text"
+        assert post.call_args.kwargs['json']['stream'] is False
+
+    @pytest.mark.unit
+    def test_stream_failure_raises_after_partial_output(self):
+        manager = _make_ollama(AIConfig())
+        response = Mock(status_code=200)
+
+        def broken_lines():
+            yield json.dumps({"response": "partial ", "done": False}).encode()
+            raise requests.ConnectionError("connection reset")
+
+        response.iter_lines.return_value = broken_lines()
+        chunks = []
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            with pytest.raises(StreamInterrupted):
+                for chunk in manager.stream_query("prompt"):
+                    chunks.append(chunk)
+
+        assert chunks == ["partial "]
+        response.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_error_line_interrupts_stream(self):
+        manager = _make_ollama(AIConfig())
+        response = Mock(status_code=200)
+        response.iter_lines.return_value = iter([
+            json.dumps({"response": "partial ", "done": False}).encode(),
+            json.dumps({"error": "model runner crashed"}).encode(),
+        ])
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            with pytest.raises(StreamInterrupted, match="model runner crashed"):
+                list(manager.stream_query("prompt"))
+        response.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_failed_status_closes_response(self):
+        manager = _make_ollama(AIConfig())
+        response = Mock(status_code=500)
+
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            assert list(manager.stream_query("prompt")) == []
+        response.close.assert_called_once()
+
+    @pytest.mark.unit
+    def test_interrupted_stream_falls_back_and_is_not_cached(self, tmp_path):
+        cache = ResponseCache(tmp_path / "response_cache.db", ttl=3600, max_entries=100, max_temperature=1.0)
+        config = AIConfig(primary_model="Ollama", hedge_requests=False)
+        with patch.object(OllamaManager, 'setup_ollama', return_value=True):
+            ollama = OllamaManager(config, response_cache=cache)
+
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.config = config
+        processor.stop_requested = False
+        processor.stream_callback = Mock()
+        processor.stream_retract_callback = Mock()
+        processor.latency_tracker = ModelLatencyTracker()
+        processor.backend_slots = {'claude': threading.BoundedSemaphore(4), 'ollama': threading.BoundedSemaphore(1)}
+        processor.ollama = ollama
+        processor.claude = Mock()
+        processor.claude.query.return_value = "backup answer"
+
+        response = Mock(status_code=200)
+
+        def broken_lines():
+            yield json.dumps({"response": "half an ans", "done": False}).encode()
+            raise requests.ConnectionError("connection reset")
+
+        response.iter_lines.return_value = broken_lines()
+        with patch.object(supermini.SafeRequests, 'post', return_value=response):
+            assert processor.query_ai_with_primary_fallback("prompt") == "backup answer"
+
+        processor.claude.query.assert_called_once()
+        processor.stream_retract_callback.assert_called_once_with("half an ans")
+        assert cache.get_stats()['response_cache_entries'] == 0
+
+
+class TestClaudeStreaming:
+    """Test incremental Claude responses."""
+
+    def _make_claude(self, task_processor=None):
+        manager = ClaudeManager(AIConfig(use_claude=False), task_processor=task_processor)
+        manager.client = MagicMock()
+        return manager
+
+    @pytest.mark.unit
+    def test_stream_query_yields_text_stream(self):
+        manager = self._make_claude()
+        stream = MagicMock()
+        stream.text_stream = iter(["Stream", "ed"])
+        manager.client.messages.stream.return_value.__enter__.return_value = stream
+
+        received = []
+        result = manager.query("hi", stream_callback=received.append)
+
+        assert result == "Streamed"
+        assert received == ["Stream", "ed"]
+        manager.client.messages.create.assert_not_called()
+
+    @pytest.mark.unit
+    def test_stream_query_cut_off_by_stop(self):
+        processor = Mock(stop_requested=False, metrics_callback=None, current_task_prompts=None)
+        manager = self._make_claude(task_processor=processor)
+        stream = MagicMock()
+        stream.text_stream = iter(["first", "second", "third"])
+        manager.client.messages.stream.return_value.__enter__.return_value = stream
+
+        chunks = []
+        for chunk in manager.stream_query("long task"):
+            chunks.append(chunk)
+            processor.stop_requested = True
+
+        assert chunks == ["first"]
+
+
+class TestSystemMonitorFirstToken:
+    """Test time-to-first-token aggregation."""
+
+    @pytest.mark.unit
+    def test_first_token_stats(self, qapp):
+        monitor = supermini.SystemMonitor()
+        assert monitor.get_first_token_stats()['streamed_responses'] == 0
+
+        monitor.log_time_to_first_token('claude', 0.4)
+        monitor.log_time_to_first_token('ollama', 0.2)
+
+        stats = monitor.get_first_token_stats()
+        assert stats['streamed_responses'] == 2
+        assert stats['last_time_to_first_token'] == 0.2
+        assert stats['avg_time_to_first_token'] == pytest.approx(0.3)
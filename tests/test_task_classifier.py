@@ -0,0 +1,135 @@
+"""
+Tests and benchmark for the local fast-path task classifier.
+"""
+import json
+import time
+import pytest
+from unittest.mock import Mock
+
+from supermini import AIConfig, TASK_TYPES, TaskProcessor
+from src.core.task_classifier import LocalTaskClassifier, benchmark_classifiers, tokenize
+
+# Held-out prompts that are not part of the seed examples
+LABELED_PROMPTS = [
+    ("Write a Python script that parses JSON logs", "code"),
+    ("Fix the failing test in my Django app", "code"),
+    ("Implement a LRU cache class in Java", "code"),
+    ("Refactor this function to be async", "code"),
+    ("Generate a picture of a cat wearing a hat", "multimedia"),
+    ("Convert my wav audio files to mp3", "multimedia"),
+    ("Crop the image and add a watermark", "multimedia"),
+    ("Create a short video from these photos", "multimedia"),
+    ("Summarize the attached quarterly report", "rag"),
+    ("What does this paper conclude about sleep", "rag"),
+    ("Answer questions about the employee handbook document", "rag"),
+    ("List the key points of these notes", "rag"),
+    ("Rename the files in my photos folder by date", "automation"),
+    ("Schedule a nightly backup of the project directory", "automation"),
+    ("Clean up old files in the downloads folder every week", "automation"),
+    ("Automate copying new reports to the shared drive", "automation"),
+    ("Plot monthly revenue from sales.csv", "analytics"),
+    ("Calculate summary statistics for this dataset", "analytics"),
+    ("Show a chart of user signups per region", "analytics"),
+    ("Find correlations between price and demand in the data", "analytics"),
+]
+
+
+def _make_processor(classifier, response="code,0.9", latency=0.0):
+    processor = TaskProcessor.__new__(TaskProcessor)
+    processor.config = AIConfig()
+    processor.local_classifier = classifier
+
+    def query(prompt, **kwargs):
+        time.sleep(latency)
+        return response(prompt) if callable(response) else response
+
+    processor.query_ai_with_primary_fallback = Mock(side_effect=query)
+    return processor
+
+
+class TestLocalTaskClassifier:
+    """Test the naive Bayes classifier."""
+
+    @pytest.mark.unit
+    def test_tokenize_adds_bigrams(self):
+        assert tokenize("Plot the Data") == ["plot", "the", "data", "plot the", "the data"]
+
+    @pytest.mark.unit
+    def test_seed_examples_classify_held_out_prompts(self):
+        classifier = LocalTaskClassifier(TASK_TYPES)
+        correct = sum(classifier.predict(prompt)[0] == expected for prompt, expected in LABELED_PROMPTS)
+        assert correct / len(LABELED_PROMPTS) >= 0.8
+
+    @pytest.mark.unit
+    def test_unknown_words_give_zero_confidence(self):
+        classifier = LocalTaskClassifier(TASK_TYPES)
+        assert classifier.predict("zzz qqq")[1] == 0.0
+
+    @pytest.mark.unit
+    def test_learning_from_history_shifts_predictions(self):
+        classifier = LocalTaskClassifier(TASK_TYPES, use_seed_examples=False)
+        classifier.fit([("transcode the podcast episode", "multimedia")] * 3 +
+                       [("tally the survey answers", "analytics")] * 3)
+
+        assert classifier.predict("transcode this episode")[0] == "multimedia"
+        assert classifier.predict("tally these answers")[0] == "analytics"
+
+    @pytest.mark.unit
+    def test_unknown_task_types_are_ignored(self):
+        classifier = LocalTaskClassifier(TASK_TYPES, use_seed_examples=False)
+        assert classifier.fit([("something", "exploration"), ("write code", "code")]) == 1
+        assert classifier.trained_examples == 1
+
+
+class TestClassifyTaskFastPath:
+    """Test classify_task falling back to the model only when unsure."""
+
+    @pytest.mark.unit
+    def test_confident_prediction_skips_model(self):
+        processor = _make_processor(LocalTaskClassifier(TASK_TYPES))
+
+        task_type, confidence = processor.classify_task("Write a Python function to sort a list")
+
+        assert task_type == "code"
+        assert confidence >= processor.config.local_classifier_threshold
+        processor.query_ai_with_primary_fallback.assert_not_called()
+
+    @pytest.mark.unit
+    def test_low_confidence_falls_back_to_model(self):
+        processor = _make_processor(LocalTaskClassifier(TASK_TYPES), response="rag,0.8")
+
+        assert processor.classify_task("hello there") == ("rag", 0.8)
+        processor.query_ai_with_primary_fallback.assert_called_once()
+
+    @pytest.mark.unit
+    def test_disabled_classifier_uses_model(self):
+        processor = _make_processor(None, response="analytics,0.7")
+
+        assert processor.classify_task("Write a Python function") == ("analytics", 0.7)
+
+
+class TestClassifierBenchmark:
+    """Benchmark the local classifier against the model round trip."""
+
+    @pytest.mark.performance
+    def test_local_classifier_vs_model_path(self, capsys):
+        classifier = LocalTaskClassifier(TASK_TYPES)
+        labels = dict(LABELED_PROMPTS)
+
+        # Stand-in for the model path: always right, with a fast local-model latency
+        def answer(classification_prompt):
+            prompt = classification_prompt.split('Task: "')[1].split('"')[0]
+            return f"{labels[prompt]},0.9"
+
+        model_processor = _make_processor(None, response=answer, latency=0.05)
+
+        report = benchmark_classifiers(LABELED_PROMPTS, {
+            'local': classifier.predict,
+            'model': model_processor.classify_task,
+        })
+        with capsys.disabled():
+            print("\n" + json.dumps(report, indent=2))
+
+        assert report['local']['accuracy'] >= 0.8
+        assert report['local']['mean_latency_ms'] < 5
+        assert report['local']['mean_latency_ms'] * 10 < report['model']['mean_latency_ms']
@@ -0,0 +1,201 @@
+"""
+Tests for the concurrent task execution engine behind TaskProcessor.
+"""
+import threading
+import time
+import pytest
+from types import SimpleNamespace
+
+from supermini import AIConfig, TaskExecutionEngine, TaskProcessor, TaskResult
+
+
+def _make_processor(process_task, **config):
+    processor = TaskProcessor.__new__(TaskProcessor)
+    processor.config = AIConfig(**config)
+    processor.stop_requested = False
+    processor.stream_callback = None
+    processor.execution_engine = None
+    processor.claude = SimpleNamespace(config=processor.config, task_processor=processor)
+    processor.ollama = SimpleNamespace(config=processor.config, task_processor=processor)
+    processor.process_task = process_task
+    return processor
+
+
+def _result(text):
+    return TaskResult(True, text, [], [])
+
+
+class TestSpawnWorker:
+    """Test per-worker processor isolation."""
+
+    @pytest.mark.unit
+    def test_worker_has_own_config_and_managers(self):
+        processor = _make_processor(lambda *args, **kwargs: None)
+        worker = processor.spawn_worker()
+
+        worker.config.temperature = 0.1
+        assert processor.config.temperature == 0.7
+        assert worker.claude.config is worker.config
+        assert worker.ollama.task_processor is worker
+        assert processor.claude.task_processor is processor
+
+    @pytest.mark.unit
+    def test_workers_get_own_analysis_helpers(self):
+        processor = _make_processor(lambda *args, **kwargs: None)
+        processor.task_intelligence = object()
+        processor.response_analyzer = object()
+        first, second = processor.spawn_worker(), processor.spawn_worker()
+
+        assert first.task_intelligence is not second.task_intelligence
+        assert first.response_analyzer is not processor.response_analyzer
+
+    @pytest.mark.unit
+    def test_shared_continuation_engine_is_used_one_task_at_a_time(self):
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def update_from_result(*args):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.02)
+            with lock:
+                active.pop()
+
+        processor = _make_processor(lambda *args, **kwargs: None)
+        processor.continuation_lock = threading.Lock()
+        processor.autonomous_continuation_engine = SimpleNamespace(update_from_result=update_from_result)
+        workers = [processor.spawn_worker() for _ in range(4)]
+        threads = [threading.Thread(target=worker._continuation, args=('update_from_result', None))
+                   for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert len(peak) == 4
+        assert max(peak) == 1
+
+
+class TestTaskExecutionEngine:
+    """Test submit/future execution on a bounded worker pool."""
+
+    @pytest.mark.unit
+    def test_submit_returns_future_with_result(self):
+        processor = _make_processor(lambda prompt, files, task_type, **options: _result(f"done: {prompt}"))
+
+        future = processor.submit("task one", task_type="code")
+
+        assert future.result(timeout=5).result == "done: task one"
+        processor.execution_engine.shutdown()
+
+    @pytest.mark.unit
+    def test_tasks_run_concurrently_up_to_limit(self):
+        lock = threading.Lock()
+        running = []
+        peak = []
+
+        def process_task(prompt, files, task_type, **options):
+            with lock:
+                running.append(prompt)
+                peak.append(len(running))
+            time.sleep(0.1)
+            with lock:
+                running.remove(prompt)
+            return _result(prompt)
+
+        processor = _make_processor(process_task, max_concurrent_tasks=2)
+        futures = [processor.submit(f"task {i}") for i in range(6)]
+
+        assert [f.result(timeout=5).result for f in futures] == [f"task {i}" for i in range(6)]
+        assert max(peak) == 2
+        processor.execution_engine.shutdown()
+
+    @pytest.mark.unit
+    def test_higher_priority_runs_first(self):
+        release = threading.Event()
+        order = []
+
+        def process_task(prompt, files, task_type, **options):
+            if prompt == "blocker":
+                release.wait(5)
+            order.append(prompt)
+            return _result(prompt)
+
+        processor = _make_processor(process_task, max_concurrent_tasks=1)
+        engine = TaskExecutionEngine(processor, max_workers=1)
+        blocker = engine.submit("blocker")
+        time.sleep(0.05)
+        futures = [engine.submit("low", priority=0), engine.submit("high", priority=5), engine.submit("mid", priority=2)]
+        release.set()
+
+        for future in [blocker] + futures:
+            future.result(timeout=5)
+        assert order == ["blocker", "high", "mid", "low"]
+        engine.shutdown()
+
+    @pytest.mark.unit
+    def test_failures_are_reported_through_future(self):
+        def process_task(prompt, files, task_type, **options):
+            raise ValueError("boom")
+
+        engine = TaskExecutionEngine(_make_processor(process_task), max_workers=1)
+        future = engine.submit("bad")
+
+        with pytest.raises(ValueError):
+            future.result(timeout=5)
+        engine.shutdown()
+        assert engine.get_stats()['failed'] == 1
+
+    @pytest.mark.unit
+    def test_shutdown_can_cancel_pending_tasks(self):
+        release = threading.Event()
+
+        def process_task(prompt, files, task_type, **options):
+            release.wait(5)
+            return _result(prompt)
+
+        engine = TaskExecutionEngine(_make_processor(process_task), max_workers=1)
+        running = engine.submit("running")
+        time.sleep(0.05)
+        pending = engine.submit("pending")
+
+        engine.shutdown(wait=False, cancel_pending=True)
+        release.set()
+
+        assert pending.cancelled()
+        assert running.result(timeout=5).result == "running"
+        with pytest.raises(RuntimeError):
+            engine.submit("late")
+
+
+class TestBackendConcurrency:
+    """Test per-backend request limits shared across workers."""
+
+    @pytest.mark.unit
+    def test_ollama_requests_are_serialized(self):
+        processor = TaskProcessor.__new__(TaskProcessor)
+        processor.config = AIConfig()
+        processor.backend_slots = {'claude': threading.BoundedSemaphore(4), 'ollama': threading.BoundedSemaphore(1)}
+        processor.latency_tracker = SimpleNamespace(record=lambda *args: None)
+        lock = threading.Lock()
+        active = []
+        peak = []
+
+        def query(callback):
+            with lock:
+                active.append(1)
+                peak.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.pop()
+            return "ok"
+
+        threads = [threading.Thread(target=processor._timed_query, args=('ollama', query, None)) for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert max(peak) == 1